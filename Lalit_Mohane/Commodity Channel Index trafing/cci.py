@@ -4,12 +4,14 @@ import logging
 from config import Config
 
 # Configure logging to write to a file
-logging.basicConfig(
-    filename=Config().log_file, 
-    level=logging.INFO, 
-    format='%(asctime)s - %(message)s', 
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=Config().log_file, 
+        level=logging.INFO, 
+        format='%(asctime)s - %(message)s', 
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
 # Function to read CSV and load data
 def read_csv(file_path):
@@ -132,4 +134,5 @@ def main():
         raise
 
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
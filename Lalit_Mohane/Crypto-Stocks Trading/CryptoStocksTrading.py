@@ -4,8 +4,12 @@ import numpy as np
 import talib
 import logging
 import os
+import sys
 from config import CONFIG
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import asof, datasets
+
 class TradingStrategy:
     def __init__(self, config):
         self.config = config
@@ -27,6 +31,8 @@ class TradingStrategy:
         logging.getLogger('').addHandler(console_handler)
     
     def load_data(self):
+        if self.config.get("streams"):
+            return self.load_aligned_data()
         if not os.path.exists(self.config["csv_file"]):
             raise FileNotFoundError("CSV file not found.")
         df = pd.read_csv(self.config["csv_file"])
@@ -36,6 +42,37 @@ class TradingStrategy:
             raise ValueError(f"Missing columns: {missing}")
         return df
 
+    def load_aligned_data(self):
+        price_columns = ['open', 'high', 'low', 'close', 'Volume']
+        streams = []
+        for name, stream_config in self.config["streams"].items():
+            if not os.path.exists(stream_config["csv_file"]):
+                raise FileNotFoundError(f"CSV file not found for stream '{name}'.")
+            df = pd.read_csv(stream_config["csv_file"])
+            time_format = datasets.validate_schema(df)
+            session = stream_config.get("session")
+            calendar = None
+            if session:
+                calendar = asof.SessionCalendar(session["open"], session["close"],
+                                                holidays=session.get("holidays", ()),
+                                                timezone=session.get("timezone"))
+            streams.append(asof.Stream.from_frame(
+                name, df, columns=[col for col in price_columns if col in df.columns],
+                time_format=time_format, max_age=stream_config.get("max_age"), calendar=calendar))
+
+        trade_stream = self.config["trade_stream"]
+        traded = next((stream for stream in streams if stream.name == trade_stream), None)
+        if traded is None:
+            raise ValueError(f"Trade stream '{trade_stream}' is not one of the configured streams")
+        sessions = traded.calendar if self.config.get("trade_sessions_only") else None
+        df = asof.align(streams, on=trade_stream, calendar=sessions)
+        df = df.rename(columns={f"{trade_stream}_{col}": col for col in price_columns})
+        missing = [col for col in price_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        logging.info(f"Aligned {len(streams)} streams on '{trade_stream}': {len(df)} rows")
+        return df
+
     def calculate_indicators(self, df):
         df['RSI'] = talib.RSI(df['close'], timeperiod=self.config["indicators"]["rsi"]["period"])
         macd, signal, hist = talib.MACD(df['close'], 
@@ -47,11 +47,22 @@ CONFIG = {
         "datefmt": "%Y-%m-%d %H:%M:%S"
     },
     
+    # Multi-asset alignment (common/asof.py). None trades the single csv_file above.
+    # Otherwise every stream is a CSV put on the time grid of "trade_stream" with
+    # as-of values (last row at or before each bar); the traded stream keeps the
+    # plain column names, the others are prefixed ("nifty_close", ...).
+    #     "streams": {
+    #         "btc": {"csv_file": os.path.join(BASE_DIR, "data", "BTCUSDT, 1.csv")},
+    #         "nifty": {"csv_file": os.path.join(BASE_DIR, "data", "NSE_NIFTY, 1 Intraday.csv"),
+    #                   "max_age": "1D",  # Older values become NaN
+    #                   "session": {"open": "09:15", "close": "15:30", "timezone": "Asia/Kolkata",
+    #                               "holidays": []}},
+    #     },
+    "streams": None,
+    "trade_stream": "btc",
+    "trade_sessions_only": False,  # Only keep bars inside the traded stream's session
+
     # Trading thresholds
     "price_movement_threshold": 0.001,  # 0.1% price movement
     "volume_multiplier": 1.5,          # Volume should be 1.5x the average
 }
-
-# Create necessary directories
-os.makedirs(os.path.join(BASE_DIR, "data"), exist_ok=True)
-os.makedirs(os.path.join(BASE_DIR, "logs"), exist_ok=True)
\ No newline at end of file
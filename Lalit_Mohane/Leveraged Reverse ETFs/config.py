@@ -5,5 +5,9 @@ CONFIG = {
     "upper_band_multiplier": 0.002,  # Adjusted for lower volatility
     "RSI_buy_threshold": 45,  # Lowered threshold
     "RSI_sell_threshold": 55,  # Lowered threshold
-    "VWAP_volume_threshold": 0.8  # Reduced volume threshold
+    "VWAP_volume_threshold": 0.8,  # Reduced volume threshold
+    "bull_etf_leverage": 3,  # Fund bought on oversold (Buy) signals
+    "inverse_etf_leverage": -3,  # Fund bought on overbought (Sell) signals
+    "etf_expense_ratio": 0.0095,  # Annual expense ratio of the ETF
+    "etf_financing_rate": 0.065  # Annual financing rate (earned by inverse funds)
 }
@@ -1,17 +1,24 @@
 # Import necessary libraries
 import csv
 import logging
+import os
+import sys
 import talib
 import numpy as np
 from datetime import datetime
 from config import CONFIG
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common.etf import etf_nav
+
 # Configure logging
-logging.basicConfig(
-    filename=CONFIG["log_file"],
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=CONFIG["log_file"],
+        level=logging.DEBUG,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
 
 # Function to read CSV data
 def read_csv(file_path):
@@ -64,6 +71,28 @@ def calculate_indicators(data):
     logging.info("Indicators calculated successfully using TA-Lib.")
     return data
 
+# Function to derive the traded ETFs' prices from the underlying
+def add_etf_prices(data):
+    closes = np.array([row["close"] for row in data], dtype=float)
+    times = [row["time"] for row in data]
+
+    # Daily-reset NAVs with expense drag and financing cost, starting at the first close
+    etf_prices = etf_nav(
+        closes,
+        [CONFIG["bull_etf_leverage"], CONFIG["inverse_etf_leverage"]],
+        times=times,
+        expense_ratio=CONFIG["etf_expense_ratio"],
+        financing_rate=CONFIG["etf_financing_rate"]
+    )
+
+    for row, (bull_price, inverse_price) in zip(data, etf_prices):
+        row["bull_price"] = bull_price
+        row["inverse_price"] = inverse_price
+
+    logging.info("ETF prices derived for leverage %sx and %sx.",
+                 CONFIG["bull_etf_leverage"], CONFIG["inverse_etf_leverage"])
+    return data
+
 # Function to apply the leveraged ETF strategy
 def leveraged_reverse_etfs_strategy(data):
     trades = []
@@ -73,19 +102,23 @@ def leveraged_reverse_etfs_strategy(data):
         volume_ratio = row["volume"] / row["volume_MA"] if row["volume_MA"] > 0 else 0  # Calculate volume ratio
 
         # Relaxed decision-making conditions
+        # Oversold: expect a bounce, go long the bull fund
         if (volatility > CONFIG["lower_band_multiplier"] * 0.5 and
             row["RSI"] < CONFIG["RSI_buy_threshold"] + 10 and
             volume_ratio > CONFIG["VWAP_volume_threshold"] * 0.5):
-            trades.append({"action": "Buy", "price": row["close"], "time": row["time"], "beta": beta})
-            logging.debug("Buy Signal: Time: %s, Price: %.2f, Beta: %.2f, Volatility: %.4f, Volume Ratio: %.2f",
-                          row["time"], row["close"], beta, volatility, volume_ratio)
+            trades.append({"action": "Buy", "bull_price": row["bull_price"], "inverse_price": row["inverse_price"],
+                           "time": row["time"], "beta": beta})
+            logging.debug("Buy Signal: Time: %s, Bull ETF: %.2f, Underlying: %.2f, Beta: %.2f, Volatility: %.4f, Volume Ratio: %.2f",
+                          row["time"], row["bull_price"], row["close"], beta, volatility, volume_ratio)
 
+        # Overbought: expect a pullback, go long the inverse fund
         elif (volatility > CONFIG["upper_band_multiplier"] * 0.5 and
               row["RSI"] > CONFIG["RSI_sell_threshold"] - 10 and
               volume_ratio > CONFIG["VWAP_volume_threshold"] * 0.5):
-            trades.append({"action": "Sell", "price": row["close"], "time": row["time"], "beta": beta})
-            logging.debug("Sell Signal: Time: %s, Price: %.2f, Beta: %.2f, Volatility: %.4f, Volume Ratio: %.2f",
-                          row["time"], row["close"], beta, volatility, volume_ratio)
+            trades.append({"action": "Sell", "bull_price": row["bull_price"], "inverse_price": row["inverse_price"],
+                           "time": row["time"], "beta": beta})
+            logging.debug("Sell Signal: Time: %s, Inverse ETF: %.2f, Underlying: %.2f, Beta: %.2f, Volatility: %.4f, Volume Ratio: %.2f",
+                          row["time"], row["inverse_price"], row["close"], beta, volatility, volume_ratio)
 
     return trades
 
@@ -93,6 +126,9 @@ def leveraged_reverse_etfs_strategy(data):
 def calculate_summary(trades):
     total_profit = 0
     trade_pairs = []
+    # Fund held ("bull" or "inverse") and its entry price; a signal closes
+    # the opposite fund and opens its own when flat
+    position = None
     buy_price = None
     summary = {
         "total_trades": 0,
@@ -101,20 +137,23 @@ def calculate_summary(trades):
     }
 
     for trade in trades:
-        if trade["action"] == "Buy" and buy_price is None:
-            buy_price = trade["price"]
-        elif trade["action"] == "Sell" and buy_price is not None:
-            sell_price = trade["price"]
+        fund, opposite = ("bull", "inverse") if trade["action"] == "Buy" else ("inverse", "bull")
+        if position == opposite:
+            sell_price = trade[f"{opposite}_price"]
             profit = sell_price - buy_price
             total_profit += profit
-            trade_pairs.append((buy_price, sell_price, profit))
+            trade_pairs.append((opposite, buy_price, sell_price, profit))
             summary["total_trades"] += 1
             if profit > 0:
                 summary["profitable_trades"] += 1
             else:
                 summary["loss_trades"] += 1
-            logging.debug("Trade Pair: Bought at %.2f, Sold at %.2f, Profit: %.2f", buy_price, sell_price, profit)
-            buy_price = None  # Reset after completing a pair
+            logging.debug("Trade Pair (%s ETF): Bought at %.2f, Sold at %.2f, Profit: %.2f",
+                          opposite, buy_price, sell_price, profit)
+            position = buy_price = None  # Reset after completing a pair
+        if position is None:
+            position = fund
+            buy_price = trade[f"{fund}_price"]
 
     logging.info("Total Profit: %.2f", total_profit)
     return total_profit, trade_pairs, summary
@@ -122,8 +161,8 @@ def calculate_summary(trades):
 # Function to display trade results and summary
 def display_summary(trades, total_profit, trade_pairs, summary):
     print("\nTrade Details:")
-    for i, (buy, sell, profit) in enumerate(trade_pairs, start=1):
-        print(f"Trade {i}: Bought at {buy}, Sold at {sell}, Profit: {profit:.2f}")
+    for i, (fund, buy, sell, profit) in enumerate(trade_pairs, start=1):
+        print(f"Trade {i}: {fund.capitalize()} ETF bought at {buy}, Sold at {sell}, Profit: {profit:.2f}")
 
     print("\nSummary:")
     print(f"Total Trades: {summary['total_trades']}")
@@ -141,6 +180,9 @@ def main():
         # Calculate indicators using TA-Lib
         data = calculate_indicators(data)
 
+        # Trades are made in the ETF, signals come from the underlying
+        data = add_etf_prices(data)
+
         # Apply the trading strategy
         trades = leveraged_reverse_etfs_strategy(data)
 
@@ -155,4 +197,5 @@ def main():
 
 # Run the program
 if __name__ == "__main__":
+    setup_logging()
     main()
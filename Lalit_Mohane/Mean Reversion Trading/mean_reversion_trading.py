@@ -6,12 +6,14 @@ import logging
 from config import config  # Importing configuration from config.py
 
 # Setup logging
-logging.basicConfig(
-    filename=config["log_file"],
-    level=logging.INFO,
-    format="%(asctime)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config["log_file"],
+        level=logging.INFO,
+        format="%(asctime)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
 
 def load_market_data(csv_file):
     """Load market data from the given CSV file and compute necessary indicators."""
@@ -165,4 +167,5 @@ def run_advanced_mean_reversion_strategy(config):
 
 # Run strategy
 if __name__ == "__main__":
+    setup_logging()
     run_advanced_mean_reversion_strategy(config)
\ No newline at end of file
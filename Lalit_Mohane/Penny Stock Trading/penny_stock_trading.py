@@ -1,15 +1,22 @@
+import os
+import sys
 import pandas as pd
 import talib
 import logging
 from config import Config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import rolling
+
 # Setup logging
-logging.basicConfig(
-    filename=Config.LOG_FILE,
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=Config.LOG_FILE,
+        level=logging.DEBUG,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        filemode="w",
+    )
 logger = logging.getLogger()
 
 def read_csv(file_path):
@@ -64,12 +71,16 @@ def penny_stock_trading_strategy(df, config):
     in_position = False
     buy_price = None
 
+    # Highs/lows of the LOOKBACK_PERIOD bars before each bar
+    window_highs = rolling.rolling_max(df['high'].to_numpy(), config.LOOKBACK_PERIOD)
+    window_lows = rolling.rolling_min(df['low'].to_numpy(), config.LOOKBACK_PERIOD)
+
     for index, row in df.iterrows():
         if index < config.LOOKBACK_PERIOD:
             continue
 
-        recent_high = df['high'][index - config.LOOKBACK_PERIOD:index].max()
-        recent_low = df['low'][index - config.LOOKBACK_PERIOD:index].min()
+        recent_high = window_highs[index - 1]
+        recent_low = window_lows[index - 1]
 
         logger.debug(f"Index: {index}, Recent High: {recent_high}, Recent Low: {recent_low}, Volume: {row['Volume']}, Volume_MA: {row['Volume_MA']}")
 
@@ -121,4 +132,5 @@ def main():
     logger.info(f"Number of Trades: {len(trade_pairs)}")
 
 if __name__ == "__main__":
+    setup_logging()
     main()
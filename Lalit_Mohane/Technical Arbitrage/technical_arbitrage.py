@@ -8,9 +8,6 @@ import talib
 import numpy as np
 from config import Config
 
-# Configure logging using config
-Config.setup_logging()
-
 # Function to read CSV data
 def read_csv(file_path):
     dataset = {
@@ -151,4 +148,6 @@ def main():
 
 # Run the program
 if __name__ == "__main__":
+    # Configure logging using config
+    Config.setup_logging()
     main()
\ No newline at end of file
@@ -6,11 +6,13 @@ import talib
 from config import *
 
 # Setup logging
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s'
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s'
+    )
 
 def calculate_theta(data, days_to_expiry):
     """Calculate theta decay."""
@@ -95,6 +97,7 @@ def summarize_trades(trade_log, initial_balance, final_balance):
 
 # Main script execution
 if __name__ == "__main__":
+    setup_logging()
     # Load and preprocess data
     data = pd.read_csv("NSE_NIFTY, 1D.csv", usecols=['time', 'open', 'high', 'low', 'close', 'Volume'])
     data = calculate_theta(data, DAYS_TO_EXPIRY)
@@ -6,6 +6,8 @@ VIX_MAX = 35.0  # Maximum VIX (%)
 
 # Rolling window for realized volatility
 REALIZED_VOL_WINDOW = 14  # Days
+# close_to_close, parkinson, garman_klass, rogers_satchell or yang_zhang (common/volatility.py)
+REALIZED_VOL_ESTIMATOR = "close_to_close"
 
 # RSI period
 RSI_PERIOD = 14
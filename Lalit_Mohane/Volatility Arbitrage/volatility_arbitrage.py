@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -5,17 +7,23 @@ import talib
 import logging
 from config import *
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import volatility
+
 # Setup logging
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s'
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s'
+    )
 
 def calculate_realized_volatility(data, window):
-    """Calculate realized volatility using rolling standard deviation."""
-    data['Pct_Change'] = data['close'].pct_change()
-    data['Realized_Vol'] = data['Pct_Change'].rolling(window).std() * np.sqrt(252) * 100
+    """Calculate rolling realized volatility (%) with the configured estimator."""
+    data['Realized_Vol'] = volatility.rolling_volatility(
+        data['open'], data['high'], data['low'], data['close'], window, REALIZED_VOL_ESTIMATOR
+    ) * 100
     return data
 
 def calculate_ta_indicators(data):
@@ -103,6 +111,7 @@ def summarize_trades(trade_log, initial_balance, final_balance):
 
 # Main script execution
 if __name__ == "__main__":
+    setup_logging()
     # Load and preprocess data
     data = pd.read_csv("NSE_NIFTY, 1D.csv", usecols=['time', 'open', 'high', 'low', 'close', 'Volume'])
     data = calculate_realized_volatility(data, REALIZED_VOL_WINDOW)
@@ -1,43 +1,22 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 import logging
 import talib
-from scipy.stats import norm
 import config
 
-# Set up logging to capture strategy details in the required format
-logging.basicConfig(
-    filename=config.LOG_FILE,
-    level=logging.INFO,
-    format=config.LOG_FORMAT
-)
-
-
-def calculate_option_greeks(S, K, T, r, sigma, option_type='call'):
-    """Calculate option Greeks using Black-Scholes model"""
-    T = max(T, 0.01)  # Ensure T is not zero
-
-    d1 = (np.log(S / K) + (r + sigma ** 2 / 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import greeks, rolling
 
-    if option_type == 'call':
-        delta = norm.cdf(d1)
-        theta = -(S * sigma * np.exp(-d1 ** 2 / 2)) / (2 * np.sqrt(2 * np.pi * T)) - r * K * np.exp(-r * T) * norm.cdf(
-            d2)
-    else:
-        delta = norm.cdf(d1) - 1
-        theta = -(S * sigma * np.exp(-d1 ** 2 / 2)) / (2 * np.sqrt(2 * np.pi * T)) + r * K * np.exp(-r * T) * norm.cdf(
-            -d2)
-
-    gamma = np.exp(-d1 ** 2 / 2) / (S * sigma * np.sqrt(2 * np.pi * T))
-    vega = S * np.sqrt(T) * np.exp(-d1 ** 2 / 2) / np.sqrt(2 * np.pi)
-
-    return {
-        'delta': delta,
-        'gamma': gamma,
-        'theta': theta,
-        'vega': vega
-    }
+# Set up logging to capture strategy details in the required format
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_FILE,
+        level=logging.INFO,
+        format=config.LOG_FORMAT
+    )
 
 
 def calculate_implied_volatility(data, window=None):
@@ -91,30 +70,29 @@ def generate_synthetic_options_data(data):
     # Time to expiration (synthetic - assuming weekly options)
     data['Days_to_Expiry'] = config.DAYS_TO_EXPIRY
 
-    # Calculate option Greeks for both calls and puts
-    for idx in data.index:
-        call_greeks = calculate_option_greeks(
-            S=data.loc[idx, 'close'],
-            K=data.loc[idx, 'ATM_Strike'],
-            T=data.loc[idx, 'Days_to_Expiry'] / config.TRADING_DAYS,
-            r=config.RISK_FREE_RATE,
-            sigma=data.loc[idx, 'IV']
-        )
-
-        put_greeks = calculate_option_greeks(
-            S=data.loc[idx, 'close'],
-            K=data.loc[idx, 'ATM_Strike'],
-            T=data.loc[idx, 'Days_to_Expiry'] / config.TRADING_DAYS,
-            r=config.RISK_FREE_RATE,
-            sigma=data.loc[idx, 'IV'],
-            option_type='put'
-        )
-
-        data.loc[idx, 'Call_Delta'] = call_greeks['delta']
-        data.loc[idx, 'Put_Delta'] = put_greeks['delta']
-        data.loc[idx, 'Gamma'] = call_greeks['gamma']
-        data.loc[idx, 'Theta'] = call_greeks['theta']
-        data.loc[idx, 'Vega'] = call_greeks['vega']
+    # Calculate option Greeks for both calls and puts, all rows at once
+    call_greeks = greeks.option_greeks(
+        S=data['close'].to_numpy(),
+        K=data['ATM_Strike'].to_numpy(),
+        T=data['Days_to_Expiry'].to_numpy() / config.TRADING_DAYS,
+        r=config.RISK_FREE_RATE,
+        sigma=data['IV'].to_numpy()
+    )
+
+    put_greeks = greeks.option_greeks(
+        S=data['close'].to_numpy(),
+        K=data['ATM_Strike'].to_numpy(),
+        T=data['Days_to_Expiry'].to_numpy() / config.TRADING_DAYS,
+        r=config.RISK_FREE_RATE,
+        sigma=data['IV'].to_numpy(),
+        option_type='put'
+    )
+
+    data['Call_Delta'] = call_greeks['delta']
+    data['Put_Delta'] = put_greeks['delta']
+    data['Gamma'] = call_greeks['gamma']
+    data['Theta'] = call_greeks['theta']
+    data['Vega'] = call_greeks['vega']
 
     return data
 
@@ -132,6 +110,7 @@ def delta_neutral_strategy(data, params):
 
     # Corrected rolling window application on Series
     data['IV_MA'] = data['IV'].rolling(window=config.IV_MA_PERIOD).mean()
+    data['Gamma_MA'] = rolling.rolling_mean(data['Gamma'].to_numpy(), config.GAMMA_MA_PERIOD)
 
     for i in range(1, len(data)):
         current_row = data.iloc[i]
@@ -146,7 +125,7 @@ def delta_neutral_strategy(data, params):
 
         # Enhanced entry signals using options data
         delta_imbalance = abs(current_row['Call_Delta'] + current_row['Put_Delta'])
-        high_gamma = current_row['Gamma'] > data['Gamma'].rolling(window=config.GAMMA_MA_PERIOD).mean().iloc[i]
+        high_gamma = current_row['Gamma'] > current_row['Gamma_MA']
         iv_spike = current_row['IV'] > current_row['IV_MA']
         put_call_signal = current_row['Put_Call_Ratio'] > config.PUT_CALL_RATIO_THRESHOLD
 
@@ -249,9 +228,11 @@ params = {
     'max_drawdown_pct': config.MAX_DRAWDOWN_PCT
 }
 
-try:
-    sample_data = pd.read_csv(config.DATA_FILE)
-    logging.info(f"Market data loaded from {config.DATA_FILE}")
-    results = delta_neutral_strategy(sample_data, params)
-except Exception as e:
-    logging.error(f"Error occurred: {str(e)}")
\ No newline at end of file
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        sample_data = pd.read_csv(config.DATA_FILE)
+        logging.info(f"Market data loaded from {config.DATA_FILE}")
+        results = delta_neutral_strategy(sample_data, params)
+    except Exception as e:
+        logging.error(f"Error occurred: {str(e)}")
@@ -1,3 +1,5 @@
+import os
+import sys
 import random
 import time
 import logging
@@ -6,12 +8,18 @@ import numpy as np
 import talib
 import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import barbus, oms
+from common.risk import RiskBook
+
 # Configure logging
-logging.basicConfig(
-    filename=config.LOG_FILE,
-    level=getattr(logging, config.LOG_LEVEL),
-    format=config.LOG_FORMAT
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_FILE,
+        level=getattr(logging, config.LOG_LEVEL),
+        format=config.LOG_FORMAT
+    )
 logger = logging.getLogger(__name__)
 
 
@@ -24,13 +32,45 @@ def get_market_prices(symbol, trend=0):
     return bid_price, ask_price
 
 
-def place_order(order_type, symbol, price, shares_count):
-    transaction_cost = config.TRANSACTION_COST_PERCENTAGE * price * shares_count
-    slippage = random.uniform(config.SLIPPAGE_RANGE_MIN, config.SLIPPAGE_RANGE_MAX)
-    final_price = price + slippage
+def risk_allows(risk_book, order_type, symbol, price, shares_count):
+    """Pre-trade check against the firm-wide risk book (always allowed without one)"""
+    if risk_book is None:
+        return True
+    quantity = shares_count if order_type == 'BUY' else -shares_count
+    approved, reason = risk_book.submit(symbol, quantity, price)
+    if not approved:
+        logger.warning(f"Risk book rejected {order_type} of {shares_count} {symbol} at {price:.2f}: {reason}")
+    return approved
+
+
+def place_order(order_type, symbol, price, shares_count, risk_book=None, order_manager=None):
+    """Execute an order; returns (average fill price, transaction cost, shares filled)"""
+    sign = 1 if order_type == 'BUY' else -1
+    if order_manager is not None:
+        # Market order through the OMS, filled by the matching engine at the current quote
+        order = order_manager.submit(symbol, order_type, shares_count)
+        filled = int(round(order.filled))
+        if order.state != oms.FILLED:
+            logger.error(f"Order {order.client_id} ended {order.state} ({order.reason}) with {order.filled} filled")
+        final_price = order.avg_price if order.avg_price is not None else price
+        slippage = final_price - price
+        transaction_cost = order.fees
+    else:
+        filled = shares_count
+        transaction_cost = config.TRANSACTION_COST_PERCENTAGE * price * shares_count
+        slippage = random.uniform(config.SLIPPAGE_RANGE_MIN, config.SLIPPAGE_RANGE_MAX)
+        final_price = price + slippage
+    if risk_book is not None:
+        # Book what was executed and release the rest of the reservation
+        if filled:
+            risk_book.fill(symbol, sign * filled, final_price, fees=transaction_cost)
+        if filled < shares_count:
+            risk_book.cancel(symbol, sign * (shares_count - filled))
+    if filled == 0:
+        return price, transaction_cost, 0
     logger.info(
-        f"Placed {order_type} order for {shares_count} shares of {symbol} at {final_price:.2f} (Slippage: {slippage:.2f}) | Transaction cost: {transaction_cost:.2f}")
-    return final_price, transaction_cost
+        f"Placed {order_type} order for {filled} shares of {symbol} at {final_price:.2f} (Slippage: {slippage:.2f}) | Transaction cost: {transaction_cost:.2f}")
+    return final_price, transaction_cost, filled
 
 
 def calculate_technical_indicators(prices):
@@ -109,10 +149,43 @@ def market_maker(symbol, desired_spread):
     market_trend = random.choice(config.MARKET_TRENDS)
     logger.info(f"Starting market maker with initial capital: {initial_capital}, symbol: {symbol}")
 
+    # With a bar bus, quotes come from its bars: bid at the close, ask one spread above
+    subscriber = barbus.BarSubscriber(config.BAR_BUS_NAME) if config.BAR_BUS_NAME else None
+    feed = subscriber.bars(timeout=config.HOLDING_PERIOD) if subscriber else None
+    # Firm-wide limits shared with the other strategies (python -m common.risk run ...)
+    risk = RiskBook(config.RISK_BOOK_NAME) if config.RISK_BOOK_NAME else None
+    # Orders through the order manager, matched against the quotes on a local exchange stub
+    exchange = orders = None
+    if config.USE_ORDER_MANAGER:
+        exchange = oms.LocalExchange(fee_rate=config.TRANSACTION_COST_PERCENTAGE)
+        # The journal lives next to this script; orders finished in earlier sessions are dropped from it
+        journal = os.path.join(os.path.dirname(os.path.abspath(__file__)), config.ORDER_JOURNAL)
+        kept, dropped = oms.compact_journal(journal)
+        if dropped:
+            logger.info(f"Order journal compacted: {dropped} finished orders dropped, {kept} still working")
+        orders = oms.BlockingOrderManager(exchange, journal=journal)
+        # Orders an earlier session left working are not on this exchange: close them and
+        # release their unfilled quantity in the risk book before quoting
+        for client_id in orders.reconcile():
+            stale = orders.manager.orders[client_id]
+            if risk is not None:
+                risk.cancel(stale.symbol, (1 if stale.side == 'BUY' else -1) * stale.remaining)
+            logger.warning(f"Order {client_id} left working by an earlier session closed ({stale.filled:g} of {stale.quantity:g} filled)")
+
     start_time = time.time()
 
     while True:
-        bid_price, ask_price = get_market_prices(symbol, market_trend)
+        if feed is None:
+            bid_price, ask_price = get_market_prices(symbol, market_trend)
+        else:
+            bar = next(feed, None)
+            if bar is None:
+                logger.info(f"Bar bus '{config.BAR_BUS_NAME}' closed or idle. Stopping.")
+                break
+            bid_price = round(float(bar['close']), 2)
+            ask_price = round(bid_price + desired_spread, 2)
+        if exchange is not None:
+            exchange.quote(symbol, bid_price, ask_price)
         price_history.append(bid_price)
         prices.append(bid_price)
 
@@ -125,17 +198,18 @@ def market_maker(symbol, desired_spread):
 
             if mean_reversion_action == 'BUY':
                 logger.info("Enhanced Mean Reversion Strategy suggests buying.")
-                order_price, transaction_cost = place_order('BUY', symbol, bid_price, 1)
-                current_capital -= (order_price + transaction_cost)
-                shares_held += 1
-                logger.info(f"Shares held after buying: {shares_held}")
+                if risk_allows(risk, 'BUY', symbol, bid_price, 1):
+                    order_price, transaction_cost, filled = place_order('BUY', symbol, bid_price, 1, risk, orders)
+                    current_capital -= (order_price * filled + transaction_cost)
+                    shares_held += filled
+                    logger.info(f"Shares held after buying: {shares_held}")
 
             elif mean_reversion_action == 'SELL':
                 logger.info("Enhanced Mean Reversion Strategy suggests selling.")
-                if shares_held > 0:
-                    order_price, transaction_cost = place_order('SELL', symbol, ask_price, 1)
-                    current_capital += (order_price - transaction_cost)
-                    shares_held -= 1
+                if shares_held > 0 and risk_allows(risk, 'SELL', symbol, ask_price, 1):
+                    order_price, transaction_cost, filled = place_order('SELL', symbol, ask_price, 1, risk, orders)
+                    current_capital += (order_price * filled - transaction_cost)
+                    shares_held -= filled
                     logger.info(f"Shares held after selling: {shares_held}")
 
             # Moving average-based strategy
@@ -144,17 +218,18 @@ def market_maker(symbol, desired_spread):
             if ma is not None:
                 if bid_price < ma:
                     logger.info("Bid price is below Moving Average. Suggesting to buy.")
-                    order_price, transaction_cost = place_order('BUY', symbol, bid_price, 1)
-                    current_capital -= (order_price + transaction_cost)
-                    shares_held += 1
-                    logger.info(f"Shares held after buying: {shares_held}")
+                    if risk_allows(risk, 'BUY', symbol, bid_price, 1):
+                        order_price, transaction_cost, filled = place_order('BUY', symbol, bid_price, 1, risk, orders)
+                        current_capital -= (order_price * filled + transaction_cost)
+                        shares_held += filled
+                        logger.info(f"Shares held after buying: {shares_held}")
 
                 elif bid_price > ma:
                     logger.info("Bid price is above Moving Average. Suggesting to sell.")
-                    if shares_held > 0:
-                        order_price, transaction_cost = place_order('SELL', symbol, ask_price, 1)
-                        current_capital += (order_price - transaction_cost)
-                        shares_held -= 1
+                    if shares_held > 0 and risk_allows(risk, 'SELL', symbol, ask_price, 1):
+                        order_price, transaction_cost, filled = place_order('SELL', symbol, ask_price, 1, risk, orders)
+                        current_capital += (order_price * filled - transaction_cost)
+                        shares_held -= filled
                         logger.info(f"Shares held after selling: {shares_held}")
 
             # Market trend randomization
@@ -164,24 +239,37 @@ def market_maker(symbol, desired_spread):
 
             # Exit strategy
             if exit_strategy(current_capital, shares_held, bid_price, initial_capital):
-                if shares_held > 0:
+                if shares_held > 0 and risk_allows(risk, 'SELL', symbol, bid_price, shares_held):
                     logger.info("Selling remaining shares before exiting due to profit/loss threshold.")
-                    order_price, transaction_cost = place_order('SELL', symbol, bid_price, shares_held)
-                    current_capital += (order_price * shares_held - transaction_cost)
-                    shares_held = 0
+                    order_price, transaction_cost, filled = place_order('SELL', symbol, bid_price, shares_held, risk, orders)
+                    current_capital += (order_price * filled - transaction_cost)
+                    shares_held -= filled
                 break
 
         # Time-based exit
         current_time = time.time()
         if current_time - start_time > config.HOLDING_PERIOD:
             logger.info("Time-based exit strategy triggered. Exiting positions.")
-            if shares_held > 0:
-                order_price, transaction_cost = place_order('SELL', symbol, bid_price, shares_held)
-                current_capital += (order_price * shares_held - transaction_cost)
-                shares_held = 0
+            if shares_held > 0 and risk_allows(risk, 'SELL', symbol, bid_price, shares_held):
+                order_price, transaction_cost, filled = place_order('SELL', symbol, bid_price, shares_held, risk, orders)
+                current_capital += (order_price * filled - transaction_cost)
+                shares_held -= filled
             break
 
-        time.sleep(config.TRADING_INTERVAL)
+        if feed is None:
+            time.sleep(config.TRADING_INTERVAL)
+
+    if risk is not None:
+        risk.close()
+    if orders is not None:
+        orders.close()
+    if subscriber is not None:
+        if subscriber.dropped:
+            logger.warning(f"{subscriber.dropped} bars were overwritten on the bar bus before they were read")
+        subscriber.close()
+        if not prices:
+            logger.info("No bars received from the bar bus.")
+            return
 
     # Final reporting
     total_value = current_capital + (shares_held * bid_price)
@@ -191,4 +279,5 @@ def market_maker(symbol, desired_spread):
 
 
 if __name__ == "__main__":
+    setup_logging()
     market_maker(config.SYMBOL, config.DESIRED_SPREAD)
\ No newline at end of file
@@ -26,9 +26,7 @@
 import random
 import time
 from collections import deque
-from textblob import TextBlob
 import threading
-import keyboard  # For capturing keyboard events
 
 
 # Simulated function to get market prices
@@ -64,6 +62,7 @@ def fetch_recent_news(symbol):
 
 # Function to analyze sentiment
 def analyze_sentiment(news_article):
+    from textblob import TextBlob  # Sentiment analysis library, imported on first use
     analysis = TextBlob(news_article)
     return analysis.sentiment.polarity  # Returns a value between -1 (negative) and 1 (positive)
 
@@ -113,6 +112,7 @@ def mean_reversion_strategy(prices, threshold=2.0):
 
 
 def stop_trading():
+    import keyboard  # For capturing keyboard events, imported when trading starts
     while True:
         if keyboard.is_pressed('q'):  # Stop if 'q' is pressed
             print("Exiting trading...")
@@ -120,6 +120,8 @@ def stop_trading():
 
 # Market maker function
 def market_maker(symbol, desired_spread):
+    import keyboard  # For capturing keyboard events, imported when trading starts
+
     buy_orders = deque(maxlen=100)
     sell_orders = deque(maxlen=100)
     price_history = deque(maxlen=50)  # Store last 50 prices for mean reversion
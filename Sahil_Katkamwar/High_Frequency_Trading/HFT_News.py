@@ -1,7 +1,6 @@
 import random
 import time
 from collections import deque
-from textblob import TextBlob  # Simple sentiment analysis library
 
 
 # Simulated function to get market prices
@@ -26,6 +25,7 @@ def fetch_recent_news(symbol):
 
 # Function to analyze sentiment
 def analyze_sentiment(news_article):
+    from textblob import TextBlob  # Simple sentiment analysis library, imported on first use
     analysis = TextBlob(news_article)
     return analysis.sentiment.polarity  # Returns a value between -1 (negative) and 1 (positive)
 
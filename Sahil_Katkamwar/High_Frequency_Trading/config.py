@@ -26,6 +26,16 @@ MARKET_DOWNTURN_PROBABILITY = 0.2
 MARKET_DOWNTURN_TRENDS = [-0.2, -0.25]
 MARKET_TRENDS = [0, 0.05, -0.05]
 
+# Live bars from a shared-memory bar bus (common/barbus.py); None uses simulated prices
+BAR_BUS_NAME = None
+
+# Firm-wide risk book shared with other strategies (common/risk.py); None trades without it
+RISK_BOOK_NAME = None
+
+# Route orders through the order manager and a local matching engine (common/oms.py)
+USE_ORDER_MANAGER = False
+ORDER_JOURNAL = "hft_orders.jsonl"  # Next to HFT_Final.py; finished orders are compacted out at start-up
+
 # Time Parameters
 HOLDING_PERIOD = 2  # seconds
 TRADING_INTERVAL = 0.01  # seconds
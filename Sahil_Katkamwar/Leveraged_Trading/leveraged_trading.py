@@ -1,14 +1,22 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 import logging
 import talib
 import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import intrabar
+
 # Set up logging
-logging.basicConfig(
-    filename=config.LOG_FILE,
-    level=config.LOG_LEVEL,
-    format=config.LOG_FORMAT
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_FILE,
+        level=config.LOG_LEVEL,
+        format=config.LOG_FORMAT
+    )
 
 
 def load_market_data(file_path):
@@ -54,6 +62,14 @@ def calculate_liquidation_price(entry_price, position_type, leverage, margin_req
     return entry_price * (1 + (1 / leverage) - margin_requirement)
 
 
+def calculate_exit_level(entry_price, position_type, liquidation_price, balance, position_size, leverage, max_loss):
+    """Nearest price at which the position is liquidated or hits its maximum loss per trade"""
+    loss_distance = balance * max_loss / (position_size * leverage)
+    if position_type == "Long":
+        return max(liquidation_price, entry_price - loss_distance)
+    return min(liquidation_price, entry_price + loss_distance)
+
+
 def leveraged_trading_strategy(data, params):
     """Enhanced leveraged trading strategy"""
     # Preprocess data with technical indicators
@@ -118,56 +134,43 @@ def leveraged_trading_strategy(data, params):
                     f"Short Entry - Price: {entry_price:.2f}, Size: {position_size:.2f}, Balance: {balance:.2f}, Reason: RSI overbought or MACD crossunder")
 
         else:  # Managing existing position
-            # Calculate current profit/loss
-            if position == "Long":
-                unrealized_pnl = position_size * (current_price - entry_price) * leverage
-
-                # Exit conditions for long
-                if (current_price <= liquidation_price or  # Liquidation
-                        rsi_overbought or  # RSI exit
-                        macd_crossunder or  # MACD exit
-                        unrealized_pnl <= -balance * params.get('max_loss_per_trade',
-                                                                config.MAX_LOSS_PER_TRADE)):  # Stop loss
-
-                    pnl = position_size * (current_price - entry_price) * leverage
-                    balance += pnl
-
-                    trades.append({
-                        'type': 'Long',
-                        'entry': entry_price,
-                        'exit': current_price,
-                        'pnl': pnl,
-                        'balance': balance
-                    })
-
-                    logging.info(
-                        f"Long Exit - Price: {current_price:.2f}, PnL: {pnl:.2f}, Balance: {balance:.2f}, Reason: Liquidation or Stop loss")
-                    position = None
-
-            else:  # Short position
-                unrealized_pnl = position_size * (entry_price - current_price) * leverage
-
-                # Exit conditions for short
-                if (current_price >= liquidation_price or  # Liquidation
-                        rsi_oversold or  # RSI exit
-                        macd_crossover or  # MACD exit
-                        unrealized_pnl <= -balance * params.get('max_loss_per_trade',
-                                                                config.MAX_LOSS_PER_TRADE)):  # Stop loss
-
-                    pnl = position_size * (entry_price - current_price) * leverage
-                    balance += pnl
-
-                    trades.append({
-                        'type': 'Short',
-                        'entry': entry_price,
-                        'exit': current_price,
-                        'pnl': pnl,
-                        'balance': balance
-                    })
-
-                    logging.info(
-                        f"Short Exit - Price: {current_price:.2f}, PnL: {pnl:.2f}, Balance: {balance:.2f}, Reason: Liquidation or Stop loss")
-                    position = None
+            # Liquidation and the stop loss are checked against the bar's high
+            # and low; RSI and MACD exits still act on the close
+            exit_level = calculate_exit_level(
+                entry_price, position, liquidation_price, balance, position_size, leverage,
+                params.get('max_loss_per_trade', config.MAX_LOSS_PER_TRADE)
+            )
+            reason, exit_price = intrabar.resolve_bar(
+                current_row['open'], current_row['high'], current_row['low'], exit_level, np.nan,
+                position == "Long"
+            )
+            if reason == intrabar.STOP:
+                exit_reason = "Liquidation or Stop loss"
+            elif position == "Long" and (rsi_overbought or macd_crossunder):
+                exit_reason, exit_price = "RSI overbought or MACD crossunder", current_price
+            elif position == "Short" and (rsi_oversold or macd_crossover):
+                exit_reason, exit_price = "RSI oversold or MACD crossover", current_price
+            else:
+                exit_reason = None
+
+            if exit_reason:
+                if position == "Long":
+                    pnl = position_size * (exit_price - entry_price) * leverage
+                else:
+                    pnl = position_size * (entry_price - exit_price) * leverage
+                balance += pnl
+
+                trades.append({
+                    'type': position,
+                    'entry': entry_price,
+                    'exit': exit_price,
+                    'pnl': pnl,
+                    'balance': balance
+                })
+
+                logging.info(
+                    f"{position} Exit - Price: {exit_price:.2f}, PnL: {pnl:.2f}, Balance: {balance:.2f}, Reason: {exit_reason}")
+                position = None
 
         # Risk management - stop trading if significant losses
         if balance < initial_balance * config.MAX_DRAWDOWN_PCT:
@@ -216,12 +219,14 @@ params = {
     'max_loss_per_trade': config.MAX_LOSS_PER_TRADE
 }
 
-try:
-    # Load and run strategy
-    data = load_market_data(config.DATA_FILE)
-    results = leveraged_trading_strategy(data, params)
-
-except FileNotFoundError:
-    logging.error(f"File not found: {config.DATA_FILE}")
-except Exception as e:
-    logging.error(f"Error occurred: {str(e)}")
\ No newline at end of file
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        # Load and run strategy
+        data = load_market_data(config.DATA_FILE)
+        results = leveraged_trading_strategy(data, params)
+
+    except FileNotFoundError:
+        logging.error(f"File not found: {config.DATA_FILE}")
+    except Exception as e:
+        logging.error(f"Error occurred: {str(e)}")
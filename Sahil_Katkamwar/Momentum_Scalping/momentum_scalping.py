@@ -6,11 +6,13 @@ from datetime import datetime
 import config
 
 # Set up logging
-logging.basicConfig(
-    filename=config.LOG_FILE,
-    level=getattr(logging, config.LOG_LEVEL),
-    format=config.LOG_FORMAT
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_FILE,
+        level=getattr(logging, config.LOG_LEVEL),
+        format=config.LOG_FORMAT
+    )
 
 
 def calculate_indicators(df):
@@ -262,6 +264,7 @@ def run_momentum_strategy(data_path, initial_balance=None):
 
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         results = run_momentum_strategy(config.DATA_FILE)
     except Exception as e:
@@ -9,6 +9,22 @@ MAX_DRAWDOWN_PCT = 0.10    # Stop if 10% account loss
 MAKER_REBATE = 0.00025  # 0.025% rebate for providing liquidity
 TAKER_FEE = 0.00075    # 0.075% fee for taking liquidity
 
+# Fee schedules to re-price the finished run under (common/costs.py
+# parameters). 'current' matches the fees applied during the run.
+COST_SCENARIOS = {
+    'current': {'maker_rebate': MAKER_REBATE, 'taker_fee': TAKER_FEE},
+    'no_rebate': {'taker_fee': TAKER_FEE},
+    'discount_broker': {
+        'commission_tiers': ((0, 0.0003),),
+        'commission_max': 20,        # Rs.20 or 0.03% per order, whichever is lower
+        'buy_tax': 0.00003,          # Stamp duty
+        'sell_tax': 0.00025,         # STT on intraday sells
+        'exchange_fee': 0.0000297,
+        'gst': 0.18
+    },
+    'taker_with_impact': {'taker_fee': TAKER_FEE, 'half_spread_bps': 1.0, 'impact_coef': 1.0},
+}
+
 # Entry Conditions
 LONG_ENTRY = {
     'rsi_threshold': 40,
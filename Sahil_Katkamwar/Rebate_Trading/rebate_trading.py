@@ -1,14 +1,21 @@
+import os
+import sys
 import pandas as pd
 import logging
 import talib
 import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import costs
+
 # Set up logging
-logging.basicConfig(
-    filename=config.LOG_CONFIG['filename'],
-    level=getattr(logging, config.LOG_CONFIG['level']),
-    format=config.LOG_CONFIG['format']
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_CONFIG['filename'],
+        level=getattr(logging, config.LOG_CONFIG['level']),
+        format=config.LOG_CONFIG['format']
+    )
 
 def load_market_data(file_path):
     """Load and prepare market data from CSV"""
@@ -52,6 +59,9 @@ def calculate_indicators(df):
     df['%K'] = stoch_slow
     df['%D'] = stoch_signal
 
+    # Per-bar return volatility, used by the market impact cost
+    df['Volatility'] = df['close'].pct_change().rolling(window=20).std()
+
     logging.info("Technical indicators calculated successfully.")
     return df
 
@@ -74,6 +84,10 @@ def rebate_trading_strategy(data):
     trades = []
     rebate_earned = 0
 
+    # Every fill and each trade's P&L before fees, for re-pricing under other fee schedules
+    fills = costs.fill_ledger()
+    gross_pnl = {}
+
     for i in range(1, len(data)):
         current_row = data.iloc[i]
         prev_row = data.iloc[i - 1]
@@ -106,6 +120,9 @@ def rebate_trading_strategy(data):
                 )
                 position = "Long"
                 entry_price = limit_price
+                fills.append(time=current_row['time'], trade_id=len(trades), price=limit_price,
+                             quantity=position_size, maker=1, volume=current_row['Volume'],
+                             volatility=current_row['Volatility'])
 
                 # Calculate rebate earned
                 rebate_earned = position_size * limit_price * config.MAKER_REBATE
@@ -127,6 +144,9 @@ def rebate_trading_strategy(data):
                 )
                 position = "Short"
                 entry_price = limit_price
+                fills.append(time=current_row['time'], trade_id=len(trades), price=limit_price,
+                             quantity=-position_size, maker=1, volume=current_row['Volume'],
+                             volatility=current_row['Volatility'])
 
                 # Calculate rebate earned
                 rebate_earned = position_size * limit_price * config.MAKER_REBATE
@@ -148,6 +168,10 @@ def rebate_trading_strategy(data):
                     total_pnl = price_pnl - fee
 
                     balance += total_pnl
+                    fills.append(time=current_row['time'], trade_id=len(trades), price=current_price,
+                                 quantity=-position_size, maker=0, volume=current_row['Volume'],
+                                 volatility=current_row['Volatility'])
+                    gross_pnl[len(trades)] = price_pnl
 
                     trades.append({
                         'type': 'Long',
@@ -174,6 +198,10 @@ def rebate_trading_strategy(data):
                     total_pnl = price_pnl - fee
 
                     balance += total_pnl
+                    fills.append(time=current_row['time'], trade_id=len(trades), price=current_price,
+                                 quantity=position_size, maker=0, volume=current_row['Volume'],
+                                 volatility=current_row['Volatility'])
+                    gross_pnl[len(trades)] = price_pnl
 
                     trades.append({
                         'type': 'Short',
@@ -220,6 +248,8 @@ def rebate_trading_strategy(data):
     logging.info(f"Win Rate: {win_rate:.2f}%")
     logging.info(f"Max Drawdown: Rs.{abs(max_drawdown):.2f}")
 
+    cost_scenarios = log_cost_scenarios(fills, gross_pnl, initial_balance)
+
     return {
         'initial_balance': initial_balance,
         'final_balance': balance,
@@ -231,10 +261,30 @@ def rebate_trading_strategy(data):
         'total_fees': total_fees,
         'max_drawdown': max_drawdown,
         'return_pct': ((balance - initial_balance) / initial_balance) * 100,
-        'trades': trades
+        'trades': trades,
+        'cost_scenarios': cost_scenarios
     }
 
+
+def log_cost_scenarios(fills, gross_pnl, initial_balance):
+    """Re-price the closed trades under every fee schedule in config.COST_SCENARIOS"""
+    if not config.COST_SCENARIOS or not gross_pnl:
+        return None
+    frame = fills.to_frame()
+    # Fills of a position still open at the end have no P&L to net against
+    frame = frame[frame['trade_id'].isin(list(gross_pnl))]
+    model = costs.CostModel(list(config.COST_SCENARIOS.values()), names=list(config.COST_SCENARIOS))
+    report = model.reprice(frame, gross_pnl, initial_balance)
+
+    logging.info("\nCost Scenarios (closed trades re-priced):")
+    for name, row in report.iterrows():
+        logging.info(f"{name}: Costs: Rs.{row['total_cost']:.2f} "
+                     f"(Rebates: Rs.{abs(row['rebate']):.2f}, Fees: Rs.{row['total_cost'] - row['rebate']:.2f}), "
+                     f"Net P/L: Rs.{row['net_pnl']:.2f}, Final Balance: Rs.{row['final_balance']:.2f}")
+    return report
+
 if __name__ == "__main__":
+    setup_logging()
     try:
         # Load and run strategy
         data = load_market_data(config.DATA_FILE_PATH)
@@ -6,6 +6,24 @@ LEVERAGE = 2.0  # Increased leverage for larger position sizes
 RISK_PER_TRADE_PCT = 0.05  # Increased risk per trade
 TRANSACTION_COST = 0.0005  # Reduced transaction cost for larger sizes
 
+# Cost schedules to re-price the finished run under (common/costs.py
+# parameters). 'flat' charges TRANSACTION_COST on every fill, close to the
+# cost applied inside the trading loop.
+COST_SCENARIOS = {
+    'flat': {'commission_tiers': ((0, TRANSACTION_COST),)},
+    'volume_tiers': {'commission_tiers': ((0, TRANSACTION_COST), (5000000, TRANSACTION_COST * 0.8))},
+    'discount_broker': {
+        'commission_tiers': ((0, 0.0003),),
+        'commission_max': 20,
+        'buy_tax': 0.00003,
+        'sell_tax': 0.00025,
+        'exchange_fee': 0.0000297,
+        'gst': 0.18
+    },
+    'flat_with_impact': {'commission_tiers': ((0, TRANSACTION_COST),), 'half_spread_bps': 1.0,
+                         'impact_coef': 1.0},
+}
+
 # Position Sizing
 MIN_NOTIONAL_VALUE = 100000  # Minimum notional value per leg
 
@@ -25,6 +43,18 @@ RSI_LOWER = 40  # Lower RSI bound for stability
 RSI_UPPER = 60  # Upper RSI bound for stability
 TREND_PERIODS = 5  # Periods to look back for trend
 
+# Monte Carlo robustness check: resample the closed trades' PnL
+# (method 'bootstrap', 'block' or 'shuffle'); samples = 0 turns it off.
+# Ruin means the balance touching ruin_fraction * INITIAL_BALANCE.
+MONTE_CARLO = {
+    'samples': 10000,
+    'method': 'bootstrap',
+    'block_size': 10,
+    'confidence': 0.95,
+    'ruin_fraction': 0.5,
+    'seed': 42
+}
+
 # Synthetic Data Generation
 SYNTHETIC_DATA = {
     'correlation': 0.92,
@@ -42,4 +72,4 @@ LOG_CONFIG = {
 }
 
 # Data Settings
-DATA_FILE_PATH = './NSE_NIFTY_Intraday.csv'
\ No newline at end of file
+DATA_FILE_PATH = 'nifty_1m_no_signals'  # Dataset name from datasets/registry.json, or a CSV path
\ No newline at end of file
@@ -1,14 +1,21 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 import talib
 import logging
 import config
 
-logging.basicConfig(
-    filename=config.LOG_CONFIG['filename'],
-    level=getattr(logging, config.LOG_CONFIG['level']),
-    format=config.LOG_CONFIG['format']
-)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import costs, datasets, montecarlo
+
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_CONFIG['filename'],
+        level=getattr(logging, config.LOG_CONFIG['level']),
+        format=config.LOG_CONFIG['format']
+    )
 
 
 def prepare_data(df):
@@ -123,6 +130,10 @@ def statistical_arbitrage_strategy(nifty_data, bank_data):
     position = None
     cooling_off_until = None
 
+    # Both legs' fills and each trade's P&L before costs, for re-pricing under other cost schedules
+    fills = costs.fill_ledger()
+    gross_pnl = {}
+
     spread = nifty_data['close'] / bank_data['close']
     zscore = calculate_zscore(spread)
 
@@ -160,6 +171,7 @@ def statistical_arbitrage_strategy(nifty_data, bank_data):
                     'nifty_size': size_nifty,
                     'bank_size': size_bank
                 }
+                record_leg_fills(fills, len(trades), current_time, position, nifty_data.iloc[i], bank_data.iloc[i], 1)
 
                 logging.info(f"""
                 Trade Entry:
@@ -189,6 +201,8 @@ def statistical_arbitrage_strategy(nifty_data, bank_data):
                     bank_pnl = position['bank_size'] * (bank_data['close'].iloc[i] - position['bank_entry'])
 
                 total_pnl = nifty_pnl + bank_pnl
+                gross_pnl[len(trades)] = total_pnl
+                record_leg_fills(fills, len(trades), current_time, position, nifty_data.iloc[i], bank_data.iloc[i], -1)
 
                 # Apply transaction costs
                 transaction_cost = config.TRANSACTION_COST * (0.8 if position['nifty_size'] > 1 else 1)
@@ -223,7 +237,32 @@ def statistical_arbitrage_strategy(nifty_data, bank_data):
                     cooling_off_until = current_time + pd.Timedelta(minutes=config.COOLING_OFF_MINUTES)
 
     # Calculate performance metrics
-    return calculate_performance_metrics(trades, initial_balance, balance)
+    results = calculate_performance_metrics(trades, initial_balance, balance)
+    results['cost_scenarios'] = reprice_costs(fills, gross_pnl, initial_balance)
+    return results
+
+
+def record_leg_fills(fills, trade_id, time, position, nifty_row, bank_row, direction):
+    """Record the NIFTY and BANK fills of an entry (direction 1) or exit (direction -1)"""
+    # A long spread buys NIFTY and sells BANK; exits reverse both legs.
+    # ATR / close stands in for the per-bar volatility of the impact model.
+    nifty_side = direction if position['type'] == 'long' else -direction
+    fills.append(time=time, trade_id=trade_id, price=nifty_row['close'],
+                 quantity=nifty_side * position['nifty_size'], maker=0, volume=nifty_row['Volume'],
+                 volatility=nifty_row['ATR'] / nifty_row['close'])
+    fills.append(time=time, trade_id=trade_id, price=bank_row['close'],
+                 quantity=-nifty_side * position['bank_size'], maker=0, volume=bank_row['Volume'],
+                 volatility=bank_row['ATR'] / bank_row['close'])
+
+
+def reprice_costs(fills, gross_pnl, initial_balance):
+    """Net results of the closed trades under every schedule in config.COST_SCENARIOS"""
+    if not config.COST_SCENARIOS or not gross_pnl:
+        return None
+    frame = fills.to_frame()
+    frame = frame[frame['trade_id'].isin(list(gross_pnl))]
+    model = costs.CostModel(list(config.COST_SCENARIOS.values()), names=list(config.COST_SCENARIOS))
+    return model.reprice(frame, gross_pnl, initial_balance)
 
 
 def generate_correlated_data(nifty_data):
@@ -278,7 +317,8 @@ def calculate_performance_metrics(trades, initial_balance, final_balance):
             'total_profit': 0,
             'max_drawdown': 0,
             'sharpe_ratio': 0,
-            'profit_factor': 0
+            'profit_factor': 0,
+            'monte_carlo': None
         }
 
     total_trades = len(trades)
@@ -301,6 +341,19 @@ def calculate_performance_metrics(trades, initial_balance, final_balance):
     gross_losses = abs(sum(t['pnl'] for t in trades if t['pnl'] < 0))
     profit_factor = gross_profits / gross_losses if gross_losses != 0 else float('inf')
 
+    # Distribution of outcomes over resampled trade sequences
+    monte_carlo = None
+    if config.MONTE_CARLO['samples']:
+        monte_carlo = montecarlo.trade_monte_carlo(
+            [t['pnl'] for t in trades], initial_balance,
+            n_samples=config.MONTE_CARLO['samples'],
+            method=config.MONTE_CARLO['method'],
+            block_size=config.MONTE_CARLO['block_size'],
+            ruin_balance=initial_balance * config.MONTE_CARLO['ruin_fraction'],
+            confidence=config.MONTE_CARLO['confidence'],
+            seed=config.MONTE_CARLO['seed']
+        )
+
     return {
         'initial_balance': initial_balance,
         'final_balance': final_balance,
@@ -310,14 +363,17 @@ def calculate_performance_metrics(trades, initial_balance, final_balance):
         'total_profit': total_profit,
         'max_drawdown': max_drawdown,
         'sharpe_ratio': sharpe_ratio,
-        'profit_factor': profit_factor
+        'profit_factor': profit_factor,
+        'monte_carlo': monte_carlo
     }
 
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         # Load data
-        nifty_data = pd.read_csv(config.DATA_FILE_PATH, parse_dates=['time'])
+        nifty_data = datasets.load(config.DATA_FILE_PATH)
+        nifty_data['time'] = pd.to_datetime(nifty_data['time'])
         nifty_data.set_index('time', inplace=True)
 
         # Generate synthetic bank data
@@ -336,6 +392,25 @@ if __name__ == "__main__":
         Max Drawdown: {results['max_drawdown']:.2f}%
         """)
 
+        mc = results['monte_carlo']
+        if mc:
+            logging.info(f"""
+        Monte Carlo ({mc['samples']} resamples, {mc['confidence']:.0%} interval):
+        Final Balance: ${mc['final_balance']['median']:,.2f} (${mc['final_balance']['ci_low']:,.2f} to ${mc['final_balance']['ci_high']:,.2f})
+        Max Drawdown: {mc['max_drawdown_pct']['median']:.2f}% ({mc['max_drawdown_pct']['ci_low']:.2f}% to {mc['max_drawdown_pct']['ci_high']:.2f}%)
+        Risk of Ruin: {mc['risk_of_ruin']:.2%}
+        """)
+
+        scenarios = results.get('cost_scenarios')
+        if scenarios is not None:
+            lines = "\n".join(f"        {name}: Costs: ${row['total_cost']:,.2f}, Net PnL: ${row['net_pnl']:,.2f}, "
+                              f"Final Balance: ${row['final_balance']:,.2f}"
+                              for name, row in scenarios.iterrows())
+            logging.info(f"""
+        Cost Scenarios (closed trades re-priced, gross PnL ${scenarios['gross_pnl'].iloc[0]:,.2f}):
+{lines}
+        """)
+
     except Exception as e:
         logging.error(f"Strategy execution error: {str(e)}")
         raise
\ No newline at end of file
@@ -5,11 +5,13 @@ import talib
 import config
 
 # Set up logging
-logging.basicConfig(
-    filename=config.LOG_FILE,
-    level=getattr(logging, config.LOG_LEVEL),
-    format=config.LOG_FORMAT
-)
+def setup_logging():
+    """Configure logging settings"""
+    logging.basicConfig(
+        filename=config.LOG_FILE,
+        level=getattr(logging, config.LOG_LEVEL),
+        format=config.LOG_FORMAT
+    )
 
 
 def calculate_technical_indicators(data):
@@ -203,6 +205,7 @@ params = {
 }
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         # Load data
         data = pd.read_csv(config.DATA_FILE, parse_dates=[config.DATE_COLUMN])
@@ -1,9 +1,14 @@
 import pandas as pd
 import time
 import os
+import sys
 from datetime import datetime
 import config_ForexTrading
 import talib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import fx
+from common.trace import DecisionTrace
 # Function to create log directory if it doesn't exist
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Forex_Trading/logs')
@@ -32,22 +37,16 @@ def log_error(message):
     with open(log_filename, 'a') as f:
         f.write(f"{message}\n")
 
-# Enhanced forex trading decision with reasoning
-def forex_trading_decision(row, position, entry_made):
-    volume = row["Volume"]
-    rsi = row["RSI"]
-    price = row["close"]
-    min_volume = config_ForexTrading.minimum_volume_threshold
-    
-    # Build reasoning components
+# Reasoning text for a recorded bar
+def render_forex_reasoning(volume, sufficient_volume, rsi, oversold, price, position, entry_made):
     reasoning = []
     
     # Volume analysis
-    volume_status = "Sufficient" if volume >= min_volume else "Insufficient"
+    volume_status = "Sufficient" if sufficient_volume else "Insufficient"
     reasoning.append(f"Volume: {volume:,} ({volume_status})")
     
     # RSI analysis
-    rsi_status = "Oversold" if rsi < config_ForexTrading.rsi else "Normal"
+    rsi_status = "Oversold" if oversold else "Normal"
     reasoning.append(f"RSI: {rsi:.2f} ({rsi_status})")
     
     # Price information
@@ -58,19 +57,122 @@ def forex_trading_decision(row, position, entry_made):
     entry_status = "No Prior Entry" if not entry_made else "Entry Made"
     reasoning.append(f"Position: {position_status} | {entry_status}")
 
-    # Combine reasoning
-    full_reasoning = " | ".join(reasoning)
+    return " | ".join(reasoning)
+
+DECISION_TRACE = DecisionTrace(
+    {'volume': 'int', 'sufficient_volume': 'bool', 'rsi': 'float', 'oversold': 'bool', 'price': 'float',
+     'position': 'category', 'entry_made': 'bool'},
+    render_forex_reasoning
+)
+
+# Enhanced forex trading decision with reasoning
+def forex_trading_decision(row, position, entry_made):
+    volume = row["Volume"]
+    rsi = row["RSI"]
+    sufficient_volume = volume >= config_ForexTrading.minimum_volume_threshold
+    oversold = rsi < config_ForexTrading.rsi
+
+    decision = "Buy" if position is None and not entry_made and sufficient_volume and oversold else "Hold"
+    reasoning = DECISION_TRACE.record(decision, volume, sufficient_volume, rsi, oversold, row["close"],
+                                      position, entry_made)
 
     if config_ForexTrading.ENABLE_DEBUG_LOGGING:
         print(f"\nAnalyzing conditions:")
-        print(full_reasoning)
+        print(reasoning)
+
+    return decision, reasoning
 
-    if position is None and not entry_made and volume >= min_volume:
-        if rsi < config_ForexTrading.rsi:
-            return "Buy", full_reasoning
+# Triangular arbitrage decision with reasoning
+def triangular_arbitrage_decision(candidate, last_traded):
+    cycle = f"{candidate.first} -> {candidate.second} -> {candidate.third} -> {candidate.first}"
+    min_profit = config_ForexTrading.arbitrage_min_profit_bps
+
+    reasoning = []
+    profit_status = "Sufficient" if candidate.profit_bps >= min_profit else "Insufficient"
+    reasoning.append(f"Cycle: {cycle}")
+    reasoning.append(f"Net Profit: {candidate.profit_bps:.2f} bps ({profit_status})")
+
+    previous = last_traded.get(cycle)
+    cooling = previous is not None and \
+        (candidate.time - previous).total_seconds() < config_ForexTrading.arbitrage_cooldown
+    reasoning.append(f"Cycle Status: {'Cooling Down' if cooling else 'Ready'}")
+
+    full_reasoning = " | ".join(reasoning)
 
+    if config_ForexTrading.ENABLE_DEBUG_LOGGING:
+        print(f"\nAnalyzing arbitrage candidate:")
+        print(full_reasoning)
+
+    if candidate.profit_bps >= min_profit and not cooling:
+        return "Arbitrage", full_reasoning
     return "Hold", full_reasoning
 
+def run_triangular_arbitrage(quotes_file, initial_balance):
+    log_dir = create_log_directory()
+    log_filename = os.path.join(log_dir, f"fx_arbitrage_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+
+    def log_trade(message):
+        with open(log_filename, 'a') as f:
+            f.write(f"{message}\n")
+        print(message)
+
+    currencies = fx.quote_currencies(quotes_file)
+    engine = fx.FXEngine(currencies,
+                         fee_bps=config_ForexTrading.arbitrage_fee_bps,
+                         min_profit_bps=config_ForexTrading.arbitrage_min_profit_bps,
+                         max_quote_age=config_ForexTrading.arbitrage_max_quote_age)
+
+    log_trade(f"===========================================")
+    log_trade(f"  FX Triangular Arbitrage  ")
+    log_trade(f"===========================================")
+    log_trade(f"Initial Balance: {initial_balance:.2f}")
+    log_trade(f"Currencies: {', '.join(currencies)}")
+    log_trade(f"Fee per Leg: {config_ForexTrading.arbitrage_fee_bps} bps")
+    log_trade(f"Minimum Net Profit: {config_ForexTrading.arbitrage_min_profit_bps} bps")
+
+    start = time.time()
+    candidates = fx.replay(quotes_file, engine)
+    elapsed = time.time() - start
+    log_trade(f"Replayed {engine.quotes_seen:,} quotes in {elapsed:.2f}s ({engine.quotes_seen / max(elapsed, 1e-9):,.0f} quotes/s)")
+    log_trade(f"Arbitrage Candidates: {len(candidates):,}")
+
+    balance = initial_balance
+    trades = []
+    last_traded = {}
+    # Candidates come sorted by quote, best cycle first; act on at most one per quote
+    for candidate in candidates.drop_duplicates('quote').itertuples(index=False):
+        decision, reasoning = triangular_arbitrage_decision(candidate, last_traded)
+        if decision != "Arbitrage":
+            continue
+        # Profit is counted in the starting currency and booked at face value
+        profit = config_ForexTrading.arbitrage_notional * candidate.profit_bps / 10000
+        balance += profit
+        cycle = f"{candidate.first} -> {candidate.second} -> {candidate.third} -> {candidate.first}"
+        last_traded[cycle] = candidate.time
+        trades.append({
+            'time': candidate.time,
+            'cycle': cycle,
+            'profit_bps': candidate.profit_bps,
+            'profit': profit,
+            'reasoning': reasoning
+        })
+        log_trade(f"\nExecuted {cycle} at {candidate.time}")
+        log_trade(f"Reasoning: {reasoning}")
+        log_trade(f"Profit: {profit:.4f}, New Balance: {balance:.2f}")
+
+    log_trade("\n===========================================")
+    log_trade(f"  Arbitrage Summary")
+    log_trade(f"===========================================")
+    log_trade(f"Initial Balance: {initial_balance:.2f}")
+    log_trade(f"Final Balance: {balance:.2f}")
+    log_trade(f"Total Profit/Loss: {balance - initial_balance:.2f}")
+    log_trade(f"Total Arbitrages Executed: {len(trades)}")
+    if trades:
+        trades_df = pd.DataFrame(trades)
+        log_trade(f"Average Net Profit: {trades_df['profit_bps'].mean():.2f} bps")
+        log_trade(f"Most Traded Cycle: {trades_df['cycle'].value_counts().index[0]}")
+    return balance, trades
+
 def run_forex_trading_strategy(csv_file, initial_balance, leverage, stop_loss_pct, target_profit_pct):
     # Create log file
     log_dir = create_log_directory()
@@ -90,6 +192,7 @@ def run_forex_trading_strategy(csv_file, initial_balance, leverage, stop_loss_pc
     trade_entry_time = None
     trade_entry_reason = None
     trades = []
+    DECISION_TRACE.clear()
 
     log_trade(f"===========================================")
     log_trade(f"  Forex Trading Strategy  ")
@@ -113,7 +216,7 @@ def run_forex_trading_strategy(csv_file, initial_balance, leverage, stop_loss_pc
                 position = "Buy"
                 trade_price = price
                 trade_entry_time = timestamp
-                trade_entry_reason = reasoning
+                trade_entry_reason = str(reasoning)
                 stop_loss = trade_price * (1 - stop_loss_pct / 100)
                 target_profit = trade_price * (1 + target_profit_pct / 100)
                 
@@ -235,6 +338,10 @@ def run_forex_trading_strategy(csv_file, initial_balance, leverage, stop_loss_pc
 
 # Main execution
 if __name__ == "__main__":
+    if config_ForexTrading.fx_quotes_file:
+        run_triangular_arbitrage(config_ForexTrading.fx_quotes_file, config_ForexTrading.initial_balance)
+        sys.exit(0)
+
     csv_file = os.path.join(os.getcwd(), './Forex_Trading/NSE_NIFTY, 1 Intraday.csv')
     data = load_market_data(csv_file)
     # data['RSI'] = talib.RSI(data['close'])
@@ -4,5 +4,13 @@ stop_loss_pct = 0.1      # 0.1% stop loss
 target_profit_pct = 0.1 
 minimum_volume_threshold = 800
 rsi = 30
-ENABLE_DEBUG_LOGGING = True  # Enable/disable debug logging
-SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
\ No newline at end of file
+ENABLE_DEBUG_LOGGING = False  # Enable/disable debug logging
+SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
+
+# Triangular arbitrage over FX quotes (common/fx.py)
+fx_quotes_file = None           # CSV of time,pair,bid,ask quotes to replay; None runs the RSI strategy
+arbitrage_fee_bps = 0.2         # Cost per leg on top of the bid/ask spread
+arbitrage_min_profit_bps = 1.0  # Minimum net profit of a cycle
+arbitrage_max_quote_age = 1.0   # Seconds; cycles using older quotes are ignored
+arbitrage_notional = 1000       # Amount put through each cycle
+arbitrage_cooldown = 1.0        # Seconds before the same cycle is traded again
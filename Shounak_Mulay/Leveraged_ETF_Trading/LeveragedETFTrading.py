@@ -1,20 +1,33 @@
 import pandas as pd
 import os
-import random
+import sys
 import config_LeveragedETF
 from datetime import datetime
 import talib
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common.etf import add_etf_columns, etf_column
+from common.trace import DecisionTrace
+
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Leveraged_ETF_Trading/logs')
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
     return log_dir
 
-def load_etf_data(file_path):
-    """Load and preprocess the ETF data with TALib indicators"""
+def load_etf_data(file_path, leverage):
+    """Load the underlying data, derive the ETF price and add TALib indicators"""
     try:
         data = pd.read_csv(file_path)
+
+        # Leveraged ETF price with daily reset, expense drag and financing cost
+        data = add_etf_columns(
+            data,
+            [leverage],
+            reset=config_LeveragedETF.etf_reset,
+            expense_ratio=config_LeveragedETF.expense_ratio,
+            financing_rate=config_LeveragedETF.financing_rate
+        )
         
         # Calculate TALib indicators
         high, low, close = data['high'], data['low'], data['close']
@@ -58,31 +71,39 @@ def calculate_market_conditions(row):
     rsi = row['RSI']  # RSI for overbought/oversold
     return volatility, trend_strength, momentum, rsi
     
-def leveraged_etf_decision(row, position, entry_made):
-    volatility, trend_strength, momentum, rsi = calculate_market_conditions(row)
-    
-    # Define thresholds
-    high_volatility_threshold = row['NATR'] * 1.2  # Using Normalized ATR
-    strong_trend_threshold = 25  # ADX above 25 indicates strong trend
-    
-    # Build detailed reasoning components
+def render_leveraged_etf_reasoning(volatility, trend_strength, momentum, rsi, price, bb_upper, bb_lower,
+                                   position, entry_made):
     reasoning = []
     reasoning.append(f"ATR (Volatility): {volatility:.2f}")
     reasoning.append(f"ADX (Trend Strength): {trend_strength:.2f}")
     reasoning.append(f"Momentum: {momentum:.2f}")
     reasoning.append(f"RSI: {rsi:.2f}")
-    reasoning.append(f"Price: {row['close']:.2f}")
-    reasoning.append(f"BB Upper: {row['Upper']:.2f}")
-    reasoning.append(f"BB Lower: {row['Lower']:.2f}")
-    
+    reasoning.append(f"Price: {price:.2f}")
+    reasoning.append(f"BB Upper: {bb_upper:.2f}")
+    reasoning.append(f"BB Lower: {bb_lower:.2f}")
+
     # Add position status to reasoning
     position_status = "No Position" if position is None else position
     entry_status = "No Prior Entry" if not entry_made else "Entry Made"
     reasoning.append(f"Position: {position_status} | {entry_status}")
 
-    # Combine reasoning
-    full_reasoning = " | ".join(reasoning)
+    return " | ".join(reasoning)
+
+# Indicator values behind each decision; reasoning is rendered from them when needed
+DECISION_TRACE = DecisionTrace(
+    {'volatility': 'float', 'trend_strength': 'float', 'momentum': 'float', 'rsi': 'float', 'price': 'float',
+     'bb_upper': 'float', 'bb_lower': 'float', 'position': 'category', 'entry_made': 'bool'},
+    render_leveraged_etf_reasoning
+)
+
+def leveraged_etf_decision(row, position, entry_made):
+    volatility, trend_strength, momentum, rsi = calculate_market_conditions(row)
     
+    # Define thresholds
+    high_volatility_threshold = row['NATR'] * 1.2  # Using Normalized ATR
+    strong_trend_threshold = 25  # ADX above 25 indicates strong trend
+
+    decision = "Hold"
     if position is None and not entry_made:
         # Entry conditions using multiple indicators
         trend_up = row['close'] > row['EMA'] and row['EMA'] > row['SMA']
@@ -91,14 +112,10 @@ def leveraged_etf_decision(row, position, entry_made):
         not_overbought = rsi < 70
         
         if (trend_up and strong_trend and good_momentum and not_overbought):
-            return "Buy", full_reasoning
-            
-    return "Hold", full_reasoning
+            decision = "Buy"
 
-def simulate_etf_price_change(entry_price, volatility, trend):
-    price_change = round(random.uniform(0.1, 2) * volatility, 2)
-    price_change *= 1.1 if trend == "up" else -1.1
-    return round(entry_price + price_change, 2)
+    return decision, DECISION_TRACE.record(decision, volatility, trend_strength, momentum, rsi, row['close'],
+                                           row['Upper'], row['Lower'], position, entry_made)
 
 def run_leveraged_etf_strategy(etf_data, initial_balance, leverage, stop_loss_pct, target_profit_pct):
     # Create log file with timestamp
@@ -120,6 +137,7 @@ def run_leveraged_etf_strategy(etf_data, initial_balance, leverage, stop_loss_pc
     trade_entry_time = None
     trade_entry_reason = None
     trades = []
+    DECISION_TRACE.clear()
 
     # Initial strategy parameters logging
     log_trade(f"===========================================")
@@ -131,9 +149,12 @@ def run_leveraged_etf_strategy(etf_data, initial_balance, leverage, stop_loss_pc
     log_trade(f"Target Profit Percentage: {target_profit_pct}%")
     log_trade(f"High Volatility Threshold: 1.0")
 
+    etf_price_column = etf_column(leverage)
+
     for index, row in etf_data.iterrows():
         timestamp = pd.Timestamp(row.name if isinstance(row.name, pd.Timestamp) else row.get('time', datetime.now()))
-        price = row["close"]
+        # Trades are made in the ETF; signals come from the underlying
+        price = row[etf_price_column]
         # volatility = calculate_volatility(row)
         # trend = calculate_market_trend(row)
 
@@ -145,11 +166,11 @@ def run_leveraged_etf_strategy(etf_data, initial_balance, leverage, stop_loss_pc
                 position = "Buy"
                 trade_price = price
                 trade_entry_time = timestamp
-                trade_entry_reason = reasoning
+                trade_entry_reason = str(reasoning)
                 stop_loss = trade_price * (1 - stop_loss_pct / 100)
                 target_profit = trade_price * (1 + target_profit_pct / 100)
                 
-                log_trade(f"\nOpened {position} position at {trade_price:.2f}")
+                log_trade(f"\nOpened {position} position at {trade_price:.2f} (underlying {row['close']:.2f})")
                 log_trade(f"Entry Reasoning: {trade_entry_reason}")
                 log_trade(f"Stop Loss: {stop_loss:.2f}, Target: {target_profit:.2f}")
                 log_trade(f"Entry Time: {trade_entry_time}")
@@ -158,7 +179,7 @@ def run_leveraged_etf_strategy(etf_data, initial_balance, leverage, stop_loss_pc
         # Manage active position
         if position == "Buy":
             current_price = price
-            leveraged_gain_loss = (current_price - trade_price) * leverage
+            leveraged_gain_loss = current_price - trade_price
 
             if current_price <= stop_loss or current_price >= target_profit:
                 # Calculate final profit/loss
@@ -204,8 +225,8 @@ def run_leveraged_etf_strategy(etf_data, initial_balance, leverage, stop_loss_pc
 
     # Close any remaining position at the end
     if position is not None:
-        final_price = etf_data.iloc[-1]['close']
-        leveraged_gain_loss = (final_price - trade_price) * leverage
+        final_price = etf_data.iloc[-1][etf_price_column]
+        leveraged_gain_loss = final_price - trade_price
         profit = leveraged_gain_loss
         balance += profit
         
@@ -279,7 +300,7 @@ if __name__ == "__main__":
     target_profit_pct = config_LeveragedETF.target_profit_pct
 
     try:
-        etf_data = load_etf_data(file_path)
+        etf_data = load_etf_data(file_path, leverage)
         final_balance, trades = run_leveraged_etf_strategy(
             etf_data, 
             initial_balance, 
@@ -3,3 +3,6 @@ initial_balance = 10000  # Starting balance
 leverage = 3             # 3x leveraged ETF
 stop_loss_pct = 0.1      # 0.1% stop loss
 target_profit_pct = 0.1  # 0.1% target profit
+etf_reset = 'daily'      # ETF re-levers once a day ('bar' for intraday reset)
+expense_ratio = 0.0095   # 0.95% annual expense ratio
+financing_rate = 0.065   # Annual cost of financing the leveraged exposure
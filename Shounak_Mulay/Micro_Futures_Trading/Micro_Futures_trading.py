@@ -1,10 +1,15 @@
 import pandas as pd
 import time
 import os
+import sys
 from datetime import datetime
 import config_MicroFuturesTrading
 import talib 
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import futures
+from common.trace import DecisionTrace
+
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Micro_Futures_Trading/logs')
     if not os.path.exists(log_dir):
@@ -12,6 +17,14 @@ def create_log_directory():
     return log_dir
 
 def load_market_data(csv_file):
+    if config_MicroFuturesTrading.futures_contracts_dir:
+        return futures.continuous_series(
+            config_MicroFuturesTrading.futures_contracts_dir,
+            config_MicroFuturesTrading.futures_market,
+            adjustment=config_MicroFuturesTrading.futures_adjustment,
+            rule=config_MicroFuturesTrading.futures_roll_rule,
+            days_before_expiry=config_MicroFuturesTrading.futures_roll_days_before_expiry
+        )
     try:
         data = pd.read_csv(filepath_or_buffer=csv_file)
         return data
@@ -27,29 +40,35 @@ def log_error(message):
     with open(log_filename, 'a') as f:
         f.write(f"[{timestamp}] {message}\n")
 
-def micro_futures_decision(row, position, entry_made):
-    volume = row["Volume"]
-    min_volume = config_MicroFuturesTrading.min_volume
-    
-    # Build detailed reasoning components
+def render_micro_futures_reasoning(volume, sufficient_volume, rsi, position, entry_made):
     reasoning = []
-    reasoning.append(f"Volume: {volume} ({['Insufficient', 'Sufficient'][volume >= min_volume]})")
-    reasoning.append(f"RSI: {row['RSI']:.2f}")
+    reasoning.append(f"Volume: {volume} ({['Insufficient', 'Sufficient'][sufficient_volume]})")
+    reasoning.append(f"RSI: {rsi:.2f}")
     reasoning.append(f"Position: {position if position else 'None'}")
     reasoning.append(f"Entry Status: {'Entry Made' if entry_made else 'No Entry'}")
-    
-    # Combine reasoning
-    full_reasoning = " | ".join(reasoning)
+    return " | ".join(reasoning)
 
-    if config_MicroFuturesTrading.ENABLE_DEBUG_LOGGING:
-        print(f"\nAnalyzing conditions:")
-        print(full_reasoning)
+# Per-bar decision inputs; see common/trace.py
+DECISION_TRACE = DecisionTrace(
+    {'volume': 'int', 'sufficient_volume': 'bool', 'rsi': 'float', 'position': 'category', 'entry_made': 'bool'},
+    render_micro_futures_reasoning
+)
+
+def micro_futures_decision(row, position, entry_made):
+    volume = row["Volume"]
+    sufficient_volume = volume >= config_MicroFuturesTrading.min_volume
 
-    if position is None and not entry_made and volume >= min_volume:
+    decision = "Hold"
+    if position is None and not entry_made and sufficient_volume:
         if row['RSI'] < config_MicroFuturesTrading.rsi_threshold: 
-            return "Buy", full_reasoning
+            decision = "Buy"
+    reasoning = DECISION_TRACE.record(decision, volume, sufficient_volume, row['RSI'], position, entry_made)
+
+    if config_MicroFuturesTrading.ENABLE_DEBUG_LOGGING:
+        print(f"\nAnalyzing conditions:")
+        print(reasoning)
 
-    return "Hold", full_reasoning
+    return decision, reasoning
 
 def run_micro_futures_strategy(csv_file, initial_balance, leverage, stop_loss_pct, target_profit_pct):
     log_dir = create_log_directory()
@@ -70,6 +89,7 @@ def run_micro_futures_strategy(csv_file, initial_balance, leverage, stop_loss_pc
     trade_entry_time = None
     trade_entry_reason = None
     trades = []
+    DECISION_TRACE.clear()
 
     log_trade(f"===========================================")
     log_trade(f"  Micro Futures Trading Strategy Started  ")
@@ -92,7 +112,7 @@ def run_micro_futures_strategy(csv_file, initial_balance, leverage, stop_loss_pc
                 position = "Buy"
                 trade_price = current_price
                 trade_entry_time = timestamp
-                trade_entry_reason = reasoning
+                trade_entry_reason = str(reasoning)
                 stop_loss = trade_price * (1 - stop_loss_pct / 100)
                 target_profit = trade_price * (1 + target_profit_pct / 100)
                 entry_made = True
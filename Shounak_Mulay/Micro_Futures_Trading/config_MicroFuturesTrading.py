@@ -9,5 +9,12 @@ target_profit_pct = 0.1  # 0.1% target profit
 # Thresholds for RSI and volume
 rsi_threshold = 30  # RSI threshold for overbought/oversold
 min_volume = 800    # Minimum volume threshold for considering a trade
-ENABLE_DEBUG_LOGGING = True  # Enable/disable debug logging
+ENABLE_DEBUG_LOGGING = False  # Enable/disable debug logging
 SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
+
+# Continuous futures series (common/futures.py)
+futures_contracts_dir = None   # Folder of <MARKET>_<YYYYMMDD>.csv contract files; None uses the spot CSV
+futures_market = "NIFTY"
+futures_roll_rule = "volume"   # volume, open_interest or expiry
+futures_roll_days_before_expiry = 5
+futures_adjustment = "back"    # Profit is counted in points, which back-adjustment preserves
@@ -1,9 +1,15 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 import config_MomentumTrading
 import talib
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import barbus
+from common.indicators import StreamingMACD, StreamingRSI
+from common.risk import RiskBook
+
 # Function to create log directory if it doesn't exist
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Momentum_Trading/logs')
@@ -65,123 +71,96 @@ def momentum_decision(row):
 
     return "Hold", full_reasoning
 
-# Run momentum strategy with enhanced logging
-def run_momentum_strategy(data, initial_balance, stop_loss_pct, target_profit_pct):
-    # Create log directory
-    log_dir = create_log_directory()
-    log_filename = os.path.join(log_dir, f"momentum_trading_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+# Position and results of one run; shared by the CSV and the bar-bus runners
+def new_trading_state(initial_balance):
+    return {
+        'balance': initial_balance,
+        'position': None,
+        'trade_price': None,
+        'stop_loss': None,
+        'target_profit': None,
+        'entry_time': None,
+        'entry_reason': None,
+        'trades': []
+    }
 
-    def log_trade(message):
-        with open(log_filename, 'a') as f:
-            f.write(f"{message}\n")
-        print(message)
+def close_position(state, exit_price, timestamp, status, log_trade, risk=None, risk_symbol=None):
+    profit = exit_price - state['trade_price']
+    state['balance'] += profit
+    if risk is not None:
+        risk.fill(risk_symbol, -1, exit_price, reserved=False)
 
-    balance = initial_balance
-    position = None
-    trade_price = None
-    stop_loss = None
-    target_profit = None
-    trade_entry_time = None
-    trade_entry_reason = None
-    trades = []
+    state['trades'].append({
+        'entry_time': state['entry_time'],
+        'exit_time': timestamp,
+        'type': state['position'],
+        'entry_price': state['trade_price'],
+        'exit_price': exit_price,
+        'status': status,
+        'profit': profit,
+        'entry_reasoning': state['entry_reason']
+    })
 
-    # Trading Initialization Logs
-    log_trade(f"===========================================")
-    log_trade(f"  Momentum Trading Strategy Started")
+    log_trade(f"\n===========================================")
+    if status == 'Market Close':
+        log_trade(f"Closed remaining position at market close.")
+    else:
+        log_trade(f"Closed {state['position']} position: {status}")
+    log_trade(f"Entry Reasoning: {state['entry_reason']}")
+    log_trade(f"Entry Price: {state['trade_price']:.2f}, Exit Price: {exit_price:.2f}")
+    log_trade(f"Profit/Loss: {profit:.2f}")
+    log_trade(f"New Balance: {state['balance']:.2f}")
+    if status != 'Market Close':
+        log_trade(f"Exit Time: {timestamp}")
     log_trade(f"===========================================")
-    log_trade(f"Initial Balance: {balance:.2f}")
-    log_trade(f"Stop Loss Percentage: {stop_loss_pct}%")
-    log_trade(f"Target Profit Percentage: {target_profit_pct}%")
-    log_trade(f"Minimum Volume: {config_MomentumTrading.min_volume:,}")
-    log_trade(f"RSI Oversold Level: {config_MomentumTrading.rsi_oversold}")
 
-    for index, row in data.iterrows():
-        current_price = row['close']
-        timestamp = row.name if isinstance(row.name, pd.Timestamp) else pd.Timestamp(row['time'])
+    # Reset position
+    for key in ('position', 'trade_price', 'stop_loss', 'target_profit', 'entry_time', 'entry_reason'):
+        state[key] = None
 
-        if position is None:
-            decision, reasoning = momentum_decision(row)
-            if decision == "Buy":
-                position = "Buy"
-                trade_price = current_price
-                trade_entry_time = timestamp
-                trade_entry_reason = reasoning
-                stop_loss = trade_price * (1 - stop_loss_pct / 100)
-                target_profit = trade_price * (1 + target_profit_pct / 100)
-                
-                log_trade(f"\nOpened {position} position at {trade_price:.2f}")
-                log_trade(f"Entry Reasoning: {trade_entry_reason}")
-                log_trade(f"Stop Loss: {stop_loss:.2f}, Target Profit: {target_profit:.2f}")
-                log_trade(f"Entry Time: {trade_entry_time}")
-
-        # Check exit conditions if in position
-        if position == "Buy":
-            if current_price <= stop_loss or current_price >= target_profit:
-                # Calculate profit/loss
-                profit = current_price - trade_price
-                balance += profit
-                
-                # Determine exit reason
-                exit_reason = "Stop Loss" if current_price <= stop_loss else "Target Profit"
-                
-                # Log trade details
-                trade_info = {
-                    'entry_time': trade_entry_time,
-                    'exit_time': timestamp,
-                    'type': position,
-                    'entry_price': trade_price,
-                    'exit_price': current_price,
-                    'status': exit_reason,
-                    'profit': profit,
-                    'entry_reasoning': trade_entry_reason
-                }
-                trades.append(trade_info)
-
-                log_trade(f"\n===========================================")
-                log_trade(f"Closed {position} position: {exit_reason}")
-                log_trade(f"Entry Reasoning: {trade_entry_reason}")
-                log_trade(f"Entry Price: {trade_price:.2f}, Exit Price: {current_price:.2f}")
-                log_trade(f"Profit/Loss: {profit:.2f}")
-                log_trade(f"New Balance: {balance:.2f}")
-                log_trade(f"Exit Time: {timestamp}")
-                log_trade(f"===========================================")
-                
-                # Reset position
-                position = None
-                trade_price = None
-                stop_loss = None
-                target_profit = None
-                trade_entry_time = None
-                trade_entry_reason = None
-
-        # Risk management
-        if balance <= initial_balance * 0.7:
-            log_trade(f"Balance dropped below 70% of initial value. Stopping strategy.")
-            break
+# Entry and exit rules for one bar; returns False once the strategy has to stop
+def process_bar(state, row, timestamp, initial_balance, stop_loss_pct, target_profit_pct, log_trade,
+                risk=None, risk_symbol=None):
+    current_price = row['close']
 
-    # Close any remaining position at the end
-    if position is not None:
-        final_price = data.iloc[-1]['close']
-        profit = final_price - trade_price
-        balance += profit
-        trades.append({
-            'entry_time': trade_entry_time,
-            'exit_time': timestamp,
-            'type': position,
-            'entry_price': trade_price,
-            'exit_price': final_price,
-            'status': 'Market Close',
-            'profit': profit,
-            'entry_reasoning': trade_entry_reason
-        })
-
-        log_trade(f"\n===========================================")
-        log_trade(f"Closed remaining position at market close.")
-        log_trade(f"Entry Reasoning: {trade_entry_reason}")
-        log_trade(f"Entry Price: {trade_price:.2f}, Exit Price: {final_price:.2f}")
-        log_trade(f"Profit/Loss: {profit:.2f}")
-        log_trade(f"New Balance: {balance:.2f}")
-        log_trade(f"===========================================")
+    if state['position'] is None:
+        decision, reasoning = momentum_decision(row)
+        if decision == "Buy" and risk is not None:
+            approved, risk_reason = risk.submit(risk_symbol, 1, current_price)
+            if approved:
+                risk.fill(risk_symbol, 1, current_price)
+            else:
+                log_trade(f"Risk book rejected entry at {current_price:.2f}: {risk_reason}")
+                decision = "Hold"
+
+        if decision == "Buy":
+            state['position'] = "Buy"
+            state['trade_price'] = current_price
+            state['entry_time'] = timestamp
+            state['entry_reason'] = reasoning
+            state['stop_loss'] = current_price * (1 - stop_loss_pct / 100)
+            state['target_profit'] = current_price * (1 + target_profit_pct / 100)
+
+            log_trade(f"\nOpened {state['position']} position at {current_price:.2f}")
+            log_trade(f"Entry Reasoning: {reasoning}")
+            log_trade(f"Stop Loss: {state['stop_loss']:.2f}, Target Profit: {state['target_profit']:.2f}")
+            log_trade(f"Entry Time: {timestamp}")
+
+    # Check exit conditions if in position
+    if state['position'] == "Buy":
+        if current_price <= state['stop_loss'] or current_price >= state['target_profit']:
+            exit_reason = "Stop Loss" if current_price <= state['stop_loss'] else "Target Profit"
+            close_position(state, current_price, timestamp, exit_reason, log_trade, risk, risk_symbol)
+
+    # Risk management
+    if state['balance'] <= initial_balance * 0.7:
+        log_trade(f"Balance dropped below 70% of initial value. Stopping strategy.")
+        return False
+    return True
+
+def log_summary(state, initial_balance, log_trade):
+    balance = state['balance']
+    trades = state['trades']
 
     # Enhanced Trading Summary Logs
     log_trade("\n===========================================")
@@ -224,9 +203,105 @@ def run_momentum_strategy(data, initial_balance, stop_loss_pct, target_profit_pc
     
     log_trade("\n===========================================")
 
-    return balance, trades
+# Run momentum strategy with enhanced logging
+def run_momentum_strategy(data, initial_balance, stop_loss_pct, target_profit_pct):
+    # Create log directory
+    log_dir = create_log_directory()
+    log_filename = os.path.join(log_dir, f"momentum_trading_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+
+    def log_trade(message):
+        with open(log_filename, 'a') as f:
+            f.write(f"{message}\n")
+        print(message)
+
+    state = new_trading_state(initial_balance)
+    timestamp = None
+
+    # Trading Initialization Logs
+    log_trade(f"===========================================")
+    log_trade(f"  Momentum Trading Strategy Started")
+    log_trade(f"===========================================")
+    log_trade(f"Initial Balance: {initial_balance:.2f}")
+    log_trade(f"Stop Loss Percentage: {stop_loss_pct}%")
+    log_trade(f"Target Profit Percentage: {target_profit_pct}%")
+    log_trade(f"Minimum Volume: {config_MomentumTrading.min_volume:,}")
+    log_trade(f"RSI Oversold Level: {config_MomentumTrading.rsi_oversold}")
+
+    for index, row in data.iterrows():
+        timestamp = row.name if isinstance(row.name, pd.Timestamp) else pd.Timestamp(row['time'])
+        if not process_bar(state, row, timestamp, initial_balance, stop_loss_pct, target_profit_pct, log_trade):
+            break
+
+    # Close any remaining position at the end
+    if state['position'] is not None:
+        close_position(state, data.iloc[-1]['close'], timestamp, 'Market Close', log_trade)
+
+    log_summary(state, initial_balance, log_trade)
+    return state['balance'], state['trades']
+
+# Trade bars as they arrive on a shared-memory bar bus (common/barbus.py)
+def run_momentum_live(bus_name, initial_balance, stop_loss_pct, target_profit_pct, symbol=None,
+                      risk_book_name=None):
+    log_dir = create_log_directory()
+    log_filename = os.path.join(log_dir, f"momentum_live_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+
+    def log_trade(message):
+        with open(log_filename, 'a') as f:
+            f.write(f"{message}\n")
+        print(message)
+
+    state = new_trading_state(initial_balance)
+    current_price = None
+    timestamp = None
+
+    macd_indicator = StreamingMACD()
+    rsi_indicator = StreamingRSI()
+
+    log_trade(f"===========================================")
+    log_trade(f"  Momentum Trading Strategy Started (bar bus '{bus_name}')")
+    log_trade(f"===========================================")
+    log_trade(f"Initial Balance: {initial_balance:.2f}")
+    log_trade(f"Stop Loss Percentage: {stop_loss_pct}%")
+    log_trade(f"Target Profit Percentage: {target_profit_pct}%")
+
+    # Firm-wide limits shared with other strategies (common/risk.py)
+    risk = RiskBook(risk_book_name) if risk_book_name else None
+    risk_symbol = symbol or bus_name
+
+    with barbus.BarSubscriber(bus_name) as subscriber:
+        for bar in subscriber.bars(symbol=symbol):
+            current_price = float(bar['close'])
+            timestamp = pd.Timestamp(int(bar['time']))
+            macd, signal, _ = macd_indicator.update(current_price)
+            row = {
+                'close': current_price,
+                'Volume': float(bar['volume']),
+                'MACD': macd,
+                'Signal': signal,
+                'RSI': rsi_indicator.update(current_price)
+            }
+            if not process_bar(state, row, timestamp, initial_balance, stop_loss_pct, target_profit_pct,
+                               log_trade, risk, risk_symbol):
+                break
+
+        if subscriber.dropped:
+            log_trade(f"Warning: {subscriber.dropped} bars were overwritten before they could be read")
+
+    if state['position'] is not None:
+        close_position(state, current_price, timestamp, 'Market Close', log_trade, risk, risk_symbol)
+    if risk is not None:
+        risk.close()
+
+    log_summary(state, initial_balance, log_trade)
+    return state['balance'], state['trades']
 
 if __name__ == "__main__":
+    if config_MomentumTrading.bar_bus_name:
+        run_momentum_live(config_MomentumTrading.bar_bus_name, config_MomentumTrading.initial_balance,
+                          config_MomentumTrading.stop_loss_pct, config_MomentumTrading.target_profit_pct,
+                          risk_book_name=config_MomentumTrading.risk_book_name)
+        sys.exit(0)
+
     file_path = os.path.join(os.getcwd(), './Momentum_Trading/NSE_NIFTY, 1 Intraday.csv')
 
     try:
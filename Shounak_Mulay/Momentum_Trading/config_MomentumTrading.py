@@ -10,4 +10,10 @@ min_volume = 300000      # Minimum volume threshold
 rsi_oversold = 60        # RSI value below which is considered oversold
 
 ENABLE_DEBUG_LOGGING = True  # Enable/disable debug logging
-SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
\ No newline at end of file
+SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
+
+# Live bars from a shared-memory bar bus (common/barbus.py); None backtests the CSV
+bar_bus_name = None
+
+# Firm-wide risk book shared with other strategies (common/risk.py); None trades without it
+risk_book_name = None
@@ -12,3 +12,8 @@ volume_ma = 1000000      # Moving average of volume (volume moving average thres
 ENABLE_DEBUG_LOGGING = True  # Enable/disable debug logging
 SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
 
+# Live bars from a shared-memory bar bus (common/barbus.py); None backtests the CSV
+bar_bus_name = None
+
+# Firm-wide risk book shared with other strategies (common/risk.py); None trades without it
+risk_book_name = None
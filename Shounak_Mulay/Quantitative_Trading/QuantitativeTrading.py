@@ -1,9 +1,14 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 import config_QuantitativeTrading as config
 import talib
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import rules
+from common.trace import DecisionTrace
+
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Quantitative_Trading/logs')
     if not os.path.exists(log_dir):
@@ -33,27 +38,30 @@ def log_error(message):
     with open(log_filename, 'a') as f:
         f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {message}\n")
 
-def quantitative_decision(row, rsi_overbought, rsi_oversold, volume_ma):
-    macd = row['MACD']
-    signal = row['Signal']
+def render_quantitative_reasoning(volume, volume_ma, volume_status, macd, signal, rsi, rsi_status, price, bb_status):
+    reasoning = []
+    reasoning.append(f"Volume: {volume:,} vs MA: {volume_ma:,} ({volume_status})")
+    macd_status = "Bullish" if macd - signal > 0 else "Bearish"
+    reasoning.append(f"MACD: {macd:.2f} vs Signal: {signal:.2f} ({macd_status})")
+    reasoning.append(f"RSI: {rsi:.2f} ({rsi_status})")
+    reasoning.append(f"Price: {price:.2f} ({bb_status})")
+    return " | ".join(reasoning)
+
+# volume_ma is a per-run threshold, so it is kept as a category (one label, original type)
+DECISION_TRACE = DecisionTrace(
+    {'volume': 'int', 'volume_ma': 'category', 'volume_status': 'category', 'macd': 'float', 'signal': 'float',
+     'rsi': 'float', 'rsi_status': 'category', 'price': 'float', 'bb_status': 'category'},
+    render_quantitative_reasoning
+)
+
+def quantitative_decision(row, rsi_overbought, rsi_oversold, volume_ma, entry_signal=None):
     rsi = row['RSI']
     price = row['close']
     volume = row['Volume']
-    upper_band = row['Upper Bollinger Band']
-    lower_band = row['Lower Bollinger Band']
 
-    # Build reasoning components
-    reasoning = []
-    
     # Volume analysis
     volume_status = "High" if volume > volume_ma else "Low"
-    reasoning.append(f"Volume: {volume:,} vs MA: {volume_ma:,} ({volume_status})")
-    
-    # MACD analysis
-    macd_diff = macd - signal
-    macd_status = "Bullish" if macd_diff > 0 else "Bearish"
-    reasoning.append(f"MACD: {macd:.2f} vs Signal: {signal:.2f} ({macd_status})")
-    
+
     # RSI analysis
     if rsi < rsi_oversold:
         rsi_status = "Oversold"
@@ -61,20 +69,19 @@ def quantitative_decision(row, rsi_overbought, rsi_oversold, volume_ma):
         rsi_status = "Overbought"
     else:
         rsi_status = "Normal"
-    reasoning.append(f"RSI: {rsi:.2f} ({rsi_status})")
-    
-    # Bollinger Bands analysis
-    bb_status = "Below Lower Band" if price < lower_band else "Above Upper Band" if price > upper_band else "Within Bands"
-    reasoning.append(f"Price: {price:.2f} ({bb_status})")
 
-    # Combine reasoning
-    full_reasoning = " | ".join(reasoning)
+    # Bollinger Bands analysis
+    bb_status = "Below Lower Band" if price < row['Lower Bollinger Band'] else \
+        "Above Upper Band" if price > row['Upper Bollinger Band'] else "Within Bands"
 
-    if rsi < rsi_oversold and volume > volume_ma:
-        return "Buy", full_reasoning
-    return "Hold", full_reasoning
+    if entry_signal is None:
+        entry_signal = rsi < rsi_oversold and volume > volume_ma
+    decision = "Buy" if entry_signal else "Hold"
+    return decision, DECISION_TRACE.record(decision, volume, volume_ma, volume_status, row['MACD'], row['Signal'],
+                                           rsi, rsi_status, price, bb_status)
 
-def run_quantitative_strategy(data, initial_balance, stop_loss_pct, target_profit_pct, rsi_oversold, rsi_overbought, volume_ma):
+def run_quantitative_strategy(data, initial_balance, stop_loss_pct, target_profit_pct, rsi_oversold, rsi_overbought, volume_ma,
+                              entry_rule=config.entry_rule):
     log_dir = create_log_directory()
     log_filename = os.path.join(log_dir, f"quantitative_trading_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
 
@@ -91,6 +98,7 @@ def run_quantitative_strategy(data, initial_balance, stop_loss_pct, target_profi
     trade_entry_time = None
     trade_entry_reason = None
     trades = []
+    DECISION_TRACE.clear()
 
     # Enhanced Trading Initialization Logs
     log_trade(f"===========================================")
@@ -101,18 +109,23 @@ def run_quantitative_strategy(data, initial_balance, stop_loss_pct, target_profi
     log_trade(f"Target Profit Percentage: {target_profit_pct}%")
     log_trade(f"RSI Parameters - Oversold: {rsi_oversold}, Overbought: {rsi_overbought}")
     log_trade(f"Volume MA Threshold: {volume_ma:,}")
+    log_trade(f"Entry Rule: {entry_rule}")
+
+    # Entry signals for every bar at once; the row loop only builds the reasoning text
+    params = {'rsi_oversold': rsi_oversold, 'rsi_overbought': rsi_overbought, 'volume_ma': volume_ma}
+    entry_signals = rules.evaluate(entry_rule, data, params)
 
-    for index, row in data.iterrows():
+    for i, (index, row) in enumerate(data.iterrows()):
         current_price = row['close']
         timestamp = pd.Timestamp(row['time']) if 'time' in row else pd.Timestamp.now()
 
-        if position is None:
-            decision, reasoning = quantitative_decision(row, rsi_overbought, rsi_oversold, volume_ma)
+        if position is None and entry_signals[i]:
+            decision, reasoning = quantitative_decision(row, rsi_overbought, rsi_oversold, volume_ma, entry_signal=True)
             if decision == "Buy":
                 position = "Buy"
                 trade_price = current_price
                 trade_entry_time = timestamp
-                trade_entry_reason = reasoning
+                trade_entry_reason = str(reasoning)
                 stop_loss = trade_price * (1 - stop_loss_pct / 100)
                 target_profit = trade_price * (1 + target_profit_pct / 100)
                 
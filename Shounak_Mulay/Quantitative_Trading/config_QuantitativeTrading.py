@@ -12,5 +12,9 @@ rsi_overbought = 70  # RSI overbought threshold
 # Volume Moving Average threshold
 volume_ma = 500000  # Moving average of volume (volume moving average threshold)
 
+# Entry condition, evaluated over the whole frame by common/rules.py.
+# Lowercase names are the thresholds above; capitalised ones are indicator columns.
+entry_rule = "RSI < rsi_oversold & Volume > volume_ma"
+
 ENABLE_DEBUG_LOGGING = True  # Enable/disable debug logging
 SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
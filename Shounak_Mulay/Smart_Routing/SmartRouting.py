@@ -1,9 +1,28 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 from config_SmartRouting import *
 import talib
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import datasets
+from common.ledger import TradeLedger
+from common.trace import DecisionTrace
+
+# Columns of the trade ledger
+TRADE_COLUMNS = {
+    'entry_time': 'time',
+    'exit_time': 'time',
+    'type': 'category',
+    'entry_price': 'float',
+    'exit_price': 'float',
+    'position_size': 'int',
+    'status': 'category',
+    'profit': 'float',
+    'entry_reasoning': 'text'
+}
+
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Smart_Routing/logs')
     if not os.path.exists(log_dir):
@@ -12,7 +31,7 @@ def create_log_directory():
 
 def load_market_data(file_path):
     try:
-        data = pd.read_csv(file_path)
+        data = datasets.load(file_path)
         if ENABLE_DEBUG_LOGGING:
             print(f"Data loaded successfully from {file_path}")
         return data
@@ -35,27 +54,34 @@ def calculate_indicators(data):
     
     return data
 
-def routing_decision(row, volume_ma):
-    volume = row['Volume']
-    obv = row['OBV']
-    
-    # Build reasoning components
+def render_routing_reasoning(volume, volume_ma, above_ma, obv, obv_positive):
     reasoning = []
-    
+
     # Volume analysis
-    volume_status = "Above MA" if volume > volume_ma else "Below MA"
+    volume_status = "Above MA" if above_ma else "Below MA"
     reasoning.append(f"Volume: {volume:,} vs MA: {volume_ma:,} ({volume_status})")
-    
+
     # Order flow (OBV) analysis
-    obv_status = "Positive" if obv > 0 else "Negative"
+    obv_status = "Positive" if obv_positive else "Negative"
     reasoning.append(f"OBV: {obv:,} ({obv_status})")
 
-    # Combine reasoning
-    full_reasoning = " | ".join(reasoning)
+    return " | ".join(reasoning)
+
+# Inputs of every routing decision; the text above is only built for bars that are read back
+DECISION_TRACE = DecisionTrace(
+    {'volume': 'int', 'volume_ma': 'int', 'above_ma': 'bool', 'obv': 'float', 'obv_positive': 'bool'},
+    render_routing_reasoning
+)
+
+def routing_decision(row, volume_ma):
+    volume = row['Volume']
+    obv = row['OBV']
+
+    above_ma = volume > volume_ma
+    obv_positive = obv > 0
+    decision = "Buy" if above_ma and obv_positive else "Hold"
 
-    if volume > volume_ma and obv > 0:
-        return "Buy", full_reasoning
-    return "Hold", full_reasoning
+    return decision, DECISION_TRACE.record(decision, volume, volume_ma, above_ma, obv, obv_positive)
 
 def run_smart_order_routing(data, initial_balance, volume_ma, stop_loss_pct, target_pct):
     log_dir = create_log_directory()
@@ -74,7 +100,8 @@ def run_smart_order_routing(data, initial_balance, volume_ma, stop_loss_pct, tar
     position_size = 1
     trade_entry_time = None
     trade_entry_reason = None
-    trades = []
+    trades = TradeLedger(TRADE_COLUMNS)
+    DECISION_TRACE.clear()
 
     # Enhanced Trading Initialization Logs
     log_trade(f"===========================================")
@@ -106,7 +133,7 @@ def run_smart_order_routing(data, initial_balance, volume_ma, stop_loss_pct, tar
                 position = "Buy"
                 trade_price = current_price
                 trade_entry_time = timestamp
-                trade_entry_reason = reasoning
+                trade_entry_reason = str(reasoning)
                 stop_loss_price = trade_price * (1 - stop_loss_pct / 100)
                 target_price = trade_price * (1 + target_pct / 100)
                 
@@ -124,18 +151,17 @@ def run_smart_order_routing(data, initial_balance, volume_ma, stop_loss_pct, tar
                 
                 exit_reason = "Stop Loss" if current_price <= stop_loss_price else "Target Profit"
                 
-                trade_info = {
-                    'entry_time': trade_entry_time,
-                    'exit_time': timestamp,
-                    'type': position,
-                    'entry_price': trade_price,
-                    'exit_price': current_price,
-                    'position_size': position_size,
-                    'status': exit_reason,
-                    'profit': profit,
-                    'entry_reasoning': trade_entry_reason
-                }
-                trades.append(trade_info)
+                trades.append(
+                    entry_time=trade_entry_time,
+                    exit_time=timestamp,
+                    type=position,
+                    entry_price=trade_price,
+                    exit_price=current_price,
+                    position_size=position_size,
+                    status=exit_reason,
+                    profit=profit,
+                    entry_reasoning=trade_entry_reason
+                )
 
                 log_trade(f"\n===========================================")
                 log_trade(f"Closed {position} position: {exit_reason}")
@@ -170,8 +196,7 @@ def run_smart_order_routing(data, initial_balance, volume_ma, stop_loss_pct, tar
     log_trade(f"Total Trades: {len(trades)}")
 
     if len(trades) > 0:
-        trades_df = pd.DataFrame(trades)
-        trades_df['profit'] = trades_df['profit'].astype(float)
+        trades_df = trades.to_frame()
         profit_trades = trades_df[trades_df['profit'] > 0]
         loss_trades = trades_df[trades_df['profit'] < 0]
 
@@ -217,8 +242,6 @@ def run_smart_order_routing(data, initial_balance, volume_ma, stop_loss_pct, tar
     return balance, trades
 
 if __name__ == "__main__":
-    file_path = os.path.join(os.getcwd(), file_path)
-    
     try:
         # Load and process data
         data = load_market_data(file_path)
@@ -11,4 +11,4 @@ volume_ma = 1000000  # Moving average of volume (volume moving average threshold
 # File path for market data CSV
 ENABLE_DEBUG_LOGGING = True  # Enable/disable debug logging
 SAVE_TRADE_HISTORY = True    # Enable/disable trade history export
-file_path = './Smart_Routing/NSE_NIFTY, 1 Intraday.csv'
+file_path = 'nifty_1m'  # Dataset name from datasets/registry.json, or a CSV path
@@ -1,10 +1,14 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 import talib
 from datetime import datetime
 import config_VolatilityTrading as config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from common import volatility
+
 def create_log_directory():
     log_dir = os.path.join(os.getcwd(), './Volatility_Trading/logs')
     if not os.path.exists(log_dir):
@@ -52,23 +56,21 @@ def calculate_technical_indicators(data):
 
 def calculate_implied_volatility(data):
     """
-    Calculate a synthetic implied volatility measure
+    Calculate a synthetic implied volatility measure for every bar
     Note: This is a simplified approximation since real implied volatility 
     requires options data
     """
-    close = data['close'].values
+    open_ = data['open'].values
     high = data['high'].values
     low = data['low'].values
+    close = data['close'].values
     
-    # Calculate historical volatility using log returns
-    log_returns = np.log(close[1:] / close[:-1])
-    hist_vol = np.std(log_returns) * np.sqrt(252)  # Annualized
-    
-    # Calculate Parkinson volatility estimator
-    parkinsons_vol = np.sqrt(1 / (4 * np.log(2)) * np.mean(np.log(high/low)**2)) * np.sqrt(252)
+    # Rolling annualized volatilities over the last IV_WINDOW bars only (no later bars)
+    hist_vol = volatility.rolling_volatility(open_, high, low, close, config.IV_WINDOW, 'close_to_close')
+    range_vol = volatility.rolling_volatility(open_, high, low, close, config.IV_WINDOW, config.IV_RANGE_ESTIMATOR)
     
-    # Synthetic IV (combination of historical and Parkinson's volatility)
-    synthetic_iv = (hist_vol + parkinsons_vol) / 2
+    # Synthetic IV (combination of historical and range-based volatility)
+    synthetic_iv = (hist_vol + range_vol) / 2
     
     return synthetic_iv
 
@@ -91,7 +93,10 @@ def volatility_decision(row, previous_row, synthetic_iv):
     # RSI conditions
     oversold = row['RSI'] < rsi_oversold
 
-    if (high_volatility and strong_trend and oversold):
+    # Optional filter on the rolling synthetic IV
+    iv_ok = not config.USE_IV_FILTER or synthetic_iv > config.IV_THRESHOLD
+
+    if (high_volatility and strong_trend and oversold and iv_ok):
         return "Buy"
     
     return "Hold"
@@ -99,7 +104,7 @@ def volatility_decision(row, previous_row, synthetic_iv):
 def run_volatility_strategy(data, initial_balance, stop_loss_pct, target_profit_pct):
     # Calculate technical indicators
     data = calculate_technical_indicators(data)
-    synthetic_iv = calculate_implied_volatility(data)
+    data['SYNTHETIC_IV'] = calculate_implied_volatility(data)
     
     # Create log directory and file
     log_dir = create_log_directory()
@@ -117,6 +122,7 @@ def run_volatility_strategy(data, initial_balance, stop_loss_pct, target_profit_
     stop_loss = None
     target_profit = None
     trade_entry_time = None
+    entry_iv = None
     trades = []
     
     # Initialize logging
@@ -134,6 +140,7 @@ def run_volatility_strategy(data, initial_balance, stop_loss_pct, target_profit_
             continue
             
         current_price = row['close']
+        synthetic_iv = row['SYNTHETIC_IV']
         timestamp = pd.Timestamp(row['time']) if 'time' in row else pd.Timestamp.now()
         
         if position is None:
@@ -142,6 +149,7 @@ def run_volatility_strategy(data, initial_balance, stop_loss_pct, target_profit_
                 position = "Buy"
                 trade_price = current_price
                 trade_entry_time = timestamp
+                entry_iv = synthetic_iv
                 stop_loss = trade_price * (1 - stop_loss_pct / 100)
                 target_profit = trade_price * (1 + target_profit_pct / 100)
                 
@@ -168,7 +176,7 @@ def run_volatility_strategy(data, initial_balance, stop_loss_pct, target_profit_
                     'status': exit_reason,
                     'profit': profit,
                     'vol_score_at_entry': row['VOL_SCORE'],
-                    'synthetic_iv_at_entry': synthetic_iv
+                    'synthetic_iv_at_entry': entry_iv
                 }
                 trades.append(trade_info)
                 
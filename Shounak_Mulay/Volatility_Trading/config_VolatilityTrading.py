@@ -16,5 +16,8 @@ VOL_SCORE_THRESHOLD = 1.5
 ATR_THRESHOLD = 50
 ADX_THRESHOLD = 25
 IV_THRESHOLD = 0.2
+IV_WINDOW = 20  # Bars in the rolling synthetic IV
+IV_RANGE_ESTIMATOR = "parkinson"  # parkinson, garman_klass, rogers_satchell or yang_zhang
+USE_IV_FILTER = False  # Only buy while the synthetic IV is above IV_THRESHOLD
 RSI_OVERSOLD = 30
 RSI_OVERBOUGHT = 70
\ No newline at end of file
@@ -1,5 +1,7 @@
 # gamma_scalping.py
 
+import os
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -7,6 +9,9 @@ import math
 import config
 import talib
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import runcache
+
 def load_market_data(csv_file):
     """Load and preprocess the CSV data, calculate indicators using TA-Lib"""
     df = pd.read_csv(csv_file)
@@ -97,6 +102,7 @@ def gamma_scalping_decision(market_data, position=None, hedge_ratio=0, entry_pri
             
     return "Hold", 0
 
+@runcache.memoize(config)
 def run_gamma_scalping(csv_file, initial_balance, risk_per_trade=0.02):
     print(f"Starting gamma scalping strategy with {initial_balance} initial balance")
     print(f"Risk per trade: {risk_per_trade * 100}% of balance")
@@ -33,6 +33,13 @@ PRICE_STRENGTH_THRESHOLD = 0  # Percentage change threshold
 # Trading conditions
 MIN_LOOKBACK = 50  # Start trading after indicators are established
 
+# Monte Carlo robustness check of the trade list (0 samples turns it off)
+MONTE_CARLO_SAMPLES = 10000
+MONTE_CARLO_METHOD = "bootstrap"  # "bootstrap", "block" or "shuffle"
+MONTE_CARLO_CONFIDENCE = 0.95
+MONTE_CARLO_SEED = 42  # Fixed so identical runs report identical percentiles (None = fresh each run)
+RUIN_BALANCE_FRACTION = 0.5  # Ruin = balance touching 50% of initial
+
 # Logging settings
 LOG_FORMAT = "%(message)s"
 LOG_LEVEL = "INFO"
@@ -4,8 +4,12 @@ import logging
 from datetime import datetime
 import config
 import os  # Add this import to handle directory creation
+import sys
 import talib as ta  # Import TA-Lib for technical indicator calculations
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import ingest, montecarlo
+
 def setup_logging():
     """Configure logging with custom format"""
     log_dir = "logs"  # Directory for logs
@@ -110,14 +114,29 @@ def print_investing_summary(trades_df, initial_balance, final_balance):
     print(f"Maximum Profit:      ${max_profit:.2f}")
     print(f"Maximum Loss:        ${max_loss:.2f}")
 
+    if config.MONTE_CARLO_SAMPLES:
+        mc = montecarlo.trade_monte_carlo(
+            trades_df['profit'], initial_balance,
+            n_samples=config.MONTE_CARLO_SAMPLES,
+            method=config.MONTE_CARLO_METHOD,
+            ruin_balance=initial_balance * config.RUIN_BALANCE_FRACTION,
+            confidence=config.MONTE_CARLO_CONFIDENCE,
+            seed=config.MONTE_CARLO_SEED
+        )
+        print(f"\nMONTE CARLO ({mc['samples']:,} resamples, {mc['confidence']:.0%} interval)")
+        print("-"*60)
+        print(f"Final Balance:        ${mc['final_balance']['ci_low']:,.2f} to ${mc['final_balance']['ci_high']:,.2f} "
+              f"(median ${mc['final_balance']['median']:,.2f})")
+        print(f"Max Drawdown:         {mc['max_drawdown_pct']['ci_low']:.2f}% to {mc['max_drawdown_pct']['ci_high']:.2f}% "
+              f"(median {mc['max_drawdown_pct']['median']:.2f}%)")
+        print(f"Risk of Ruin:         {mc['risk_of_ruin']:.2%}")
+
 def run_momentum_investing():
     """Execute the momentum investing strategy"""
     setup_logging()
 
     # Load and prepare data
-    df = pd.read_csv(config.DATA_PATH)
-    df['time'] = pd.to_datetime(df['time'], dayfirst=True)
-    df = df.sort_values('time')
+    df = ingest.load(config.DATA_PATH)
 
     # Calculate indicators
     df = calculate_technical_indicators(df)
@@ -3,9 +3,10 @@
 # Initial balance and risk parameters
 INITIAL_BALANCE = 10000
 BALANCE_RISK_THRESHOLD = 0.9  # Stop trading if balance falls below 90% of initial
+INTRABAR_PATH = "nearest"  # Fill order when a bar touches both stop and target: "nearest", "stop_first" or "target_first"
 
 # Data configuration
-DATA_FILE = "loadData.csv"  # Replace with your data file path
+DATA_FILE = "nifty_1m_rounded"  # Dataset name from datasets/registry.json, or a CSV path
 
 # Technical Analysis Parameters
 TA_PARAMS = {
@@ -29,4 +30,20 @@ STRANGLE_PARAMS = {
     "BANDWIDTH_THRESHOLD": 0.0007,  # Added missing parameter
     "MAX_SPREAD": 10.0,
     "MIN_VOLUME": 300000
-}
\ No newline at end of file
+}
+
+# Chunked (out-of-core) execution
+# Rows per block when streaming the data file; None loads the whole file at once.
+# Indicator state and the open position are carried across blocks, so any
+# chunk size produces the same trades.
+CHUNK_SIZE = None
+
+# Variant sweep (run_variant_sweep): every combination of the values below is
+# backtested in one pass over the data, with the same rules as the strategies above
+RUN_VARIANT_SWEEP = False
+VARIANT_GRID = {
+    "BANDWIDTH_THRESHOLD": [0.0003, 0.0005, 0.0007, 0.0009, 0.0011],
+    "MAX_SPREAD": [5.0, 7.5, 10.0, 15.0],
+    "MIN_VOLUME": [100000, 200000, 300000, 400000]
+}
+VARIANT_RESULTS_FILE = "variant_results.csv"  # None to skip saving the table
@@ -1,5 +1,10 @@
+import config
 import trading_strategy
 
 if __name__ == "__main__":
-    trading_strategy.run_straddle_strategy()
-    trading_strategy.run_strangle_strategy()
+    trading_strategy.setup_logging()
+    if config.RUN_VARIANT_SWEEP:
+        trading_strategy.run_variant_sweep()
+    else:
+        trading_strategy.run_straddle_strategy()
+        trading_strategy.run_strangle_strategy()
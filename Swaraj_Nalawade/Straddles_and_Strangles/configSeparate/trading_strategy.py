@@ -1,32 +1,20 @@
+import itertools
 import logging
+import os
 import sys
+import numpy as np
 import pandas as pd
 import talib
+from talib import stream
 import config
 
-# Configure logging to capture both terminal output and write to a file
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import datasets, intrabar
+
+# Log file capturing both terminal output and the trade log
 logfile = 'trading_strategies.log'
 
-# Set up logger with dual handlers (file and console)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-# Create file handler to write logs to a file
-file_handler = logging.FileHandler(logfile, encoding='utf-8')
-file_handler.setLevel(logging.INFO)
-
-# Create console handler to print logs to terminal
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-
-# Use custom formatter to avoid adding extra timestamp or metadata
-formatter = logging.Formatter('%(message)s')
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
-
-# Add handlers to the logger
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
 
 # Redirect stdout to the logger (so print statements are captured)
 class StdoutLogger:
@@ -40,12 +28,35 @@ class StdoutLogger:
     def flush(self):
         pass
 
-sys.stdout = StdoutLogger(logger)
+def setup_logging():
+    """Log to the terminal and to ``logfile``, and route print output through the logger"""
+    if logger.handlers:
+        return
+    logger.setLevel(logging.INFO)
+
+    # Use custom formatter to avoid adding extra timestamp or metadata
+    formatter = logging.Formatter('%(message)s')
+    file_handler = logging.FileHandler(logfile, encoding='utf-8')
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setLevel(logging.INFO)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    sys.stdout = StdoutLogger(logger)
+
+def add_bandwidth(df):
+    """Add the Bollinger bandwidth and drop the indicator warm-up rows."""
+    df['Bandwidth'] = (df['Upper_BB'] - df['Lower_BB']) / (2 * df['Middle_BB'])  # Volatility measure
+
+    df.dropna(subset=['RSI', 'MACD', 'ATR', 'Bandwidth'], inplace=True)
+    return df
 
 # The rest of your code remains unchanged
 def load_data():
     """Load historical market data and calculate technical indicators."""
-    df = pd.read_csv(config.DATA_FILE, parse_dates=['time'])
+    df = datasets.load(config.DATA_FILE)
+    df['time'] = pd.to_datetime(df['time'])
     
     # Calculate indicators
     df['RSI'] = talib.RSI(df['close'], timeperiod=config.TA_PARAMS["RSI_PERIOD"])
@@ -55,67 +66,262 @@ def load_data():
     df['Upper_BB'], df['Middle_BB'], df['Lower_BB'] = talib.BBANDS(df['close'], 
                                                            timeperiod=config.TA_PARAMS["BOLLINGER_PERIOD"])
     df['ATR'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=config.TA_PARAMS["ATR_PERIOD"])
-    df['Bandwidth'] = (df['Upper_BB'] - df['Lower_BB']) / (2 * df['Middle_BB'])  # Volatility measure
-    
-    df.dropna(subset=['RSI', 'MACD', 'ATR', 'Bandwidth'], inplace=True)
-    return df
+    return add_bandwidth(df)
+
+def open_indicator_streams(df):
+    """Open TA-Lib stream handles on ``df`` and add the indicator columns for its rows.
+
+    The values over ``df`` come from the batch functions, and each handle then
+    continues bar by bar with values bit-identical to what talib reports for
+    the whole series. Raises talib.InsufficientHistory while ``df`` is still
+    shorter than an indicator's warm-up.
+    """
+    close, high, low = (df[col].to_numpy(dtype=np.float64) for col in ('close', 'high', 'low'))
+    rsi, df['RSI'] = stream.RSI.open_and_fill(close, timeperiod=config.TA_PARAMS["RSI_PERIOD"])
+    macd, (df['MACD'], _, _) = stream.MACD.open_and_fill(close, fastperiod=config.TA_PARAMS["MACD_FAST"],
+                                                         slowperiod=config.TA_PARAMS["MACD_SLOW"],
+                                                         signalperiod=config.TA_PARAMS["MACD_SIGNAL"])
+    bbands, (df['Upper_BB'], df['Middle_BB'], df['Lower_BB']) = stream.BBANDS.open_and_fill(
+        close, timeperiod=config.TA_PARAMS["BOLLINGER_PERIOD"])
+    atr, df['ATR'] = stream.ATR.open_and_fill(high, low, close, timeperiod=config.TA_PARAMS["ATR_PERIOD"])
+    return {'rsi': rsi, 'macd': macd, 'bbands': bbands, 'atr': atr}
+
+def update_indicator_streams(df, streams):
+    """Advance open stream handles over the rows of ``df`` and add the indicator columns."""
+    rsi, macd, bbands, atr = [], [], [], []
+    for close, high, low in zip(df['close'].to_numpy(dtype=np.float64), df['high'].to_numpy(dtype=np.float64),
+                                df['low'].to_numpy(dtype=np.float64)):
+        rsi.append(streams['rsi'].update(close))
+        macd.append(streams['macd'].update(close)[0])
+        bbands.append(streams['bbands'].update(close))
+        atr.append(streams['atr'].update(high, low, close))
+    df['RSI'] = rsi
+    df['MACD'] = macd
+    df['Upper_BB'], df['Middle_BB'], df['Lower_BB'] = np.array(bbands).reshape(-1, 3).T
+    df['ATR'] = atr
+
+def load_data_chunked(chunk_size):
+    """Stream the data file in blocks of ``chunk_size`` rows, carrying indicator state between blocks.
+
+    Yields the same rows and indicator values as load_data(), but memory stays
+    bounded by the chunk size no matter how long the file is. Blocks are held
+    back only until the indicators have enough history to start.
+    """
+    streams = None
+    pending = None
+    for df in pd.read_csv(datasets.resolve(config.DATA_FILE), parse_dates=['time'], chunksize=chunk_size):
+        if streams is not None:
+            update_indicator_streams(df, streams)
+            yield add_bandwidth(df)
+            continue
+        pending = df if pending is None else pd.concat([pending, df])
+        try:
+            streams = open_indicator_streams(pending)
+        except talib.InsufficientHistory:
+            continue
+        yield add_bandwidth(pending)
+        pending = None
+
+def process_bar(row, strategy_name, params, state):
+    """Advance the position state machine by one bar. Returns False once trading is halted."""
+    bandwidth = row['Bandwidth']
+    spread = row['high'] - row['low']
+    volume = row['Volume']
+    atr = row['ATR']
+    current_price = row['close']
+
+    # Entry Conditions: Bollinger Bands squeeze + sufficient volume
+    entered = False
+    if (state['position'] is None and
+        bandwidth < params['BANDWIDTH_THRESHOLD'] and
+        spread <= params['MAX_SPREAD'] and
+        volume >= params['MIN_VOLUME']):
+
+        state['position'] = strategy_name
+        state['entry_time'] = row['time']
+        state['entry_price'] = current_price
+        state['stop_loss'] = state['entry_price'] - 2 * atr
+        state['target_profit'] = state['entry_price'] + 3 * atr
+        entered = True
+
+        print(f"✅ Time: {state['entry_time']} | Entered {strategy_name.capitalize()} at {state['entry_price']:.2f} | Bandwidth: {bandwidth:.4f} | Spread: {spread:.2f} | Volume: {volume:.2f}")
+
+    # Exit Conditions: stop/target touched by the bar's high or low. The entry
+    # bar's range happened before the entry at its close, so it is not checked.
+    if state['position']:
+        entry_price = state['entry_price']
+        reason = intrabar.NO_EXIT
+        if not entered:
+            reason, exit_price = intrabar.resolve_bar(row['open'], row['high'], row['low'], state['stop_loss'],
+                                                      state['target_profit'], True, config.INTRABAR_PATH)
+        if reason == intrabar.STOP:
+            state['balance'] -= (entry_price - exit_price)
+            print(f"❌ Time: {row['time']} | Stopped Out at {exit_price:.2f} | Loss: {entry_price - exit_price:.2f}")
+            state['position'] = None
+
+        elif reason == intrabar.TARGET:
+            state['balance'] += (exit_price - entry_price)
+            print(f"💰 Time: {row['time']} | Profit Booked at {exit_price:.2f} | Profit: {exit_price - entry_price:.2f}")
+            state['position'] = None
+
+        if state['balance'] <= config.INITIAL_BALANCE * config.BALANCE_RISK_THRESHOLD:
+            print("🚨 Trading Halted: Risk Threshold Reached 🚨")
+            return False
+
+    return True
 
 def execute_strategy(strategy_name, params):
     """Generalized function to execute straddle/strangle strategies"""
-    df = load_data()
-    balance = config.INITIAL_BALANCE
-    position = None
-    entry_time = None
-    entry_price = None
-    stop_loss = None
-    target_profit = None
+    if config.CHUNK_SIZE:
+        frames = load_data_chunked(config.CHUNK_SIZE)
+    else:
+        frames = [load_data()]
+
+    state = {
+        'balance': config.INITIAL_BALANCE,
+        'position': None,
+        'entry_time': None,
+        'entry_price': None,
+        'stop_loss': None,
+        'target_profit': None
+    }
 
     print(f"\n📊 **{strategy_name.capitalize()} Strategy Execution**")
     start_index = max(config.TA_PARAMS.values())
+    bars_seen = 0
+    halted = False
 
-    for i in range(start_index, len(df)):
-        row = df.iloc[i]
-        bandwidth = row['Bandwidth']
-        spread = row['high'] - row['low']
-        volume = row['Volume']
-        atr = row['ATR']
-        current_price = row['close']
-
-        # Entry Conditions: Bollinger Bands squeeze + sufficient volume
-        if (position is None and
-            bandwidth < params['BANDWIDTH_THRESHOLD'] and
-            spread <= params['MAX_SPREAD'] and
-            volume >= params['MIN_VOLUME']):
-            
-            position = strategy_name
-            entry_time = row['time']
-            entry_price = current_price
-            stop_loss = entry_price - 2 * atr
-            target_profit = entry_price + 3 * atr
-
-            print(f"✅ Time: {entry_time} | Entered {strategy_name.capitalize()} at {entry_price:.2f} | Bandwidth: {bandwidth:.4f} | Spread: {spread:.2f} | Volume: {volume:.2f}")
-
-        # Exit Conditions
-        if position:
-            if current_price <= stop_loss:
-                balance -= (entry_price - current_price)
-                print(f"❌ Time: {row['time']} | Stopped Out at {current_price:.2f} | Loss: {entry_price - current_price:.2f}")
-                position = None
-
-            elif current_price >= target_profit:
-                balance += (current_price - entry_price)
-                print(f"💰 Time: {row['time']} | Profit Booked at {current_price:.2f} | Profit: {current_price - entry_price:.2f}")
-                position = None
-
-            if balance <= config.INITIAL_BALANCE * config.BALANCE_RISK_THRESHOLD:
-                print("🚨 Trading Halted: Risk Threshold Reached 🚨")
+    for df in frames:
+        # Skip the first start_index bars of the whole stream, not of each chunk
+        first = min(max(start_index - bars_seen, 0), len(df))
+        bars_seen += len(df)
+        for i in range(first, len(df)):
+            if not process_bar(df.iloc[i], strategy_name, params, state):
+                halted = True
                 break
+        if halted:
+            break
 
+    balance = state['balance']
     print("\n📊 **Final Results**")
     print(f"Initial Balance: ${config.INITIAL_BALANCE:,.2f}")
     print(f"Final Balance: ${balance:,.2f}")
     print(f"Net P/L: ${balance - config.INITIAL_BALANCE:,.2f}")
     print(f"Return: {((balance - config.INITIAL_BALANCE) / config.INITIAL_BALANCE * 100):.2f}%")
+    return balance
+
+VARIANT_PARAMS = ('BANDWIDTH_THRESHOLD', 'MAX_SPREAD', 'MIN_VOLUME')
+
+def variant_grid(grid):
+    """Every combination of the parameter values in ``grid`` (a dict of lists), as a DataFrame"""
+    missing = [name for name in VARIANT_PARAMS if name not in grid]
+    if missing:
+        raise ValueError(f"Variant grid is missing: {', '.join(missing)}")
+    combos = list(itertools.product(*(list(grid[name]) for name in VARIANT_PARAMS)))
+    return pd.DataFrame(combos, columns=list(VARIANT_PARAMS))
+
+def run_variants(variants, df=None):
+    """Backtest many parameter variants in a single pass over the data.
+
+    ``variants`` is a list of params dicts (like STRADDLE_PARAMS) or a
+    DataFrame with one row per variant. The rules are those of
+    execute_strategy, but indicators are computed once and the position
+    state of every variant (entry, stop, target, balance) is held in arrays
+    that advance together bar by bar. Returns one row per variant with its
+    parameters, final balance, return, trade count, wins and whether it halted.
+    """
+    variants = pd.DataFrame(list(variants) if not isinstance(variants, pd.DataFrame) else variants)
+    missing = [name for name in VARIANT_PARAMS if name not in variants.columns]
+    if missing:
+        raise ValueError(f"Variants are missing: {', '.join(missing)}")
+    if len(variants) == 0:
+        raise ValueError("Need at least one variant")
+    variants = variants.reset_index(drop=True)
+    bandwidth_threshold = variants['BANDWIDTH_THRESHOLD'].to_numpy(dtype=np.float64)
+    max_spread = variants['MAX_SPREAD'].to_numpy(dtype=np.float64)
+    min_volume = variants['MIN_VOLUME'].to_numpy(dtype=np.float64)
+
+    df = load_data() if df is None else df
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    atr = df['ATR'].to_numpy(dtype=np.float64)
+    bandwidth = df['Bandwidth'].to_numpy(dtype=np.float64)
+    spread = high - low
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+
+    n_variants = len(variants)
+    in_position = np.zeros(n_variants, dtype=bool)
+    entry_price = np.zeros(n_variants)
+    stop_loss = np.zeros(n_variants)
+    target_profit = np.zeros(n_variants)
+    balance = np.full(n_variants, float(config.INITIAL_BALANCE))
+    trades = np.zeros(n_variants, dtype=np.int64)
+    wins = np.zeros(n_variants, dtype=np.int64)
+    active = np.ones(n_variants, dtype=bool)
+    halt_level = config.INITIAL_BALANCE * config.BALANCE_RISK_THRESHOLD
+
+    # Bars on which at least the loosest variant would enter; on every other
+    # bar only the variants already holding a position need any work
+    any_entry = ((bandwidth < bandwidth_threshold.max()) & (spread <= max_spread.max()) &
+                 (volume >= min_volume.min()))
+
+    for i in range(max(config.TA_PARAMS.values()), len(close)):
+        holding = in_position.any()
+        if not holding and not any_entry[i]:
+            continue
+
+        # Exits, for positions opened on an earlier bar
+        if holding:
+            reason, fill = intrabar.resolve_bar(open_[i], high[i], low[i], stop_loss, target_profit,
+                                                True, config.INTRABAR_PATH)
+            exiting = in_position & (reason != intrabar.NO_EXIT)
+            if exiting.any():
+                balance[exiting] += fill[exiting] - entry_price[exiting]
+                trades[exiting] += 1
+                wins[exiting & (reason == intrabar.TARGET)] += 1
+                in_position[exiting] = False
+                # Balance only moves on exits, so that is when the risk threshold can be crossed
+                active &= ~(exiting & (balance <= halt_level))
+        else:
+            exiting = np.zeros(n_variants, dtype=bool)
+
+        # Entries at the close, for variants that were flat when the bar opened
+        if any_entry[i]:
+            entering = (active & ~in_position & ~exiting & (bandwidth[i] < bandwidth_threshold) &
+                        (spread[i] <= max_spread) & (volume[i] >= min_volume))
+            if entering.any():
+                in_position[entering] = True
+                entry_price[entering] = close[i]
+                stop_loss[entering] = close[i] - 2 * atr[i]
+                target_profit[entering] = close[i] + 3 * atr[i]
+
+    results = variants.copy()
+    results['final_balance'] = balance
+    results['net_pnl'] = balance - config.INITIAL_BALANCE
+    results['return_pct'] = results['net_pnl'] / config.INITIAL_BALANCE * 100
+    results['trades'] = trades
+    results['wins'] = wins
+    results['open_position'] = in_position
+    results['halted'] = ~active
+    return results
+
+def report_variants(results):
+    """Print the best variants of a sweep and save the full table to CSV"""
+    print(f"\n📊 **Variant Sweep: {len(results)} variants**")
+    for _, row in results.nlargest(5, 'final_balance').iterrows():
+        print(f"Bandwidth < {row['BANDWIDTH_THRESHOLD']:.4f}, Spread <= {row['MAX_SPREAD']:.2f}, "
+              f"Volume >= {row['MIN_VOLUME']:.0f} | Final Balance: ${row['final_balance']:,.2f} | "
+              f"Return: {row['return_pct']:.2f}% | Trades: {row['trades']} | Halted: {row['halted']}")
+    if config.VARIANT_RESULTS_FILE:
+        results.to_csv(config.VARIANT_RESULTS_FILE, index=False)
+        print(f"Variant results saved to {config.VARIANT_RESULTS_FILE}")
+
+def run_variant_sweep():
+    results = run_variants(variant_grid(config.VARIANT_GRID))
+    report_variants(results)
+    return results
 
 def run_straddle_strategy():
     execute_strategy('straddle', config.STRADDLE_PARAMS)
@@ -3,11 +3,20 @@
 INITIAL_BALANCE = 10000
 STOP_LOSS_PERCENT = 1.0
 TARGET_PROFIT_PERCENT = 2.0
+# Which level fills first when one bar touches both stop and target:
+# "nearest" (open -> nearer extreme), "stop_first" or "target_first"
+INTRABAR_PATH = "nearest"
 
 # Moving Average parameters
 SHORT_MA_PERIOD = 5
 LONG_MA_PERIOD = 15
 
+# Moving average sweep (run_ma_sweep): every short period is paired with
+# every longer long period, ranges are inclusive
+RUN_MA_SWEEP = False
+SWEEP_SHORT_PERIODS = (2, 50)
+SWEEP_LONG_PERIODS = (10, 250)
+
 # Technical indicator thresholds
 RSI_BUY_THRESHOLD = 50
 RSI_SELL_THRESHOLD = 50
@@ -16,7 +25,7 @@ RSI_SELL_THRESHOLD = 50
 MAX_LOSS_PERCENT = 30  # Stop trading if balance drops below 70% of initial
 
 # File paths
-DATA_PATH = "loadData.csv"
+DATA_PATH = "nifty_1m_rounded"  # Dataset name from datasets/registry.json, or a CSV path
 
 # Required columns in input data
 REQUIRED_COLUMNS = [
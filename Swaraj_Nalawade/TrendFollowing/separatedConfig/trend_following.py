@@ -1,9 +1,15 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 import logging
 import talib as ta
 from datetime import datetime
 import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import datasets, intrabar
+
 def setup_logging():
     """Configure logging settings"""
     log_filename = f"trend_following_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
@@ -56,31 +62,33 @@ def check_entry_conditions(row, position):
     return None
 
 def check_exit_conditions(row, position, stop_loss, target_profit):
-    """Check if exit conditions are met"""
+    """Check if exit conditions are met; returns (reason, exit price) or (None, None)
+
+    Stop loss and target are checked against the bar's high and low (see
+    common.intrabar) and fill at their level, or at the open on a gap.
+    A trend reversal exits at the close.
+    """
     if not position:
-        return None
-        
-    current_price = row['close']
+        return None, None
+
+    reason, price = intrabar.resolve_bar(row['open'], row['high'], row['low'], stop_loss, target_profit,
+                                         position == "Long", config.INTRABAR_PATH)
+    if reason != intrabar.NO_EXIT:
+        return intrabar.EXIT_REASONS[reason], price
+
     short_ma = row['short_ma']
     long_ma = row['long_ma']
-    
-    if position == "Long":
-        if current_price <= stop_loss:
-            return "Stop Loss"
-        elif current_price >= target_profit:
-            return "Target Profit"
-        elif short_ma < long_ma:
-            return "Trend Reversal"
-            
-    elif position == "Short":
-        if current_price >= stop_loss:
-            return "Stop Loss"
-        elif current_price <= target_profit:
-            return "Target Profit"
-        elif short_ma > long_ma:
-            return "Trend Reversal"
-    
-    return None
+    if (position == "Long" and short_ma < long_ma) or (position == "Short" and short_ma > long_ma):
+        return "Trend Reversal", row['close']
+
+    return None, None
+
+def next_true_index(mask):
+    """For every bar, the first bar at or after it where mask is True (len(mask) if none)"""
+    mask = np.asarray(mask, dtype=bool)
+    size = len(mask)
+    index = np.where(mask, np.arange(size), size)
+    return np.append(np.minimum.accumulate(index[::-1])[::-1], size)
 
 def log_trade_details(message, log_filename):
     """Log trade details to the file and console"""
@@ -93,7 +101,7 @@ def run_trend_following_strategy():
     log_filename = setup_logging()
     
     # Load and prepare data
-    df = pd.read_csv(config.DATA_PATH)
+    df = datasets.load(config.DATA_PATH)
     
     # Validate required columns
     if not all(col in df.columns for col in config.REQUIRED_COLUMNS):
@@ -121,47 +129,68 @@ def run_trend_following_strategy():
     
     # Skip initial rows where moving averages are not available
     start_index = max(df['short_ma'].isna().sum(), df['long_ma'].isna().sum())
-    
-    # Main trading loop
-    for i in range(start_index, len(df)):
-        current_row = df.iloc[i]
-        
+
+    # Instead of checking every bar, jump from event to event: the next entry
+    # signal, then the first bar that touches the stop or target and the
+    # first trend reversal bar, whichever comes first. The entry and exit
+    # rules themselves are only evaluated on those bars
+    bars = {col: df[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low', 'close', 'short_ma', 'long_ma')}
+    short_ma = bars['short_ma']
+    long_ma = bars['long_ma']
+    touches = intrabar.TouchSearch(df['high'], df['low'], df['open'])
+    next_entry = next_true_index(short_ma != long_ma)
+    next_bearish = next_true_index(short_ma < long_ma)
+    next_bullish = next_true_index(short_ma > long_ma)
+    n_bars = len(df)
+
+    i = start_index
+    while i < n_bars:
         # Check for position entry
-        if position is None:
-            entry_signal = check_entry_conditions(current_row, position)
-            if entry_signal:
-                position, trade_price, stop_loss, target_profit = enter_position(
-                    entry_signal, current_row['close']
-                )
-                log_trade_details(f"Opened {position} position at {trade_price:.2f}\nStop Loss: {stop_loss:.2f}, Target: {target_profit:.2f}", log_filename)
-        
-        # Check for position exit
-        else:
-            exit_reason = check_exit_conditions(current_row, position, stop_loss, target_profit)
-            if exit_reason:
-                balance, profit = exit_position(current_row['close'], trade_price, position, exit_reason, balance)
-                log_trade_details(f"Closed {position} position: {exit_reason}\nEntry Price: {trade_price:.2f}, Exit Price: {current_row['close']:.2f}\nProfit/Loss: {profit:.2f}\nNew Balance: {balance:.2f}", log_filename)
-                
-                trade_history.append({
-                    "entry_price": trade_price,
-                    "exit_price": current_row['close'],
-                    "position_type": position,
-                    "exit_reason": exit_reason,
-                    "profit": profit,
-                    "balance": balance
-                })
-                
-                # Reset position
-                position = None
-                trade_price = None
-                stop_loss = None
-                target_profit = None
-        
+        entry_bar = next_entry[i]
+        if entry_bar >= n_bars:
+            break
+        row = {col: values[entry_bar] for col, values in bars.items()}
+        entry_signal = check_entry_conditions(row, position)
+        position, trade_price, stop_loss, target_profit = enter_position(entry_signal, row['close'])
+        log_trade_details(f"Opened {position} position at {trade_price:.2f}\nStop Loss: {stop_loss:.2f}, Target: {target_profit:.2f}", log_filename)
+
+        # Check for position exit (stop/target wins a tie with a reversal on the same bar)
+        touch_bars, _, _ = touches.first_touch(entry_bar, stop_loss, target_profit,
+                                               position == "Long", config.INTRABAR_PATH)
+        reversal_bar = (next_bearish if position == "Long" else next_bullish)[entry_bar + 1]
+        touch_bar = touch_bars[0] if touch_bars[0] >= 0 else n_bars
+        exit_bar = min(touch_bar, reversal_bar)
+        if exit_bar >= n_bars:
+            break
+        row = {col: values[exit_bar] for col, values in bars.items()}
+        exit_reason, exit_price = check_exit_conditions(row, position, stop_loss, target_profit)
+
+        balance, profit = exit_position(exit_price, trade_price, position, exit_reason, balance)
+        log_trade_details(f"Closed {position} position: {exit_reason}\nEntry Price: {trade_price:.2f}, Exit Price: {exit_price:.2f}\nProfit/Loss: {profit:.2f}\nNew Balance: {balance:.2f}", log_filename)
+
+        trade_history.append({
+            "entry_price": trade_price,
+            "exit_price": exit_price,
+            "position_type": position,
+            "exit_reason": exit_reason,
+            "profit": profit,
+            "balance": balance
+        })
+
+        # Reset position
+        position = None
+        trade_price = None
+        stop_loss = None
+        target_profit = None
+
         # Check stop condition
         if balance <= config.INITIAL_BALANCE * (1 - config.MAX_LOSS_PERCENT / 100):
             log_trade_details(f"Balance dropped below {100 - config.MAX_LOSS_PERCENT}% of initial value. Stopping strategy.", log_filename)
             break
-    
+
+        # No new entry on the exit bar
+        i = exit_bar + 1
+
     # Create and save trade history
     trades_df = pd.DataFrame(trade_history)
     if len(trades_df) > 0 and config.SAVE_TRADE_HISTORY:
@@ -179,8 +208,145 @@ def run_trend_following_strategy():
     
     return balance, trades_df
 
+def moving_average_matrix(close, periods):
+    """SMA of close for every period, built from one cumulative sum (rows: periods, columns: bars)"""
+    close = np.asarray(close, dtype=np.float64)
+    # Summing deviations from the first close keeps the cumulative sum small,
+    # so differences of it lose almost no precision even on long files
+    base = close[0]
+    cumsum = np.concatenate(([0.0], np.cumsum(close - base)))
+    bars = np.arange(len(close))
+
+    sma = np.full((len(periods), len(close)), np.nan)
+    for row, period in enumerate(periods):
+        valid = bars[period - 1:]
+        sma[row, valid] = base + (cumsum[valid + 1] - cumsum[valid + 1 - period]) / period
+    return sma
+
+def run_ma_sweep(short_range=None, long_range=None):
+    """Backtest every (short, long) moving average pair in a single pass over the data.
+
+    Uses the same rules as run_trend_following_strategy (entry on MA order,
+    exit on intrabar stop loss / target or trend reversal, halt at MAX_LOSS_PERCENT),
+    but the position state of all pairs is held in arrays and advanced
+    together bar by bar. Returns heatmaps (short period x long period) of
+    final balance, trade count and maximum drawdown in percent.
+    """
+    short_range = short_range or config.SWEEP_SHORT_PERIODS
+    long_range = long_range or config.SWEEP_LONG_PERIODS
+    short_periods = np.arange(short_range[0], short_range[1] + 1)
+    long_periods = np.arange(long_range[0], long_range[1] + 1)
+
+    df = datasets.load(config.DATA_PATH)
+    close = df['close'].to_numpy(dtype=np.float64)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+
+    periods = np.union1d(short_periods, long_periods)
+    sma = moving_average_matrix(close, periods)
+
+    # All pairs with short < long, as row indices into the SMA matrix
+    short_grid, long_grid = np.meshgrid(short_periods, long_periods, indexing='ij')
+    keep = short_grid < long_grid
+    pair_short = short_grid[keep]
+    pair_long = long_grid[keep]
+    short_rows = np.searchsorted(periods, pair_short)
+    long_rows = np.searchsorted(periods, pair_long)
+    n_pairs = len(pair_short)
+
+    # Position state per pair: 1 = Long, -1 = Short, 0 = flat
+    position = np.zeros(n_pairs, dtype=np.int8)
+    trade_price = np.zeros(n_pairs)
+    stop_loss = np.zeros(n_pairs)
+    target_profit = np.zeros(n_pairs)
+    balance = np.full(n_pairs, float(config.INITIAL_BALANCE))
+    peak_balance = balance.copy()
+    max_drawdown = np.zeros(n_pairs)
+    trade_count = np.zeros(n_pairs, dtype=np.int64)
+    active = np.ones(n_pairs, dtype=bool)
+
+    stop_level = config.INITIAL_BALANCE * (1 - config.MAX_LOSS_PERCENT / 100)
+    first_bar = pair_long - 1  # Each pair starts once its long MA is available
+
+    for i in range(int(first_bar.min()), len(close)):
+        price = close[i]
+        short_ma = sma[short_rows, i]
+        long_ma = sma[long_rows, i]
+        live = active & (first_bar <= i)
+
+        # Exits (checked only for positions opened on an earlier bar): stop or
+        # target touched within the bar first, then trend reversal at the close
+        is_long = live & (position == 1)
+        is_short = live & (position == -1)
+        touched, fill = intrabar.resolve_bar(open_[i], high[i], low[i], stop_loss, target_profit,
+                                             position == 1, config.INTRABAR_PATH)
+        touched = (is_long | is_short) & (touched != intrabar.NO_EXIT)
+        reversed_trend = (is_long & (short_ma < long_ma)) | (is_short & (short_ma > long_ma))
+        exiting = touched | reversed_trend
+        if exiting.any():
+            exit_price = np.where(touched, fill, price)
+            profit = np.where(is_long, exit_price - trade_price, trade_price - exit_price)
+            balance[exiting] += profit[exiting]
+            trade_count[exiting] += 1
+            position[exiting] = 0
+            np.maximum(peak_balance, balance, out=peak_balance)
+            np.maximum(max_drawdown, (peak_balance - balance) / peak_balance * 100, out=max_drawdown)
+
+        # Entries (flat pairs that did not exit on this bar)
+        entering = live & (position == 0) & ~exiting & (short_ma != long_ma)
+        if entering.any():
+            going_long = entering & (short_ma > long_ma)
+            going_short = entering & (short_ma < long_ma)
+            position[going_long] = 1
+            position[going_short] = -1
+            trade_price[entering] = price
+            stop_loss[going_long] = price * (1 - config.STOP_LOSS_PERCENT / 100)
+            target_profit[going_long] = price * (1 + config.TARGET_PROFIT_PERCENT / 100)
+            stop_loss[going_short] = price * (1 + config.STOP_LOSS_PERCENT / 100)
+            target_profit[going_short] = price * (1 - config.TARGET_PROFIT_PERCENT / 100)
+
+        # Stop condition
+        active &= ~(live & (balance <= stop_level))
+
+    results = pd.DataFrame({
+        'short_period': pair_short,
+        'long_period': pair_long,
+        'final_balance': balance,
+        'total_trades': trade_count,
+        'max_drawdown_pct': max_drawdown
+    })
+    return {
+        'final_balance': results.pivot(index='short_period', columns='long_period', values='final_balance'),
+        'total_trades': results.pivot(index='short_period', columns='long_period', values='total_trades'),
+        'max_drawdown_pct': results.pivot(index='short_period', columns='long_period', values='max_drawdown_pct'),
+        'results': results
+    }
+
+def report_ma_sweep(sweep):
+    """Log the best pairs of a sweep and save the heatmaps to CSV"""
+    log_filename = setup_logging()
+    results = sweep['results']
+
+    log_trade_details("===========================================", log_filename)
+    log_trade_details("  Moving Average Sweep", log_filename)
+    log_trade_details("===========================================", log_filename)
+    log_trade_details(f"Pairs Tested: {len(results)}", log_filename)
+    for _, row in results.nlargest(5, 'final_balance').iterrows():
+        log_trade_details(f"Short MA: {row['short_period']:.0f}, Long MA: {row['long_period']:.0f} | "
+                          f"Final Balance: {row['final_balance']:.2f}, Trades: {row['total_trades']:.0f}, "
+                          f"Max Drawdown: {row['max_drawdown_pct']:.2f}%", log_filename)
+
+    if config.SAVE_TRADE_HISTORY:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        for name in ('final_balance', 'total_trades', 'max_drawdown_pct'):
+            sweep[name].to_csv(f"ma_sweep_{name}_{timestamp}.csv")
+
 if __name__ == "__main__":
-    final_balance, trades = run_trend_following_strategy()
+    if config.RUN_MA_SWEEP:
+        report_ma_sweep(run_ma_sweep())
+    else:
+        final_balance, trades = run_trend_following_strategy()
 
 
 
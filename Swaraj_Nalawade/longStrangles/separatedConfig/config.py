@@ -21,12 +21,20 @@ STOP_LOSS_PERCENT = 50  # Reduced to minimize losses
 MAX_HOLD_DAYS = 30  # Shortened to avoid holding for too long
 IV_EXIT_THRESHOLD = 10  # Exit when IV drops below this lower level
 
+# Greeks book (portfolio Greeks of the open strangles)
+UNDERLYING = "NIFTY"
+RISK_FREE_RATE = 0.05
+STRANGLE_WIDTH_PERCENT = 5  # Call/put strikes this far above/below the entry price
+OPTION_EXPIRY_DAYS = 30  # Days from entry to expiry of the strangle legs
+CONTRACT_MULTIPLIER = 100
+
 # Position sizing
 MAX_POSITION_SIZE = 10  # Increased max contracts for higher exposure
 MIN_DAYS_BETWEEN_TRADES = 1  # Reduced days between trades
 
 # Technical indicators using TA-Lib
 VOLATILITY_WINDOW = 10  # Reduced lookback for faster IV calculations
+VOLATILITY_ESTIMATOR = "close_to_close"  # or parkinson, garman_klass, rogers_satchell, yang_zhang
 VWAP_WEIGHT = 0.5  # Adjusted weights for synthetic IV
 RSI_WEIGHT = 0.3
 BOLL_WEIGHT = 0.2
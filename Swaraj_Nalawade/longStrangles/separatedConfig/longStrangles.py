@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 import talib
@@ -6,16 +8,15 @@ import logging
 from datetime import datetime
 import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import ingest, volatility
+from common.greeks import GreeksBook
+
 def load_market_data(csv_file):
     """Load and preprocess the CSV data"""
     try:
-        df = pd.read_csv(csv_file)
-        df['time'] = pd.to_datetime(df['time'], dayfirst=True)
-
-        # Convert relevant columns to numeric
-        numeric_columns = ['open', 'high', 'low', 'close', 'Volume']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Dates, numeric columns and price gaps are handled by common/ingest.py
+        df = ingest.load(csv_file)
 
         # Calculate Bollinger Bands using TA-Lib
         df['Upper Bollinger Band'], _, df['Lower Bollinger Band'] = talib.BBANDS(df['close'], timeperiod=20, nbdevup=2, nbdevdn=2, matype=0)
@@ -23,8 +24,10 @@ def load_market_data(csv_file):
         # Calculate RSI using TA-Lib
         df['RSI'] = talib.RSI(df['close'], timeperiod=14)
 
-        # Calculate historical volatility
-        df['historical_volatility'] = df['close'].pct_change().rolling(window=config.VOLATILITY_WINDOW).std() * np.sqrt(252) * 100
+        # Calculate historical volatility (rolling, see common/volatility.py for the estimators)
+        df['historical_volatility'] = volatility.rolling_volatility(
+            df['open'], df['high'], df['low'], df['close'], config.VOLATILITY_WINDOW, config.VOLATILITY_ESTIMATOR
+        ) * 100
 
         # Synthetic IV calculation
         df['synthetic_iv'] = (
@@ -38,8 +41,11 @@ def load_market_data(csv_file):
         df['synthetic_delta'] = price_from_lower.div(bb_range).fillna(0.5)
         df['synthetic_delta'] = (df['synthetic_delta'] - 0.5) * 2
 
-        # Forward fill NaN values using ffill()
-        df.ffill(inplace=True)
+        # Carry the derived indicators forward over gaps (raw columns such as the
+        # sparse divergence markers are left as they are)
+        derived = ['Upper Bollinger Band', 'Lower Bollinger Band', 'RSI', 'historical_volatility', 'synthetic_iv',
+                   'synthetic_delta']
+        df[derived] = df[derived].ffill()
 
         print("\nData Overview:")
         print(f"Total rows: {len(df)}")
@@ -61,6 +67,7 @@ class LongStranglesStrategy:
         self.balance = self.initial_balance
         self.positions = []
         self.trade_history = []
+        self.greeks_book = GreeksBook(rate=config.RISK_FREE_RATE)
 
     def _setup_logging(self):
         """Configure logging settings"""
@@ -92,6 +99,27 @@ class LongStranglesStrategy:
         )
         return max(1, max_contracts)
 
+    def _update_greeks_book(self, row):
+        """Re-mark the open strangle legs to the current bar"""
+        vol = row['synthetic_iv'] / 100 if row['synthetic_iv'] > 0 else None
+        self.greeks_book.update_market(config.UNDERLYING, spot=row['close'], vol=vol, time=row['time'])
+
+    def _open_strangle_legs(self, row, contracts):
+        """Add the call and put legs of a new strangle to the Greeks book"""
+        expiry = row['time'] + pd.Timedelta(days=config.OPTION_EXPIRY_DAYS)
+        width = config.STRANGLE_WIDTH_PERCENT / 100
+        call_leg = self.greeks_book.open_option(config.UNDERLYING, 'call', row['close'] * (1 + width), expiry,
+                                              contracts, config.CONTRACT_MULTIPLIER)
+        put_leg = self.greeks_book.open_option(config.UNDERLYING, 'put', row['close'] * (1 - width), expiry,
+                                             contracts, config.CONTRACT_MULTIPLIER)
+        return call_leg, put_leg
+
+    def _log_portfolio_greeks(self):
+        book_greeks = self.greeks_book.greeks()
+        self.logger.info(f"Portfolio Greeks - Delta: {book_greeks['delta']:,.2f}, Gamma: {book_greeks['gamma']:,.4f}, "
+                         f"Vega: {book_greeks['vega']:,.2f}, Theta: {book_greeks['theta']:,.2f}, "
+                         f"Delta hedge: {self.greeks_book.hedge_quantity(config.UNDERLYING):,.2f}")
+
     def _check_entry_conditions(self, row):
         """Check if entry conditions are met"""
         iv_condition = config.MIN_IMPLIED_VOLATILITY <= row['synthetic_iv'] <= config.MAX_IMPLIED_VOLATILITY
@@ -130,6 +158,8 @@ class LongStranglesStrategy:
         start_index = max(20, config.MIN_LOOKBACK)
 
         for index, row in self.data.iloc[start_index:].iterrows():
+            self._update_greeks_book(row)
+
             for position in self.positions[:]:
                 exit_check = self._check_exit_conditions(position, row)
 
@@ -142,11 +172,14 @@ class LongStranglesStrategy:
 
                     self.trade_history.append(position)
                     self.positions.remove(position)
+                    self.greeks_book.close(position['call_leg'])
+                    self.greeks_book.close(position['put_leg'])
 
                     self.logger.info(f"\nClosed strangle position:")
                     self.logger.info(f"P&L: ${exit_check['pnl']:,.2f}")
                     self.logger.info(f"Exit Reason: {exit_check['exit_reason']}")
                     self.logger.info(f"Current Balance: ${self.balance:,.2f}")
+                    self._log_portfolio_greeks()
 
             if len(self.positions) < config.MAX_POSITION_SIZE and self._check_entry_conditions(row):
                 contracts = self._calculate_position_size(row['close'])
@@ -162,9 +195,11 @@ class LongStranglesStrategy:
                     'premium_paid': premium * contracts * 100,
                     'max_profit': premium * contracts * 100 * 2
                 }
+                new_position['call_leg'], new_position['put_leg'] = self._open_strangle_legs(row, contracts)
 
                 self.positions.append(new_position)
                 self.logger.info(f"\nOpened new strangle position at ${row['close']:,.2f}")
+                self._log_portfolio_greeks()
 
         total_pnl = self.balance - self.initial_balance
         percentage_return = (total_pnl / self.initial_balance) * 100
@@ -24,5 +24,23 @@ MACD_SIGNAL = 9
 STOP_LOSS_PERCENT = 1.5
 PROFIT_TARGET_PERCENT = 3.0
 
+# Continuous futures (common/futures.py). Folder of per-contract files named
+# <MARKET>_<YYYYMMDD>.csv; None trades the spot series in DATA_PATH instead.
+FUTURES_CONTRACTS_DIR = None
+FUTURES_MARKET = "NIFTY"
+FUTURES_ROLL_RULE = "volume"  # volume, open_interest or expiry
+FUTURES_ROLL_DAYS_BEFORE_EXPIRY = 5  # Used by the expiry rule
+# Stops and targets are percentages, so keep percentage moves across rolls
+FUTURES_ADJUSTMENT = "ratio"
+
+# Compact data mode (common/compact.py): keep only DATA_COLUMNS, stored as
+# float32/int32 except FLOAT64_COLUMNS, which P&L is accounted in
+COMPACT_DATA = False
+DATA_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'Volume']
+FLOAT64_COLUMNS = ['close']
+# Compare signals with a float64 run before trading. The verdict is kept per
+# data file and settings, so the float64 frame is only loaded the first time
+CHECK_COMPACT_PARITY = True
+
 # Logging
 LOG_LEVEL = "INFO"
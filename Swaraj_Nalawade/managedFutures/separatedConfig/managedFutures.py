@@ -4,28 +4,41 @@ import talib
 import logging
 from datetime import datetime
 import config
+import hashlib
 import json
 import os
+import sys
 from pathlib import Path
 
-# Setup logging
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
-timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import compact, datasets, futures, ingest
 
-logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+log_dir = Path("logs")
 logger = logging.getLogger("trading_system")
 
 
-def load_data():
-    """Load and preprocess market data from CSV."""
-    df = pd.read_csv(config.DATA_PATH, usecols=['time', 'open', 'high', 'low', 'close', 'Volume'])
-    df['time'] = pd.to_datetime(df['time'], format='%d-%m-%Y')
-    df = df.sort_values('time')
-    return df
+def setup_logging():
+    """Create the log directory and configure logging."""
+    log_dir.mkdir(exist_ok=True)
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+
+def load_data(compact_data=None):
+    """Load and preprocess market data from CSV, or the continuous futures series if configured."""
+    compact_data = config.COMPACT_DATA if compact_data is None else compact_data
+    if config.FUTURES_CONTRACTS_DIR:
+        df = futures.continuous_series(config.FUTURES_CONTRACTS_DIR, config.FUTURES_MARKET,
+                                       adjustment=config.FUTURES_ADJUSTMENT, rule=config.FUTURES_ROLL_RULE,
+                                       days_before_expiry=config.FUTURES_ROLL_DAYS_BEFORE_EXPIRY)
+        df = df[config.DATA_COLUMNS]
+        return compact.compact(df, keep=config.FLOAT64_COLUMNS) if compact_data else df
+    if compact_data:
+        return ingest.load(config.DATA_PATH, columns=config.DATA_COLUMNS, compact=True,
+                           float64_columns=config.FLOAT64_COLUMNS)
+    return ingest.load(config.DATA_PATH)[config.DATA_COLUMNS]
 
 
 def calculate_indicators(df):
@@ -65,6 +78,62 @@ def generate_signals(df):
     return signals
 
 
+# Settings the compact/float64 comparison depends on
+PARITY_SETTINGS = ('DATA_COLUMNS', 'FLOAT64_COLUMNS', 'SMA_SHORT_PERIOD', 'SMA_LONG_PERIOD', 'ADX_PERIOD',
+                   'RSI_PERIOD', 'BBANDS_PERIOD', 'BBANDS_STDDEV', 'MACD_FAST', 'MACD_SLOW', 'MACD_SIGNAL',
+                   'FUTURES_CONTRACTS_DIR', 'FUTURES_MARKET', 'FUTURES_ROLL_RULE',
+                   'FUTURES_ROLL_DAYS_BEFORE_EXPIRY', 'FUTURES_ADJUSTMENT')
+
+
+def data_digest():
+    """Content hash of the traded data: the CSV, or every contract file of the futures series."""
+    if not config.FUTURES_CONTRACTS_DIR:
+        return datasets.digest(config.DATA_PATH)
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(config.FUTURES_CONTRACTS_DIR)):
+        path = os.path.join(config.FUTURES_CONTRACTS_DIR, name)
+        if os.path.isfile(path):
+            digest.update(f"{name}:{datasets.file_hash(path)}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def parity_verdict_path():
+    """File holding the parity verdict for the current data and settings."""
+    settings = json.dumps({name: getattr(config, name) for name in PARITY_SETTINGS}, sort_keys=True)
+    key = hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(datasets.CACHE_DIR, f"{data_digest()}.parity-{key}.json")
+
+
+def check_compact_parity(df):
+    """Compare signals on the compact frame with a float64 run; returns the frame to trade on.
+
+    The verdict is stored per data digest and settings, so later runs on the
+    same data skip the float64 load.
+    """
+    verdict_path = parity_verdict_path()
+    if os.path.exists(verdict_path):
+        with open(verdict_path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        if not result['mismatches']:
+            logger.info(f"Compact data: signals matched float64 on this data before ({result['bars']} bars)")
+            return df
+        logger.warning("Compact signals differed from float64 on this data before; trading on float64 data")
+        return calculate_indicators(load_data(compact_data=False))
+
+    baseline = calculate_indicators(load_data(compact_data=False))
+    result = compact.parity(generate_signals, baseline, df)
+    os.makedirs(os.path.dirname(verdict_path), exist_ok=True)
+    with open(verdict_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=1)
+    logger.info(f"Compact data: {result['bytes_compact']:,} bytes vs {result['bytes_baseline']:,} "
+                f"({result['saving']:.0%} less), {result['mismatches']} of {result['bars']} signals differ")
+    if result['mismatches']:
+        logger.warning(f"Compact signals differ from float64 at bars {result['mismatch_bars']}; "
+                       f"trading on float64 data")
+        return baseline
+    return df
+
+
 def calculate_position_size(balance, price):
     """Calculate position size based on risk management."""
     risk_amount = balance * config.RISK_PER_TRADE
@@ -80,6 +149,10 @@ def run_strategy():
 
         df = load_data()
         df = calculate_indicators(df)
+        if config.COMPACT_DATA:
+            df = compact.compact(df, keep=config.FLOAT64_COLUMNS)
+            if config.CHECK_COMPACT_PARITY:
+                df = check_compact_parity(df)
         signals = generate_signals(df)
 
         balance = config.INITIAL_BALANCE
@@ -127,6 +200,7 @@ def run_strategy():
         print(f"Total P/L: ${final_balance - config.INITIAL_BALANCE:,.2f}")
         print(f"Profit Percentage: {((final_balance - config.INITIAL_BALANCE) / config.INITIAL_BALANCE) * 100:.2f}%")
 
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         trades_df.to_csv(log_dir / f"trade_history_{timestamp}.csv", index=False)
 
     except Exception as e:
@@ -135,4 +209,5 @@ def run_strategy():
 
 
 if __name__ == "__main__":
+    setup_logging()
     run_strategy()
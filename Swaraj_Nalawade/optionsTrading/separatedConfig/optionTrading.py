@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import numpy as np
 import logging
@@ -6,6 +7,9 @@ import talib
 from datetime import datetime
 from config import DATA_CONFIG, TRADING_PARAMS, INDICATOR_PARAMS, REQUIRED_COLUMNS
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import ingest
+
 
 class OptionsTradeLogger:
     def __init__(self, initial_balance):
@@ -197,12 +201,11 @@ def calculate_options_metrics(df):
 
 def run_options_trading_strategy():
     # Load and prepare data
-    df = pd.read_csv(DATA_CONFIG["data_path"])
-    df['time'] = pd.to_datetime(df['time'])
-    df = df.sort_values('time')
-
-    numeric_columns = [col for col in REQUIRED_COLUMNS if col != 'time']
-    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors='coerce')
+    # Parsed, sorted and type-checked by common/ingest.py
+    df = ingest.load(DATA_CONFIG["data_path"])
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Data is missing required columns: {', '.join(missing)}")
 
     # Calculate options metrics
     df = calculate_options_metrics(df)
@@ -14,6 +14,10 @@ RSI_OVERSOLD = 30
 RSI_OVERBOUGHT = 70
 VOLUME_SURGE_MULTIPLIER = 1.2
 
+# Entry rules (see common/rules.py); names are indicator columns or settings in this file
+BULLISH_RULE = "RSI <= RSI_OVERSOLD & MACD > Signal"
+BEARISH_RULE = "RSI >= RSI_OVERBOUGHT & MACD < Signal"
+
 # Logging Configuration
 LOG_FORMAT = "%(message)s"
 LOG_FILENAME = f"rsi_trading_log_{datetime.now().strftime('%Y%m%d')}.log"
@@ -1,11 +1,17 @@
 # trading_strategy.py
+import os
+import sys
 import talib
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
+import config
 from config import *  # Import all config parameters
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import rules, runcache
+
 def setup_logging():
     """Configure logging with custom format showing trade timestamps."""
     logging.basicConfig(
@@ -47,17 +53,10 @@ def calculate_indicators(df):
     return df
 
 def identify_rsi_signals(df):
-    """Enhanced signal identification with stricter conditions."""
-    # RSI Conditions
-    rsi_oversold = df['RSI'] <= RSI_OVERSOLD
-    rsi_overbought = df['RSI'] >= RSI_OVERBOUGHT
-
-    # MACD Confirmation
-    macd_bullish = df['MACD'] > df['Signal']
-    macd_bearish = df['MACD'] < df['Signal']
-
-    bullish_signal = rsi_oversold & macd_bullish
-    bearish_signal = rsi_overbought & macd_bearish
+    """Evaluate BULLISH_RULE and BEARISH_RULE from config over the whole frame."""
+    params = rules.config_params(config)
+    bullish_signal = pd.Series(rules.evaluate(BULLISH_RULE, df, params), index=df.index)
+    bearish_signal = pd.Series(rules.evaluate(BEARISH_RULE, df, params), index=df.index)
 
     return bullish_signal, bearish_signal
 
@@ -86,6 +85,8 @@ def save_trade_log(trade_history, output_path="trade_log.csv"):
     trades_df.to_csv(output_path, index=False)
     print(f"Trade log saved to {output_path}")
 
+# Log file names carry today's date but do not change the trades
+@runcache.memoize(config, ignore=('LOG_FILENAME', 'LOG_FILE_PATH'))
 def run_rsi_strategy(data_path=CSV_FILE_PATH, initial_balance=INITIAL_BALANCE, 
                      stop_loss_pct=STOP_LOSS_PERCENT, target_profit_pct=TARGET_PROFIT_PERCENT, 
                      risk_per_trade=RISK_PER_TRADE, transaction_cost_pct=TRANSACTION_COST_PERCENT):
@@ -1,29 +1,38 @@
+import os
+import sys
 import pandas as pd
 import talib
 from datetime import datetime
 import config
 
-# Function to load market data and calculate indicators using TA-Lib
-def load_market_data(csv_file):
-    df = pd.read_csv(csv_file)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from common import ingest, runcache
+from common.ledger import TradeLedger
 
-    # Ensure time column is in datetime format
-    df['time'] = pd.to_datetime(df['time'])
+# Columns of the trade ledger
+TRADE_COLUMNS = {
+    'entry_time': 'time',
+    'exit_time': 'time',
+    'entry_price': 'float',
+    'exit_price': 'float',
+    'status': 'category',
+    'profit': 'float'
+}
 
-    # Sort data by time to maintain correct sequence
-    df = df.sort_values(by='time').reset_index(drop=True)
+# Function to load market data and calculate indicators using TA-Lib
+def load_market_data(csv_file):
+    # Parsed, sorted and validated once by common/ingest.py (cached by file content)
+    df = ingest.load(csv_file)
 
     # Calculate indicators using TA-Lib
     df['RSI'] = talib.RSI(df['close'], timeperiod=14)
     df['MACD'], df['Signal'], _ = talib.MACD(df['close'], fastperiod=12, slowperiod=26, signalperiod=9)
     df['%K'], df['%D'] = talib.STOCH(df['high'], df['low'], df['close'], fastk_period=14, slowk_period=3, slowd_period=3)
 
-    # ✅ Instead of dropping all NaN rows, fill NaNs with previous valid values
-    df.fillna(method='bfill', inplace=True)  # Backfill NaNs
-    df.fillna(method='ffill', inplace=True)  # Forward-fill remaining NaNs
+    # Indicator warm-up bars stay NaN: backfilling them copied later values into
+    # earlier bars, and no signal fires on a NaN comparison anyway
 
-    # ✅ DEBUG: Print after filling NaNs
-    print("After filling NaN:")
+    print("Loaded market data:")
     print(df[['time', 'close', 'RSI', 'MACD', 'Signal', '%K', '%D']].head(30))
 
     return df
@@ -75,7 +84,8 @@ def scalping_decision(market_data, position=None):
 
     return "Hold"
 
-# Main function to run scalping strategy
+# Main function to run scalping strategy (repeated runs on unchanged inputs come from the run cache)
+@runcache.memoize(config)
 def run_scalping_strategy():
     balance = config.INITIAL_BALANCE
     df = load_market_data(config.CSV_FILE_PATH)
@@ -84,7 +94,7 @@ def run_scalping_strategy():
     trade_price = None
     stop_loss = None
     target_profit = None
-    trades = []
+    trades = TradeLedger(TRADE_COLUMNS)
     current_index = config.INITIAL_LOOKBACK
     
     log_filename = f"scalping_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
@@ -131,14 +141,14 @@ def run_scalping_strategy():
                 log_trade(f"Profit/Loss: {profit:.2f}")
                 log_trade(f"New Balance: {balance:.2f}")
                 
-                trades.append({
-                    'entry_time': trade_entry_time,
-                    'exit_time': market_data['timestamp'],
-                    'entry_price': trade_price,
-                    'exit_price': current_price,
-                    'status': status,
-                    'profit': profit
-                })
+                trades.append(
+                    entry_time=trade_entry_time,
+                    exit_time=market_data['timestamp'],
+                    entry_price=trade_price,
+                    exit_price=current_price,
+                    status=status,
+                    profit=profit
+                )
                 position = None
                 current_index += config.COOLDOWN_PERIODS
                 continue
@@ -164,6 +174,11 @@ def run_scalping_strategy():
     log_trade(f"Final Balance: {balance:.2f}")
     log_trade(f"Total Profit/Loss: {balance - config.INITIAL_BALANCE:.2f}")
     log_trade(f"Total Trades Executed: {len(trades)}")
+
+    if config.SAVE_TRADE_HISTORY and len(trades) > 0:
+        history_filename = f"trade_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        trades.to_csv(history_filename)
+        log_trade(f"Trade history saved to {history_filename}")
     
     return balance, trades
 
@@ -0,0 +1,6 @@
+"""Shared helpers used by the strategy scripts of every team member.
+
+Strategy scripts are run from their own folder (so that ``import config``
+picks up the local config file); to use these helpers they add the
+repository root to ``sys.path`` before importing ``common``.
+"""
@@ -0,0 +1,440 @@
+"""Shared-memory bar bus: one producer, any number of strategy processes.
+
+The producer writes each bar once into a ring of fixed-layout records in
+``multiprocessing.shared_memory``; subscribers attach to the same block by
+name and read the records in place as NumPy structured-array views. Nothing
+is parsed, pickled or copied per subscriber, so publishing costs the same
+with one subscriber or fifty.
+
+    bus = barbus.BarBus('nifty_bars', symbols=['NIFTY'])          # feed process
+    bus.publish(time_ns, open_, high, low, close, volume)
+
+    subscriber = barbus.BarSubscriber('nifty_bars')               # strategy process
+    for bar in subscriber.bars():
+        ... bar['close'], bar['vwap'], bar['time'] ...
+
+Every record carries its sequence number (1, 2, 3, ...). The producer
+stamps the slot's sequence number last, after the fields, and only then
+advances the published count, so a subscriber never sees a half-written
+record as valid. (On x86 stores become visible in program order; on
+weakly ordered CPUs the sequence check is best effort.)
+
+The producer never waits for subscribers. Each subscriber publishes its
+read cursor in a table in the shared block; every ``check_every`` bars the
+producer compares the cursors with its own position and flags subscribers
+that are more than ``slow_fraction`` of the ring behind (``on_slow`` is
+called once per episode). A subscriber that falls a full ring behind has
+been lapped: it skips to the oldest record still in the ring and counts
+the bars it lost in ``dropped``.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: subscriber registration is not locked
+    fcntl = None
+
+MAGIC = 0x5355424241524221  # Marks a block as a bar bus
+VERSION = 1
+MAX_SUBSCRIBERS = 64
+SYMBOL_BYTES = 4096
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u8'),
+    ('version', '<u4'),
+    ('record_size', '<u4'),
+    ('capacity', '<u8'),
+    ('write_seq', '<u8'),       # Sequence number of the last published record
+    ('producer_pid', '<i8'),
+    ('closed', '<u8'),
+    ('symbols_length', '<u8'),
+    ('_pad', '<u8'),
+])
+
+SUBSCRIBER_DTYPE = np.dtype([
+    ('pid', '<i8'),             # 0: free slot
+    ('cursor', '<u8'),          # Sequence number of the last record released by the subscriber
+    ('slow', '<u8'),            # Set by the producer while the subscriber is far behind
+    ('dropped', '<u8'),
+])
+
+# One bar: 72 bytes, time in int64 nanoseconds since the epoch (UTC)
+RECORD_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('vwap', '<f8'),
+    ('symbol', '<u4'),
+    ('_pad', '<u4'),
+])
+
+_SUBSCRIBERS_OFFSET = HEADER_DTYPE.itemsize
+_SYMBOLS_OFFSET = _SUBSCRIBERS_OFFSET + MAX_SUBSCRIBERS * SUBSCRIBER_DTYPE.itemsize
+_RECORDS_OFFSET = _SYMBOLS_OFFSET + SYMBOL_BYTES
+
+
+def _layout(buffer, capacity):
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=buffer, offset=0)
+    subscribers = np.ndarray(MAX_SUBSCRIBERS, dtype=SUBSCRIBER_DTYPE, buffer=buffer, offset=_SUBSCRIBERS_OFFSET)
+    records = np.ndarray(capacity, dtype=RECORD_DTYPE, buffer=buffer, offset=_RECORDS_OFFSET)
+    return header, subscribers, records
+
+
+def attach_block(name):
+    """Open an existing block without handing it to this process's resource tracker.
+
+    Before Python 3.13 attaching registers the block too, and the tracker
+    would unlink the producer's block when the subscriber exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _to_ns(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return pd.Timestamp(value).value
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BarBus:
+    """Producer side: creates the shared block and publishes bars into it."""
+
+    def __init__(self, name, capacity=65536, symbols=('default',), slow_fraction=0.5, check_every=None,
+                 on_slow=None):
+        """``capacity`` records are kept (72 bytes each). ``on_slow(slot, pid, lag)``
+        is called when a subscriber falls behind; by default it prints a warning."""
+        if capacity < 2:
+            raise ValueError("Ring capacity must be at least 2")
+        if not 0 < slow_fraction <= 1:
+            raise ValueError("slow_fraction must be in (0, 1]")
+        self.symbols = list(symbols)
+        encoded = json.dumps(self.symbols).encode('utf-8')
+        if len(encoded) > SYMBOL_BYTES:
+            raise ValueError(f"Symbol names take more than {SYMBOL_BYTES} bytes")
+        self.name = name
+        self.capacity = int(capacity)
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=_RECORDS_OFFSET + self.capacity * RECORD_DTYPE.itemsize)
+        self.header, self.subscribers, self.records = _layout(self.shm.buf, self.capacity)
+        self.subscribers[:] = 0
+        self.shm.buf[_SYMBOLS_OFFSET:_SYMBOLS_OFFSET + len(encoded)] = encoded
+        self.header['magic'] = MAGIC
+        self.header['version'] = VERSION
+        self.header['record_size'] = RECORD_DTYPE.itemsize
+        self.header['capacity'] = self.capacity
+        self.header['write_seq'] = 0
+        self.header['producer_pid'] = os.getpid()
+        self.header['closed'] = 0
+        self.header['symbols_length'] = len(encoded)
+
+        self.slow_lag = max(1, int(self.capacity * slow_fraction))
+        self.check_every = check_every or max(1, self.capacity // 64)
+        self.on_slow = on_slow or self._report_slow
+        self.seq = 0
+        self._seq_column = self.records['seq']
+        # Plain uint64 view of write_seq: cheaper to store than a structured field
+        self._write_seq = np.ndarray(1, dtype='<u8', buffer=self.shm.buf,
+                                     offset=HEADER_DTYPE.fields['write_seq'][1])
+        self._symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._vwap_sums = np.zeros((len(self.symbols), 2))  # (turnover, volume) per symbol
+
+    def symbol_id(self, symbol):
+        if symbol not in self._symbol_ids:
+            raise ValueError(f"Unknown symbol '{symbol}'; the bus carries {', '.join(self.symbols)}")
+        return self._symbol_ids[symbol]
+
+    def publish(self, time, open_, high, low, close, volume, vwap=None, symbol=0):
+        """Write one bar and make it visible; returns its sequence number.
+
+        ``symbol`` is a name or an index into ``symbols``. Without ``vwap``
+        the cumulative VWAP of the symbol since the bus started is stored.
+        """
+        symbol = symbol if isinstance(symbol, (int, np.integer)) else self.symbol_id(symbol)
+        if vwap is None:
+            sums = self._vwap_sums[symbol]
+            sums[0] += close * volume
+            sums[1] += volume
+            vwap = sums[0] / sums[1] if sums[1] else close
+        seq = self.seq + 1
+        slot = (seq - 1) % self.capacity
+        # Invalidate the slot, fill it, then stamp it: readers check the stamp
+        self._seq_column[slot] = 0
+        self.records[slot] = (0, _to_ns(time), open_, high, low, close, volume, vwap, symbol, 0)
+        self._seq_column[slot] = seq
+        self._write_seq[0] = seq
+        self.seq = seq
+        if seq % self.check_every == 0:
+            self.check_subscribers()
+        return seq
+
+    def publish_frame(self, df, symbol=0, time_column='time'):
+        """Publish a DataFrame of bars (``open``, ``high``, ``low``, ``close``, ``Volume``) in order."""
+        symbol = symbol if isinstance(symbol, (int, np.integer)) else self.symbol_id(symbol)
+        times = pd.to_datetime(df[time_column]).to_numpy('datetime64[ns]').view('i8')
+        volume_column = 'Volume' if 'Volume' in df.columns else 'volume'
+        close, volume = df['close'].to_numpy(np.float64), df[volume_column].to_numpy(np.float64)
+        if 'vwap' in df.columns:
+            vwap = df['vwap'].to_numpy(np.float64)
+        else:
+            sums = self._vwap_sums[symbol]
+            turnover = sums[0] + np.cumsum(close * volume)
+            traded = sums[1] + np.cumsum(volume)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                vwap = np.where(traded > 0, turnover / traded, close)
+            if len(close):
+                sums[:] = turnover[-1], traded[-1]
+        columns = [df[c].to_numpy(np.float64) for c in ('open', 'high', 'low')]
+
+        # Write in pieces that never wrap or lap themselves
+        done = 0
+        while done < len(times):
+            first_seq = self.seq + 1
+            slot = (first_seq - 1) % self.capacity
+            count = min(len(times) - done, self.capacity - slot, self.check_every)
+            window = self.records[slot:slot + count]
+            piece = slice(done, done + count)
+            window['seq'] = 0
+            window['time'] = times[piece]
+            window['open'], window['high'], window['low'] = (c[piece] for c in columns)
+            window['close'], window['volume'], window['vwap'] = close[piece], volume[piece], vwap[piece]
+            window['symbol'] = symbol
+            window['seq'] = np.arange(first_seq, first_seq + count, dtype=np.uint64)
+            self.seq += count
+            self._write_seq[0] = self.seq
+            done += count
+            self.check_subscribers()
+        return self.seq
+
+    def check_subscribers(self):
+        """Flag subscribers that are more than ``slow_lag`` records behind; returns their slots."""
+        table = self.subscribers
+        active = table['pid'] != 0
+        if not active.any():
+            return []
+        lag = self.seq - table['cursor'].astype(np.int64)
+        slow = active & (lag > self.slow_lag)
+        newly_slow = np.flatnonzero(slow & (table['slow'] == 0))
+        for slot in newly_slow:
+            pid = int(table['pid'][slot])
+            if not _pid_alive(pid):
+                table[slot] = 0  # Subscriber died without closing: free its slot
+                continue
+            table['slow'][slot] = 1
+            self.on_slow(int(slot), pid, int(lag[slot]))
+        table['slow'][active & ~slow] = 0
+        return [int(slot) for slot in np.flatnonzero(table['slow'])]
+
+    def _report_slow(self, slot, pid, lag):
+        print(f"Bar bus '{self.name}': subscriber {slot} (pid {pid}) is {lag} bars behind "
+              f"(ring holds {self.capacity})")
+
+    def status(self):
+        """One row per attached subscriber: pid, lag, slow flag and bars dropped."""
+        table = self.subscribers
+        slots = np.flatnonzero(table['pid'] != 0)
+        return pd.DataFrame({
+            'slot': slots,
+            'pid': table['pid'][slots],
+            'lag': self.seq - table['cursor'][slots].astype(np.int64),
+            'slow': table['slow'][slots].astype(bool),
+            'dropped': table['dropped'][slots]
+        })
+
+    def close(self, unlink=True):
+        """Tell subscribers the feed has ended and release the block."""
+        self.header['closed'] = 1
+        del self.header, self.subscribers, self.records, self._seq_column, self._write_seq
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BarSubscriber:
+    """Consumer side: attaches to a bus by name and reads new records in place."""
+
+    def __init__(self, name, from_start=False):
+        """By default reading starts at the next bar published; ``from_start``
+        begins with the oldest record still in the ring."""
+        self.shm = attach_block(name)
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        if header['magic'] != MAGIC or header['version'] != VERSION or header['record_size'] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Shared memory '{name}' is not a version {VERSION} bar bus")
+        self.name = name
+        self.capacity = int(header['capacity'])
+        self.header, self.subscribers, self.records = _layout(self.shm.buf, self.capacity)
+        symbols = bytes(self.shm.buf[_SYMBOLS_OFFSET:_SYMBOLS_OFFSET + int(self.header['symbols_length'])])
+        self.symbols = json.loads(symbols.decode('utf-8'))
+        self._seq_column = self.records['seq']
+
+        self.slot = self._register()
+        newest = int(self.header['write_seq'])
+        self.cursor = max(newest - self.capacity, 0) if from_start else newest
+        self._entry = self.subscribers[self.slot:self.slot + 1]
+        self._entry['cursor'] = self.cursor
+        self.dropped = 0
+        self._pending = None
+
+    def _register(self):
+        lock_path = os.path.join(tempfile.gettempdir(), f"barbus_{self.name}.lock")
+        with open(lock_path, 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            pids = self.subscribers['pid']
+            for slot in np.flatnonzero(pids != 0):
+                if not _pid_alive(int(pids[slot])):
+                    self.subscribers[slot] = 0
+            free = np.flatnonzero(pids == 0)
+            if not len(free):
+                raise ValueError(f"Bar bus '{self.name}' already has {MAX_SUBSCRIBERS} subscribers")
+            slot = int(free[0])
+            self.subscribers[slot] = (os.getpid(), int(self.header['write_seq']), 0, 0)
+        return slot
+
+    @property
+    def lag(self):
+        """Records published but not yet read."""
+        return int(self.header['write_seq']) - self.cursor
+
+    @property
+    def slow(self):
+        """Whether the producer currently flags this subscriber as slow."""
+        return bool(self._entry['slow'][0])
+
+    @property
+    def closed(self):
+        return bool(self.header['closed'])
+
+    def poll(self, max_records=None):
+        """Records published since the last call, as a read-only view into the ring.
+
+        The view is only valid until the producer laps it, so use it before
+        the next call. A batch ends at the end of the ring; the records after
+        the wrap come with the next call. Empty when nothing new arrived.
+        """
+        self._release()
+        newest = int(self.header['write_seq'])
+        if newest - self.cursor > self.capacity:
+            # Lapped: the oldest unread records were overwritten
+            lost = newest - self.capacity - self.cursor
+            self.dropped += lost
+            self._entry['dropped'] = self.dropped
+            self.cursor = newest - self.capacity
+        if newest == self.cursor:
+            return self.records[:0]
+        start = self.cursor % self.capacity
+        count = min(newest - self.cursor, self.capacity - start)
+        if max_records is not None:
+            count = min(count, max_records)
+        batch = self.records[start:start + count]
+        self._pending = (start, self.cursor + 1, count)
+        self.cursor += count
+        return batch
+
+    def _release(self):
+        """Account for the previous batch and publish the cursor past it."""
+        if self._pending is not None:
+            start, first_seq, count = self._pending
+            if self._seq_column[start] != first_seq:
+                # Overwritten while it was being read
+                self.dropped += count
+                self._entry['dropped'] = self.dropped
+            self._pending = None
+        self._entry['cursor'] = self.cursor
+
+    def wait(self, timeout=None, spin=0.001, sleep=0.0002, max_records=None):
+        """Next batch of records, waiting for the producer if there is none yet.
+
+        Spins for ``spin`` seconds (``None``: for ever, lowest latency at the
+        cost of a busy core) and then checks every ``sleep`` seconds. Returns
+        an empty view on timeout or when the producer has closed the bus.
+        """
+        batch = self.poll(max_records)
+        if len(batch):
+            return batch
+        started = time.perf_counter()
+        write_seq = self.header['write_seq']
+        while True:
+            if write_seq != self.cursor:
+                return self.poll(max_records)
+            if self.header['closed']:
+                return self.poll(max_records)
+            waited = time.perf_counter() - started
+            if timeout is not None and waited >= timeout:
+                return self.records[:0]
+            if spin is not None and waited >= spin:
+                time.sleep(sleep)
+            write_seq = self.header['write_seq']
+
+    def bars(self, symbol=None, timeout=None, **wait_options):
+        """Yield records one at a time until the producer closes the bus (or ``timeout`` passes idle)."""
+        symbol_id = None if symbol is None else self.symbols.index(symbol)
+        # Short batches keep the window in which the producer can lap a batch small
+        wait_options.setdefault('max_records', max(1, self.capacity // 8))
+        while True:
+            batch = self.wait(timeout=timeout, **wait_options)
+            if not len(batch):
+                if self.closed or timeout is not None:
+                    self._release()
+                    return
+                continue
+            expected = self.cursor - len(batch) + 1
+            stamps = batch['seq']
+            for i in range(len(batch)):
+                if stamps[i] != expected + i:
+                    # The producer lapped this batch while it was being read
+                    self.dropped += len(batch) - i
+                    self._entry['dropped'] = self.dropped
+                    self._pending = None
+                    break
+                record = batch[i]
+                if symbol_id is None or record['symbol'] == symbol_id:
+                    yield record
+
+    def close(self):
+        """Leave the bus (frees the subscriber slot)."""
+        if self.shm is None:
+            return
+        self._entry[0] = 0
+        del self.header, self.subscribers, self.records, self._seq_column, self._entry
+        self.shm.close()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,139 @@
+"""Compact in-memory frames: declared columns only, float32, int32 and categories.
+
+Loaders keep every column of the CSV as float64 or text (about 28 columns on
+the intraday files, including the ``Plot`` columns and label strings nobody
+reads) and strategies add 10-20 float64 indicator columns on top. Compact
+mode keeps only the columns a strategy declares and stores them in the
+narrowest type that holds the values within the precision budget:
+
+    df = ingest.load(path, columns=['time', 'high', 'low', 'close', 'Volume'],
+                     compact=True, float64_columns=['close'])
+    df = calculate_indicators(df)
+    df = compact.compact(df, keep=['close'])      # new indicator columns to float32
+
+- float64 columns become float32 when every value survives the round trip
+  within ``rtol`` (relative) and whole-number columns (counts, volumes with
+  gaps) survive it exactly. Columns in ``keep`` stay float64; use it for the
+  prices P&L is accounted in, since arithmetic on float32 scalars stays
+  float32.
+- int64 columns become int32 when every value fits; nullable ``Int64`` and
+  ``Float64`` columns become ``Int32`` and ``Float32``.
+- text columns with repeated values (labels) become categories.
+
+Float32 rounding can move a comparison that sits on a tie (``MACD >
+Signal`` on equal values), so ``parity`` runs a signal function on the
+float64 frame and on the compact frame and reports every bar where they
+disagree. Strategies run it once before trading in compact mode.
+"""
+import numpy as np
+import pandas as pd
+
+# Relative round-trip error allowed for float32 (float32 itself is good to ~6e-8)
+RTOL = 1e-6
+
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+def nbytes(df):
+    """Bytes held by a frame, text and categories included."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def float32_fits(values, rtol=RTOL):
+    """True if ``values`` can be stored as float32 within the precision budget."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return True
+    if np.abs(finite).max() > _FLOAT32_MAX:
+        return False
+    narrowed = finite.astype(np.float32).astype(np.float64)
+    if np.array_equal(finite, np.round(finite)):
+        # Counts must come back exactly
+        return np.array_equal(finite, narrowed)
+    scale = np.maximum(np.abs(finite), np.finfo(np.float32).tiny)
+    return bool((np.abs(narrowed - finite) / scale).max() <= rtol)
+
+
+def compact_dtype(series, rtol=RTOL):
+    """Narrow dtype for a column, or None to keep it as it is.
+
+    Nullable extension columns (``Int64``, ``Float64``) keep their missing
+    values and narrow to ``Int32``/``Float32``.
+    """
+    dtype = series.dtype
+    nullable = isinstance(dtype, pd.api.extensions.ExtensionDtype)
+    if pd.api.types.is_float_dtype(dtype):
+        if dtype.itemsize > 4 and float32_fits(series.to_numpy(dtype=np.float64, na_value=np.nan), rtol):
+            return 'Float32' if nullable else np.float32
+    elif pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        values = series.dropna()
+        if dtype.itemsize > 4 and len(values):
+            info = np.iinfo(np.int32)
+            if info.min <= values.min() and values.max() <= info.max:
+                return 'Int32' if nullable else np.int32
+    elif dtype == object or pd.api.types.is_string_dtype(dtype):
+        if series.nunique() <= len(series) // 2:
+            return 'category'
+    return None
+
+
+def compact(df, columns=None, keep=(), rtol=RTOL):
+    """Copy of ``df`` with only ``columns`` (all by default), narrowed column by column.
+
+    Columns in ``keep`` are copied unchanged. Returns the new frame; the
+    input is not modified.
+    """
+    if columns is not None:
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not in the data: {', '.join(map(str, missing))}")
+        df = df[list(columns)]
+    narrowed = {}
+    for column in df.columns:
+        series = df[column]
+        dtype = None if column in keep else compact_dtype(series, rtol)
+        narrowed[column] = series if dtype is None else series.astype(dtype)
+    return pd.DataFrame(narrowed, index=df.index)
+
+
+def _as_array(result):
+    if isinstance(result, (pd.Series, pd.Index)):
+        return result.to_numpy()
+    return np.asarray(result)
+
+
+def parity(signal_fn, baseline, compacted):
+    """Run ``signal_fn`` on the float64 frame and on the compact frame and compare.
+
+    ``signal_fn`` takes a frame and returns per-bar signals (a Series or
+    array, or a tuple of them). Each frame is passed as a copy. Returns a
+    dict with the number of bars, the mismatching bar positions, and the
+    memory held by both frames.
+    """
+    expected = signal_fn(baseline.copy())
+    actual = signal_fn(compacted.copy())
+    if not isinstance(expected, tuple):
+        expected, actual = (expected,), (actual,)
+    if len(expected) != len(actual):
+        raise ValueError("Signal function returned a different number of outputs on the compact frame")
+
+    differs = np.zeros(len(baseline), dtype=bool)
+    for left, right in zip(expected, actual):
+        left, right = _as_array(left), _as_array(right)
+        if left.shape != right.shape:
+            raise ValueError(f"Signal shapes differ: {left.shape} vs {right.shape}")
+        same = left == right
+        if left.dtype.kind == 'f' or right.dtype.kind == 'f':
+            same |= pd.isna(left) & pd.isna(right)
+        differs |= ~np.asarray(same, dtype=bool).reshape(len(baseline), -1).all(axis=1)
+
+    before, after = nbytes(baseline), nbytes(compacted)
+    return {
+        'bars': len(baseline),
+        'mismatches': int(differs.sum()),
+        'mismatch_bars': np.flatnonzero(differs).tolist()[:20],
+        'bytes_baseline': before,
+        'bytes_compact': after,
+        'saving': 1 - after / before if before else 0.0,
+    }
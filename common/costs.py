@@ -0,0 +1,244 @@
+"""Execution-cost model that re-prices a recorded run after the fact.
+
+Strategies record their fills (price, signed quantity, maker or taker, and
+optionally the bar's volume and volatility) in a ``fill_ledger`` together
+with the gross P&L of each trade. ``CostModel`` then prices those fills
+under any number of cost scenarios at once. Parameters are arrays with one
+entry per scenario and costs come out as a (scenarios, fills) matrix, so
+100 fee schedules cost one broadcast instead of 100 backtests.
+
+Cost components per fill (notional = price * |quantity|), all in currency:
+
+    commission      tier rate * notional, the tier picked by the cumulative
+                    notional traded so far, clipped to [min, max] per fill
+    taxes           buy_tax on buys (stamp duty), sell_tax on sells (STT),
+                    exchange_fee on both, gst on commission + exchange fee
+    spread          half_spread_bps of notional on taker fills
+    impact          impact_coef * volatility * sqrt(|quantity| / volume)
+                    * notional on taker fills (square-root law); needs the
+                    bar volume and the per-bar volatility of returns
+    taker fee       taker_fee * notional on taker fills
+    rebate          -maker_rebate * notional on maker fills
+
+Re-pricing assumes the costs would not have changed the trades themselves;
+a strategy whose sizing or filters depend on the running balance can take
+slightly different trades under a very different fee schedule.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from common.ledger import TradeLedger
+
+FILL_COLUMNS = {
+    'time': 'time',
+    'trade_id': 'int',
+    'price': 'float',
+    'quantity': 'float',     # Positive for buys, negative for sells
+    'maker': 'int',          # 1 for passive (limit) fills, 0 for aggressive ones
+    'volume': 'float',       # Bar volume, for market impact (NaN: no impact)
+    'volatility': 'float',   # Per-bar return volatility, for market impact
+}
+
+DEFAULT_PARAMS = {
+    'commission_tiers': ((0.0, 0.0),),  # (cumulative notional from which it applies, rate)
+    'commission_min': 0.0,
+    'commission_max': np.inf,
+    'buy_tax': 0.0,
+    'sell_tax': 0.0,
+    'exchange_fee': 0.0,
+    'gst': 0.0,
+    'half_spread_bps': 0.0,
+    'impact_coef': 0.0,
+    'taker_fee': 0.0,
+    'maker_rebate': 0.0,
+}
+
+COMPONENTS = ('commission', 'taxes', 'spread', 'impact', 'taker_fee', 'rebate')
+
+
+def fill_ledger(capacity=1024):
+    """Empty ledger for recording fills with the columns ``CostModel`` reads."""
+    return TradeLedger(FILL_COLUMNS, capacity=capacity)
+
+
+class CostModel:
+    """A set of cost scenarios, each one a full fee schedule."""
+
+    def __init__(self, scenarios=None, names=None):
+        """``scenarios`` is a dict of parameters (one scenario), a list of such
+        dicts, or a DataFrame with one row per scenario. Missing parameters
+        take their ``DEFAULT_PARAMS`` value."""
+        if scenarios is None:
+            scenarios = [{}]
+        elif isinstance(scenarios, dict):
+            scenarios = [scenarios]
+        elif isinstance(scenarios, pd.DataFrame):
+            names = list(scenarios.index) if names is None else names
+            scenarios = scenarios.to_dict('records')
+        scenarios = list(scenarios)
+        if not scenarios:
+            raise ValueError("Need at least one cost scenario")
+        for scenario in scenarios:
+            unknown = set(scenario) - set(DEFAULT_PARAMS)
+            if unknown:
+                raise ValueError(f"Unknown cost parameters: {', '.join(sorted(unknown))}")
+
+        self.size = len(scenarios)
+        if names is None:
+            names = pd.RangeIndex(self.size, name='scenario')
+        self.names = names if isinstance(names, pd.Index) else pd.Index(names, name='scenario')
+        if len(self.names) != self.size:
+            raise ValueError("Need one name per scenario")
+        self.scenarios = [{**DEFAULT_PARAMS, **scenario} for scenario in scenarios]
+
+        # Column vectors (scenarios, 1) so they broadcast against (fills,)
+        self.params = {name: np.array([s[name] for s in self.scenarios], dtype=np.float64)[:, None]
+                       for name in DEFAULT_PARAMS if name != 'commission_tiers'}
+        self._thresholds, self._rates = self._tier_table([s['commission_tiers'] for s in self.scenarios])
+
+    @classmethod
+    def grid(cls, base=None, **axes):
+        """Every combination of the given parameter values on top of ``base``.
+
+        ``CostModel.grid(sell_tax=[0.001, 0.00125], half_spread_bps=range(10))``
+        builds 20 scenarios, indexed by the varied parameters.
+        """
+        base = dict(base or {})
+        keys = list(axes)
+        combos = list(itertools.product(*(list(values) for values in axes.values())))
+        if not keys:
+            return cls([base])
+        names = pd.MultiIndex.from_tuples(combos, names=keys)
+        return cls([{**base, **dict(zip(keys, combo))} for combo in combos], names=names)
+
+    @staticmethod
+    def _tier_table(all_tiers):
+        # Pad every schedule to the same number of tiers with unreachable ones
+        width = max(len(tiers) for tiers in all_tiers)
+        thresholds = np.full((len(all_tiers), width), np.inf)
+        rates = np.zeros((len(all_tiers), width))
+        for row, tiers in enumerate(all_tiers):
+            tiers = sorted(tiers)
+            if not tiers or tiers[0][0] > 0:
+                raise ValueError("Commission tiers must start at a cumulative notional of 0")
+            thresholds[row, :len(tiers)] = [start for start, _ in tiers]
+            rates[row, :len(tiers)] = [rate for _, rate in tiers]
+        return thresholds, rates
+
+    def _commissions(self, notional):
+        """Commission per fill for each distinct commission schedule, and the schedule of each scenario."""
+        schedules = np.hstack([self._thresholds, self._rates,
+                               self.params['commission_min'], self.params['commission_max']])
+        unique, schedule_of = np.unique(schedules, axis=0, return_inverse=True)
+        width = self._thresholds.shape[1]
+        thresholds, rates = unique[:, :width], unique[:, width:2 * width]
+        low, high = unique[:, -2:-1], unique[:, -1:]
+
+        # Tier of each fill: the last threshold the notional traded before it has reached
+        traded_before = np.cumsum(notional) - notional
+        tier = (traded_before[None, :, None] >= thresholds[:, None, :]).sum(axis=2) - 1
+        rate = np.take_along_axis(rates, tier, axis=1)
+        commission = np.clip(rate * notional, low, high)
+        return np.where(notional > 0, commission, 0.0), schedule_of.ravel()
+
+    def _features(self, price, quantity, maker, volume, volatility):
+        """Per-fill quantities that the linear cost parameters multiply, as a (features, fills) array."""
+        price = np.asarray(price, dtype=np.float64)
+        quantity = np.asarray(quantity, dtype=np.float64)
+        maker = np.zeros(price.shape, dtype=bool) if maker is None else np.asarray(maker, dtype=bool)
+        notional = price * np.abs(quantity)
+        if volume is not None and volatility is not None:
+            volume = np.asarray(volume, dtype=np.float64)
+            volatility = np.asarray(volatility, dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shape = volatility * np.sqrt(np.abs(quantity) / volume) * notional
+            impact_base = np.where(~maker & (volume > 0) & np.isfinite(shape), shape, 0.0)
+        else:
+            impact_base = np.zeros_like(notional)
+        features = np.vstack([
+            np.where(quantity > 0, notional, 0.0),   # bought notional
+            np.where(quantity < 0, notional, 0.0),   # sold notional
+            notional,
+            np.where(maker, 0.0, notional),          # taker notional
+            np.where(maker, notional, 0.0),          # maker notional
+            impact_base
+        ])
+        return features, notional
+
+    def _components(self, features, commission):
+        """Cost components from (summed) features and commissions, each (scenarios, groups)."""
+        bought, sold, notional, taker, maker, impact_base = features
+        p = self.params
+        exchange = p['exchange_fee'] * notional
+        return {
+            'commission': commission,
+            'taxes': p['buy_tax'] * bought + p['sell_tax'] * sold + exchange + p['gst'] * (commission + exchange),
+            'spread': p['half_spread_bps'] / 10000 * taker,
+            'impact': p['impact_coef'] * impact_base,
+            'taker_fee': p['taker_fee'] * taker,
+            'rebate': (0.0 - p['maker_rebate']) * maker
+        }
+
+    def fill_costs(self, price, quantity, maker=None, volume=None, volatility=None, breakdown=False):
+        """Cost of every fill under every scenario, as a (scenarios, fills) array.
+
+        With ``breakdown=True`` returns a dict of one such array per component
+        in ``COMPONENTS`` instead of their sum.
+        """
+        features, notional = self._features(price, quantity, maker, volume, volatility)
+        commission, schedule_of = self._commissions(notional)
+        parts = self._components(features[:, None, :], commission[schedule_of])
+        parts = {name: np.broadcast_to(value, (self.size, len(notional))) for name, value in parts.items()}
+        if breakdown:
+            return parts
+        return sum(parts.values())
+
+    def reprice(self, fills, gross_pnl=None, initial_balance=None):
+        """Re-price a fill ledger (or a DataFrame with ``FILL_COLUMNS``) under every scenario.
+
+        ``gross_pnl`` is the cost-free P&L of each trade, indexed by trade id
+        (a dict, Series or array). Returns a DataFrame with one row per
+        scenario: total cost, cost per component, and with ``gross_pnl`` the
+        net P&L, plus the final balance when ``initial_balance`` is given.
+        The per-trade net P&L matrix is in ``result.attrs['net_trade_pnl']``.
+        """
+        frame = fills.to_frame() if isinstance(fills, TradeLedger) else fills
+        volume = frame['volume'].to_numpy() if 'volume' in frame else None
+        volatility = frame['volatility'].to_numpy() if 'volatility' in frame else None
+        maker = frame['maker'].to_numpy() if 'maker' in frame else None
+        features, notional = self._features(frame['price'].to_numpy(), frame['quantity'].to_numpy(),
+                                            maker, volume, volatility)
+        commission, schedule_of = self._commissions(notional)
+
+        # Every component is linear in the fill features (commission aside,
+        # which is computed once per distinct schedule), so sums over fills
+        # can be taken before the scenario parameters are applied
+        parts = self._components(features.sum(axis=1)[:, None, None],
+                                 commission.sum(axis=1)[schedule_of, None])
+        result = pd.DataFrame({name: np.broadcast_to(value, (self.size, 1))[:, 0] for name, value in parts.items()},
+                              index=self.names)
+        result.insert(0, 'total_cost', result[list(COMPONENTS)].sum(axis=1))
+
+        if gross_pnl is not None:
+            gross = pd.Series(gross_pnl, dtype=np.float64)
+            positions = gross.index.get_indexer(frame['trade_id'].to_numpy())
+            if (positions < 0).any():
+                raise ValueError("Fills refer to trade ids that have no gross P&L")
+
+            def per_trade(values):
+                rows = np.arange(len(values))[:, None]
+                slots = (positions[None, :] + len(gross) * rows).ravel()
+                return np.bincount(slots, weights=values.ravel(),
+                                   minlength=len(values) * len(gross)).reshape(len(values), len(gross))
+
+            trade_parts = self._components(per_trade(features)[:, None, :], per_trade(commission)[schedule_of])
+            net = gross.to_numpy()[None, :] - sum(trade_parts.values())
+            result['gross_pnl'] = gross.sum()
+            result['net_pnl'] = net.sum(axis=1)
+            result['profitable_trades'] = (net > 0).sum(axis=1)
+            if initial_balance is not None:
+                result['final_balance'] = initial_balance + result['net_pnl']
+            result.attrs['net_trade_pnl'] = pd.DataFrame(net, index=result.index, columns=gross.index)
+        return result
@@ -0,0 +1,269 @@
+"""Registry of the market data files used by the strategies.
+
+The same NIFTY exports are copied into almost every strategy folder. The
+registry gives each distinct file a logical name (``nifty_1m``,
+``nifty_1d``, ...) in ``datasets/registry.json``, keeps a single copy of its
+content under ``datasets/objects/<sha256>.csv`` and a pre-parsed pickle
+under ``datasets/cache/<sha256>.pkl``.
+
+Configs can then use a logical name wherever they used a path:
+
+    DATA_PATH = "nifty_1m"
+    df = datasets.load(config.DATA_PATH)
+
+``load`` also accepts plain file paths; those are hashed and share the same
+parsed cache, so every copy of a file hits one warm entry. A file's hash is
+kept per (path, size, mtime), so it is read once per process while it is
+unchanged. The content hash
+ignores CRLF/LF differences, which is the only thing that separates several
+of the copies in this repository.
+
+Command line (from the repository root):
+
+    python -m common.datasets list
+    python -m common.datasets register nifty_1m "Lalit_Mohane/NSE_NIFTY, 1 Intraday.csv"
+    python -m common.datasets sync
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS_DIR = os.path.join(REPO_ROOT, 'datasets')
+REGISTRY_FILE = os.path.join(DATASETS_DIR, 'registry.json')
+OBJECTS_DIR = os.path.join(DATASETS_DIR, 'objects')
+CACHE_DIR = os.path.join(DATASETS_DIR, 'cache')
+
+# Every registered dataset must provide these columns
+REQUIRED_COLUMNS = ['time', 'open', 'high', 'low', 'close']
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Time formats found in the exports, tried in order
+TIME_FORMATS = ['ISO8601', '%d-%m-%Y']
+
+_BLOCK_SIZE = 1 << 20
+
+# Parsed frames of this process, keyed by content hash
+_frames = {}
+
+# Content hashes of this process, keyed by (path, size, mtime) so unchanged files are read once
+_hashes = {}
+
+
+def content_hash(path):
+    """SHA-256 of a file's content with CRLF line endings read as LF."""
+    digest = hashlib.sha256()
+    pending_cr = b''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(_BLOCK_SIZE)
+            if not block:
+                break
+            block = pending_cr + block
+            pending_cr = b''
+            if block.endswith(b'\r'):
+                block, pending_cr = block[:-1], b'\r'
+            digest.update(block.replace(b'\r\n', b'\n'))
+    digest.update(pending_cr)
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """``content_hash`` of a file, read again only when its size or modification time changes."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _hashes.get(key)
+    if digest is None:
+        digest = _hashes[key] = content_hash(path)
+    return digest
+
+
+def read_registry():
+    """Return the registry as a dict of name -> entry."""
+    if not os.path.exists(REGISTRY_FILE):
+        return {}
+    with open(REGISTRY_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_registry(registry):
+    os.makedirs(DATASETS_DIR, exist_ok=True)
+    with open(REGISTRY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def validate_schema(df, required_columns=None):
+    """Check required columns and parseable prices/timestamps. Returns the detected time format."""
+    required_columns = REQUIRED_COLUMNS if required_columns is None else required_columns
+    missing = [col for col in required_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Dataset is missing required columns: {', '.join(missing)}")
+    if len(df) == 0:
+        raise ValueError("Dataset has no rows")
+
+    for col in PRICE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            raise ValueError(f"Column '{col}' is not numeric")
+
+    if 'time' not in df.columns:
+        return None
+    for time_format in TIME_FORMATS:
+        try:
+            pd.to_datetime(df['time'], format=time_format)
+            return time_format
+        except (ValueError, TypeError):
+            continue
+    raise ValueError("Column 'time' does not match any known time format")
+
+
+def register(name, path, required_columns=None):
+    """Validate ``path``, store its content once and record it under ``name``."""
+    digest = content_hash(path)
+    df = pd.read_csv(path)
+    time_format = validate_schema(df, required_columns)
+
+    os.makedirs(OBJECTS_DIR, exist_ok=True)
+    object_path = os.path.join(OBJECTS_DIR, f"{digest}.csv")
+    if not os.path.exists(object_path):
+        shutil.copyfile(path, object_path)
+
+    registry = read_registry()
+    entry = registry.get(name, {})
+    if entry and entry['sha256'] != digest:
+        raise ValueError(f"Dataset '{name}' is already registered with different content")
+
+    source = os.path.relpath(os.path.abspath(path), REPO_ROOT).replace(os.sep, '/')
+    sources = entry.get('sources', [])
+    if source not in sources:
+        sources.append(source)
+    registry[name] = {
+        'sha256': digest,
+        'rows': len(df),
+        'columns': list(df.columns),
+        'time_format': time_format,
+        'sources': sorted(sources)
+    }
+    write_registry(registry)
+    _store_frame(digest, df)
+    return registry[name]
+
+
+def resolve(name_or_path):
+    """Return a readable file path for a registered name; anything else is returned unchanged."""
+    registry = read_registry()
+    if name_or_path not in registry:
+        return name_or_path
+
+    entry = registry[name_or_path]
+    object_path = os.path.join(OBJECTS_DIR, f"{entry['sha256']}.csv")
+    if os.path.exists(object_path):
+        return object_path
+
+    # Fresh checkout: fill the store from any recorded source with matching content
+    for source in entry['sources']:
+        source_path = os.path.join(REPO_ROOT, source)
+        if os.path.exists(source_path) and file_hash(source_path) == entry['sha256']:
+            os.makedirs(OBJECTS_DIR, exist_ok=True)
+            shutil.copyfile(source_path, object_path)
+            return object_path
+    raise FileNotFoundError(f"No stored copy or matching source found for dataset '{name_or_path}'")
+
+
+def digest(name_or_path):
+    """Content hash of a registered dataset or of a file."""
+    registry = read_registry()
+    if name_or_path in registry:
+        return registry[name_or_path]['sha256']
+    return file_hash(name_or_path)
+
+
+def load(name_or_path):
+    """Return a DataFrame (as ``pd.read_csv`` would) for a registered name or a file path.
+
+    The parsed frame is cached in memory and on disk by content hash;
+    callers get their own copy, so adding indicator columns is safe.
+    """
+    registry = read_registry()
+    if name_or_path in registry:
+        digest = registry[name_or_path]['sha256']
+        path = None
+    else:
+        path = name_or_path
+        digest = file_hash(path)
+
+    df = _frames.get(digest)
+    if df is None:
+        df = _load_cached_frame(digest)
+    if df is None:
+        df = pd.read_csv(path if path is not None else resolve(name_or_path))
+        _store_frame(digest, df)
+    _frames[digest] = df
+    return df.copy()
+
+
+def sync():
+    """Register every source listed in the registry, e.g. after a fresh checkout."""
+    for name, entry in sorted(read_registry().items()):
+        for source in entry['sources']:
+            register(name, os.path.join(REPO_ROOT, source))
+
+
+def clear_cache():
+    """Drop the parsed-frame cache (memory and disk); stored objects are kept."""
+    _frames.clear()
+    if os.path.isdir(CACHE_DIR):
+        shutil.rmtree(CACHE_DIR)
+
+
+def _load_cached_frame(digest):
+    cache_path = os.path.join(CACHE_DIR, f"{digest}.pkl")
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # Written by an incompatible pandas version; parse the CSV again
+        return None
+
+
+def _store_frame(digest, df):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(CACHE_DIR, f"{digest}.pkl")
+    with open(cache_path + '.tmp', 'wb') as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(cache_path + '.tmp', cache_path)
+    _frames[digest] = df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the shared dataset registry")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Show registered datasets")
+    register_parser = commands.add_parser('register', help="Register a CSV file under a logical name")
+    register_parser.add_argument('name')
+    register_parser.add_argument('path')
+    commands.add_parser('sync', help="Store and cache every registered source")
+    commands.add_parser('clear-cache', help="Remove the parsed-frame cache")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, entry in sorted(read_registry().items()):
+            print(f"{name}: {entry['rows']} rows, {len(entry['sources'])} copies, sha256 {entry['sha256'][:12]}")
+    elif args.command == 'register':
+        entry = register(args.name, args.path)
+        print(f"Registered {args.name} ({entry['rows']} rows, sha256 {entry['sha256'][:12]})")
+    elif args.command == 'sync':
+        sync()
+    elif args.command == 'clear-cache':
+        clear_cache()
+
+
+if __name__ == "__main__":
+    main()
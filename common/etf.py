@@ -0,0 +1,109 @@
+"""Leveraged and inverse ETF prices derived from an underlying price series.
+
+A leveraged fund does not return ``leverage`` times the underlying's return
+over a holding period: it resets its exposure every day, so its value
+compounds the *daily* leveraged returns and drifts away from a simple
+multiple of the underlying in choppy markets. On top of that it pays an
+expense ratio and finances its exposure.
+
+``etf_nav`` builds those NAV series. Between resets the fund holds a fixed
+exposure set at the last reset price, so for a bar ``t`` in a reset period
+that started from reference price ``p_ref``:
+
+    NAV_t = NAV_at_reset * (1 + leverage * (p_t / p_ref - 1))
+
+and the period's closing value becomes the next period's ``NAV_at_reset``.
+Fees are charged at the last bar of each day:
+
+    daily cost = (expense_ratio + (leverage - 1) * financing_rate) / periods_per_year
+
+``leverage - 1`` is the borrowed share of a bull fund; for inverse funds it
+is negative, i.e. interest earned on the cash collateral and short
+proceeds. A fund whose value would go negative is wiped out and stays at 0.
+
+All leverage factors (and all underlyings, if ``prices`` has one column per
+underlying) are computed together: one broadcast of the period returns and
+one cumulative product over the reset periods.
+"""
+import numpy as np
+import pandas as pd
+
+RESET_MODES = ('daily', 'bar')
+
+
+def etf_nav(prices, leverages, times=None, reset='daily', expense_ratio=0.0, financing_rate=0.0,
+            periods_per_year=252, initial_nav=None):
+    """NAV of one ETF per leverage factor, for every bar of ``prices``.
+
+    ``prices`` is a 1-D series (n,) or a 2-D array (n, m) of m underlyings on
+    the same bars; the result has shape (n, k) or (n, m, k) for k leverages.
+    ``times`` gives the bar timestamps; without it every bar is one trading
+    day. ``reset='bar'`` re-levers after every bar (intraday reset); fees are
+    still charged once per day. ``initial_nav`` defaults to the first price,
+    so ETF and underlying start at the same level.
+    """
+    if reset not in RESET_MODES:
+        raise ValueError(f"Reset must be one of {', '.join(RESET_MODES)}, got '{reset}'")
+    prices = np.asarray(prices, dtype=np.float64)
+    leverages = np.atleast_1d(np.asarray(leverages, dtype=np.float64))
+    if prices.ndim not in (1, 2):
+        raise ValueError("Prices must be a 1-D series or a 2-D (bars, underlyings) array")
+    if len(prices) == 0:
+        return np.empty(prices.shape + leverages.shape)
+    if np.any(prices <= 0) or np.any(np.isnan(prices)):
+        raise ValueError("Prices must be positive and not NaN")
+    size = len(prices)
+
+    # Last bar of each day (fees are charged there)
+    if times is None:
+        day_end = np.ones(size, dtype=bool)
+    else:
+        days = pd.DatetimeIndex(pd.to_datetime(times)).normalize()
+        if len(days) != size:
+            raise ValueError("Times and prices must have the same length")
+        day_end = np.append(days[1:] != days[:-1], True)
+    period_end = day_end.copy() if reset == 'daily' else np.ones(size, dtype=bool)
+
+    # Bar 0 is the base. Every later bar belongs to the reset period that
+    # follows the last period end before it.
+    period_end[0] = True
+    period = np.concatenate(([0], np.cumsum(period_end[:-1])))
+    end_bars = np.flatnonzero(period_end)
+    reference = prices[end_bars[period - 1]]
+    reference[0] = prices[0]
+
+    # Growth of each bar since its period started: (n, [m,] k)
+    moves = prices / reference - 1.0
+    growth = 1.0 + moves[..., None] * leverages
+
+    daily_cost = (expense_ratio + (leverages - 1.0) * financing_rate) / periods_per_year
+    charged = day_end.copy()
+    charged[0] = False
+    growth[charged] -= daily_cost
+    np.maximum(growth, 0.0, out=growth)
+
+    # NAV at the start of each period is the running product of period closes
+    closing_growth = growth[end_bars]
+    start_nav = np.concatenate((np.ones((1,) + closing_growth.shape[1:]),
+                                np.cumprod(closing_growth, axis=0)[:-1]))
+    nav = start_nav[period] * growth
+    nav[np.maximum.accumulate(nav == 0, axis=0)] = 0.0
+
+    if initial_nav is None:
+        initial_nav = prices[0]
+    return nav * np.asarray(initial_nav, dtype=np.float64)[..., None]
+
+
+def etf_column(leverage):
+    """Column name used by ``add_etf_columns`` for a leverage factor, e.g. 'ETF_3x', 'ETF_-1x'."""
+    return f"ETF_{leverage:g}x"
+
+
+def add_etf_columns(df, leverages, price_column='close', time_column='time', **kwargs):
+    """Add one NAV column per leverage factor to ``df`` (see ``etf_nav`` for the options)."""
+    leverages = list(np.atleast_1d(leverages))
+    times = df[time_column] if time_column in df.columns else None
+    navs = etf_nav(df[price_column].to_numpy(), leverages, times=times, **kwargs)
+    for i, leverage in enumerate(leverages):
+        df[etf_column(leverage)] = navs[:, i]
+    return df
@@ -0,0 +1,344 @@
+"""Continuous futures series stitched from individual expiring contracts.
+
+Each contract comes as its own CSV (``time, open, high, low, close,
+Volume`` and optionally ``OpenInterest``) named ``<MARKET>_<YYYYMMDD>.csv``
+after its expiry date, e.g. ``NIFTY_20240125.csv``. ``FuturesStore`` rolls
+from one contract to the next and keeps, per market:
+
+    <store>/<MARKET>/bars.bin    raw stitched bars (one fixed-size record per
+                                 bar, read back as a read-only memmap)
+    <store>/<MARKET>/meta.json   contracts, roll points and roll gaps
+
+Roll rules, checked on the bars both contracts traded:
+
+    'volume'         roll on the first bar where the next contract trades more
+    'open_interest'  roll on the first bar where the next contract has more OI
+    'expiry'         roll on the first bar at or after expiry minus
+                     ``days_before_expiry`` calendar days
+
+If the crossover never happens the roll falls on the last shared bar.
+
+Adjustments remove the jump at every roll so that price changes across a
+roll are real P&L:
+
+    'back'   add each later roll gap (next close - current close at the roll
+             bar) to the earlier bars; point moves are kept, old prices can
+             go negative
+    'ratio'  multiply earlier bars by each later roll ratio; percentage moves
+             are kept
+    'none'   raw stitched prices
+
+Only the raw bars and the per-roll gaps are stored. The adjustment of a bar
+depends on the rolls *after* it, so it is applied when loading, from the
+cumulative gaps, in one vectorised pass. A new contract therefore only
+re-stitches the tail of the series from the previous contract onwards;
+nothing before it is read or rewritten.
+
+Command line (from the repository root):
+
+    python -m common.futures update path/to/contracts --rule volume
+    python -m common.futures list
+"""
+import argparse
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from common import datasets
+
+STORE_DIR = os.path.join(datasets.DATASETS_DIR, 'futures')
+
+ROLL_RULES = ('volume', 'open_interest', 'expiry')
+ADJUSTMENTS = ('none', 'back', 'ratio')
+
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),            # Nanoseconds since the epoch
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('open_interest', '<f8'),   # NaN when the contract file has none
+    ('contract', '<i4')         # Position of the contract in the market's meta
+])
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+_FILE_NAME = re.compile(r'^(?P<market>.+)_(?P<expiry>\d{8})\.csv$', re.IGNORECASE)
+_VOLUME_COLUMNS = ('Volume', 'volume')
+_OPEN_INTEREST_COLUMNS = ('OpenInterest', 'open_interest', 'OI', 'oi')
+
+
+def parse_contract_name(path):
+    """(market, expiry date as 'YYYY-MM-DD') from a ``<MARKET>_<YYYYMMDD>.csv`` file name."""
+    match = _FILE_NAME.match(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"Contract file name must look like <MARKET>_<YYYYMMDD>.csv, got '{os.path.basename(path)}'")
+    expiry = datetime.strptime(match.group('expiry'), '%Y%m%d')
+    return match.group('market'), expiry.strftime('%Y-%m-%d')
+
+
+def read_contract(path):
+    """Bars of one contract file as a ``BAR_DTYPE`` array sorted by time (contract field 0)."""
+    df = pd.read_csv(path)
+    # Column dtypes are fixed by now; the head is enough to pick the time format
+    time_format = datasets.validate_schema(df.head(20))
+    bars = np.zeros(len(df), dtype=BAR_DTYPE)
+    bars['time'] = pd.to_datetime(df['time'], format=time_format).to_numpy('datetime64[ns]').view('i8')
+    for field in PRICE_FIELDS:
+        bars[field] = df[field].to_numpy(np.float64)
+    volume = next((c for c in _VOLUME_COLUMNS if c in df.columns), None)
+    bars['volume'] = df[volume].to_numpy(np.float64) if volume else np.nan
+    open_interest = next((c for c in _OPEN_INTEREST_COLUMNS if c in df.columns), None)
+    bars['open_interest'] = df[open_interest].to_numpy(np.float64) if open_interest else np.nan
+
+    bars = bars[np.argsort(bars['time'], kind='stable')]
+    # Keep the last row of any repeated timestamp
+    keep = np.append(bars['time'][1:] != bars['time'][:-1], True)
+    return bars[keep]
+
+
+def find_roll(current, following, start_after, expiry, rule='volume', days_before_expiry=5):
+    """Roll bar between two contracts: (index in ``current``, index in ``following``).
+
+    Only bars of ``current`` after ``start_after`` (the previous roll time)
+    are considered. The continuous series takes ``current`` up to and
+    including that bar and ``following`` from its next bar. Returns None
+    when the contracts share no bar after ``start_after``.
+    """
+    if rule not in ROLL_RULES:
+        raise ValueError(f"Roll rule must be one of {', '.join(ROLL_RULES)}, got '{rule}'")
+    shared, in_current, in_following = np.intersect1d(current['time'], following['time'],
+                                                     assume_unique=True, return_indices=True)
+    valid = shared > start_after
+    shared, in_current, in_following = shared[valid], in_current[valid], in_following[valid]
+    if len(shared) == 0:
+        return None
+
+    if rule == 'expiry':
+        roll_from = pd.Timestamp(expiry) - pd.Timedelta(days=days_before_expiry)
+        crossed = shared >= roll_from.value
+    else:
+        field = 'volume' if rule == 'volume' else 'open_interest'
+        crossed = following[field][in_following] > current[field][in_current]
+    position = int(np.argmax(crossed)) if crossed.any() else len(shared) - 1
+    return int(in_current[position]), int(in_following[position])
+
+
+class FuturesStore:
+    """Continuous series of many markets, stored on disk and memory-mapped on load."""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+
+    def _market_dir(self, market):
+        return os.path.join(self.directory, market)
+
+    def _read_meta(self, market):
+        try:
+            with open(os.path.join(self._market_dir(market), 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, market, meta):
+        path = os.path.join(self._market_dir(market), 'meta.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def _bars_path(self, market):
+        return os.path.join(self._market_dir(market), 'bars.bin')
+
+    def markets(self):
+        """Names of the stored markets."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.exists(os.path.join(self.directory, name, 'meta.json')))
+
+    def update(self, market, paths, rule='volume', days_before_expiry=5):
+        """Bring a market up to date with its contract files. Returns True if anything changed.
+
+        Contracts are ordered by expiry. Unchanged leading contracts are kept
+        as stored; stitching restarts at the contract before the first new or
+        modified file, since its roll point depends on the file after it.
+        """
+        if rule not in ROLL_RULES:
+            raise ValueError(f"Roll rule must be one of {', '.join(ROLL_RULES)}, got '{rule}'")
+        contracts = []
+        for path in paths:
+            name_market, expiry = parse_contract_name(path)
+            if name_market != market:
+                raise ValueError(f"File '{path}' belongs to market '{name_market}', not '{market}'")
+            stat = os.stat(path)
+            contracts.append({'name': os.path.basename(path)[:-4], 'expiry': expiry, 'path': os.path.abspath(path),
+                              'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+        if not contracts:
+            raise ValueError(f"No contract files for market '{market}'")
+        contracts.sort(key=lambda c: c['expiry'])
+        if len({c['expiry'] for c in contracts}) != len(contracts):
+            raise ValueError(f"Market '{market}' has two contract files with the same expiry")
+
+        meta = self._read_meta(market)
+        bars_path = self._bars_path(market)
+        stored = []
+        if (meta is not None and meta['rule'] == rule and meta['days_before_expiry'] == days_before_expiry
+                and os.path.exists(bars_path)
+                and os.path.getsize(bars_path) >= meta['length'] * BAR_DTYPE.itemsize):
+            stored = meta['contracts']
+        keys = ('name', 'expiry', 'path', 'size', 'mtime_ns')
+        first_changed = 0
+        while (first_changed < min(len(stored), len(contracts))
+               and all(stored[first_changed][k] == contracts[first_changed][k] for k in keys)):
+            first_changed += 1
+        if first_changed == len(stored) == len(contracts):
+            return False
+
+        restart = max(first_changed - 1, 0)
+        kept = stored[:restart]
+        length = stored[restart]['start'] if restart < len(stored) else 0
+        start_after = stored[restart]['start_after'] if restart < len(stored) else np.iinfo(np.int64).min
+
+        os.makedirs(self._market_dir(market), exist_ok=True)
+        mode = 'r+b' if os.path.exists(bars_path) else 'w+b'
+        with open(bars_path, mode) as f:
+            f.truncate(length * BAR_DTYPE.itemsize)
+            f.seek(0, os.SEEK_END)
+            current = read_contract(contracts[restart]['path'])
+            for index in range(restart, len(contracts)):
+                entry = dict(contracts[index], start=length, start_after=int(start_after), gap=None, ratio=None)
+                following = read_contract(contracts[index + 1]['path']) if index + 1 < len(contracts) else None
+                roll = None if following is None else find_roll(current, following, start_after, entry['expiry'],
+                                                                 rule, days_before_expiry)
+                segment = current[current['time'] > start_after]
+                if roll is not None:
+                    roll_bar, next_bar = roll
+                    roll_time = current['time'][roll_bar]
+                    segment = segment[segment['time'] <= roll_time]
+                    entry['gap'] = float(following['close'][next_bar] - current['close'][roll_bar])
+                    entry['ratio'] = float(following['close'][next_bar] / current['close'][roll_bar])
+                elif following is not None:
+                    # No overlap: hand over after the last bar, measuring the gap between consecutive closes
+                    roll_time = segment['time'][-1] if len(segment) else start_after
+                    after = following[following['time'] > roll_time]
+                    if len(segment) == 0 or len(after) == 0:
+                        raise ValueError(f"Contract '{entry['name']}' has no bars to roll from into the next one")
+                    entry['gap'] = float(after['close'][0] - segment['close'][-1])
+                    entry['ratio'] = float(after['close'][0] / segment['close'][-1])
+
+                segment = segment.copy()
+                segment['contract'] = index
+                f.write(segment.tobytes())
+                length += len(segment)
+                kept.append(entry)
+                if following is not None:
+                    start_after = roll_time
+                    current = following
+
+        self._write_meta(market, {'market': market, 'rule': rule, 'days_before_expiry': days_before_expiry,
+                                  'length': length, 'contracts': kept})
+        return True
+
+    def update_directory(self, directory, rule='volume', days_before_expiry=5):
+        """Update every market found in a folder of contract files. Returns {market: changed}."""
+        by_market = {}
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith('.csv'):
+                market, _ = parse_contract_name(name)
+                by_market.setdefault(market, []).append(os.path.join(directory, name))
+        return {market: self.update(market, paths, rule, days_before_expiry)
+                for market, paths in by_market.items()}
+
+    def bars(self, market):
+        """Raw stitched bars of a market as a read-only ``BAR_DTYPE`` memmap."""
+        meta = self._read_meta(market)
+        if meta is None:
+            raise KeyError(f"Market '{market}' is not in the futures store")
+        if meta['length'] == 0:
+            return np.zeros(0, dtype=BAR_DTYPE)
+        return np.memmap(self._bars_path(market), dtype=BAR_DTYPE, mode='r', shape=(meta['length'],))
+
+    def arrays(self, market, adjustment='back'):
+        """Adjusted OHLC (and raw time, volume, OI, contract) of a market as a dict of arrays."""
+        if adjustment not in ADJUSTMENTS:
+            raise ValueError(f"Adjustment must be one of {', '.join(ADJUSTMENTS)}, got '{adjustment}'")
+        bars = self.bars(market)
+        contracts = self._read_meta(market)['contracts']
+        result = {field: bars[field] for field in ('time', 'volume', 'open_interest', 'contract')}
+        contract = bars['contract']
+
+        if adjustment == 'back':
+            gaps = np.array([c['gap'] or 0.0 for c in contracts])
+            # A contract's bars move by its own roll gap and every later one
+            shift = np.cumsum(gaps[::-1])[::-1][contract]
+            for field in PRICE_FIELDS:
+                result[field] = bars[field] + shift
+        elif adjustment == 'ratio':
+            ratios = np.array([c['ratio'] or 1.0 for c in contracts])
+            # Likewise, the product of its own roll ratio and every later one
+            factor = np.cumprod(ratios[::-1])[::-1][contract]
+            for field in PRICE_FIELDS:
+                result[field] = bars[field] * factor
+        else:
+            for field in PRICE_FIELDS:
+                result[field] = bars[field]
+        return result
+
+    def load(self, market, adjustment='back'):
+        """Continuous series of a market as a DataFrame in the layout of the NIFTY exports."""
+        arrays = self.arrays(market, adjustment)
+        names = [c['name'] for c in self._read_meta(market)['contracts']]
+        return pd.DataFrame({
+            'time': pd.to_datetime(np.asarray(arrays['time']), unit='ns'),
+            'open': arrays['open'],
+            'high': arrays['high'],
+            'low': arrays['low'],
+            'close': arrays['close'],
+            'Volume': np.asarray(arrays['volume']),
+            'OpenInterest': np.asarray(arrays['open_interest']),
+            'contract': pd.Categorical.from_codes(np.asarray(arrays['contract']), categories=names)
+        })
+
+    def load_all(self, markets=None, adjustment='back'):
+        """{market: DataFrame} for the given markets (default: all stored ones)."""
+        return {market: self.load(market, adjustment) for market in (markets or self.markets())}
+
+
+def continuous_series(contracts_dir, market, adjustment='back', rule='volume', days_before_expiry=5, store=None):
+    """Update one market from a folder of contract files and return its continuous series."""
+    store = store or FuturesStore()
+    paths = [os.path.join(contracts_dir, name) for name in sorted(os.listdir(contracts_dir))
+             if name.lower().endswith('.csv') and parse_contract_name(name)[0] == market]
+    store.update(market, paths, rule, days_before_expiry)
+    return store.load(market, adjustment)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect continuous futures series")
+    commands = parser.add_subparsers(dest='command', required=True)
+    update_parser = commands.add_parser('update', help="Ingest new or changed contract files from a folder")
+    update_parser.add_argument('directory')
+    update_parser.add_argument('--rule', choices=ROLL_RULES, default='volume')
+    update_parser.add_argument('--days-before-expiry', type=int, default=5)
+    commands.add_parser('list', help="Show stored markets")
+    args = parser.parse_args()
+
+    store = FuturesStore()
+    if args.command == 'update':
+        changed = store.update_directory(args.directory, args.rule, args.days_before_expiry)
+        print(f"Updated {sum(changed.values())} of {len(changed)} markets")
+    elif args.command == 'list':
+        for market in store.markets():
+            meta = store._read_meta(market)
+            contracts = meta['contracts']
+            print(f"{market}: {meta['length']} bars, {len(contracts)} contracts "
+                  f"({contracts[0]['name']} .. {contracts[-1]['name']}), roll rule '{meta['rule']}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Cross-rate matrix and triangular-arbitrage detection over FX quote streams.
+
+Rates are kept as an N x N matrix of log conversion rates: ``log_rates[i, j]``
+is the log of the amount of currency j received for one unit of currency i
+when crossing the spread. A quote on BASE/QUOTE with bid b and ask a sets
+
+    log_rates[BASE, QUOTE] = log(b)       sell BASE at the bid
+    log_rates[QUOTE, BASE] = -log(a)      buy BASE at the ask
+
+so spreads are already netted into every path. A triangular cycle
+i -> j -> k -> i is profitable when its log-rate sum, less ``fee_bps`` per
+leg, exceeds log(1 + ``min_profit_bps`` / 10000). Pairs never quoted are
+-inf and never form a cycle.
+
+A quote on (i, j) only changes the cycles through that pair: i -> j -> k -> i
+and j -> i -> k -> j for every third currency k, which is row j plus
+column i of the matrix and row i plus column j. ``FXEngine.process`` checks
+these cycles for every quote of a batch at once. The matrix as it stood at
+each quote is recovered with a forward fill of "last update position" per
+directed pair over the batch, so detection is exact at tick resolution
+while the work is a handful of array operations per batch.
+
+Quote files for replay are CSVs with ``time, pair, bid, ask`` columns;
+pairs are written 'EURUSD', 'EUR/USD' or 'EUR_USD'.
+"""
+import numpy as np
+import pandas as pd
+
+# Batch cells (quotes x directed pairs) of the forward fill: 8-16 MB of int16/int32.
+# Chunks stay under 16,000 quotes so ids usually fit int16.
+CHUNK_CELLS = 4_000_000
+
+CANDIDATE_COLUMNS = ['time', 'quote', 'first', 'second', 'third', 'profit_bps']
+
+
+def split_pair(pair):
+    """('EUR', 'USD') from 'EURUSD', 'EUR/USD' or 'EUR_USD'."""
+    code = pair.replace('/', '').replace('_', '').replace('-', '').strip().upper()
+    if len(code) != 6:
+        raise ValueError(f"Cannot read currency pair '{pair}'")
+    return code[:3], code[3:]
+
+
+class FXEngine:
+    """Live cross-rate matrix of a set of currencies, checked for triangular arbitrage on every quote."""
+
+    def __init__(self, currencies, fee_bps=0.0, min_profit_bps=0.0, max_quote_age=None):
+        """``max_quote_age`` (seconds) ignores cycles that rely on a quote older than that."""
+        self.currencies = [c.upper() for c in currencies]
+        if len(set(self.currencies)) != len(self.currencies):
+            raise ValueError("Currencies must be unique")
+        n = len(self.currencies)
+        if n < 3:
+            raise ValueError("Need at least three currencies for a triangle")
+        self.size = n
+        self.index = {currency: i for i, currency in enumerate(self.currencies)}
+        self.log_rates = np.full((n, n), -np.inf)
+        np.fill_diagonal(self.log_rates, 0.0)
+        self.quote_times = np.full((n, n), np.iinfo(np.int64).min)
+        np.fill_diagonal(self.quote_times, np.iinfo(np.int64).max)
+
+        # Fees and threshold in log space: three legs per cycle
+        self.cycle_cost = -3 * np.log1p(-fee_bps / 10000)
+        self.min_log_profit = np.log1p(min_profit_bps / 10000)
+        self.max_age = None if max_quote_age is None else int(max_quote_age * 1e9)
+
+        # Third currencies of every ordered pair (rows for i == j are unused)
+        everyone = np.arange(n)
+        self._others = np.array([[everyone[(everyone != i) & (everyone != j)] if i != j else everyone[:n - 2]
+                                  for j in range(n)] for i in range(n)])
+        self.quotes_seen = 0
+
+    def pair_indices(self, pairs):
+        """Base and quote currency indices of an array of pair names."""
+        codes, uniques = pd.factorize(pd.Series(pairs, dtype=object))
+        base, quote = np.empty(len(uniques), dtype=np.int64), np.empty(len(uniques), dtype=np.int64)
+        for u, pair in enumerate(uniques):
+            first, second = split_pair(pair)
+            if first not in self.index or second not in self.index:
+                raise ValueError(f"Pair '{pair}' uses a currency outside {', '.join(self.currencies)}")
+            base[u], quote[u] = self.index[first], self.index[second]
+        return base[codes], quote[codes]
+
+    def on_quote(self, time, pair, bid, ask):
+        """Apply one quote; returns the candidate cycles it creates (see ``process``)."""
+        base, quote = split_pair(pair)
+        if base not in self.index or quote not in self.index:
+            raise ValueError(f"Pair '{pair}' uses a currency outside {', '.join(self.currencies)}")
+        return self.process([pd.Timestamp(time).value], [self.index[base]], [self.index[quote]], [bid], [ask])
+
+    def process(self, times, base, quote, bids, asks):
+        """Apply a batch of quotes in order and return every arbitrage candidate they create.
+
+        ``times`` are int64 nanoseconds (or anything ``pd.to_datetime`` reads),
+        ``base``/``quote`` currency indices. The result has one row per quote
+        and profitable cycle through the quoted pair: the quote's time and
+        position in the batch, the three currencies in trading order and the
+        profit net of spread and fees in basis points.
+        """
+        times = np.asarray(times)
+        if times.dtype.kind != 'i':
+            times = pd.to_datetime(times).to_numpy('datetime64[ns]').view('i8')
+        base, quote = np.asarray(base, dtype=np.int64), np.asarray(quote, dtype=np.int64)
+        bids, asks = np.asarray(bids, dtype=np.float64), np.asarray(asks, dtype=np.float64)
+        if np.any(base == quote):
+            raise ValueError("A pair needs two different currencies")
+        if np.any(bids <= 0) or np.any(asks < bids):
+            raise ValueError("Quotes need 0 < bid <= ask")
+
+        step = max(1, min(CHUNK_CELLS // (self.size * self.size), 16000))
+        found = []
+        for start in range(0, len(times), step):
+            end = start + step
+            candidates = self._process_chunk(times[start:end], base[start:end], quote[start:end],
+                                             bids[start:end], asks[start:end], start)
+            if candidates is not None:
+                found.append(candidates)
+        self.quotes_seen += len(times)
+        if not found:
+            return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+        return pd.concat(found, ignore_index=True)
+
+    def _process_chunk(self, times, base, quote, bids, asks, offset):
+        n, count = self.size, len(times)
+        edges = n * n
+        flat_rates, flat_times = self.log_rates.ravel(), self.quote_times.ravel()
+
+        # Every rate a quote can see gets an id: directed pair e before the
+        # chunk is e, the sell / buy side of quote p is edges + 2p / edges + 2p + 1.
+        # Later quotes have larger ids, so a running maximum down the chunk gives,
+        # for every quote and pair, the id of the rate in force at that quote.
+        values = np.concatenate((flat_rates, np.column_stack((np.log(bids), -np.log(asks))).ravel()))
+        stamps = np.concatenate((flat_times, np.repeat(times, 2)))
+        dtype = np.int16 if len(values) <= np.iinfo(np.int16).max else np.int32
+        last = np.full((count, edges), -1, dtype=dtype)
+        last[0] = np.arange(edges)
+        positions = np.arange(count)
+        sell_id = edges + 2 * positions
+        last[positions, base * n + quote] = sell_id
+        last[positions, quote * n + base] = sell_id + 1
+        np.maximum.accumulate(last, axis=0, out=last)
+
+        def rates_at(pairs):
+            ids = np.take_along_axis(last, pairs, axis=1)
+            return values[ids], stamps[ids]
+
+        thirds = self._others[base, quote]                          # (count, n - 2)
+        b, q = base[:, None], quote[:, None]
+        frames = []
+        # base -> quote -> k -> base opens at the bid, quote -> base -> k -> quote at the ask
+        for first, second, opening in ((b, q, values[sell_id]), (q, b, values[sell_id + 1])):
+            onward, onward_time = rates_at(second * n + thirds)
+            back, back_time = rates_at(thirds * n + first)
+            profit = onward
+            profit += back
+            profit += (opening - self.cycle_cost)[:, None]
+            if self.max_age is not None:
+                oldest = np.minimum(onward_time, back_time)
+                profit[times[:, None] - oldest > self.max_age] = -np.inf
+            rows, columns = np.nonzero(profit > self.min_log_profit)
+            if len(rows):
+                frames.append(pd.DataFrame({
+                    'time': times[rows],
+                    'quote': rows + offset,
+                    'first': np.broadcast_to(first, thirds.shape)[rows, columns],
+                    'second': np.broadcast_to(second, thirds.shape)[rows, columns],
+                    'third': thirds[rows, columns],
+                    'profit_bps': np.expm1(profit[rows, columns]) * 10000
+                }))
+
+        # The matrix after the chunk: every pair takes the rate in force at the last quote
+        flat_rates[:] = values[last[-1]]
+        flat_times[:] = stamps[last[-1]]
+
+        if not frames:
+            return None
+        result = pd.concat(frames, ignore_index=True).sort_values(['quote', 'profit_bps'],
+                                                                   ascending=[True, False], kind='stable')
+        result['time'] = pd.to_datetime(result['time'], unit='ns')
+        for column in ('first', 'second', 'third'):
+            result[column] = pd.Categorical.from_codes(result[column].to_numpy(), categories=self.currencies)
+        return result.reset_index(drop=True)
+
+    def cross_rates(self, implied=True):
+        """N x N DataFrame of conversion rates (units of column currency per unit of row currency).
+
+        With ``implied=True`` pairs that were never quoted are filled with the
+        best rate through one intermediate currency. NaN where no path exists.
+        """
+        rates = self.log_rates
+        if implied:
+            through = (rates[:, :, None] + rates[None, :, :]).max(axis=1)
+            rates = np.where(np.isfinite(rates), rates, through)
+        with np.errstate(over='ignore'):
+            values = np.where(np.isfinite(rates), np.exp(rates), np.nan)
+        return pd.DataFrame(values, index=self.currencies, columns=self.currencies)
+
+
+def read_quotes(path, chunk_size=None):
+    """Quote file as a DataFrame (or an iterator of DataFrames of ``chunk_size`` rows)."""
+    def prepare(frame):
+        missing = [c for c in ('time', 'pair', 'bid', 'ask') if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Quote file is missing columns: {', '.join(missing)}")
+        frame['time'] = pd.to_datetime(frame['time'], format='ISO8601')
+        return frame
+
+    if chunk_size is None:
+        return prepare(pd.read_csv(path))
+    return (prepare(chunk) for chunk in pd.read_csv(path, chunksize=chunk_size))
+
+
+def quote_currencies(path):
+    """Sorted currencies that appear in a quote file."""
+    pairs = pd.read_csv(path, usecols=['pair'])['pair'].unique()
+    return sorted({currency for pair in pairs for currency in split_pair(pair)})
+
+
+def replay(path, engine, chunk_size=100_000):
+    """Feed a quote file through ``engine`` in order; returns all candidates with global quote numbers."""
+    found, seen = [], 0
+    for chunk in read_quotes(path, chunk_size):
+        base, quote = engine.pair_indices(chunk['pair'].to_numpy())
+        candidates = engine.process(chunk['time'].to_numpy('datetime64[ns]').view('i8'), base, quote,
+                                    chunk['bid'].to_numpy(), chunk['ask'].to_numpy())
+        candidates['quote'] += seen
+        seen += len(chunk)
+        if len(candidates):
+            found.append(candidates)
+    if not found:
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+    return pd.concat(found, ignore_index=True)
@@ -0,0 +1,298 @@
+"""Black-Scholes Greeks and an incremental portfolio Greeks book.
+
+``option_greeks`` prices any number of options at once (NumPy arrays in,
+arrays out) with the same formulas the delta-neutral strategy used per row.
+
+``GreeksBook`` holds every open option and underlying leg of a book and keeps
+the portfolio delta, gamma, vega and theta up to date as legs are opened
+and closed and as market inputs move:
+
+    book = GreeksBook(rate=0.05)
+    book.set_time(timestamp)
+    book.update_market('NIFTY', spot=24850.0, vol=0.14)
+    call = book.open_option('NIFTY', 'call', strike=25000, expiry=expiry, quantity=50)
+    book.open_underlying('NIFTY', quantity=-20)
+    book.update_market('NIFTY', spot=24862.5)      # re-prices NIFTY legs only
+    book.update_market('NIFTY', spot=24870.0, time=next_bar)   # new bar: one re-price
+    book.hedge_quantity('NIFTY')                    # units to trade for zero delta
+    book.close(call)
+
+Each leg's Greeks are cached already scaled by its size, and totals are
+kept per underlying, so reading the book or the delta hedge is O(1). A spot
+or volatility update re-prices only the legs on that underlying, in one
+vectorised call; opening, closing or re-marking a single leg touches only
+that leg. Greek units: delta and gamma per unit of the underlying, vega per
+1.00 of volatility, theta per year.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Standard normal CDF, resolved on first use so importing this module does not load scipy
+_ndtr = None
+
+
+def _norm_cdf(x):
+    global _ndtr
+    if _ndtr is None:
+        try:
+            from scipy.special import ndtr as _ndtr
+        except ImportError:
+            erf = np.vectorize(math.erf, otypes=[float])
+
+            def _ndtr(values):
+                return 0.5 * (1.0 + erf(np.asarray(values) / math.sqrt(2.0)))
+    return _ndtr(x)
+
+
+GREEKS = ('delta', 'gamma', 'vega', 'theta')
+
+# Floor on time to expiry in years, as in the delta-neutral strategy
+MIN_TIME_TO_EXPIRY = 0.01
+
+_CALL, _PUT, _UNDERLYING = 1, -1, 0
+_OPTION_TYPES = {'call': _CALL, 'put': _PUT}
+_NS_PER_DAY = 86400 * 10 ** 9
+
+
+def option_greeks(S, K, T, r, sigma, option_type='call'):
+    """Delta, gamma, theta and vega of European options (arrays or scalars).
+
+    ``option_type`` is 'call' / 'put' or a boolean array that is True for calls.
+    """
+    S, K, sigma = np.asarray(S, dtype=np.float64), np.asarray(K, dtype=np.float64), np.asarray(sigma, dtype=np.float64)
+    T = np.maximum(np.asarray(T, dtype=np.float64), MIN_TIME_TO_EXPIRY)
+    is_call = option_type == 'call' if isinstance(option_type, str) else np.asarray(option_type, dtype=bool)
+
+    sqrt_t = np.sqrt(T)
+    d1 = (np.log(S / K) + (r + sigma ** 2 / 2) * T) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    density = np.exp(-d1 ** 2 / 2)
+    discount = r * K * np.exp(-r * T)
+    decay = -(S * sigma * density) / (2 * np.sqrt(2 * np.pi * T))
+
+    delta = np.where(is_call, _norm_cdf(d1), _norm_cdf(d1) - 1)
+    theta = np.where(is_call, decay - discount * _norm_cdf(d2), decay + discount * _norm_cdf(-d2))
+    gamma = density / (S * sigma * np.sqrt(2 * np.pi * T))
+    vega = S * sqrt_t * density / np.sqrt(2 * np.pi)
+
+    return {
+        'delta': delta,
+        'gamma': gamma,
+        'theta': theta,
+        'vega': vega
+    }
+
+
+class GreeksBook:
+    """Open legs of an options book with incrementally maintained portfolio Greeks."""
+
+    def __init__(self, rate=0.0, year_days=365, capacity=256):
+        self.rate = rate
+        self.year_days = year_days
+        self.time = None
+        self.capacity = max(int(capacity), 1)
+        self.underlyings = {}
+        self.spot = []
+        self.vol = []
+        self._legs_by_underlying = []
+        self._index_cache = {}
+        self._totals = np.zeros((0, len(GREEKS)))
+        self._total = np.zeros(len(GREEKS))
+
+        self._underlying = np.zeros(self.capacity, dtype=np.int32)
+        self._kind = np.zeros(self.capacity, dtype=np.int8)
+        self._strike = np.zeros(self.capacity)
+        self._expiry = np.zeros(self.capacity)
+        self._size = np.zeros(self.capacity)
+        self._iv = np.full(self.capacity, np.nan)
+        self._open = np.zeros(self.capacity, dtype=bool)
+        self._greeks = np.zeros((self.capacity, len(GREEKS)))
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def __len__(self):
+        return int(self._open.sum())
+
+    # ----- market inputs -----
+
+    def set_time(self, time):
+        """Set the valuation time (Timestamp, datetime or string) and re-price every option."""
+        self.time = self._years(time)
+        for code in range(len(self.underlyings)):
+            self._reprice_underlying(code)
+
+    def update_market(self, underlying, spot=None, vol=None, time=None):
+        """Move spot and/or the default volatility of one underlying; re-prices only its legs.
+
+        With ``time`` the valuation time moves too and every leg is re-priced,
+        once (cheaper than ``set_time`` followed by ``update_market``).
+        """
+        code = self._underlying_code(underlying)
+        if spot is not None:
+            if spot <= 0:
+                raise ValueError(f"Spot must be positive, got {spot}")
+            self.spot[code] = float(spot)
+        if vol is not None:
+            if vol <= 0:
+                raise ValueError(f"Volatility must be positive, got {vol}")
+            self.vol[code] = float(vol)
+        if time is not None:
+            self.set_time(time)
+        else:
+            self._reprice_underlying(code)
+
+    def update_leg_vol(self, leg, vol):
+        """Give one option leg its own implied volatility; re-prices only that leg."""
+        self._check_open(leg)
+        if vol <= 0:
+            raise ValueError(f"Volatility must be positive, got {vol}")
+        self._iv[leg] = vol
+        self._reprice_leg(leg)
+
+    # ----- legs -----
+
+    def open_option(self, underlying, option_type, strike, expiry, quantity, multiplier=1, vol=None):
+        """Add an option leg (negative quantity for short) and return its leg id."""
+        if option_type not in _OPTION_TYPES:
+            raise ValueError(f"Option type must be 'call' or 'put', got '{option_type}'")
+        if strike <= 0:
+            raise ValueError(f"Strike must be positive, got {strike}")
+        leg = self._new_leg(underlying, _OPTION_TYPES[option_type], quantity * multiplier)
+        self._strike[leg] = strike
+        self._expiry[leg] = self._years(expiry)
+        self._iv[leg] = np.nan if vol is None else vol
+        self._reprice_leg(leg)
+        return leg
+
+    def open_underlying(self, underlying, quantity):
+        """Add a position in the underlying itself (delta only) and return its leg id."""
+        leg = self._new_leg(underlying, _UNDERLYING, quantity)
+        self._reprice_leg(leg)
+        return leg
+
+    def close(self, leg):
+        """Remove a leg and its contribution to the portfolio Greeks."""
+        self._check_open(leg)
+        code = self._underlying[leg]
+        self._totals[code] -= self._greeks[leg]
+        self._total -= self._greeks[leg]
+        self._greeks[leg] = 0.0
+        self._open[leg] = False
+        self._legs_by_underlying[code].discard(leg)
+        self._index_cache.pop(code, None)
+        self._free.append(leg)
+        if not self._legs_by_underlying[code]:
+            # Flat: drop any rounding left over from the incremental updates
+            self._totals[code] = 0.0
+            self._total = self._totals.sum(axis=0)
+
+    def leg_greeks(self, leg):
+        """Greeks of one leg, scaled by its quantity and multiplier."""
+        self._check_open(leg)
+        return dict(zip(GREEKS, self._greeks[leg].tolist()))
+
+    # ----- portfolio answers -----
+
+    def greeks(self, underlying=None):
+        """Portfolio Greeks of the whole book or of one underlying."""
+        if underlying is None:
+            values = self._total
+        elif underlying in self.underlyings:
+            values = self._totals[self.underlyings[underlying]]
+        else:
+            values = np.zeros(len(GREEKS))
+        return dict(zip(GREEKS, values.tolist()))
+
+    def hedge_quantity(self, underlying):
+        """Units of the underlying to buy (positive) or sell (negative) to bring its delta to zero."""
+        if underlying not in self.underlyings:
+            return 0.0
+        return 0.0 - float(self._totals[self.underlyings[underlying], 0])
+
+    # ----- internals -----
+
+    def _years(self, time):
+        if isinstance(time, (int, float)):
+            return float(time)
+        return pd.Timestamp(time).value / (_NS_PER_DAY * self.year_days)
+
+    def _underlying_code(self, underlying):
+        code = self.underlyings.get(underlying)
+        if code is None:
+            code = len(self.underlyings)
+            self.underlyings[underlying] = code
+            self.spot.append(np.nan)
+            self.vol.append(np.nan)
+            self._legs_by_underlying.append(set())
+            self._totals = np.vstack([self._totals, np.zeros(len(GREEKS))])
+        return code
+
+    def _check_open(self, leg):
+        if not (0 <= leg < self.capacity and self._open[leg]):
+            raise KeyError(f"No open leg with id {leg}")
+
+    def _new_leg(self, underlying, kind, size):
+        code = self._underlying_code(underlying)
+        if not self._free:
+            self._grow()
+        leg = self._free.pop()
+        self._underlying[leg] = code
+        self._kind[leg] = kind
+        self._size[leg] = size
+        self._greeks[leg] = 0.0
+        self._open[leg] = True
+        self._legs_by_underlying[code].add(leg)
+        self._index_cache.pop(code, None)
+        return leg
+
+    def _grow(self):
+        old = self.capacity
+        self.capacity *= 2
+        for name in ('_underlying', '_kind', '_strike', '_expiry', '_size', '_iv', '_open', '_greeks'):
+            data = getattr(self, name)
+            grown = np.zeros((self.capacity,) + data.shape[1:], dtype=data.dtype)
+            grown[:old] = data
+            setattr(self, name, grown)
+        self._iv[old:] = np.nan
+        self._free.extend(range(self.capacity - 1, old - 1, -1))
+
+    def _price(self, legs):
+        """Scaled Greeks for the given open legs, as an (n, 4) array."""
+        codes = self._underlying[legs]
+        spot = np.asarray(self.spot)[codes]
+        values = np.zeros((len(legs), len(GREEKS)))
+        underlying = self._kind[legs] == _UNDERLYING
+        values[underlying, 0] = 1.0
+
+        options = ~underlying
+        if options.any():
+            if self.time is None:
+                raise ValueError("Valuation time is not set; call set_time() before pricing options")
+            vol = np.where(np.isnan(self._iv[legs]), np.asarray(self.vol)[codes], self._iv[legs])
+            priced = options & ~np.isnan(spot) & ~np.isnan(vol)
+            if priced.any():
+                result = option_greeks(spot[priced], self._strike[legs][priced],
+                                       self._expiry[legs][priced] - self.time, self.rate,
+                                       vol[priced], self._kind[legs][priced] == _CALL)
+                for column, name in enumerate(GREEKS):
+                    values[priced, column] = result[name]
+        return values * self._size[legs, None]
+
+    def _reprice_leg(self, leg):
+        code = self._underlying[leg]
+        new = self._price(np.array([leg]))[0]
+        self._totals[code] += new - self._greeks[leg]
+        self._total += new - self._greeks[leg]
+        self._greeks[leg] = new
+
+    def _reprice_underlying(self, code):
+        legs = self._index_cache.get(code)
+        if legs is None:
+            legs = np.fromiter(self._legs_by_underlying[code], dtype=np.int64)
+            self._index_cache[code] = legs
+        if len(legs):
+            self._greeks[legs] = self._price(legs)
+        # Summing afresh here also clears rounding left by incremental opens/closes
+        self._totals[code] = self._greeks[legs].sum(axis=0)
+        self._total = self._totals.sum(axis=0)
@@ -0,0 +1,326 @@
+"""Streaming versions of the TA-Lib indicators used across the strategies.
+
+Each class keeps only the state it needs (a few floats and at most one
+window of recent values) and follows TA-Lib's default algorithms (same
+seeding, same lookbacks, same running sums). Because every bar goes through
+the same scalar arithmetic, feeding a series in one block, bar by bar or in
+chunks of any size gives exactly the same floats.
+
+Against ``talib`` itself the values agree to rounding error only: recent
+TA-Lib builds pick FMA / reciprocal-multiply code paths per CPU, so bitwise
+equality with the C library cannot be guaranteed on every machine.
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+NAN = float('nan')
+
+# Same thresholds TA-Lib uses in its TA_IS_ZERO / TA_IS_ZERO_OR_NEG macros
+_ZERO = 0.00000001
+
+
+def _is_zero(value):
+    return -_ZERO < value < _ZERO
+
+
+class StreamingIndicator:
+    """Base class: leading NaN inputs are skipped, like the TA-Lib wrapper does."""
+
+    n_outputs = 1
+
+    def __init__(self):
+        self.started = False
+
+    def update(self, *values):
+        """Feed one bar and return the indicator value(s) for that bar."""
+        if not self.started:
+            if any(math.isnan(v) for v in values):
+                return self._empty()
+            self.started = True
+        return self._update(*values)
+
+    def update_many(self, *arrays):
+        """Feed a block of bars and return the outputs as NumPy arrays."""
+        arrays = [np.asarray(a, dtype=np.float64) for a in arrays]
+        size = len(arrays[0])
+        outputs = [np.empty(size) for _ in range(self.n_outputs)]
+        for i, values in enumerate(zip(*arrays)):
+            result = self.update(*values)
+            if self.n_outputs == 1:
+                outputs[0][i] = result
+            else:
+                for out, value in zip(outputs, result):
+                    out[i] = value
+        return outputs[0] if self.n_outputs == 1 else tuple(outputs)
+
+    def _empty(self):
+        return NAN if self.n_outputs == 1 else (NAN,) * self.n_outputs
+
+    def _update(self, *values):
+        raise NotImplementedError
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple moving average (running total, as in TA_INT_SMA)."""
+
+    def __init__(self, period):
+        super().__init__()
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def _update(self, value):
+        self.total += value
+        self.window.append(value)
+        if len(self.window) < self.period:
+            return NAN
+        current = self.total
+        self.total -= self.window.popleft()
+        return current / self.period
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential moving average seeded with the SMA of the first ``period`` values."""
+
+    def __init__(self, period, k=None):
+        super().__init__()
+        self.period = period
+        self.k = 2.0 / (period + 1) if k is None else k
+        self.seed = []
+        self.value = None
+
+    def _update(self, value):
+        if self.value is None:
+            self.seed.append(value)
+            if len(self.seed) < self.period:
+                return NAN
+            total = 0.0
+            for seed_value in self.seed:
+                total += seed_value
+            self.value = total / self.period
+            self.seed = None
+            return self.value
+        self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """Wilder RSI, seeded with the average gain/loss of the first ``period`` changes."""
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.period = period
+        self.prev_value = None
+        self.prev_gain = 0.0
+        self.prev_loss = 0.0
+        self.count = 0
+
+    def _update(self, value):
+        if self.prev_value is None:
+            self.prev_value = value
+            return NAN
+
+        change = value - self.prev_value
+        self.prev_value = value
+        self.count += 1
+
+        if self.count <= self.period:
+            if change < 0:
+                self.prev_loss -= change
+            else:
+                self.prev_gain += change
+            if self.count < self.period:
+                return NAN
+            self.prev_loss /= self.period
+            self.prev_gain /= self.period
+        else:
+            self.prev_loss *= (self.period - 1)
+            self.prev_gain *= (self.period - 1)
+            if change < 0:
+                self.prev_loss -= change
+            else:
+                self.prev_gain += change
+            self.prev_loss /= self.period
+            self.prev_gain /= self.period
+
+        total = self.prev_gain + self.prev_loss
+        if _is_zero(total):
+            return 0.0
+        return 100.0 * (self.prev_gain / total)
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line, signal line and histogram.
+
+    As in TA-Lib, both EMAs start on bar ``slow - 1`` (the fast EMA is seeded
+    with the last ``fast`` closes at that point) and nothing is emitted until
+    the signal EMA is ready.
+    """
+
+    n_outputs = 3
+
+    def __init__(self, fastperiod=12, slowperiod=26, signalperiod=9):
+        super().__init__()
+        if slowperiod < fastperiod:
+            fastperiod, slowperiod = slowperiod, fastperiod
+        self.fast_period = fastperiod
+        self.slow_period = slowperiod
+        self.fast_k = 2.0 / (fastperiod + 1)
+        self.slow_k = 2.0 / (slowperiod + 1)
+        self.window = deque(maxlen=slowperiod)
+        self.fast = None
+        self.slow = None
+        self.signal = StreamingEMA(signalperiod)
+
+    def _update(self, value):
+        if self.slow is None:
+            self.window.append(value)
+            if len(self.window) < self.slow_period:
+                return self._empty()
+            slow_total = 0.0
+            for window_value in self.window:
+                slow_total += window_value
+            fast_total = 0.0
+            for window_value in list(self.window)[-self.fast_period:]:
+                fast_total += window_value
+            self.slow = slow_total / self.slow_period
+            self.fast = fast_total / self.fast_period
+            self.window = None
+        else:
+            self.slow = ((value - self.slow) * self.slow_k) + self.slow
+            self.fast = ((value - self.fast) * self.fast_k) + self.fast
+
+        macd = self.fast - self.slow
+        signal = self.signal.update(macd)
+        if math.isnan(signal):
+            return self._empty()
+        return macd, signal, macd - signal
+
+
+class StreamingBBANDS(StreamingIndicator):
+    """Bollinger Bands over an SMA middle band (TA-Lib's default MA type)."""
+
+    n_outputs = 3
+
+    def __init__(self, timeperiod=5, nbdevup=2.0, nbdevdn=2.0):
+        super().__init__()
+        self.period = timeperiod
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+        self.sma = StreamingSMA(timeperiod)
+        self.window = deque()
+        self.total_sq = 0.0
+
+    def _update(self, value):
+        middle = self.sma.update(value)
+        self.total_sq += value * value
+        self.window.append(value)
+        if len(self.window) < self.period:
+            return self._empty()
+
+        mean_sq = self.total_sq / self.period
+        trailing = self.window.popleft()
+        self.total_sq -= trailing * trailing
+        mean_sq -= middle * middle
+        stddev = math.sqrt(mean_sq) if mean_sq >= _ZERO else 0.0
+
+        if self.nbdevup == self.nbdevdn:
+            if self.nbdevup == 1.0:
+                return middle + stddev, middle, middle - stddev
+            band = stddev * self.nbdevup
+            return middle + band, middle, middle - band
+        return middle + stddev * self.nbdevup, middle, middle - stddev * self.nbdevdn
+
+
+class StreamingATR(StreamingIndicator):
+    """Wilder ATR, seeded with the simple average of the first ``period`` true ranges."""
+
+    def __init__(self, timeperiod=14):
+        super().__init__()
+        self.period = timeperiod
+        self.prev_close = None
+        self.seed_total = 0.0
+        self.count = 0
+        self.value = None
+
+    def _update(self, high, low, close):
+        prev_close = self.prev_close
+        self.prev_close = close
+        if prev_close is None:
+            return NAN
+
+        true_range = high - low
+        from_high = abs(prev_close - high)
+        if from_high > true_range:
+            true_range = from_high
+        from_low = abs(prev_close - low)
+        if from_low > true_range:
+            true_range = from_low
+
+        if self.value is None:
+            self.seed_total += true_range
+            self.count += 1
+            if self.count < self.period:
+                return NAN
+            self.value = self.seed_total / self.period
+            return self.value
+
+        self.value *= self.period - 1
+        self.value += true_range
+        self.value /= self.period
+        return self.value
+
+
+class StreamingSTOCH(StreamingIndicator):
+    """Slow stochastic (%K, %D) with SMA smoothing, TA-Lib's default matypes.
+
+    Like TA-Lib, %K is only emitted once %D is available as well.
+    """
+
+    n_outputs = 2
+
+    def __init__(self, fastk_period=5, slowk_period=3, slowd_period=3):
+        super().__init__()
+        self.fastk_period = fastk_period
+        self.highs = deque(maxlen=fastk_period)
+        self.lows = deque(maxlen=fastk_period)
+        self.slowk = StreamingSMA(slowk_period)
+        self.slowd = StreamingSMA(slowd_period)
+
+    def _update(self, high, low, close):
+        self.highs.append(high)
+        self.lows.append(low)
+        if len(self.highs) < self.fastk_period:
+            return self._empty()
+
+        lowest = min(self.lows)
+        diff = (max(self.highs) - lowest) / 100.0
+        fastk = (close - lowest) / diff if diff != 0.0 else 0.0
+        slowk = self.slowk.update(fastk)
+        if math.isnan(slowk):
+            return self._empty()
+        slowd = self.slowd.update(slowk)
+        if math.isnan(slowd):
+            return self._empty()
+        return slowk, slowd
+
+
+class StreamingOBV(StreamingIndicator):
+    """On-balance volume, starting from the first bar's volume as TA-Lib does."""
+
+    def __init__(self):
+        super().__init__()
+        self.prev_close = None
+        self.value = 0.0
+
+    def _update(self, close, volume):
+        if self.prev_close is None:
+            self.value = volume
+        elif close > self.prev_close:
+            self.value += volume
+        elif close < self.prev_close:
+            self.value -= volume
+        self.prev_close = close
+        return self.value
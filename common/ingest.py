@@ -0,0 +1,321 @@
+"""Validate and clean a market data file once, then reuse the cleaned frame.
+
+Every loader used to do its own hygiene: one backfilled indicator warm-up
+(leaking later values into earlier bars), one forward-filled every column,
+others coerced columns one at a time or parsed dates with their own
+``dayfirst``/``format`` guesses. ``load`` replaces that with one pipeline:
+
+    df = ingest.load(config.CSV_FILE_PATH)        # or a registered name, e.g. "nifty_1m"
+    report = ingest.report(config.CSV_FILE_PATH)   # what was found and changed
+
+1. Schema: the time column is found, text columns that hold numbers are
+   converted (all in one ``to_numeric`` call per such column) and the time
+   format is detected once from a sample, then the whole column is parsed
+   with that format.
+2. Order: rows are sorted by time (stable) and duplicate timestamps dropped,
+   keeping the last row.
+3. Outliers: bars with non-positive prices or ``high < low``, and bars whose
+   close-to-close move is more than ``max_return_mads`` times the median
+   absolute move of the preceding ``outlier_window`` bars. The scale only
+   uses earlier bars and the first bar of each session is not tested
+   (overnight moves are not ticks). Their price columns are blanked.
+4. Missing prices: forward-filled only (at most ``fill_limit`` bars); a
+   value is never taken from a later bar. Leading gaps stay NaN.
+5. Calendar: with the bar interval taken as the median time step, intraday
+   data is checked for missing bars inside a session, bars outside session
+   hours and session breaks; daily data for skipped trading days and bars
+   on non-trading days. These are reported, not changed (``flags=True``
+   adds ``gap_before`` and ``session_start`` columns).
+6. Dtypes: integer columns whose total fits in int32 are stored as int32
+   and repeated text columns as categories. With ``compact=True`` only the
+   declared ``columns`` are kept and prices are stored as float32 too (see
+   ``common/compact.py``), except ``float64_columns``.
+
+The cleaned frame and its report are cached under ``datasets/cache`` by
+content hash, options and ``CLEAN_VERSION``, next to the parsed frames of
+``datasets.load``. Bump ``CLEAN_VERSION`` whenever ``clean`` changes what
+it produces, so stale cached frames are not served.
+
+Command line:
+
+    python -m common.ingest "Swaraj_Nalawade/scalping/separatedConfig/loadData.csv"
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from common import asof, compact as compact_frames, datasets
+
+# Time formats tried on a sample of the time column, in order
+TIME_FORMATS = ['ISO8601', '%d-%m-%Y', '%d-%m-%Y %H:%M', '%d-%m-%Y %H:%M:%S', '%d/%m/%Y', '%d/%m/%Y %H:%M',
+                '%m/%d/%Y', '%Y%m%d']
+
+# A daily (or slower) series has a median step of at least this much
+_DAILY = pd.Timedelta(hours=20).value
+
+_SAMPLE = 200
+
+# Part of the cache key; bump it when the cleaning rules change
+CLEAN_VERSION = 1
+
+# Parsed results of this process, keyed by content hash and options
+_cleaned = {}
+
+
+def find_time_column(df):
+    """Name of the timestamp column: 'time' if present, else the first column named like a date."""
+    if 'time' in df.columns:
+        return 'time'
+    for column in df.columns:
+        if str(column).strip().lower() in ('date', 'datetime', 'timestamp', 'time'):
+            return column
+    raise ValueError("No time column found (expected 'time', 'date', 'datetime' or 'timestamp')")
+
+
+def detect_time_format(values):
+    """Time format of a column, judged from its first non-empty values.
+
+    Returns one of ``TIME_FORMATS``, or 'epoch_s' / 'epoch_ms' / 'epoch_ns'
+    for numeric timestamps.
+    """
+    values = pd.Series(values).dropna()
+    if len(values) == 0:
+        raise ValueError("Time column is empty")
+    sample = values.iloc[:_SAMPLE]
+    if pd.api.types.is_numeric_dtype(sample):
+        largest = float(np.abs(sample).max())
+        return 'epoch_s' if largest < 1e11 else 'epoch_ms' if largest < 1e14 else 'epoch_ns'
+    sample = sample.astype(str)
+    for time_format in TIME_FORMATS:
+        try:
+            pd.to_datetime(sample, format=time_format)
+            return time_format
+        except (ValueError, TypeError):
+            continue
+    raise ValueError(f"Time column does not match any known time format (first value {sample.iloc[0]!r})")
+
+
+def parse_times(values, time_format):
+    """Parse a whole time column with a format from ``detect_time_format``; bad values become NaT."""
+    if time_format.startswith('epoch_'):
+        return pd.to_datetime(values, unit=time_format[len('epoch_'):], errors='coerce')
+    return pd.to_datetime(values, format=time_format, errors='coerce')
+
+
+def _numeric_text_columns(df, skip):
+    """Text columns whose non-empty values are (almost all) numbers."""
+    columns = []
+    for column in df.columns:
+        if column in skip or pd.api.types.is_numeric_dtype(df[column]) or \
+                isinstance(df[column].dtype, pd.CategoricalDtype):
+            continue
+        sample = df[column].dropna().iloc[:_SAMPLE]
+        if len(sample) and pd.to_numeric(sample, errors='coerce').notna().mean() >= 0.9:
+            columns.append(column)
+    return columns
+
+
+def _outliers(df, time_ns, session_start, price_columns, max_return_mads, outlier_window):
+    """Boolean mask of bars to blank; every test only looks at the bar itself and earlier bars."""
+    prices = df[price_columns].to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        bad = (prices <= 0).any(axis=1)
+        if 'high' in price_columns and 'low' in price_columns:
+            bad |= df['high'].to_numpy(dtype=np.float64) < df['low'].to_numpy(dtype=np.float64)
+    if 'close' not in price_columns or not max_return_mads:
+        return bad
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_close = np.log(np.where(bad, np.nan, df['close'].to_numpy(dtype=np.float64)))
+    moves = np.abs(np.diff(log_close, prepend=np.nan))
+    moves[session_start] = np.nan
+    scale = pd.Series(moves).rolling(outlier_window, min_periods=min(20, outlier_window)).median() \
+        .shift(1).to_numpy()
+    with np.errstate(invalid='ignore'):
+        spikes = moves > max_return_mads * scale
+        # The bar after a lone spike moves back; measure it from the bar before the spike instead
+        after = np.flatnonzero(spikes[:-1]) + 1
+        after = after[after >= 2]
+        spikes[after] = np.abs(log_close[after] - log_close[after - 2]) > max_return_mads * scale[after]
+    return bad | spikes
+
+
+def clean(df, time_column=None, time_format=None, calendar=asof.NSE, price_columns=None, fill_limit=None,
+          max_return_mads=25, outlier_window=500, downcast=True, flags=False, columns=None, compact=False,
+          float64_columns=()):
+    """Validate and clean a raw frame (as read by ``pd.read_csv``). Returns ``(frame, report)``."""
+    time_column = find_time_column(df) if time_column is None else time_column
+    if columns is not None:
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Dataset is missing requested columns: {', '.join(map(str, missing))}")
+        df = df[[time_column] + [c for c in columns if c != time_column]]
+    df = df.copy()
+    price_columns = [c for c in (datasets.PRICE_COLUMNS if price_columns is None else price_columns)
+                     if c in df.columns]
+    report = {'rows_in': len(df), 'time_column': time_column}
+
+    # Schema
+    converted = _numeric_text_columns(df, skip={time_column})
+    for column in converted:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    report['numeric_columns_converted'] = converted
+    missing = [c for c in datasets.REQUIRED_COLUMNS if c not in df.columns and c != 'time']
+    if missing and columns is None:
+        raise ValueError(f"Dataset is missing required columns: {', '.join(missing)}")
+
+    time_format = detect_time_format(df[time_column]) if time_format is None else time_format
+    times = parse_times(df[time_column], time_format)
+    report['time_format'] = time_format
+    report['unparsed_times'] = int(times.isna().sum())
+    df[time_column] = times
+    df = df[times.notna().to_numpy()]
+
+    # Order and duplicates
+    time_ns = asof._as_ns(df[time_column])
+    report['was_sorted'] = bool(np.all(time_ns[1:] >= time_ns[:-1]))
+    if not report['was_sorted']:
+        order = np.argsort(time_ns, kind='stable')
+        df, time_ns = df.iloc[order], time_ns[order]
+    duplicate = np.zeros(len(df), dtype=bool)
+    duplicate[:-1] = time_ns[1:] == time_ns[:-1]
+    report['duplicates_dropped'] = int(duplicate.sum())
+    if duplicate.any():
+        df, time_ns = df[~duplicate], time_ns[~duplicate]
+    df = df.reset_index(drop=True)
+    if len(df) == 0:
+        raise ValueError("Dataset has no rows with a valid time")
+
+    # Calendar: bar interval, sessions, gaps
+    steps = np.diff(time_ns)
+    interval = int(np.median(steps)) if len(steps) else 0
+    report['interval'] = str(pd.Timedelta(interval, unit='ns'))
+    session_start = np.ones(len(df), dtype=bool)
+    gap_before = np.zeros(len(df), dtype=bool)
+    if calendar is not None and len(df) > 1:
+        # The calendar takes naive times as exchange-local and converts tz-aware ones
+        times = df[time_column]
+        days = calendar.session_days(times)
+        session_start[1:] = days[1:] != days[:-1]
+        if interval >= _DAILY:
+            skipped = calendar.trading_days_between(days[:-1] + 1, days[1:])
+            gap_before[1:] = skipped > 0
+            report['missing_sessions'] = int(skipped.sum())
+            report['bars_on_non_trading_days'] = int((~calendar.is_trading_day(times)).sum())
+        else:
+            missing_bars = np.where(session_start[1:], 0, np.rint(steps / interval).astype(np.int64) - 1)
+            gap_before[1:] = missing_bars > 0
+            report['missing_bars'] = int(missing_bars.sum())
+            report['bars_outside_session'] = int((~calendar.is_open(times)).sum())
+        report['sessions'] = int(session_start.sum())
+        report['gaps'] = int(gap_before.sum())
+
+    # Outliers, then look-ahead-safe filling of the price columns
+    outliers = _outliers(df, time_ns, session_start, price_columns, max_return_mads, outlier_window)
+    report['outliers'] = int(outliers.sum())
+    report['outlier_times'] = [str(t) for t in df.loc[outliers, time_column].iloc[:20]]
+    if outliers.any():
+        df.loc[outliers, price_columns] = np.nan
+    filled = {}
+    for column in price_columns:
+        before = int(df[column].isna().sum())
+        if before:
+            df[column] = df[column].ffill(limit=fill_limit)
+            filled[column] = before - int(df[column].isna().sum())
+    report['filled'] = filled
+
+    # Dtypes
+    downcast_columns = {}
+    if compact:
+        narrowed = compact_frames.compact(df, keep=[time_column, *float64_columns])
+        downcast_columns = {str(c): str(narrowed[c].dtype) for c in df.columns if narrowed[c].dtype != df[c].dtype}
+        df = narrowed
+    elif downcast:
+        for column in df.columns:
+            series = df[column]
+            if column == time_column:
+                continue
+            if pd.api.types.is_integer_dtype(series) and series.dtype.itemsize > 4:
+                if np.abs(series.to_numpy(dtype=np.float64)).sum() < np.iinfo(np.int32).max:
+                    df[column] = series.astype(np.int32)
+                    downcast_columns[column] = 'int32'
+            elif series.dtype == object or pd.api.types.is_string_dtype(series):
+                if series.nunique() <= len(series) // 2:
+                    df[column] = series.astype('category')
+                    downcast_columns[column] = 'category'
+    report['downcast'] = downcast_columns
+
+    if flags:
+        df['gap_before'] = gap_before
+        df['session_start'] = session_start
+    report['rows_out'] = len(df)
+    report['first'] = str(df[time_column].iloc[0])
+    report['last'] = str(df[time_column].iloc[-1])
+    return df, report
+
+
+def _option(value):
+    if isinstance(value, asof.SessionCalendar):
+        return [value.open, value.close, value.weekdays.tolist(), value.holidays.tolist(), str(value.timezone)]
+    return repr(value)
+
+
+def _key(digest, options):
+    encoded = json.dumps([CLEAN_VERSION, options], sort_keys=True, default=_option).encode('utf-8')
+    return f"{digest}.clean-{hashlib.sha256(encoded).hexdigest()[:16]}"
+
+
+def ingest(name_or_path, **options):
+    """Cleaned frame and report for a registered dataset name or a file path (cached)."""
+    digest = datasets.digest(name_or_path)
+    key = _key(digest, options)
+    cached = _cleaned.get(key)
+    if cached is None:
+        cache_path = os.path.join(datasets.CACHE_DIR, f"{key}.pkl")
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # Missing, or written by an incompatible pandas version
+            cached = clean(datasets.load(name_or_path), **options)
+            os.makedirs(datasets.CACHE_DIR, exist_ok=True)
+            with open(cache_path + '.tmp', 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_path + '.tmp', cache_path)
+            with open(os.path.join(datasets.CACHE_DIR, f"{key}.report.json"), 'w', encoding='utf-8') as f:
+                json.dump(cached[1], f, indent=2)
+                f.write('\n')
+        _cleaned[key] = cached
+    df, found = cached
+    return df.copy(), dict(found)
+
+
+def load(name_or_path, **options):
+    """Cleaned DataFrame for a registered dataset name or a file path; see ``clean`` for options."""
+    return ingest(name_or_path, **options)[0]
+
+
+def report(name_or_path, **options):
+    """What ``clean`` found and changed for a dataset (a JSON-serialisable dict)."""
+    return ingest(name_or_path, **options)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and clean a market data file")
+    parser.add_argument('dataset', help="Registered dataset name or CSV path")
+    parser.add_argument('--fill-limit', type=int, default=None, help="Forward-fill at most this many bars")
+    parser.add_argument('--max-return-mads', type=float, default=25,
+                        help="Blank bars moving more than this many median moves (0 disables)")
+    args = parser.parse_args()
+    found = report(args.dataset, fill_limit=args.fill_limit, max_return_mads=args.max_return_mads)
+    for name, value in found.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
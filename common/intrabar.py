@@ -0,0 +1,156 @@
+"""Stop-loss / take-profit resolution against each bar's high and low.
+
+Checking ``close <= stop_loss`` misses every stop that was touched inside a
+bar and recovered by the close. This module checks the bar's range instead:
+
+* ``resolve_bar`` decides, for one bar (or many positions on their current
+  bars at once), whether the stop or the target was touched and at what
+  price it filled.
+* ``TouchSearch`` finds, for any number of open positions, the first bar
+  after entry that touches the stop or the target. It builds sparse tables
+  of range minima / maxima of the lows and highs once (O(n log n)); each
+  search then descends the table in O(log n) steps, vectorised over all
+  positions, instead of walking the bars one by one.
+
+Fills: a level touched inside the bar fills at the level; a bar that opens
+beyond the level (a gap) fills at the open. When both levels lie inside one
+bar the order is unknowable from OHLC data and ``path`` decides:
+
+    'nearest'       open -> nearer extreme -> other extreme -> close
+    'stop_first'    assume the stop was hit first (conservative)
+    'target_first'  assume the target was hit first
+
+Levels may be NaN to disable one side (e.g. a stop without a target).
+"""
+import numpy as np
+
+NO_EXIT, STOP, TARGET = 0, 1, 2
+EXIT_REASONS = {NO_EXIT: None, STOP: 'Stop Loss', TARGET: 'Target Profit'}
+PATHS = ('nearest', 'stop_first', 'target_first')
+
+
+def _check_path(path):
+    if path not in PATHS:
+        raise ValueError(f"Intrabar path must be one of {', '.join(PATHS)}, got '{path}'")
+
+
+def resolve_bar(open_, high, low, stop, target, is_long, path='nearest'):
+    """Exit reason (NO_EXIT / STOP / TARGET) and fill price for positions on a bar.
+
+    All arguments broadcast against each other, so this works for one
+    position (scalars) or many positions at once (arrays). The fill price
+    is NaN where nothing was touched.
+    """
+    _check_path(path)
+    open_, high, low = np.asarray(open_, dtype=np.float64), np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64)
+    stop, target = np.asarray(stop, dtype=np.float64), np.asarray(target, dtype=np.float64)
+    is_long = np.asarray(is_long, dtype=bool)
+
+    # Touched at all, and already through the level at the open (gap)
+    stop_hit = np.where(is_long, low <= stop, high >= stop)
+    target_hit = np.where(is_long, high >= target, low <= target)
+    stop_gap = np.where(is_long, open_ <= stop, open_ >= stop)
+    target_gap = np.where(is_long, open_ >= target, open_ <= target)
+
+    if path == 'stop_first':
+        stop_wins = stop_hit & ~target_gap
+    elif path == 'target_first':
+        stop_wins = stop_hit & (stop_gap | ~target_hit)
+    else:
+        # The extreme nearer the open is visited first
+        low_first = (open_ - low) <= (high - open_)
+        stop_side_first = np.where(is_long, low_first, ~low_first)
+        stop_wins = stop_hit & (stop_gap | ~target_hit | (~target_gap & stop_side_first))
+
+    reason = np.where(stop_wins, STOP, np.where(target_hit, TARGET, NO_EXIT)).astype(np.int8)
+    price = np.where(reason == STOP, np.where(stop_gap, open_, stop),
+                     np.where(reason == TARGET, np.where(target_gap, open_, target), np.nan))
+    if reason.ndim == 0:
+        return int(reason), float(price)
+    return reason, price
+
+
+class TouchSearch:
+    """First bar at or after a start bar whose low/high reaches a level."""
+
+    def __init__(self, high, low, open_=None):
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.open = None if open_ is None else np.asarray(open_, dtype=np.float64)
+        if len(self.high) != len(self.low) or (self.open is not None and len(self.open) != len(self.low)):
+            raise ValueError("High, low and open must have the same length")
+        if np.isnan(self.high).any() or np.isnan(self.low).any():
+            raise ValueError("High and low must not contain NaN")
+        self.size = len(self.low)
+        self._mins = self._sparse_table(self.low, np.minimum)
+        self._maxs = self._sparse_table(self.high, np.maximum)
+
+    @staticmethod
+    def _sparse_table(values, ufunc):
+        # Level k holds the extreme of values[i:i + 2**k] for every valid i
+        levels = [values]
+        width = 1
+        while width * 2 <= len(values):
+            previous = levels[-1]
+            levels.append(ufunc(previous[:-width], previous[width:]))
+            width *= 2
+        return levels
+
+    def _descend(self, levels, untouched, starts):
+        position = np.array(starts, dtype=np.int64)
+        for k in range(len(levels) - 1, -1, -1):
+            width = 1 << k
+            table = levels[k]
+            fits = position + width <= self.size
+            index = np.minimum(position, len(table) - 1)
+            # Skip whole blocks that cannot contain the first touch
+            skip = fits & untouched(table[index])
+            position += np.where(skip, width, 0)
+        return position
+
+    def first_at_or_below(self, levels, starts):
+        """First bar >= start whose low is at or below the level (``size`` if none)."""
+        levels = np.asarray(levels, dtype=np.float64)
+        return self._descend(self._mins, lambda lows: ~(lows <= levels), starts)
+
+    def first_at_or_above(self, levels, starts):
+        """First bar >= start whose high is at or above the level (``size`` if none)."""
+        levels = np.asarray(levels, dtype=np.float64)
+        return self._descend(self._maxs, lambda highs: ~(highs >= levels), starts)
+
+    def first_touch(self, entry_bars, stops, targets, is_long, path='nearest', end_bars=None):
+        """Resolve stops/targets for positions entered at the close of ``entry_bars``.
+
+        Returns (exit_bars, reasons, prices) arrays: the first bar after entry
+        (up to ``end_bars``, inclusive) that touched a level, with reason and
+        fill price as in ``resolve_bar``. Positions that touch nothing get
+        exit bar -1, NO_EXIT and NaN.
+        """
+        _check_path(path)
+        if self.open is None:
+            raise ValueError("first_touch needs open prices to price gaps; pass open_ to TouchSearch")
+        entry_bars = np.atleast_1d(np.asarray(entry_bars, dtype=np.int64))
+        stops = np.broadcast_to(np.asarray(stops, dtype=np.float64), entry_bars.shape)
+        targets = np.broadcast_to(np.asarray(targets, dtype=np.float64), entry_bars.shape)
+        is_long = np.broadcast_to(np.asarray(is_long, dtype=bool), entry_bars.shape)
+        ends = np.full(entry_bars.shape, self.size - 1) if end_bars is None else \
+            np.broadcast_to(np.asarray(end_bars, dtype=np.int64), entry_bars.shape)
+
+        starts = entry_bars + 1
+        below_stop = self.first_at_or_below(stops, starts)
+        above_stop = self.first_at_or_above(stops, starts)
+        below_target = self.first_at_or_below(targets, starts)
+        above_target = self.first_at_or_above(targets, starts)
+        stop_bar = np.where(is_long, below_stop, above_stop)
+        target_bar = np.where(is_long, above_target, below_target)
+
+        exit_bars = np.minimum(stop_bar, target_bar)
+        touched = exit_bars <= np.minimum(ends, self.size - 1)
+        bars = np.where(touched, exit_bars, 0)
+        reasons, prices = resolve_bar(self.open[bars], self.high[bars], self.low[bars],
+                                      np.where(stop_bar == exit_bars, stops, np.nan),
+                                      np.where(target_bar == exit_bars, targets, np.nan),
+                                      is_long, path)
+        reasons = np.where(touched, reasons, NO_EXIT).astype(np.int8)
+        prices = np.where(touched, prices, np.nan)
+        return np.where(touched, exit_bars, -1), reasons, prices
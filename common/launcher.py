@@ -0,0 +1,249 @@
+"""Fast-start entry point for the strategy scripts.
+
+Importing this module only pulls in the standard library: strategies are
+looked up by name and their script is executed as ``__main__`` (exactly as
+``python script.py`` would, with the same working directory) only when a
+run is requested.
+
+For many short runs, ``WarmPool`` keeps a fork server that has already
+imported the numeric stack (NumPy, pandas, TA-Lib and the ``common``
+helpers). Every run is forked from that server into a fresh process, so it
+starts with the heavy imports done but with a clean ``sys.modules`` - each
+folder has its own ``config`` module, so runs must not share one.
+
+    python -m common.launcher list
+    python -m common.launcher run trend_following scalping   # warm pool, prints start-up times
+    python -m common.launcher run --cold trend_following     # in this process, no pool
+    python -m common.launcher serve                          # read strategy names from stdin
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+from multiprocessing.connection import wait
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Strategy name -> (script, working directory), relative to the repository root.
+# The working directory is the one the script's relative data/log paths expect.
+STRATEGIES = {
+    # Lalit_Mohane
+    'cci': ('Lalit_Mohane/Commodity Channel Index trafing/cci.py', None),
+    'crypto_stocks': ('Lalit_Mohane/Crypto-Stocks Trading/CryptoStocksTrading.py', None),
+    'day_trading': ('Lalit_Mohane/Day Trading/day_trading.py', None),
+    'leveraged_reverse_etfs': ('Lalit_Mohane/Leveraged Reverse ETFs/leaveraged_reverse_etfs.py', None),
+    'mean_reversion': ('Lalit_Mohane/Mean Reversion Trading/mean_reversion_trading.py', None),
+    'penny_stock': ('Lalit_Mohane/Penny Stock Trading/penny_stock_trading.py', None),
+    'technical_arbitrage': ('Lalit_Mohane/Technical Arbitrage/technical_arbitrage.py', None),
+    'theta_decay': ('Lalit_Mohane/Theta Decay Trading/tdt.py', None),
+    'volatility_arbitrage': ('Lalit_Mohane/Volatility Arbitrage/volatility_arbitrage.py', None),
+    # Sahil_Katkamwar
+    'delta_neutral': ('Sahil_Katkamwar/Delta_Neutral_Strategy/delta_neutral_trading.py', None),
+    'hft_final': ('Sahil_Katkamwar/High_Frequency_Trading/HFT_Final.py', None),
+    'hft_key_params': ('Sahil_Katkamwar/High_Frequency_Trading/HFT_Key_Params.py', None),
+    'hft_many_strategies': ('Sahil_Katkamwar/High_Frequency_Trading/HFT_Many_Strategies.py', None),
+    'hft_news': ('Sahil_Katkamwar/High_Frequency_Trading/HFT_News.py', None),
+    'leveraged_trading': ('Sahil_Katkamwar/Leveraged_Trading/leveraged_trading.py', None),
+    'momentum_scalping': ('Sahil_Katkamwar/Momentum_Scalping/momentum_scalping.py', None),
+    'rebate_trading': ('Sahil_Katkamwar/Rebate_Trading/rebate_trading.py', None),
+    'statistical_arbitrage': ('Sahil_Katkamwar/Statistical_Arbitrage/statistical_arbitrage.py', None),
+    'swing_trading': ('Sahil_Katkamwar/Swing_Trading/swing_trading_strategy.py', None),
+    'synthetic_arbitrage': ('Sahil_Katkamwar/Synthetic_Arbitrage/synthetic_arbitrage_strategy.py', None),
+    # Shounak_Mulay (scripts expect to be started from the member folder)
+    'forex_trading': ('Shounak_Mulay/Forex_Trading/Forex_Trading.py', 'Shounak_Mulay'),
+    'leveraged_etf': ('Shounak_Mulay/Leveraged_ETF_Trading/LeveragedETFTrading.py', 'Shounak_Mulay'),
+    'micro_futures': ('Shounak_Mulay/Micro_Futures_Trading/Micro_Futures_trading.py', 'Shounak_Mulay'),
+    'momentum_trading': ('Shounak_Mulay/Momentum_Trading/MomentumTrading.py', 'Shounak_Mulay'),
+    'order_flow': ('Shounak_Mulay/Order_Flow_Trading/Order_Flow_Trading.py', 'Shounak_Mulay'),
+    'quantitative_trading': ('Shounak_Mulay/Quantitative_Trading/QuantitativeTrading.py', 'Shounak_Mulay'),
+    'smart_routing': ('Shounak_Mulay/Smart_Routing/SmartRouting.py', 'Shounak_Mulay'),
+    'volatility_trading': ('Shounak_Mulay/Volatility_Trading/VolatilityTrading.py', 'Shounak_Mulay'),
+    # Swaraj_Nalawade
+    'gamma_scalping': ('Swaraj_Nalawade/GammaScalping/separatedConfig/gammaScalping.py', None),
+    'long_strangles': ('Swaraj_Nalawade/longStrangles/separatedConfig/longStrangles.py', None),
+    'managed_futures': ('Swaraj_Nalawade/managedFutures/separatedConfig/managedFutures.py', None),
+    'momentum_investing': ('Swaraj_Nalawade/MomentumInvesting/separatedConfig/momentum_investing.py', None),
+    'options_trading': ('Swaraj_Nalawade/optionsTrading/separatedConfig/optionTrading.py', None),
+    'rsi_trading': ('Swaraj_Nalawade/rsi_trading/separatedConfig/rsiTrading.py', None),
+    'scalping': ('Swaraj_Nalawade/scalping/separatedConfig/scalping.py', None),
+    'straddles_and_strangles': ('Swaraj_Nalawade/Straddles_and_Strangles/configSeparate/main.py', None),
+    'trend_following': ('Swaraj_Nalawade/TrendFollowing/separatedConfig/trend_following.py', None),
+}
+
+# Imported once by the fork server and inherited by every run
+PRELOAD_MODULES = [
+    'numpy',
+    'pandas',
+    'talib',
+    'common.indicators',
+    'common.ledger',
+    'common.rolling',
+    'common.datasets',
+]
+
+
+def strategy_paths(name):
+    """Return (absolute script path, absolute working directory) for a strategy name."""
+    if name not in STRATEGIES:
+        raise KeyError(f"Unknown strategy '{name}'. Known strategies: {', '.join(sorted(STRATEGIES))}")
+    script, cwd = STRATEGIES[name]
+    script = os.path.join(REPO_ROOT, script)
+    cwd = os.path.join(REPO_ROOT, cwd) if cwd else os.path.dirname(script)
+    return script, cwd
+
+
+def _folder_modules(folder):
+    """Names of the imported modules whose file lives directly in ``folder``."""
+    names = []
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) == folder:
+            names.append(name)
+    return names
+
+
+def run_strategy(name):
+    """Run a strategy script as ``__main__`` in this process and return its globals.
+
+    The script gets its own folder first on the path and a fresh ``config``
+    (and other folder-local modules); the caller's are put back afterwards,
+    so several strategies run one after another keep their own settings.
+    """
+    script, cwd = strategy_paths(name)
+    folder = os.path.dirname(script)
+    old_cwd = os.getcwd()
+    old_path = list(sys.path)
+    saved_config = sys.modules.pop('config', None)
+    os.chdir(cwd)
+    sys.path.insert(0, folder)
+    try:
+        return runpy.run_path(script, run_name='__main__')
+    finally:
+        os.chdir(old_cwd)
+        sys.path[:] = old_path
+        sys.modules.pop('config', None)
+        for module_name in _folder_modules(folder):
+            del sys.modules[module_name]
+        if saved_config is not None:
+            sys.modules['config'] = saved_config
+
+
+def _run_in_child(name, conn, requested_at, quiet):
+    started_at = time.monotonic()
+    result = {'name': name, 'startup_ms': (started_at - requested_at) * 1000}
+    devnull = open(os.devnull, 'w') if quiet else None
+    if devnull is not None:
+        sys.stdout = devnull
+    try:
+        run_strategy(name)
+        result['status'] = 'ok'
+    except BaseException as e:  # SystemExit from a script is a result too
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if devnull is not None:
+            sys.stdout = sys.__stdout__
+            devnull.close()
+    result['runtime_ms'] = (time.monotonic() - started_at) * 1000
+    conn.send(result)
+    conn.close()
+
+
+class WarmPool:
+    """Runs strategies in processes forked from a server with the numeric stack preloaded."""
+
+    def __init__(self, processes=None, preload_modules=None, quiet=False):
+        self.processes = processes or os.cpu_count() or 1
+        self.quiet = quiet
+        if REPO_ROOT not in sys.path:
+            # The fork server imports the preloads with this process's sys.path
+            sys.path.append(REPO_ROOT)
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self._ctx = multiprocessing.get_context('forkserver')
+            # Modules that fail to import are skipped by the fork server
+            self._ctx.set_forkserver_preload(PRELOAD_MODULES if preload_modules is None else list(preload_modules))
+        else:
+            # Windows: no fork server, every run pays for its own imports
+            self._ctx = multiprocessing.get_context('spawn')
+        self._started = False
+
+    def start(self):
+        """Start the fork server now (otherwise the first run starts it)."""
+        if not self._started:
+            # Any child brings the fork server up with its preloads
+            process = self._ctx.Process(target=time.sleep, args=(0,))
+            process.start()
+            process.join()
+            self._started = True
+
+    def run(self, name):
+        """Run one strategy and return its result dict (status, startup_ms, runtime_ms)."""
+        return self.run_many([name])[0]
+
+    def run_many(self, names):
+        """Run strategies with at most ``processes`` at a time; results come back in input order."""
+        self.start()
+        results = [None] * len(names)
+        pending = list(enumerate(names))
+        running = {}
+        while pending or running:
+            while pending and len(running) < self.processes:
+                index, name = pending.pop(0)
+                conn, process = self._start_one(name)
+                running[conn] = (index, process)
+            for conn in wait(list(running)):
+                index, process = running.pop(conn)
+                try:
+                    results[index] = conn.recv()
+                except EOFError:
+                    results[index] = {'name': names[index], 'status': 'error', 'error': 'worker exited without a result'}
+                process.join()
+        return results
+
+    def _start_one(self, name):
+        receiver, sender = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(target=_run_in_child, args=(name, sender, time.monotonic(), self.quiet))
+        process.start()
+        sender.close()
+        return receiver, process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run strategy scripts by name")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Show strategy names")
+    run_parser = commands.add_parser('run', help="Run one or more strategies")
+    run_parser.add_argument('names', nargs='+')
+    run_parser.add_argument('--cold', action='store_true', help="Run in this process instead of the warm pool")
+    run_parser.add_argument('--processes', type=int, default=None)
+    run_parser.add_argument('--quiet', action='store_true', help="Hide the strategies' console output")
+    serve_parser = commands.add_parser('serve', help="Keep a warm pool and run names read from stdin")
+    serve_parser.add_argument('--processes', type=int, default=None)
+    serve_parser.add_argument('--quiet', action='store_true', help="Hide the strategies' console output")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name in sorted(STRATEGIES):
+            print(f"{name}: {STRATEGIES[name][0]}")
+    elif args.command == 'run' and args.cold:
+        for name in args.names:
+            run_strategy(name)
+    elif args.command == 'run':
+        pool = WarmPool(args.processes, quiet=args.quiet)
+        for result in pool.run_many(args.names):
+            print(json.dumps(result), file=sys.stderr)
+    elif args.command == 'serve':
+        pool = WarmPool(args.processes, quiet=args.quiet)
+        pool.start()
+        for line in sys.stdin:
+            names = line.split()
+            if names:
+                for result in pool.run_many(names):
+                    print(json.dumps(result), file=sys.stderr, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Array-backed trade ledger.
+
+Strategies used to collect one dict per trade and build a DataFrame at the
+end. A dict holding Timestamps, floats and an f-string costs around a
+kilobyte per trade; this ledger stores every column in a preallocated NumPy
+array instead (8 bytes per number or timestamp, 1-4 bytes per label), so a
+trade costs a few dozen bytes.
+
+Column kinds:
+    'float'    - float64 values (prices, sizes, P&L, balances)
+    'int'      - int64 values (bar indices, quantities); missing values are
+                 stored as 0, since int64 has no NaN
+    'time'     - timestamps, stored as int64 nanoseconds since the epoch; a
+                 column holds either tz-aware or naive timestamps, not both
+    'category' - strings from a small fixed set (side, exit reason), int8 codes
+    'text'     - free text such as entry reasoning, interned into int32 codes
+                 so repeated strings are stored once
+"""
+import numpy as np
+import pandas as pd
+
+_DTYPES = {
+    'float': np.float64,
+    'int': np.int64,
+    'time': np.int64,
+    'category': np.int8,
+    'text': np.int32,
+}
+
+_NAT = np.iinfo(np.int64).min
+
+
+class TradeLedger:
+    """Growable columnar store of closed trades."""
+
+    def __init__(self, columns, capacity=1024):
+        """``columns`` maps column name to one of the kinds listed in the module docstring."""
+        for name, kind in columns.items():
+            if kind not in _DTYPES:
+                raise ValueError(f"Unknown column kind '{kind}' for column '{name}'")
+        self.columns = dict(columns)
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self._data = {name: np.empty(self.capacity, dtype=_DTYPES[kind])
+                      for name, kind in self.columns.items()}
+        self._labels = {name: [] for name, kind in self.columns.items() if kind in ('category', 'text')}
+        self._codes = {name: {} for name in self._labels}
+        self._timezones = {}
+        self._aware = {}
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """Return trade ``index`` as a dict, decoded the same way it was appended."""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("trade index out of range")
+        return {name: self._decode(name, self._data[name][index]) for name in self.columns}
+
+    def append(self, **values):
+        """Record one trade. Columns that are not given are stored as NaN ('float'), 0 ('int'), NaT or ''."""
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        for name, kind in self.columns.items():
+            self._data[name][i] = self._encode(name, kind, values.get(name))
+        self.size += 1
+
+    def column(self, name):
+        """Raw view of one column (codes for 'category'/'text', epoch ns for 'time')."""
+        return self._data[name][:self.size]
+
+    def categories(self, name):
+        """Labels of a 'category'/'text' column, indexed by code."""
+        return list(self._labels[name])
+
+    @property
+    def nbytes(self):
+        """Bytes used by the recorded rows, including the interned label tables."""
+        array_bytes = sum(self._data[name].itemsize * self.size for name in self.columns)
+        label_bytes = sum(len(label.encode('utf-8')) for labels in self._labels.values() for label in labels)
+        return array_bytes + label_bytes
+
+    def to_frame(self):
+        """Return a pandas DataFrame; numeric columns are views on the ledger arrays."""
+        frame = {}
+        for name, kind in self.columns.items():
+            data = self.column(name)
+            if kind in ('category', 'text'):
+                frame[name] = pd.Categorical.from_codes(data, categories=self._labels[name])
+            elif kind == 'time':
+                times = pd.DatetimeIndex(data.view('datetime64[ns]'))
+                tz = self._timezones.get(name)
+                frame[name] = times.tz_localize('UTC').tz_convert(tz) if tz is not None else times
+            else:
+                frame[name] = data
+        return pd.DataFrame(frame, copy=False)
+
+    def to_arrow(self):
+        """Return a pyarrow Table; numeric buffers are shared, labels become dictionary arrays."""
+        import pyarrow as pa
+
+        arrays = {}
+        for name, kind in self.columns.items():
+            data = self.column(name)
+            if kind in ('category', 'text'):
+                arrays[name] = pa.DictionaryArray.from_arrays(
+                    pa.array(data), pa.array(self._labels[name], type=pa.string()))
+            elif kind == 'time':
+                tz = self._timezones.get(name)
+                arrays[name] = pa.array(data.view('datetime64[ns]'), type=pa.timestamp('ns', tz=tz),
+                                        mask=data == _NAT)
+            else:
+                arrays[name] = pa.array(data)
+        return pa.table(arrays)
+
+    def to_parquet(self, path):
+        """Write the ledger to a Parquet file (requires pyarrow)."""
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path)
+
+    def to_csv(self, path):
+        """Write the ledger to a CSV file."""
+        self.to_frame().to_csv(path, index=False)
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, data in self._data.items():
+            grown = np.empty(self.capacity, dtype=data.dtype)
+            grown[:self.size] = data[:self.size]
+            self._data[name] = grown
+
+    def _encode(self, name, kind, value):
+        if kind in ('category', 'text'):
+            if value is None:
+                value = ''
+            codes = self._codes[name]
+            code = codes.get(value)
+            if code is None:
+                code = len(self._labels[name])
+                if kind == 'category' and code > np.iinfo(np.int8).max:
+                    raise ValueError(f"Too many distinct values for category column '{name}'; use 'text'")
+                codes[value] = code
+                self._labels[name].append(value)
+            return code
+        if kind == 'time':
+            if value is None or pd.isna(value):
+                return _NAT
+            value = pd.Timestamp(value)
+            aware = value.tzinfo is not None
+            if self._aware.setdefault(name, aware) != aware:
+                # A naive time would otherwise be read back as if it were UTC
+                raise ValueError(f"Column '{name}' mixes timezone-aware and naive timestamps")
+            if aware:
+                self._timezones.setdefault(name, value.tzinfo)
+            return value.value
+        if value is None:
+            return np.nan if kind == 'float' else 0
+        return value
+
+    def _decode(self, name, raw):
+        kind = self.columns[name]
+        if kind in ('category', 'text'):
+            return self._labels[name][raw]
+        if kind == 'time':
+            if raw == _NAT:
+                return pd.NaT
+            tz = self._timezones.get(name)
+            value = pd.Timestamp(int(raw), unit='ns')
+            return value.tz_localize('UTC').tz_convert(tz) if tz is not None else value
+        return raw.item()
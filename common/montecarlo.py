@@ -0,0 +1,181 @@
+"""Monte Carlo robustness checks for strategy results.
+
+A backtest gives one final balance for one ordering of one price history.
+This module turns that into distributions:
+
+* ``trade_monte_carlo`` resamples the closed-trade P&L sequence (bootstrap
+  with replacement, block bootstrap to keep streaks together, or a plain
+  reshuffle) and rebuilds the equity curve of every resample.
+* ``returns_monte_carlo`` block-bootstraps the underlying's bar returns into
+  new price paths and reruns a strategy kernel on each of them.
+
+Both report the mean, median and a confidence interval of the final
+balance and of the maximum drawdown (in percent of the running peak), plus
+the risk of ruin: the share of paths whose balance touches ``ruin_balance``.
+
+Resamples are generated in chunks of a bounded number of cells, so 50,000
+resamples of a 10,000-trade history never materialise one 500-million-cell
+array, and the chunks are spread over a process pool. Every chunk draws
+from its own ``SeedSequence`` child, so a given seed gives the same result
+for any number of processes.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('bootstrap', 'block', 'shuffle')
+
+# Cells (resamples x trades) per chunk: about 32 MB of float64 per array
+CHUNK_CELLS = 4_000_000
+
+
+def resample_indices(rng, size, n_samples, method='bootstrap', block_size=1):
+    """(n_samples, size) array of indices into a sequence of ``size`` items.
+
+    'bootstrap' draws with replacement, 'shuffle' permutes (same trades, new
+    order), 'block' is a circular block bootstrap: runs of ``block_size``
+    consecutive items starting at random positions, wrapping at the end.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Method must be one of {', '.join(METHODS)}, got '{method}'")
+    if method == 'bootstrap':
+        return rng.integers(0, size, size=(n_samples, size), dtype=np.int32)
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(np.arange(size, dtype=np.int32), (n_samples, size)), axis=1)
+    if block_size < 1:
+        raise ValueError(f"Block size must be at least 1, got {block_size}")
+    n_blocks = -(-size // block_size)
+    starts = rng.integers(0, size, size=(n_samples, n_blocks, 1), dtype=np.int32)
+    return ((starts + np.arange(block_size, dtype=np.int32)) % size).reshape(n_samples, -1)[:, :size]
+
+
+def equity_statistics(pnl, initial_balance, ruin_balance):
+    """Final balance, max drawdown % and ruin flag of every row of a (paths, trades) P&L array.
+
+    Works in place on ``pnl`` (a fresh gathered array in the callers) to
+    keep the number of full-size temporaries at two.
+    """
+    equity = np.cumsum(pnl, axis=1, out=pnl)
+    equity += initial_balance
+    final_balance = equity[:, -1].copy()
+    ruined = equity.min(axis=1) <= ruin_balance
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, initial_balance, out=peak)
+    # Lowest equity / running peak ratio gives the deepest drawdown
+    lowest_ratio = np.divide(equity, peak, out=peak).min(axis=1)
+    return final_balance, np.maximum((1.0 - lowest_ratio) * 100, 0.0), ruined
+
+
+def _trade_chunk(pnl, initial_balance, ruin_balance, n_samples, method, block_size, seed):
+    rng = np.random.default_rng(seed)
+    indices = resample_indices(rng, len(pnl), n_samples, method, block_size)
+    return equity_statistics(pnl[indices], initial_balance, ruin_balance)
+
+
+def _returns_chunk(close, returns, kernel, n_samples, block_size, seed):
+    rng = np.random.default_rng(seed)
+    indices = resample_indices(rng, len(returns), n_samples, 'block', block_size)
+    paths = close[0] * np.cumprod(1.0 + returns[indices], axis=1)
+    paths = np.concatenate((np.full((n_samples, 1), close[0]), paths), axis=1)
+    return [np.asarray(kernel(path), dtype=np.float64) for path in paths]
+
+
+def _chunk_sizes(n_samples, cells_per_sample):
+    per_chunk = max(1, CHUNK_CELLS // max(cells_per_sample, 1))
+    return [min(per_chunk, n_samples - start) for start in range(0, n_samples, per_chunk)]
+
+
+def _run_chunks(function, chunk_args, processes):
+    """Run ``function(*args)`` for every chunk, in a process pool when more than one process is asked for."""
+    processes = os.cpu_count() if processes is None else processes
+    processes = min(processes, len(chunk_args))
+    if processes <= 1:
+        return [function(*args) for args in chunk_args]
+    # Fork where available: workers inherit the loaded modules instead of re-importing
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context(method)) as pool:
+        return list(pool.map(function, *zip(*chunk_args)))
+
+
+def summarize(final_balance, max_drawdown, ruined, confidence=0.95):
+    """Mean, median and confidence interval of each metric, plus the risk of ruin."""
+    if not 0 < confidence < 1:
+        raise ValueError(f"Confidence must be between 0 and 1, got {confidence}")
+    tails = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    summary = {}
+    for name, values in (('final_balance', final_balance), ('max_drawdown_pct', max_drawdown)):
+        low, high = np.percentile(values, tails)
+        summary[name] = {
+            'mean': float(np.mean(values)),
+            'median': float(np.median(values)),
+            'ci_low': float(low),
+            'ci_high': float(high)
+        }
+    summary['risk_of_ruin'] = float(np.mean(ruined))
+    summary['samples'] = len(final_balance)
+    summary['confidence'] = confidence
+    return summary
+
+
+def trade_monte_carlo(pnl, initial_balance, n_samples=10000, method='bootstrap', block_size=10,
+                      ruin_balance=None, confidence=0.95, processes=None, seed=None):
+    """Resample a closed-trade P&L sequence ``n_samples`` times and summarise the outcomes.
+
+    ``ruin_balance`` defaults to half the initial balance. ``block_size`` is
+    only used by the 'block' method. Returns the dict from ``summarize``.
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if len(pnl) == 0:
+        raise ValueError("Need at least one trade to resample")
+    if n_samples < 1:
+        raise ValueError(f"Number of samples must be at least 1, got {n_samples}")
+    ruin_balance = initial_balance * 0.5 if ruin_balance is None else ruin_balance
+
+    sizes = _chunk_sizes(n_samples, len(pnl))
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = _run_chunks(_trade_chunk,
+                         [(pnl, initial_balance, ruin_balance, size, method, block_size, child)
+                          for size, child in zip(sizes, seeds)],
+                         processes)
+    final_balance, max_drawdown, ruined = (np.concatenate(parts) for parts in zip(*chunks))
+    return summarize(final_balance, max_drawdown, ruined, confidence)
+
+
+def returns_monte_carlo(close, kernel, initial_balance, n_samples=1000, block_size=20,
+                        ruin_balance=None, confidence=0.95, processes=None, seed=None):
+    """Rerun a strategy kernel on block-bootstrapped price paths and summarise the outcomes.
+
+    ``kernel(close_path)`` takes a 1-D array of closes and returns the P&L
+    of each closed trade in order; it must be a module-level function so it
+    can be sent to the worker processes. Paths with no trades count as a
+    flat equity curve.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < 2:
+        raise ValueError("Need at least two closes to build returns")
+    if n_samples < 1:
+        raise ValueError(f"Number of samples must be at least 1, got {n_samples}")
+    returns = close[1:] / close[:-1] - 1.0
+    ruin_balance = initial_balance * 0.5 if ruin_balance is None else ruin_balance
+
+    sizes = _chunk_sizes(n_samples, len(close))
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = _run_chunks(_returns_chunk,
+                         [(close, returns, kernel, size, block_size, child) for size, child in zip(sizes, seeds)],
+                         processes)
+
+    final_balance, max_drawdown, ruined = [], [], []
+    for pnl in (trades for chunk in chunks for trades in chunk):
+        final, drawdown, ruin = equity_statistics(np.append(0.0, pnl)[None, :], initial_balance, ruin_balance)
+        final_balance.append(final[0])
+        max_drawdown.append(drawdown[0])
+        ruined.append(ruin[0])
+    return summarize(np.array(final_balance), np.array(max_drawdown), np.array(ruined), confidence)
+
+
+def summary_frame(summary):
+    """The metric part of a summary as a DataFrame (one row per metric)."""
+    return pd.DataFrame({name: summary[name] for name in ('final_balance', 'max_drawdown_pct')}).T
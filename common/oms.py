@@ -0,0 +1,729 @@
+"""Order management: order lifecycle, journal and a local matching engine.
+
+``OrderManager`` tracks every order from submission to its final state and
+talks to an exchange adapter: ``LocalExchange`` here, a broker adapter in
+production. Both implement the same calls (see ``LocalExchange``): submit,
+cancel and replace orders in batches, list open orders, and push execution
+reports back to the manager.
+
+    async with oms.OrderManager(exchange, journal='orders.jsonl') as manager:
+        order = manager.submit('NIFTY', 'BUY', 50, price=22150.0)
+        manager.replace(order.client_id, price=22152.0)
+        await order.wait()                      # filled, cancelled or rejected
+
+Order states:
+
+    pending ─ack─> open ─fill─> partially_filled ─fill─> filled
+       │             │                 │
+       │             └── cancel ───────┴──> pending_cancel ─> cancelled
+       │             └── replace ──────┴──> pending_replace ─> open / partially_filled
+       └─> rejected
+
+A cancel or replace the exchange refuses puts the order back to open or
+partially_filled. Reports that do not fit the order's state (duplicates,
+reports for finished orders) are counted in ``stale_reports`` and ignored.
+
+Client order IDs are idempotent: submitting an ID the manager already
+knows returns that order instead of sending it again, also after a restart.
+Requests made during one pass of the event loop go out as one batch per
+kind, so a burst of a thousand orders is one adapter call.
+
+Every request and report is appended to the journal (one JSON array per
+line), and requests are written before they are sent. A restarted manager
+replays the journal to rebuild its orders; ``reconcile`` then asks the
+exchange which of the orders it believes are working really are.
+``compact_journal`` drops finished orders between sessions so the replay
+stays short.
+
+For synchronous scripts, ``BlockingOrderManager`` runs the event loop only
+while it waits for an order.
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+PENDING, OPEN, PARTIALLY_FILLED, FILLED = 'pending', 'open', 'partially_filled', 'filled'
+PENDING_CANCEL, PENDING_REPLACE, CANCELLED, REJECTED = 'pending_cancel', 'pending_replace', 'cancelled', 'rejected'
+TERMINAL_STATES = frozenset((FILLED, CANCELLED, REJECTED))
+SIDES = ('BUY', 'SELL')
+
+# What the exchange sends back. ``quantity``/``price`` are the fill for 'fill'
+# and the new total quantity and limit for 'replaced'.
+ExecutionReport = namedtuple('ExecutionReport', ['kind', 'client_id', 'quantity', 'price', 'fee', 'exchange_id',
+                                                 'reason', 'time'])
+REPORT_KINDS = ('ack', 'fill', 'cancelled', 'rejected', 'replaced', 'cancel_rejected', 'replace_rejected')
+
+# (client_id, symbol, side, quantity, price) as handed to the adapter; price None is a market order
+OrderRequest = namedtuple('OrderRequest', ['client_id', 'symbol', 'side', 'quantity', 'price'])
+
+_EPSILON = 1e-9
+
+# One encoder for all journal lines (json.dumps with options builds a new one per call)
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def report(kind, client_id, quantity=0.0, price=None, fee=0.0, exchange_id=None, reason=None):
+    """An execution report stamped with the current time."""
+    return ExecutionReport(kind, client_id, quantity, price, fee, exchange_id, reason, time.time_ns())
+
+
+class Order:
+    """One order as the manager sees it."""
+
+    __slots__ = ('client_id', 'symbol', 'side', 'quantity', 'price', 'state', 'filled', 'avg_price', 'fees',
+                 'exchange_id', 'reason', 'created', 'updated', '_waiter')
+
+    def __init__(self, client_id, symbol, side, quantity, price, created):
+        self.client_id = client_id
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.price = price
+        self.state = PENDING
+        self.filled = 0.0
+        self.avg_price = None
+        self.fees = 0.0
+        self.exchange_id = None
+        self.reason = None
+        self.created = created
+        self.updated = created
+        self._waiter = None
+
+    @property
+    def remaining(self):
+        return self.quantity - self.filled
+
+    @property
+    def done(self):
+        return self.state in TERMINAL_STATES
+
+    async def wait(self):
+        """Wait until the order is filled, cancelled or rejected; returns the order."""
+        if self.state not in TERMINAL_STATES:
+            if self._waiter is None:
+                self._waiter = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self._waiter)
+        return self
+
+    def _working_state(self):
+        if self.filled >= self.quantity - _EPSILON:
+            return FILLED
+        return PARTIALLY_FILLED if self.filled > 0 else OPEN
+
+    def apply(self, report):
+        """Move the order by one execution report; False if the report does not fit its state."""
+        kind, state = report.kind, self.state
+        if kind == 'fill':
+            if state in TERMINAL_STATES:
+                return False
+            total = self.filled + report.quantity
+            self.avg_price = report.price if self.avg_price is None else \
+                (self.avg_price * self.filled + report.price * report.quantity) / total
+            self.filled = total
+            self.fees += report.fee
+            if total >= self.quantity - _EPSILON:
+                self.state = FILLED
+            elif state in (PENDING, OPEN):
+                self.state = PARTIALLY_FILLED
+        elif state in TERMINAL_STATES:
+            return False
+        elif kind == 'ack':
+            if state != PENDING:
+                return False
+            self.state = OPEN
+            self.exchange_id = report.exchange_id
+        elif kind == 'cancelled':
+            self.state = CANCELLED
+            self.reason = report.reason
+        elif kind == 'rejected':
+            if state != PENDING:
+                return False
+            self.state = REJECTED
+            self.reason = report.reason
+        elif kind == 'replaced':
+            if state != PENDING_REPLACE:
+                return False
+            self.quantity, self.price = report.quantity, report.price
+            self.state = self._working_state()
+        elif kind in ('cancel_rejected', 'replace_rejected'):
+            if state not in (PENDING_CANCEL, PENDING_REPLACE):
+                return False
+            self.state = self._working_state()
+            self.reason = report.reason
+        else:
+            raise ValueError(f"Unknown execution report kind '{kind}'")
+        self.updated = report.time
+        if self._waiter is not None and self.state in TERMINAL_STATES and not self._waiter.done():
+            self._waiter.set_result(self)
+        return True
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith('_')}
+
+    def __repr__(self):
+        return (f"Order({self.client_id} {self.side} {self.quantity:g} {self.symbol} @ "
+                f"{'MKT' if self.price is None else self.price}, {self.state}, filled {self.filled:g})")
+
+
+class OrderJournal:
+    """Append-only file of order requests and execution reports, one JSON array per line."""
+
+    def __init__(self, path, fsync=False):
+        """With ``fsync`` every flush waits for the disk (survives a power cut, not just a crash)."""
+        self.path = path
+        self.fsync = fsync
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lines = []
+
+    def new(self, order):
+        self._lines.append(_encode(['new', order.client_id, order.symbol, order.side, order.quantity, order.price,
+                                    order.created]))
+
+    def request(self, kind, client_id, quantity=None, price=None):
+        self._lines.append(_encode([kind, client_id, quantity, price, time.time_ns()]))
+
+    def report(self, report):
+        self._lines.append(_encode(report))
+
+    def flush(self):
+        if not self._lines:
+            return
+        self._file.write('\n'.join(self._lines) + '\n')
+        self._lines.clear()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def replay_journal(path):
+    """Orders rebuilt from a journal (client_id -> Order) and the number of stale lines skipped."""
+    orders, stale = {}, 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break  # The last line was cut short by a crash
+            entry = json.loads(line)
+            kind = entry[0]
+            if kind == 'new':
+                _, client_id, symbol, side, quantity, price, created = entry
+                orders.setdefault(client_id, Order(client_id, symbol, side, quantity, price, created))
+                continue
+            order = orders.get(entry[1])
+            if order is None:
+                stale += 1
+            elif kind == 'cancel_request':
+                order.state = PENDING_CANCEL
+            elif kind == 'replace_request':
+                order.state = PENDING_REPLACE
+            elif not order.apply(ExecutionReport(*entry)):
+                stale += 1
+    return orders, stale
+
+
+def compact_journal(path):
+    """Rewrite a journal with only the orders that are still working; returns (kept, dropped) order counts.
+
+    Run it between sessions, before a manager opens the journal: finished
+    orders no longer need replaying, so the file stays as large as the
+    working orders instead of growing with every session. Client IDs of
+    dropped orders are forgotten (they are no longer idempotent).
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    orders, _ = replay_journal(path)
+    working = {client_id for client_id, order in orders.items() if not order.done}
+    tmp_path = path + '.tmp'
+    with open(path, 'r', encoding='utf-8') as source, open(tmp_path, 'w', encoding='utf-8') as target:
+        for line in source:
+            if not line.endswith('\n'):
+                break
+            if json.loads(line)[1] in working:
+                target.write(line)
+    os.replace(tmp_path, path)
+    return len(working), len(orders) - len(working)
+
+
+class OrderManager:
+    """Order lifecycle on top of an exchange adapter, with batching and a journal.
+
+    Create it inside a running event loop (or use it as ``async with``).
+    """
+
+    def __init__(self, exchange, journal=None, fsync=False, batch_size=1000, on_update=None, id_prefix=None):
+        """``journal`` is a file path (None: no journal; an existing file is replayed).
+        ``on_update(order, report)`` is called after every report is applied."""
+        self.exchange = exchange
+        self.batch_size = batch_size
+        self.on_update = on_update
+        self.orders = {}
+        self.stale_reports = 0
+        self.recovered = 0
+        if journal is not None and os.path.exists(journal):
+            self.orders, self.stale_reports = replay_journal(journal)
+            self.recovered = len(self.orders)
+        # Orders from earlier sessions; pending ones among them were never acknowledged and are not in flight
+        self._replayed = set(self.orders)
+        self.journal = OrderJournal(journal, fsync) if journal is not None else None
+        self.id_prefix = id_prefix or time.strftime('%Y%m%d%H%M%S-')
+        self._ids = itertools.count(1)
+        self._loop = asyncio.get_running_loop()
+        self._new, self._cancels, self._replaces = [], [], []
+        self._flush_scheduled = False
+        self._sending = set()
+        exchange.connect(self._on_reports)
+
+    # Requests
+
+    def submit(self, symbol, side, quantity, price=None, client_id=None):
+        """Queue a new order (``price`` None: market) and return it; sent with the current batch."""
+        if client_id is not None and client_id in self.orders:
+            return self.orders[client_id]
+        if side not in SIDES:
+            raise ValueError(f"Order side must be one of {', '.join(SIDES)}, not '{side}'")
+        if not quantity > 0:
+            raise ValueError("Order quantity must be positive")
+        if price is not None and not price > 0:
+            raise ValueError("Limit price must be positive")
+        if client_id is None:
+            client_id = f"{self.id_prefix}{next(self._ids)}"
+            while client_id in self.orders:
+                client_id = f"{self.id_prefix}{next(self._ids)}"
+        order = Order(client_id, symbol, side, quantity, price, time.time_ns())
+        self.orders[client_id] = order
+        if self.journal is not None:
+            self.journal.new(order)
+        self._new.append(OrderRequest(client_id, symbol, side, quantity, price))
+        self._schedule_flush()
+        return order
+
+    def cancel(self, client_id):
+        """Ask to cancel an order; a no-op for finished orders or ones already being cancelled."""
+        order = self._get(client_id)
+        if order.state in TERMINAL_STATES or order.state == PENDING_CANCEL:
+            return order
+        order.state = PENDING_CANCEL
+        if self.journal is not None:
+            self.journal.request('cancel_request', client_id)
+        self._cancels.append(client_id)
+        self._schedule_flush()
+        return order
+
+    def replace(self, client_id, quantity=None, price=None):
+        """Change an order's total quantity and/or limit price."""
+        order = self._get(client_id)
+        if order.state in TERMINAL_STATES or order.state in (PENDING_CANCEL, PENDING_REPLACE):
+            raise ValueError(f"Order {client_id} is {order.state} and cannot be replaced")
+        if order.price is None and price is not None:
+            raise ValueError("A market order cannot be given a limit price")
+        quantity = order.quantity if quantity is None else quantity
+        price = order.price if price is None else price
+        if quantity <= order.filled:
+            raise ValueError(f"Order {client_id} has already filled {order.filled:g}")
+        order.state = PENDING_REPLACE
+        if self.journal is not None:
+            self.journal.request('replace_request', client_id, quantity, price)
+        self._replaces.append((client_id, quantity, price))
+        self._schedule_flush()
+        return order
+
+    def _get(self, client_id):
+        order = self.orders.get(client_id)
+        if order is None:
+            raise ValueError(f"Unknown order '{client_id}'")
+        return order
+
+    # Batching
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        new, cancels, replaces = self._new, self._cancels, self._replaces
+        self._new, self._cancels, self._replaces = [], [], []
+        if self.journal is not None:
+            self.journal.flush()  # Requests are on disk before they leave
+        task = self._loop.create_task(self._send(new, cancels, replaces))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, new, cancels, replaces):
+        size = self.batch_size
+        for start in range(0, len(new), size):
+            batch = new[start:start + size]
+            try:
+                await self.exchange.submit_orders(batch)
+            except Exception as error:
+                self._on_reports([report('rejected', request.client_id, reason=f"send failed: {error}")
+                                  for request in batch])
+        for start in range(0, len(cancels), size):
+            batch = cancels[start:start + size]
+            try:
+                await self.exchange.cancel_orders(batch)
+            except Exception as error:
+                self._on_reports([report('cancel_rejected', client_id, reason=f"send failed: {error}")
+                                  for client_id in batch])
+        for start in range(0, len(replaces), size):
+            batch = replaces[start:start + size]
+            try:
+                await self.exchange.replace_orders(batch)
+            except Exception as error:
+                self._on_reports([report('replace_rejected', client_id, reason=f"send failed: {error}")
+                                  for client_id, _, _ in batch])
+
+    async def drain(self):
+        """Wait until every queued request has been handed to the exchange."""
+        while self._flush_scheduled or self._sending:
+            if self._sending:
+                await asyncio.gather(*list(self._sending))
+            else:
+                await asyncio.sleep(0)
+
+    # Reports
+
+    def _on_reports(self, reports):
+        orders, journal, on_update = self.orders, self.journal, self.on_update
+        for execution in reports:
+            order = orders.get(execution.client_id)
+            if order is None or not order.apply(execution):
+                self.stale_reports += 1
+                continue
+            if journal is not None:
+                journal.report(execution)
+            if on_update is not None:
+                on_update(order, execution)
+        if journal is not None:
+            journal.flush()
+
+    async def reconcile(self):
+        """Cancel locally any order the manager thinks is working but the exchange does not know;
+        returns their client IDs.
+
+        Call it after a restart, before trading: orders replayed from the
+        journal that the exchange no longer holds (left open by a session
+        that crashed, or on a fresh exchange) are closed instead of staying
+        working forever.
+        """
+        await self.drain()
+        working = set(await self.exchange.open_orders())
+        missing = [order.client_id for order in self.orders.values()
+                   if order.state not in TERMINAL_STATES and order.client_id not in working
+                   and (order.state != PENDING or order.client_id in self._replayed)]
+        self._on_reports([report('cancelled', client_id, reason='not open at the exchange')
+                          for client_id in missing])
+        return missing
+
+    # Reporting
+
+    def open_orders(self):
+        return [order for order in self.orders.values() if order.state not in TERMINAL_STATES]
+
+    def status(self):
+        """One row per order."""
+        return status_frame(self.orders)
+
+    async def close(self):
+        await self.drain()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def status_frame(orders):
+    columns = ['client_id', 'symbol', 'side', 'quantity', 'price', 'state', 'filled', 'avg_price', 'fees',
+               'exchange_id', 'reason']
+    frame = pd.DataFrame([order.as_dict() for order in orders.values()], columns=columns + ['created', 'updated'])
+    for column in ('created', 'updated'):
+        frame[column] = pd.to_datetime(frame[column], unit='ns')
+    return frame
+
+
+class _Resting:
+    __slots__ = ('client_id', 'symbol', 'side', 'price', 'quantity', 'filled', 'alive', 'exchange_id')
+
+    def __init__(self, client_id, symbol, side, price, quantity, exchange_id):
+        self.client_id = client_id
+        self.symbol = symbol
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.filled = 0.0
+        self.alive = True
+        self.exchange_id = exchange_id
+
+
+class _Book:
+    """Price-time priority book of resting orders plus the quoted outside liquidity."""
+
+    __slots__ = ('bids', 'asks', 'bid', 'ask', 'bid_size', 'ask_size')
+
+    def __init__(self):
+        self.bids, self.asks = [], []  # Heaps of (-price / price, sequence, order)
+        self.bid = self.ask = None
+        self.bid_size = self.ask_size = 0.0
+
+    def best(self, heap):
+        while heap and not heap[0][2].alive:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+
+class LocalExchange:
+    """In-process matching engine with the adapter interface the OrderManager drives.
+
+    Orders match against each other by price and time priority, and against
+    outside liquidity set with ``quote`` (``bid_size``/``ask_size`` per
+    quote; infinite by default). Market orders take what is there and the
+    rest is cancelled; limit orders rest. Reports reach the manager after
+    ``latency`` seconds (on the next loop pass when 0).
+
+    Adapter interface: ``connect(on_reports)``, ``submit_orders(requests)``,
+    ``cancel_orders(client_ids)``, ``replace_orders([(client_id, quantity, price)])``
+    (all coroutines after ``connect``) and ``open_orders()``, the client IDs still working.
+    """
+
+    def __init__(self, latency=0.0, fee_rate=0.0):
+        self.latency = latency
+        self.fee_rate = fee_rate
+        self.books = {}
+        self.orders = {}
+        self._listener = None
+        self._sequence = itertools.count()
+        self._exchange_ids = itertools.count(1)
+
+    def connect(self, on_reports):
+        self._listener = on_reports
+
+    def _deliver(self, reports):
+        if not reports or self._listener is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # Called outside the loop (a quote from synchronous code)
+            self._listener(reports)
+            return
+        if self.latency:
+            loop.call_later(self.latency, self._listener, reports)
+        else:
+            loop.call_soon(self._listener, reports)
+
+    def _book(self, symbol):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = _Book()
+        return book
+
+    def _fill(self, order, quantity, price, reports):
+        order.filled += quantity
+        reports.append(report('fill', order.client_id, quantity, price, self.fee_rate * quantity * price,
+                              order.exchange_id))
+        if order.filled >= order.quantity - _EPSILON:
+            order.alive = False
+
+    def _match(self, book, order, reports):
+        """Fill an incoming order against resting orders and the quote, best price first."""
+        buy = order.side == 'BUY'
+        heap = book.asks if buy else book.bids
+        while order.quantity - order.filled > _EPSILON:
+            resting = book.best(heap)
+            outside = book.ask if buy else book.bid
+            if outside is not None and (book.ask_size if buy else book.bid_size) <= _EPSILON:
+                outside = None
+            candidates = [price for price in (resting.price if resting else None, outside) if price is not None]
+            if not candidates:
+                break
+            price = min(candidates) if buy else max(candidates)
+            if order.price is not None and (price > order.price if buy else price < order.price):
+                break
+            wanted = order.quantity - order.filled
+            if resting is not None and resting.price == price:
+                quantity = min(wanted, resting.quantity - resting.filled)
+                self._fill(resting, quantity, price, reports)
+            else:
+                quantity = min(wanted, book.ask_size if buy else book.bid_size)
+                if buy:
+                    book.ask_size -= quantity
+                else:
+                    book.bid_size -= quantity
+            self._fill(order, quantity, price, reports)
+
+    def _rest(self, book, order):
+        if order.price is None:
+            return
+        key = -order.price if order.side == 'BUY' else order.price
+        heapq.heappush(book.bids if order.side == 'BUY' else book.asks, (key, next(self._sequence), order))
+
+    def _finish_incoming(self, book, order, reports):
+        if order.quantity - order.filled <= _EPSILON:
+            order.alive = False
+        elif order.price is None:
+            order.alive = False
+            reports.append(report('cancelled', order.client_id, exchange_id=order.exchange_id, reason='no liquidity'))
+        else:
+            self._rest(book, order)
+
+    async def submit_orders(self, requests):
+        reports = []
+        for request in requests:
+            client_id = request.client_id
+            if client_id in self.orders:
+                reports.append(report('rejected', client_id, reason='duplicate client order id'))
+                continue
+            if request.side not in SIDES or not request.quantity > 0 or (request.price is not None and
+                                                                          not request.price > 0):
+                reports.append(report('rejected', client_id, reason='invalid order'))
+                continue
+            order = _Resting(client_id, request.symbol, request.side, request.price, request.quantity,
+                             f"X{next(self._exchange_ids)}")
+            self.orders[client_id] = order
+            reports.append(report('ack', client_id, exchange_id=order.exchange_id))
+            book = self._book(request.symbol)
+            self._match(book, order, reports)
+            self._finish_incoming(book, order, reports)
+        self._deliver(reports)
+
+    async def cancel_orders(self, client_ids):
+        reports = []
+        for client_id in client_ids:
+            order = self.orders.get(client_id)
+            if order is None:
+                reports.append(report('cancel_rejected', client_id, reason='unknown order'))
+            elif not order.alive:
+                reports.append(report('cancel_rejected', client_id, reason='order is no longer working'))
+            else:
+                order.alive = False
+                reports.append(report('cancelled', client_id, exchange_id=order.exchange_id, reason='cancelled'))
+        self._deliver(reports)
+
+    async def replace_orders(self, replacements):
+        """Keeps time priority when only the quantity goes down; otherwise the order re-queues (and may match)."""
+        reports = []
+        for client_id, quantity, price in replacements:
+            order = self.orders.get(client_id)
+            if order is None or not order.alive:
+                reports.append(report('replace_rejected', client_id,
+                                      reason='unknown order' if order is None else 'order is no longer working'))
+                continue
+            if quantity <= order.filled + _EPSILON:
+                reports.append(report('replace_rejected', client_id, reason='quantity not above the filled amount'))
+                continue
+            reports.append(report('replaced', client_id, quantity, price, exchange_id=order.exchange_id))
+            if price == order.price and quantity <= order.quantity:
+                order.quantity = quantity
+                continue
+            order.alive = False
+            replacement = _Resting(client_id, order.symbol, order.side, price, quantity, order.exchange_id)
+            replacement.filled = order.filled
+            self.orders[client_id] = replacement
+            book = self.books[order.symbol]
+            self._match(book, replacement, reports)
+            self._finish_incoming(book, replacement, reports)
+        self._deliver(reports)
+
+    async def open_orders(self):
+        return [client_id for client_id, order in self.orders.items() if order.alive]
+
+    def quote(self, symbol, bid, ask, bid_size=float('inf'), ask_size=float('inf')):
+        """Set the outside bid and ask; resting orders that now cross them fill."""
+        book = self._book(symbol)
+        book.bid, book.ask, book.bid_size, book.ask_size = bid, ask, bid_size, ask_size
+        reports = []
+        for heap, buy in ((book.bids, True), (book.asks, False)):
+            while True:
+                order = book.best(heap)
+                outside = book.ask if buy else book.bid
+                size = book.ask_size if buy else book.bid_size
+                if order is None or outside is None or size <= _EPSILON or \
+                        (order.price < outside if buy else order.price > outside):
+                    break
+                quantity = min(order.quantity - order.filled, size)
+                if buy:
+                    book.ask_size -= quantity
+                else:
+                    book.bid_size -= quantity
+                self._fill(order, quantity, outside, reports)
+        self._deliver(reports)
+
+
+class BlockingOrderManager:
+    """OrderManager for synchronous code: the event loop runs only inside these calls."""
+
+    def __init__(self, exchange, **options):
+        self.loop = asyncio.new_event_loop()
+        self.manager = self.loop.run_until_complete(self._create(exchange, options))
+
+    @staticmethod
+    async def _create(exchange, options):
+        return OrderManager(exchange, **options)
+
+    def submit(self, symbol, side, quantity, price=None, client_id=None, wait=True, timeout=None):
+        """Submit an order; with ``wait`` return once it is filled, cancelled or rejected
+        (or ``timeout`` seconds pass) instead of as soon as it is sent."""
+        order = self.manager.submit(symbol, side, quantity, price, client_id)
+        self.run(order.wait() if wait else self.manager.drain(), timeout)
+        return order
+
+    def cancel(self, client_id, timeout=None):
+        order = self.manager.cancel(client_id)
+        self.run(order.wait(), timeout)
+        return order
+
+    def reconcile(self, timeout=None):
+        """See ``OrderManager.reconcile``; returns the client IDs of the orders it closed."""
+        return self.run(self.manager.reconcile(), timeout) or []
+
+    def run(self, awaitable, timeout=None):
+        """Run the loop until ``awaitable`` completes (or ``timeout`` seconds pass)."""
+        if timeout is not None:
+            awaitable = asyncio.wait_for(awaitable, timeout)
+        try:
+            return self.loop.run_until_complete(awaitable)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.loop.run_until_complete(self.manager.close())
+        self.loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect an order journal")
+    parser.add_argument('journal')
+    parser.add_argument('--open', action='store_true', help="Only orders that are still working")
+    parser.add_argument('--compact', action='store_true', help="Drop finished orders from the journal first")
+    args = parser.parse_args()
+    if args.compact:
+        kept, dropped = compact_journal(args.journal)
+        print(f"Compacted journal: kept {kept} working orders, dropped {dropped} finished")
+    orders, stale = replay_journal(args.journal)
+    frame = status_frame(orders)
+    if args.open:
+        frame = frame[~frame['state'].isin(TERMINAL_STATES)]
+    print(frame.to_string(index=False))
+    counts = frame['state'].value_counts()
+    print(', '.join(f"{state}: {count}" for state, count in counts.items()) + (f", stale lines: {stale}" if stale else ''))
+
+
+if __name__ == '__main__':
+    main()
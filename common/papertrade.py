@@ -0,0 +1,803 @@
+"""Paper-trading daemon for the per-bar decision functions.
+
+Several strategies already keep their trading rules in a pure function of
+one bar's ``market_data`` dict (``scalping_decision``,
+``day_trading_decision``, ...). ``PaperDaemon`` hosts any number of them in
+one long-running process and feeds them live bars:
+
+    python -m common.papertrade run scalping day_trading swing_trading --feed tcp://127.0.0.1:9100
+    python -m common.papertrade run scalping@BANKNIFTY --feed csv:live_bars.csv
+    python -m common.papertrade status
+
+Per bar, every indicator the hosted strategies need is advanced once with
+the streaming classes of ``common.indicators`` (shared between strategies
+that ask for the same one), the strategy's ``market_data`` dict is built
+from those values and its decision function is called; the paper position
+is then opened or closed at the bar's close. No history is kept or
+recomputed, so the cost of a bar does not grow with the length of the run.
+
+Feeds (``--feed``):
+
+    tcp://HOST:PORT     listen for newline-delimited JSON bars
+    csv:PATH            follow a CSV file that another process appends to
+    replay:PATH         read a CSV file once (backfill or testing)
+
+A bar has ``time``, ``open``, ``high``, ``low``, ``close`` and ``Volume``
+(``volume`` is accepted too), plus an optional ``symbol``. Strategies are
+bound to one symbol (``name@SYMBOL``; bars without a symbol are
+``DEFAULT_SYMBOL``).
+
+The state of every strategy (position, balance, closed trades) and of every
+indicator is checkpointed to one pickle, at most every
+``checkpoint_interval`` seconds and on shutdown. A restarted daemon resumes
+from it and ignores bars at or before the last one it processed, so a feed
+can be replayed from its start without double counting. A strategy or
+indicator that is not in the checkpoint starts cold and warms up on live bars.
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import math
+import os
+import pickle
+import re
+import signal
+import socket
+import sys
+import time
+
+import pandas as pd
+
+from common import launcher
+from common.indicators import (StreamingATR, StreamingBBANDS, StreamingEMA, StreamingMACD, StreamingRSI,
+                               StreamingSMA, StreamingSTOCH)
+from common.ledger import TradeLedger
+
+STATE_DIR = os.path.join(launcher.REPO_ROOT, '.papertrade')
+DEFAULT_CHECKPOINT = os.path.join(STATE_DIR, 'checkpoint.pkl')
+DEFAULT_LOG = os.path.join(STATE_DIR, 'paper_trades.log')
+DEFAULT_SYMBOL = 'default'
+CHECKPOINT_VERSION = 1
+
+# Indicator kind -> (streaming class, inputs). An indicator spec is a tuple
+# (kind, source, *parameters): source is a bar field or another spec, and is
+# 'hlc' for the kinds that read high, low and close.
+INDICATOR_KINDS = {
+    'SMA': (StreamingSMA, 1),
+    'EMA': (StreamingEMA, 1),
+    'RSI': (StreamingRSI, 1),
+    'MACD': (StreamingMACD, 1),
+    'BBANDS': (StreamingBBANDS, 1),
+    'ATR': (StreamingATR, 3),
+    'STOCH': (StreamingSTOCH, 3),
+}
+
+PAPER_TRADE_COLUMNS = {
+    'entry_time': 'time',
+    'exit_time': 'time',
+    'side': 'category',
+    'entry_price': 'float',
+    'exit_price': 'float',
+    'reason': 'category',
+    'profit': 'float'
+}
+
+
+class _NullWriter:
+    """Swallows the decision functions' debug prints."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+_NULL = _NullWriter()
+
+
+class IndicatorBank:
+    """Streaming indicators of one symbol, each advanced once per bar."""
+
+    def __init__(self):
+        self.indicators = {}
+        self._plan = []
+
+    def require(self, specs):
+        """Add indicators (and the indicators they are computed from)."""
+        for spec in specs:
+            self._add(tuple(spec))
+
+    def _add(self, spec):
+        if spec in self.indicators:
+            return
+        kind, source, *params = spec
+        if kind not in INDICATOR_KINDS:
+            raise ValueError(f"Unknown indicator '{kind}'; known: {', '.join(INDICATOR_KINDS)}")
+        cls, n_inputs = INDICATOR_KINDS[kind]
+        if n_inputs == 3:
+            inputs = ('high', 'low', 'close')
+        else:
+            if isinstance(source, tuple):
+                self._add(source)
+                if self.indicators[source].n_outputs != 1:
+                    raise ValueError(f"Cannot feed the {source[0]} outputs into another indicator")
+            inputs = (source,)
+        indicator = cls(*params)
+        self.indicators[spec] = indicator
+        self._plan.append((spec, indicator, inputs))
+
+    def adopt(self, saved):
+        """Take over the warmed-up indicators of a checkpointed bank where the specs match."""
+        for position, (spec, _, inputs) in enumerate(self._plan):
+            if spec in saved.indicators:
+                self.indicators[spec] = saved.indicators[spec]
+                self._plan[position] = (spec, saved.indicators[spec], inputs)
+
+    def update(self, bar):
+        """Advance every indicator with one bar; returns {spec: value or tuple of values}."""
+        values = {}
+        for spec, indicator, inputs in self._plan:
+            if len(inputs) == 1:
+                source = inputs[0]
+                values[spec] = indicator.update(values[source] if isinstance(source, tuple) else bar[source])
+            else:
+                values[spec] = indicator.update(bar['high'], bar['low'], bar['close'])
+        return values
+
+
+def _ready(*values):
+    for value in values:
+        if math.isnan(value):
+            return False
+    return True
+
+
+_modules = {}
+
+
+def load_strategy_module(script):
+    """Import a strategy script with its own folder's ``config`` module.
+
+    Every strategy folder has a module named ``config``; each script is
+    imported with its folder first on the path and a fresh ``config``, so
+    scripts loaded side by side keep their own settings.
+    """
+    if script in _modules:
+        return _modules[script]
+    path = os.path.join(launcher.REPO_ROOT, script)
+    folder = os.path.dirname(path)
+    name = 'papertrade_' + re.sub(r'\W', '_', os.path.splitext(script)[0])
+    saved_config = sys.modules.pop('config', None)
+    sys.path.insert(0, folder)
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(folder)
+        sys.modules.pop('config', None)
+        if saved_config is not None:
+            sys.modules['config'] = saved_config
+    _modules[script] = module
+    return module
+
+
+class PaperStrategy:
+    """A decision function hosted by the daemon, with its paper position.
+
+    Subclasses name the launcher entry of their script and the decision
+    function, list the indicators they need, build ``market_data`` from a
+    bar and the indicator values, and translate the function's answer into
+    'BUY', 'SELL', 'EXIT' or 'HOLD'. Fills are at the bar's close; stop and
+    target (in percent of the entry) are checked on the close, as in the
+    batch loops, and only for strategies whose batch loop uses them.
+    """
+
+    key = None
+    decision = None
+
+    def __init__(self, name=None, symbol=DEFAULT_SYMBOL):
+        self.name = name or (self.key if symbol == DEFAULT_SYMBOL else f"{self.key}@{symbol}")
+        self.symbol = symbol
+        self.module = load_strategy_module(launcher.STRATEGIES[self.key][0])
+        self.decide = getattr(self.module, self.decision)
+        self.stop_pct, self.target_pct, self.cooldown = None, None, 0
+        self.configure()
+        self.state = {
+            'position': None,
+            'entry_price': None,
+            'entry_time': None,
+            'stop_loss': None,
+            'target_profit': None,
+            'size': 1.0,
+            'balance': float(self.initial_balance),
+            'cooldown': 0,
+            'bars': 0,
+            'last_time': None
+        }
+        self.trades = TradeLedger(PAPER_TRADE_COLUMNS)
+
+    def configure(self):
+        """Read balance, stop / target and cooldown from the strategy's config."""
+        self.initial_balance = 10000
+
+    def indicators(self):
+        return []
+
+    def market_data(self, bar, values):
+        """The decision function's input for this bar, or None while indicators warm up."""
+        raise NotImplementedError
+
+    def signal(self, market_data):
+        raise NotImplementedError
+
+    def position_size(self, price):
+        return 1.0
+
+    def trade_profit(self, side, entry_price, exit_price, size):
+        return (exit_price - entry_price if side == 'BUY' else entry_price - exit_price) * size
+
+    def on_bar(self, bar, values):
+        """Advance the paper position by one bar; returns the messages to log."""
+        market_data = self.market_data(bar, values)
+        if market_data is None:
+            return ()
+        state = self.state
+        state['bars'] += 1
+        state['last_time'] = bar['time']
+        if state['cooldown']:
+            state['cooldown'] -= 1
+            return ()
+
+        price = bar['close']
+        decision = self.signal(market_data)
+        side = state['position']
+        if side is None:
+            if decision in ('BUY', 'SELL'):
+                return (self.open(side=decision, price=price, bar=bar),)
+            return ()
+
+        reason = None
+        if self.stop_pct is not None:
+            if (price <= state['stop_loss']) if side == 'BUY' else (price >= state['stop_loss']):
+                reason = 'Stop Loss'
+            elif (price >= state['target_profit']) if side == 'BUY' else (price <= state['target_profit']):
+                reason = 'Target Profit'
+        if reason is None and decision == 'EXIT':
+            reason = 'Signal'
+        if reason is None:
+            return ()
+        return (self.close(price, bar, reason),)
+
+    def open(self, side, price, bar):
+        state = self.state
+        state.update(position=side, entry_price=price, entry_time=bar['time'], size=self.position_size(price))
+        direction = 1 if side == 'BUY' else -1
+        if self.stop_pct is not None:
+            state['stop_loss'] = price * (1 - direction * self.stop_pct / 100)
+            state['target_profit'] = price * (1 + direction * self.target_pct / 100)
+        return f"{side} at {price:.2f}"
+
+    def close(self, price, bar, reason):
+        state = self.state
+        profit = self.trade_profit(state['position'], state['entry_price'], price, state['size'])
+        state['balance'] += profit
+        self.trades.append(entry_time=pd.Timestamp(state['entry_time']), exit_time=pd.Timestamp(bar['time']),
+                           side=state['position'], entry_price=state['entry_price'], exit_price=price,
+                           reason=reason, profit=profit)
+        message = (f"EXIT {state['position']} at {price:.2f} ({reason}), Profit: {profit:.2f}, "
+                   f"Balance: {state['balance']:.2f}")
+        state.update(position=None, entry_price=None, entry_time=None, stop_loss=None, target_profit=None,
+                     size=1.0, cooldown=self.cooldown)
+        return message
+
+    def checkpoint(self):
+        return {'class': type(self).__name__, 'state': self.state, 'trades': self.trades}
+
+    def restore(self, saved):
+        self.state.update(saved['state'])
+        self.trades = saved['trades']
+
+
+class ScalpingPaper(PaperStrategy):
+    key = 'scalping'
+    decision = 'scalping_decision'
+    RSI, MACD, STOCH = ('RSI', 'close', 14), ('MACD', 'close', 12, 26, 9), ('STOCH', 'hlc', 14, 3, 3)
+
+    def configure(self):
+        config = self.module.config
+        self.initial_balance = config.INITIAL_BALANCE
+        self.stop_pct, self.target_pct = config.STOP_LOSS_PERCENT, config.TARGET_PROFIT_PERCENT
+        self.cooldown = config.COOLDOWN_PERIODS
+
+    def indicators(self):
+        return [self.RSI, self.MACD, self.STOCH]
+
+    def market_data(self, bar, values):
+        rsi = values[self.RSI]
+        macd, macd_signal, _ = values[self.MACD]
+        k_percent, d_percent = values[self.STOCH]
+        if not _ready(rsi, macd, k_percent):
+            return None
+        return {
+            "bid_price": bar['close'],
+            "ask_price": bar['close'],
+            "volume": bar['Volume'],
+            "rsi": rsi,
+            "macd": macd,
+            "signal": macd_signal,
+            "k_percent": k_percent,
+            "d_percent": d_percent,
+            "timestamp": bar['timestamp']
+        }
+
+    def signal(self, market_data):
+        # The batch loop names positions "Buy" / "Sell"
+        position = self.state['position']
+        return self.decide(market_data, position.capitalize() if position else None).upper()
+
+
+class DayTradingPaper(PaperStrategy):
+    key = 'day_trading'
+    decision = 'day_trading_decision'
+
+    def configure(self):
+        config = self.module.CONFIG
+        self.initial_balance = config['initial_balance']
+        self.stop_pct, self.target_pct = config['stop_loss_pct'], config['target_profit_pct']
+        self.rsi = ('RSI', 'close', config['rsi_period'])
+        self.rsi_ma = ('SMA', self.rsi, config['rsi_period'])
+        self.volume_ma = ('SMA', 'Volume', config['volume_ma_period'])
+        self.macd = ('MACD', 'close', config['macd_fast'], config['macd_slow'], config['macd_signal'])
+        self.bbands = ('BBANDS', 'close', config['bb_period'], config['bb_dev'], config['bb_dev'])
+        self.stoch = ('STOCH', 'hlc', config['stoch_k'], 3, config['stoch_d'])
+        self.vwap_turnover = ('SMA', 'turnover', config['vwap_period'])
+        self.vwap_volume = ('SMA', 'Volume', config['vwap_period'])
+
+    def indicators(self):
+        return [self.rsi, self.rsi_ma, self.volume_ma, self.macd, self.bbands, self.stoch,
+                self.vwap_turnover, self.vwap_volume]
+
+    def market_data(self, bar, values):
+        rsi, rsi_ma, volume_ma = values[self.rsi], values[self.rsi_ma], values[self.volume_ma]
+        macd, macd_signal, _ = values[self.macd]
+        upper, _, lower = values[self.bbands]
+        k_percent, d_percent = values[self.stoch]
+        vwap_volume = values[self.vwap_volume]
+        # Like the batch loop, decide from the first bar: NaN indicators fail every comparison
+        return {
+            "bid_price": bar['close'],
+            "ask_price": bar['close'],
+            "volume": bar['Volume'],
+            "volume_ma": volume_ma,
+            "buy_orders": bar['Volume'],
+            "sell_orders": bar['Volume'],
+            "rsi": rsi,
+            "rsi_ma": rsi_ma,
+            "macd": macd,
+            "signal": macd_signal,
+            "upper_band": upper,
+            "lower_band": lower,
+            "vwap": values[self.vwap_turnover] / vwap_volume if vwap_volume != 0 else float('nan'),
+            "k_percent": k_percent,
+            "d_percent": d_percent,
+            "timestamp": bar['timestamp']
+        }
+
+    def signal(self, market_data):
+        return self.decide(market_data, self.state['position'])[0]
+
+
+class SwingTradingPaper(PaperStrategy):
+    key = 'swing_trading'
+    decision = 'swing_trading_decision'
+    RSI, MACD = ('RSI', 'close', 14), ('MACD', 'close', 12, 26, 9)
+    BBANDS, VOLUME_MA = ('BBANDS', 'close', 20, 2, 2), ('SMA', 'Volume', 20)
+
+    def configure(self):
+        # The batch loop computes a stop and target but never exits on them
+        self.initial_balance = self.module.config.INITIAL_BALANCE
+
+    def indicators(self):
+        return [self.RSI, self.MACD, self.BBANDS, self.VOLUME_MA]
+
+    def market_data(self, bar, values):
+        rsi = values[self.RSI]
+        macd, macd_signal, _ = values[self.MACD]
+        upper, middle, lower = values[self.BBANDS]
+        if not _ready(rsi, macd, upper):
+            return None
+        return {
+            "close_price": bar['close'],
+            "volume": bar['Volume'],
+            "volume_ma": values[self.VOLUME_MA],
+            "rsi": rsi,
+            "macd": macd,
+            "signal": macd_signal,
+            "upper_band": upper,
+            "lower_band": lower,
+            "middle_band": middle,
+            "timestamp": bar['timestamp'],
+        }
+
+    def signal(self, market_data):
+        entry_price = self.state['entry_price'] or 0.0
+        return self.decide(market_data, self.state['position'], entry_price)[0]
+
+
+class MeanReversionPaper(PaperStrategy):
+    key = 'mean_reversion'
+    decision = 'advanced_mean_reversion_decision'
+    SMA_50, SMA_200, RSI = ('SMA', 'close', 50), ('SMA', 'close', 200), ('RSI', 'close', 14)
+    VOLUME_MA, BBANDS = ('SMA', 'Volume', 20), ('BBANDS', 'close', 20, 2.5, 2.5)
+
+    def configure(self):
+        config = self.module.config
+        self.initial_balance = config['initial_balance']
+        self.allocation = config['trade_allocation']
+
+    def indicators(self):
+        return [self.SMA_50, self.SMA_200, self.RSI, self.VOLUME_MA, self.BBANDS]
+
+    def market_data(self, bar, values):
+        upper, _, lower = values[self.BBANDS]
+        # No warm-up gate, as in the batch loop (NaN indicators fail every comparison)
+        return {
+            "close": bar['close'],
+            "volume": bar['Volume'],
+            "rsi": values[self.RSI],
+            "sma_50": values[self.SMA_50],
+            "sma_200": values[self.SMA_200],
+            "volume_ma": values[self.VOLUME_MA],
+            "upper_bb": upper,
+            "lower_bb": lower,
+            "time": bar['timestamp']
+        }
+
+    def signal(self, market_data):
+        state = self.state
+        position = None if state['position'] is None else {'type': state['position'],
+                                                           'entry_price': state['entry_price']}
+        return self.decide(market_data, position)[0]
+
+    def position_size(self, price):
+        return self.state['balance'] * self.allocation
+
+    def trade_profit(self, side, entry_price, exit_price, size):
+        # Same formula as the batch loop: the trade size is converted at the exit price
+        return super().trade_profit(side, entry_price, exit_price, size / exit_price)
+
+
+class GammaScalpingPaper(PaperStrategy):
+    """Long gamma with a delta hedge; the P&L model is the batch loop's."""
+
+    key = 'gamma_scalping'
+    decision = 'gamma_scalping_decision'
+    RSI, BBANDS = ('RSI', 'close', 14), ('BBANDS', 'close', 20, 2, 2)
+
+    def configure(self):
+        config = self.module.config
+        self.initial_balance = config.INITIAL_BALANCE
+        self.risk_per_trade = config.RISK_PER_TRADE
+        self.multiplier = config.GAMMA_POSITION_MULTIPLIER
+        self.lookback = config.MIN_LOOKBACK
+
+    def indicators(self):
+        return [self.RSI, self.BBANDS]
+
+    def market_data(self, bar, values):
+        # Session VWAP from the first bar the daemon saw, like the batch loop's cumulative sum
+        state = self.state
+        state['turnover_sum'] = state.get('turnover_sum', 0.0) + bar['turnover']
+        state['volume_sum'] = state.get('volume_sum', 0.0) + bar['Volume']
+        state['seen'] = state.get('seen', 0) + 1
+        if state['seen'] <= self.lookback or not state['volume_sum']:
+            return None
+        rsi = values[self.RSI]
+        upper, _, lower = values[self.BBANDS]
+        price = bar['close']
+        vwap = state['turnover_sum'] / state['volume_sum']
+        return {
+            "price": price,
+            "volume": bar['Volume'],
+            "delta": 0.5 + (rsi - 50) / 100,
+            "gamma": 0.05 * math.exp(-(price - vwap) ** 2 / (100 ** 2)),
+            "vega": abs(upper - lower) / price,
+            "timestamp": bar['timestamp'],
+            "vwap": vwap,
+            "upper_band": upper,
+            "lower_band": lower
+        }
+
+    def on_bar(self, bar, values):
+        market_data = self.market_data(bar, values)
+        if market_data is None:
+            return ()
+        state = self.state
+        state['bars'] += 1
+        state['last_time'] = bar['time']
+        hedge_ratio = state.get('hedge_ratio', 0.0)
+        decision, hedge_adjust = self.decide(market_data, state['position'], hedge_ratio, state['entry_price'])
+        price = market_data['price']
+
+        if state['position'] is not None:
+            if decision == 'Exit':
+                price_change = price - state['entry_price']
+                total_pnl = (price_change * market_data['gamma'] * self.multiplier - hedge_ratio * price_change)
+                total_pnl *= (self.initial_balance * self.risk_per_trade) / (price * market_data['gamma'])
+                state['hedge_ratio'] = 0.0
+                state['size'] = total_pnl
+                return (self.close(price, bar, 'Signal'),)
+            if decision == 'Adjust':
+                state['hedge_ratio'] = hedge_ratio + hedge_adjust
+                return (f"Adjusted hedge ratio from {hedge_ratio:.2f} to {state['hedge_ratio']:.2f}",)
+        elif decision == 'Buy':
+            state['hedge_ratio'] = hedge_adjust
+            self.open('BUY', price, bar)
+            return (f"Opened gamma scalping position at {price:.2f}, hedge ratio {hedge_adjust:.2f}",)
+        return ()
+
+    def trade_profit(self, side, entry_price, exit_price, size):
+        # ``size`` carries the P&L worked out in on_bar
+        return size
+
+
+PAPER_STRATEGIES = {cls.key: cls for cls in (ScalpingPaper, DayTradingPaper, SwingTradingPaper,
+                                             MeanReversionPaper, GammaScalpingPaper)}
+
+
+def create_strategy(spec):
+    """Strategy from 'name' or 'name@SYMBOL'."""
+    key, _, symbol = spec.partition('@')
+    if key not in PAPER_STRATEGIES:
+        raise ValueError(f"No paper-trading adapter for '{key}'; available: {', '.join(sorted(PAPER_STRATEGIES))}")
+    return PAPER_STRATEGIES[key](symbol=symbol or DEFAULT_SYMBOL)
+
+
+class PaperDaemon:
+    """Dispatches bars to hosted strategies and checkpoints their state."""
+
+    def __init__(self, strategies, checkpoint=DEFAULT_CHECKPOINT, checkpoint_interval=5.0, log_file=DEFAULT_LOG,
+                 quiet=True):
+        """``checkpoint`` / ``log_file`` may be None to disable them; ``quiet`` hides
+        the decision functions' own prints."""
+        self.strategies = list(strategies)
+        names = [strategy.name for strategy in self.strategies]
+        if len(set(names)) != len(names):
+            raise ValueError("Hosted strategies need unique names")
+        self.banks = {}
+        self.routes = {}
+        for strategy in self.strategies:
+            self.banks.setdefault(strategy.symbol, IndicatorBank()).require(strategy.indicators())
+            self.routes.setdefault(strategy.symbol, []).append(strategy)
+        self.last_time = {}
+        self.checkpoint_file = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.quiet = quiet
+        self.bars = 0
+        self.busy = 0.0
+        self.slowest = 0.0
+        self._last_checkpoint = time.monotonic()
+        self._log = None
+        if log_file:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            self._log = open(log_file, 'a', encoding='utf-8')
+        if checkpoint and os.path.exists(checkpoint):
+            self.restore()
+
+    def log(self, message):
+        if self._log is not None:
+            self._log.write(f"{pd.Timestamp.now()} - {message}\n")
+            self._log.flush()
+        print(message)
+
+    def on_bar(self, bar):
+        """Process one bar; returns False if it was at or before the last bar of its symbol."""
+        started = time.perf_counter()
+        symbol = bar.get('symbol', DEFAULT_SYMBOL)
+        timestamp = bar['time'] if isinstance(bar['time'], pd.Timestamp) else pd.Timestamp(bar['time'])
+        stamp = timestamp.value
+        if stamp <= self.last_time.get(symbol, -1 << 63):
+            return False
+        bank = self.banks.get(symbol)
+        if bank is None:
+            return False
+        volume = float(bar['Volume'] if 'Volume' in bar else bar['volume'])
+        close = float(bar['close'])
+        bar = {'time': stamp, 'timestamp': timestamp, 'open': float(bar['open']), 'high': float(bar['high']),
+               'low': float(bar['low']), 'close': close, 'Volume': volume, 'turnover': close * volume}
+
+        values = bank.update(bar)
+        events = []
+        stdout = sys.stdout
+        if self.quiet:
+            sys.stdout = _NULL
+        try:
+            for strategy in self.routes[symbol]:
+                for message in strategy.on_bar(bar, values):
+                    events.append((strategy.name, message))
+        finally:
+            sys.stdout = stdout
+        self.last_time[symbol] = stamp
+        self.bars += 1
+
+        elapsed = time.perf_counter() - started
+        self.busy += elapsed
+        self.slowest = max(self.slowest, elapsed)
+        for name, message in events:
+            self.log(f"[{timestamp}] {name}: {message}")
+        if self.checkpoint_file and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+        return True
+
+    def run(self, bars):
+        """Process bars from a feed until it ends or the process is interrupted; checkpoints on exit."""
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+        try:
+            previous = signal.signal(signal.SIGTERM, stop)
+        except ValueError:  # Not the main thread
+            previous = None
+        try:
+            for bar in bars:
+                self.on_bar(bar)
+        except KeyboardInterrupt:
+            self.log("Stopping paper trading")
+        finally:
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+            if self.checkpoint_file:
+                self.save_checkpoint()
+            stats = self.stats()
+            self.log(f"Processed {stats['bars']} bars, {stats['mean_us']:.1f} us per bar on average, "
+                     f"slowest {stats['max_us']:.1f} us")
+
+    def stats(self):
+        return {
+            'bars': self.bars,
+            'mean_us': self.busy / self.bars * 1e6 if self.bars else 0.0,
+            'max_us': self.slowest * 1e6
+        }
+
+    def status(self):
+        """One row per strategy: symbol, position, entry, balance and trade count."""
+        return status_frame({strategy.name: strategy.checkpoint() for strategy in self.strategies},
+                            {strategy.name: strategy.symbol for strategy in self.strategies})
+
+    def save_checkpoint(self):
+        """Write the state of every strategy and indicator (atomically)."""
+        payload = {
+            'version': CHECKPOINT_VERSION,
+            'saved_at': pd.Timestamp.now(),
+            'last_time': dict(self.last_time),
+            'banks': self.banks,
+            'strategies': {strategy.name: strategy.checkpoint() for strategy in self.strategies},
+            'symbols': {strategy.name: strategy.symbol for strategy in self.strategies}
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_file)), exist_ok=True)
+        with open(self.checkpoint_file + '.tmp', 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self.checkpoint_file + '.tmp', self.checkpoint_file)
+        self._last_checkpoint = time.monotonic()
+
+    def restore(self):
+        """Resume from the checkpoint file; strategies and indicators missing from it start cold."""
+        saved = read_checkpoint(self.checkpoint_file)
+        self.last_time.update({symbol: stamp for symbol, stamp in saved['last_time'].items() if symbol in self.banks})
+        for symbol, bank in self.banks.items():
+            if symbol in saved['banks']:
+                bank.adopt(saved['banks'][symbol])
+        resumed = []
+        for strategy in self.strategies:
+            entry = saved['strategies'].get(strategy.name)
+            if entry is not None and entry['class'] == type(strategy).__name__:
+                strategy.restore(entry)
+                resumed.append(strategy.name)
+        self.log(f"Resumed from {self.checkpoint_file} (saved {saved['saved_at']}): {', '.join(resumed) or 'no strategies'}")
+
+
+def read_checkpoint(path=DEFAULT_CHECKPOINT):
+    with open(path, 'rb') as f:
+        saved = pickle.load(f)
+    if saved.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} has version {saved.get('version')}, expected {CHECKPOINT_VERSION}")
+    return saved
+
+
+def status_frame(entries, symbols):
+    rows = []
+    for name, entry in entries.items():
+        state, trades = entry['state'], entry['trades']
+        profits = trades.column('profit') if len(trades) else []
+        rows.append({
+            'strategy': name,
+            'symbol': symbols.get(name, DEFAULT_SYMBOL),
+            'position': state['position'],
+            'entry_price': state['entry_price'],
+            'balance': state['balance'],
+            'trades': len(trades),
+            'wins': int(sum(1 for p in profits if p > 0)),
+            'bars': state['bars'],
+            'last_bar': pd.Timestamp(state['last_time']) if state['last_time'] is not None else None
+        })
+    return pd.DataFrame(rows)
+
+
+def csv_bars(path, follow=False, poll_interval=0.5):
+    """Bars from a CSV file with a header; with ``follow`` keep waiting for appended rows."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        header = next(csv.reader([f.readline()]))
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if line.endswith('\n'):
+                if line.strip():
+                    yield dict(zip(header, next(csv.reader([line]))))
+                continue
+            # End of file, or a row the writer has not finished yet
+            if not follow:
+                if line.strip():
+                    yield dict(zip(header, next(csv.reader([line]))))
+                return
+            f.seek(position)
+            time.sleep(poll_interval)
+
+
+def socket_bars(host='127.0.0.1', port=9100):
+    """Bars sent as newline-delimited JSON objects to a local TCP port, one client at a time."""
+    with socket.create_server((host, port)) as server:
+        while True:
+            connection, _ = server.accept()
+            with connection, connection.makefile('r', encoding='utf-8') as lines:
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def open_feed(spec, poll_interval=0.5):
+    """Bar iterator for a feed spec: tcp://HOST:PORT, csv:PATH or replay:PATH."""
+    if spec.startswith('tcp://'):
+        host, _, port = spec[len('tcp://'):].rpartition(':')
+        return socket_bars(host or '127.0.0.1', int(port))
+    if spec.startswith('csv:'):
+        return csv_bars(spec[len('csv:'):], follow=True, poll_interval=poll_interval)
+    if spec.startswith('replay:'):
+        return csv_bars(spec[len('replay:'):])
+    raise ValueError(f"Unknown feed '{spec}'; use tcp://HOST:PORT, csv:PATH or replay:PATH")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paper-trade strategies on live bars")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Show strategies that can be paper traded")
+    run_parser = commands.add_parser('run', help="Start the daemon")
+    run_parser.add_argument('strategies', nargs='+', help="Strategy names, optionally name@SYMBOL")
+    run_parser.add_argument('--feed', required=True, help="tcp://HOST:PORT, csv:PATH or replay:PATH")
+    run_parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    run_parser.add_argument('--checkpoint-interval', type=float, default=5.0, help="Seconds between checkpoints")
+    run_parser.add_argument('--log-file', default=DEFAULT_LOG)
+    run_parser.add_argument('--verbose', action='store_true', help="Show the decision functions' own prints")
+    status_parser = commands.add_parser('status', help="Show the state stored in a checkpoint")
+    status_parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for key in sorted(PAPER_STRATEGIES):
+            print(f"{key}: {launcher.STRATEGIES[key][0]} ({PAPER_STRATEGIES[key].decision})")
+    elif args.command == 'run':
+        daemon = PaperDaemon([create_strategy(spec) for spec in args.strategies], checkpoint=args.checkpoint,
+                             checkpoint_interval=args.checkpoint_interval, log_file=args.log_file,
+                             quiet=not args.verbose)
+        daemon.log(f"Paper trading {', '.join(s.name for s in daemon.strategies)} from {args.feed}")
+        daemon.run(open_feed(args.feed))
+        print(daemon.status().to_string(index=False))
+    elif args.command == 'status':
+        saved = read_checkpoint(args.checkpoint)
+        print(f"Saved {saved['saved_at']}")
+        print(status_frame(saved['strategies'], saved['symbols']).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+"""Firm-wide risk book shared by every strategy process.
+
+Each strategy enforces its own stop (70% of its balance, MAX_LOSS_PERCENT,
+MAX_DRAWDOWN_PCT, ``exit_strategy``); none of them sees what the others
+hold. ``RiskBook`` keeps the aggregate in one shared-memory block that any
+process can attach to by name:
+
+    python -m common.risk run firm --capital 1000000 --max-gross-leverage 2 --max-daily-loss 20000
+
+    book = risk.RiskBook('firm')                     # in a strategy process
+    approved, reason = book.submit('NIFTY', 50, 22150.0)
+    if approved:
+        ...send the order...
+        book.fill('NIFTY', 50, fill_price, fees=cost)   # or book.cancel(...)
+
+Counters are updated incrementally: a fill, cancel or price mark changes one
+symbol's row and adds the difference to the firm totals, so a pre-trade
+check reads a handful of numbers whatever the number of symbols or
+strategies. Totals kept:
+
+    cash           capital less the cost of every fill and its fees
+    net            sum of quantity * mark (equity = cash + net)
+    gross          sum of |quantity * mark|
+    exposure       gross counting open orders as if they all filled: per
+                   symbol the larger of |position + pending buys| and
+                   |position - pending sells|
+    pending        notional of open buy and sell orders
+
+``submit`` checks an order against the limits and, if it passes, reserves
+it as pending in the same locked step, so two processes cannot both use the
+last of a limit. Orders that only reduce a position are always accepted.
+Once the day's loss (equity against the equity at the start of the day)
+reaches ``max_daily_loss`` the book halts: new risk is rejected until the
+next local midnight or ``reset_day``.
+
+Updates take a thread lock and, for a named book, an ``fcntl`` lock on a
+file next to the block; a check costs a few microseconds.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pandas as pd
+
+from common.barbus import attach_block
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads are serialised
+    fcntl = None
+
+MAGIC = 0x4B4F4F424B534952  # Marks a block as a risk book
+VERSION = 1
+MAX_SYMBOLS = 512
+SYMBOL_BYTES = 32
+
+# Firm totals (float64 slots)
+CASH, NET, GROSS, EXPOSURE, PENDING_BUY, PENDING_SELL, DAY_START, NEXT_RESET, HALTED, CHECKS, REJECTS = range(11)
+TOTAL_SLOTS = 16
+
+# Limits (float64 slots, inf when off)
+LIMIT_NAMES = ('max_order_notional', 'max_symbol_notional', 'max_gross_exposure', 'max_gross_leverage',
+               'max_net_leverage', 'max_daily_loss')
+(MAX_ORDER, MAX_SYMBOL, MAX_GROSS, MAX_GROSS_LEVERAGE, MAX_NET_LEVERAGE, MAX_DAILY_LOSS) = range(len(LIMIT_NAMES))
+LIMIT_SLOTS = 8
+
+# Per-symbol row (float64 slots): quantities, last mark, and the row's share of the totals
+QTY, PENDING_BUY_QTY, PENDING_SELL_QTY, MARK, ROW_NET, ROW_GROSS, ROW_EXPOSURE, ROW_PENDING_BUY, \
+    ROW_PENDING_SELL = range(9)
+ROW_SLOTS = 10
+
+_HEADER_BYTES = 32  # magic, version, max_symbols, symbol_count (int64)
+_TOTALS_OFFSET = _HEADER_BYTES
+_LIMITS_OFFSET = _TOTALS_OFFSET + TOTAL_SLOTS * 8
+_ROWS_OFFSET = _LIMITS_OFFSET + LIMIT_SLOTS * 8
+_NAMES_OFFSET = _ROWS_OFFSET + MAX_SYMBOLS * ROW_SLOTS * 8
+BLOCK_SIZE = _NAMES_OFFSET + MAX_SYMBOLS * SYMBOL_BYTES
+
+INF = float('inf')
+
+
+def _next_midnight(now):
+    """Epoch seconds of the next local midnight after ``now``."""
+    day = time.localtime(now)
+    return time.mktime((day.tm_year, day.tm_mon, day.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+
+
+class RiskBook:
+    """Positions, exposure and daily P&L of every strategy, with pre-trade limits."""
+
+    def __init__(self, name=None, capital=None, create=False, **limits):
+        """Attach to the book ``name``; with ``create`` make it, starting from ``capital``.
+
+        ``name=None`` keeps a private book in this process. Limits (any of
+        ``LIMIT_NAMES``, None for no limit) are set by the creator and can be
+        changed later with ``set_limits``.
+        """
+        self.name = name
+        self.shm = None
+        if name is None or create:
+            if capital is None or capital <= 0:
+                raise ValueError("A new risk book needs a positive capital")
+            if name is None:
+                buffer = memoryview(bytearray(BLOCK_SIZE))
+            else:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=BLOCK_SIZE)
+                buffer = self.shm.buf
+        else:
+            if limits or capital is not None:
+                raise ValueError("Capital and limits are set when the book is created")
+            self.shm = attach_block(name)
+            buffer = self.shm.buf
+        self._buffer = buffer
+        self._header = buffer[:_HEADER_BYTES].cast('q')
+        self._totals = buffer[_TOTALS_OFFSET:_LIMITS_OFFSET].cast('d')
+        self._limits = buffer[_LIMITS_OFFSET:_ROWS_OFFSET].cast('d')
+        self._rows = buffer[_ROWS_OFFSET:_NAMES_OFFSET].cast('d')
+
+        self._thread_lock = threading.Lock()
+        self._lock_file = None
+        if name is not None and fcntl is not None:
+            self._lock_file = open(os.path.join(tempfile.gettempdir(), f"riskbook_{name}.lock"), 'w')
+        self._slots = {}
+
+        if name is None or create:
+            self._header[0], self._header[1], self._header[2], self._header[3] = MAGIC, VERSION, MAX_SYMBOLS, 0
+            self._totals[CASH] = float(capital)
+            for i in range(LIMIT_SLOTS):
+                self._limits[i] = INF
+            self.set_limits(**limits)
+            self.reset_day()
+        elif self._header[0] != MAGIC or self._header[1] != VERSION or self._header[2] != MAX_SYMBOLS:
+            self.close()
+            raise ValueError(f"Shared memory '{name}' is not a version {VERSION} risk book")
+
+    # Locking: threads first, then other processes
+
+    def _acquire(self):
+        self._thread_lock.acquire()
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    # Symbols
+
+    def _slot(self, symbol):
+        """Row index of ``symbol``, registering it on first use (call with the lock held)."""
+        slot = self._slots.get(symbol)
+        if slot is not None:
+            return slot
+        encoded = symbol.encode('utf-8')
+        if len(encoded) > SYMBOL_BYTES:
+            raise ValueError(f"Symbol '{symbol}' is longer than {SYMBOL_BYTES} bytes")
+        padded = encoded.ljust(SYMBOL_BYTES, b'\0')
+        count = self._header[3]
+        # Another process may have added it since this one last looked
+        for slot in range(count):
+            start = _NAMES_OFFSET + slot * SYMBOL_BYTES
+            if self._buffer[start:start + SYMBOL_BYTES] == padded:
+                self._slots[symbol] = slot
+                return slot
+        if count >= MAX_SYMBOLS:
+            raise ValueError(f"Risk book '{self.name}' already tracks {MAX_SYMBOLS} symbols")
+        start = _NAMES_OFFSET + count * SYMBOL_BYTES
+        self._buffer[start:start + SYMBOL_BYTES] = padded
+        self._header[3] = count + 1
+        self._slots[symbol] = count
+        return count
+
+    def symbols(self):
+        names = []
+        for slot in range(self._header[3]):
+            start = _NAMES_OFFSET + slot * SYMBOL_BYTES
+            names.append(bytes(self._buffer[start:start + SYMBOL_BYTES]).rstrip(b'\0').decode('utf-8'))
+        return names
+
+    def _revalue(self, base):
+        """Recompute one row's share of the totals from its quantities and mark."""
+        rows, totals = self._rows, self._totals
+        mark = rows[base + MARK]
+        net = rows[base + QTY] * mark
+        pending_buy = rows[base + PENDING_BUY_QTY] * mark
+        pending_sell = rows[base + PENDING_SELL_QTY] * mark
+        gross = abs(net)
+        exposure = max(abs(net + pending_buy), abs(net - pending_sell))
+        totals[NET] += net - rows[base + ROW_NET]
+        totals[GROSS] += gross - rows[base + ROW_GROSS]
+        totals[EXPOSURE] += exposure - rows[base + ROW_EXPOSURE]
+        totals[PENDING_BUY] += pending_buy - rows[base + ROW_PENDING_BUY]
+        totals[PENDING_SELL] += pending_sell - rows[base + ROW_PENDING_SELL]
+        rows[base + ROW_NET], rows[base + ROW_GROSS], rows[base + ROW_EXPOSURE] = net, gross, exposure
+        rows[base + ROW_PENDING_BUY], rows[base + ROW_PENDING_SELL] = pending_buy, pending_sell
+
+    def _roll_day(self):
+        """Start a new day at local midnight, and halt once the day's loss reaches the limit."""
+        totals = self._totals
+        equity = totals[CASH] + totals[NET]
+        if time.time() >= totals[NEXT_RESET]:
+            totals[DAY_START] = equity
+            totals[NEXT_RESET] = _next_midnight(time.time())
+            totals[HALTED] = 0.0
+        elif not totals[HALTED] and totals[DAY_START] - equity >= self._limits[MAX_DAILY_LOSS]:
+            totals[HALTED] = 1.0
+        return equity
+
+    # Pre-trade checks
+
+    def _check(self, base, quantity, price):
+        """Reason the order breaks a limit, or None; ``price`` is already the row's mark."""
+        rows, totals, limits = self._rows, self._totals, self._limits
+        equity = self._roll_day()
+        position = rows[base + QTY]
+        if quantity * position < 0 and abs(quantity) <= abs(position) - (
+                rows[base + PENDING_SELL_QTY] if position > 0 else rows[base + PENDING_BUY_QTY]):
+            return None  # Only reduces a position, even with the orders already working against it
+        if totals[HALTED]:
+            return f"daily loss limit reached ({totals[DAY_START] - equity:.2f})"
+        notional = abs(quantity) * price
+        if notional > limits[MAX_ORDER]:
+            return f"order notional {notional:.2f} above {limits[MAX_ORDER]:.2f}"
+
+        net = position * price
+        pending_buy = rows[base + PENDING_BUY_QTY] * price
+        pending_sell = rows[base + PENDING_SELL_QTY] * price
+        if quantity > 0:
+            pending_buy += notional
+            net_worst = totals[NET] + totals[PENDING_BUY] + notional
+        else:
+            pending_sell += notional
+            net_worst = totals[NET] - totals[PENDING_SELL] - notional
+        exposure = max(abs(net + pending_buy), abs(net - pending_sell))
+        if exposure > limits[MAX_SYMBOL]:
+            return f"symbol exposure {exposure:.2f} above {limits[MAX_SYMBOL]:.2f}"
+        gross = totals[EXPOSURE] - rows[base + ROW_EXPOSURE] + exposure
+        if gross > limits[MAX_GROSS]:
+            return f"gross exposure {gross:.2f} above {limits[MAX_GROSS]:.2f}"
+        if equity <= 0:
+            return "no equity left"
+        if gross > limits[MAX_GROSS_LEVERAGE] * equity:
+            return f"gross leverage {gross / equity:.2f} above {limits[MAX_GROSS_LEVERAGE]:.2f}"
+        if abs(net_worst) > limits[MAX_NET_LEVERAGE] * equity:
+            return f"net leverage {abs(net_worst) / equity:.2f} above {limits[MAX_NET_LEVERAGE]:.2f}"
+        return None
+
+    def _mark_row(self, symbol, price):
+        base = self._slot(symbol) * ROW_SLOTS
+        if price != self._rows[base + MARK]:
+            self._rows[base + MARK] = price
+            self._revalue(base)
+        return base
+
+    def check(self, symbol, quantity, price):
+        """Would a ``quantity`` order (positive buys, negative sells) at ``price`` pass? Returns (approved, reason)."""
+        self._acquire()
+        try:
+            reason = self._check(self._mark_row(symbol, price), quantity, price)
+            self._totals[CHECKS] += 1
+            if reason is not None:
+                self._totals[REJECTS] += 1
+            return reason is None, reason
+        finally:
+            self._release()
+
+    def submit(self, symbol, quantity, price):
+        """Check an order and, if it passes, reserve it as pending. Returns (approved, reason).
+
+        ``price`` also becomes the symbol's mark. An approved order must end
+        in ``fill`` and/or ``cancel`` for its full quantity.
+        """
+        if quantity == 0:
+            raise ValueError("Order quantity must not be zero")
+        self._acquire()
+        try:
+            base = self._mark_row(symbol, price)
+            reason = self._check(base, quantity, price)
+            self._totals[CHECKS] += 1
+            if reason is not None:
+                self._totals[REJECTS] += 1
+                return False, reason
+            self._rows[base + (PENDING_BUY_QTY if quantity > 0 else PENDING_SELL_QTY)] += abs(quantity)
+            self._revalue(base)
+            return True, None
+        finally:
+            self._release()
+
+    # Post-trade updates
+
+    def fill(self, symbol, quantity, price, fees=0.0, reserved=True):
+        """Book an execution. ``reserved`` releases that much of a submitted order;
+        fills that were never submitted (``reserved=False``) are booked as they are."""
+        self._acquire()
+        try:
+            base = self._slot(symbol) * ROW_SLOTS
+            rows = self._rows
+            if reserved:
+                pending = PENDING_BUY_QTY if quantity > 0 else PENDING_SELL_QTY
+                rows[base + pending] = max(0.0, rows[base + pending] - abs(quantity))
+            rows[base + QTY] += quantity
+            rows[base + MARK] = price
+            self._totals[CASH] -= quantity * price + fees
+            self._revalue(base)
+            self._roll_day()
+        finally:
+            self._release()
+
+    def cancel(self, symbol, quantity):
+        """Release the unfilled ``quantity`` of a submitted order."""
+        self._acquire()
+        try:
+            base = self._slot(symbol) * ROW_SLOTS
+            pending = PENDING_BUY_QTY if quantity > 0 else PENDING_SELL_QTY
+            self._rows[base + pending] = max(0.0, self._rows[base + pending] - abs(quantity))
+            self._revalue(base)
+        finally:
+            self._release()
+
+    def mark(self, symbol, price):
+        """Revalue a symbol at a new price."""
+        self._acquire()
+        try:
+            self._mark_row(symbol, price)
+            self._roll_day()
+        finally:
+            self._release()
+
+    # Control and reporting
+
+    def set_limits(self, **limits):
+        unknown = set(limits) - set(LIMIT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown risk limits: {', '.join(sorted(unknown))}; use {', '.join(LIMIT_NAMES)}")
+        for name, value in limits.items():
+            if value is not None and value < 0:
+                raise ValueError(f"{name} must not be negative")
+            self._limits[LIMIT_NAMES.index(name)] = INF if value is None else float(value)
+
+    def reset_day(self):
+        """Start a new trading day now: the day's loss is measured from the current equity again."""
+        self._acquire()
+        try:
+            self._totals[NEXT_RESET] = 0.0
+            self._roll_day()
+        finally:
+            self._release()
+
+    @property
+    def halted(self):
+        return bool(self._totals[HALTED])
+
+    def status(self):
+        """Firm totals, leverage, the day's P&L and the limits."""
+        totals = self._totals
+        equity = totals[CASH] + totals[NET]
+        status = {
+            'equity': equity,
+            'cash': totals[CASH],
+            'net': totals[NET],
+            'gross': totals[GROSS],
+            'exposure': totals[EXPOSURE],
+            'pending_buy': totals[PENDING_BUY],
+            'pending_sell': totals[PENDING_SELL],
+            'gross_leverage': totals[GROSS] / equity if equity > 0 else INF,
+            'net_leverage': abs(totals[NET]) / equity if equity > 0 else INF,
+            'day_pnl': equity - totals[DAY_START],
+            'halted': self.halted,
+            'checks': int(totals[CHECKS]),
+            'rejects': int(totals[REJECTS]),
+        }
+        status.update({name: self._limits[i] for i, name in enumerate(LIMIT_NAMES)})
+        return status
+
+    def positions(self):
+        """One row per symbol: position, open orders, mark and notional."""
+        rows = self._rows
+        records = []
+        for slot, symbol in enumerate(self.symbols()):
+            base = slot * ROW_SLOTS
+            records.append({
+                'symbol': symbol,
+                'quantity': rows[base + QTY],
+                'pending_buy': rows[base + PENDING_BUY_QTY],
+                'pending_sell': rows[base + PENDING_SELL_QTY],
+                'mark': rows[base + MARK],
+                'notional': rows[base + ROW_NET],
+                'exposure': rows[base + ROW_EXPOSURE]
+            })
+        return pd.DataFrame(records, columns=['symbol', 'quantity', 'pending_buy', 'pending_sell', 'mark',
+                                              'notional', 'exposure'])
+
+    def close(self, unlink=False):
+        """Detach from the book; the creator unlinks it when the service stops."""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        for view in (self._header, self._totals, self._limits, self._rows):
+            view.release()
+        self._buffer = None
+        if self.shm is not None:
+            self.shm.close()
+            if unlink:
+                self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Firm-wide risk book shared by strategy processes")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Create a book and keep it alive, printing its status")
+    run_parser.add_argument('name')
+    run_parser.add_argument('--capital', type=float, required=True)
+    for limit in LIMIT_NAMES:
+        run_parser.add_argument('--' + limit.replace('_', '-'), type=float, default=None)
+    run_parser.add_argument('--interval', type=float, default=10.0, help="Seconds between status lines")
+    status_parser = commands.add_parser('status', help="Show a running book")
+    status_parser.add_argument('name')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        book = RiskBook(args.name, capital=args.capital, create=True,
+                        **{limit: getattr(args, limit) for limit in LIMIT_NAMES})
+        print(f"Risk book '{args.name}' running with capital {args.capital:.2f}")
+        try:
+            while True:
+                time.sleep(args.interval)
+                status = book.status()
+                print(f"{pd.Timestamp.now()} equity {status['equity']:.2f}, day P&L {status['day_pnl']:.2f}, "
+                      f"gross {status['gross_leverage']:.2f}x, net {status['net_leverage']:.2f}x, "
+                      f"rejects {status['rejects']}/{status['checks']}" + (" HALTED" if status['halted'] else ""))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            book.close(unlink=True)
+    else:
+        with RiskBook(args.name) as book:
+            for key, value in book.status().items():
+                print(f"{key}: {value}")
+            print(book.positions().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
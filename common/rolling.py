@@ -0,0 +1,264 @@
+"""Sliding-window statistics (max, min, mean, standard deviation).
+
+Two ways to use them:
+
+* Batch - ``rolling_max``, ``rolling_min``, ``rolling_mean`` and
+  ``rolling_std`` take a whole array and return an array of the same length,
+  aligned like ``pd.Series.rolling(window).<stat>()``: the value at ``i``
+  covers ``values[i - window + 1:i + 1]``, the first ``window - 1`` entries
+  are NaN and so is any window that contains a NaN.
+* Streaming - ``RollingMax``, ``RollingMin`` and ``RollingStats`` take one
+  value per ``update`` call, for bar-by-bar loops and live feeds.
+
+Max/min use a monotonic deque when streaming and van Herk/Gil-Werman block
+maxima in batch mode; mean/variance use Welford's update when streaming and
+the blockwise parallel form of it in batch mode. Every bar costs O(1) (amortized for
+the deque), whatever the window length. Max/min are exact; means and
+standard deviations agree with pandas to rounding error.
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+NAN = float('nan')
+
+
+def _check_window(window):
+    if int(window) != window or window < 1:
+        raise ValueError(f"Window must be a positive integer, got {window}")
+    return int(window)
+
+
+def _block_extreme(values, window, ufunc, fill):
+    values = np.asarray(values, dtype=np.float64)
+    window = _check_window(window)
+    size = len(values)
+    result = np.full(size, np.nan)
+    if size < window:
+        return result
+
+    # Prefix extremes run forward inside each block of ``window`` values and
+    # suffix extremes run backward; every window spans at most two blocks.
+    padded_size = -(-size // window) * window
+    padded = np.full(padded_size, fill)
+    padded[:size] = values
+    blocks = padded.reshape(-1, window)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    starts = np.arange(size - window + 1)
+    result[window - 1:] = ufunc(suffix[starts], prefix[starts + window - 1])
+    return result
+
+
+def rolling_max(values, window):
+    """Maximum of each window of ``window`` values."""
+    return _block_extreme(values, window, np.maximum, -np.inf)
+
+
+def rolling_min(values, window):
+    """Minimum of each window of ``window`` values."""
+    return _block_extreme(values, window, np.minimum, np.inf)
+
+
+def _window_moments(values, window):
+    """Mean and sum of squared deviations of every full window, plus a NaN mask.
+
+    Uses the same two-block split as the extremes: each window is a suffix
+    of one block plus a prefix of the next. Each part is summed around its
+    own block's mean and the two parts are merged with the parallel form of
+    Welford's update (Chan et al.), so rounding error depends on the window
+    length rather than on the length of the series.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    size = len(values)
+    missing = np.isnan(values)
+
+    padded_size = -(-size // window) * window
+    blocks = np.zeros(padded_size)
+    blocks[:size] = np.where(missing, 0.0, values)
+    blocks = blocks.reshape(-1, window)
+    present = np.zeros(padded_size)
+    present[:size] = ~missing
+    present = present.reshape(-1, window)
+    counts = present.sum(axis=1, keepdims=True)
+    centres = blocks.sum(axis=1, keepdims=True) / np.maximum(counts, 1)
+    deviations = (blocks - centres) * present
+
+    def prefix_and_suffix(x):
+        prefix = np.cumsum(x, axis=1).ravel()
+        suffix = np.cumsum(x[:, ::-1], axis=1)[:, ::-1].ravel()
+        return prefix, suffix
+
+    prefix_sum, suffix_sum = prefix_and_suffix(deviations)
+    prefix_sq, suffix_sq = prefix_and_suffix(deviations * deviations)
+    centres = np.repeat(centres.ravel(), window)
+
+    starts = np.arange(size - window + 1)
+    ends = starts + window - 1
+    # Head part: rest of the start's block (empty when the window is block-aligned)
+    n_head = np.where(starts % window == 0, 0, window - starts % window)
+    n_tail = window - n_head
+    head_sum = np.where(n_head > 0, suffix_sum[starts], 0.0)
+    head_sq = np.where(n_head > 0, suffix_sq[starts], 0.0)
+    safe_head = np.maximum(n_head, 1)
+    head_mean = centres[starts] + head_sum / safe_head
+    head_m2 = head_sq - head_sum * head_sum / safe_head
+    tail_mean = centres[ends] + prefix_sum[ends] / n_tail
+    tail_m2 = prefix_sq[ends] - prefix_sum[ends] * prefix_sum[ends] / n_tail
+
+    delta = tail_mean - head_mean
+    means = head_mean + delta * n_tail / window
+    m2 = head_m2 + tail_m2 + delta * delta * n_head * n_tail / window
+
+    cumulative_missing = np.concatenate(([0], np.cumsum(missing)))
+    has_missing = cumulative_missing[window:] > cumulative_missing[:-window]
+    return means, m2, has_missing
+
+
+def rolling_mean(values, window):
+    """Mean of each window of ``window`` values."""
+    window = _check_window(window)
+    result = np.full(len(values), np.nan)
+    if len(values) < window:
+        return result
+    means, _, has_missing = _window_moments(values, window)
+    means[has_missing] = np.nan
+    result[window - 1:] = means
+    return result
+
+
+def rolling_std(values, window, ddof=1):
+    """Standard deviation of each window (sample std by default, like pandas)."""
+    window = _check_window(window)
+    result = np.full(len(values), np.nan)
+    if len(values) < window or window <= ddof:
+        return result
+    _, m2, has_missing = _window_moments(values, window)
+    stds = np.sqrt(np.maximum(m2, 0.0) / (window - ddof))
+    stds[has_missing] = np.nan
+    result[window - 1:] = stds
+    return result
+
+
+class _RollingExtreme:
+    """Monotonic deque of (index, value); the front is the current extreme."""
+
+    def __init__(self, window):
+        self.window = _check_window(window)
+        self.count = 0
+        self.candidates = deque()
+        self.last_missing = -1
+        self.value = NAN
+
+    def update(self, value):
+        """Add one value and return the extreme of the last ``window`` values (NaN until full)."""
+        index = self.count
+        self.count += 1
+        if math.isnan(value):
+            self.last_missing = index
+        else:
+            # A value beaten by a newer one can never be the extreme again
+            while self.candidates and not self._keeps(self.candidates[-1][1], value):
+                self.candidates.pop()
+            self.candidates.append((index, value))
+        while self.candidates and self.candidates[0][0] <= index - self.window:
+            self.candidates.popleft()
+
+        if self.count < self.window or self.last_missing > index - self.window:
+            self.value = NAN
+        else:
+            self.value = self.candidates[0][1]
+        return self.value
+
+    def _keeps(self, older, newer):
+        raise NotImplementedError
+
+
+class RollingMax(_RollingExtreme):
+    """Streaming maximum over the last ``window`` values."""
+
+    def _keeps(self, older, newer):
+        return older > newer
+
+
+class RollingMin(_RollingExtreme):
+    """Streaming minimum over the last ``window`` values."""
+
+    def _keeps(self, older, newer):
+        return older < newer
+
+
+class RollingStats:
+    """Streaming mean, variance and standard deviation over the last ``window`` values (Welford)."""
+
+    def __init__(self, window, ddof=1):
+        self.window = _check_window(window)
+        self.ddof = ddof
+        self.values = deque()
+        self.missing = 0
+        self.n = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+        self.removed = 0
+
+    def update(self, value):
+        """Add one value; returns the window mean (NaN until the window is full)."""
+        self.values.append(value)
+        self._add(value)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+            self.removed += 1
+            if self.removed == self.window:
+                # Removing values lets rounding error build up; once per
+                # window, recompute from the stored values (O(1) amortized)
+                self._recompute()
+        return self.mean
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window and self.missing == 0
+
+    @property
+    def mean(self):
+        return self.mean_ if self.ready else NAN
+
+    @property
+    def variance(self):
+        if not self.ready or self.window <= self.ddof:
+            return NAN
+        return max(self.m2, 0.0) / (self.window - self.ddof)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def _recompute(self):
+        self.removed = 0
+        present = [v for v in self.values if not math.isnan(v)]
+        self.n = len(present)
+        self.mean_ = math.fsum(present) / self.n if present else 0.0
+        self.m2 = math.fsum((v - self.mean_) ** 2 for v in present)
+
+    def _add(self, value):
+        if math.isnan(value):
+            self.missing += 1
+            return
+        self.n += 1
+        delta = value - self.mean_
+        self.mean_ += delta / self.n
+        self.m2 += delta * (value - self.mean_)
+
+    def _remove(self, value):
+        if math.isnan(value):
+            self.missing -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.mean_ = 0.0
+            self.m2 = 0.0
+            return
+        delta = value - self.mean_
+        self.mean_ -= delta / self.n
+        self.m2 -= delta * (value - self.mean_)
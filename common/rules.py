@@ -0,0 +1,432 @@
+"""Signal rules written as expressions and evaluated over whole columns.
+
+A strategy can keep its entry/exit conditions in config as strings:
+
+    BULLISH_RULE = "RSI <= RSI_OVERSOLD & MACD > Signal"
+    ENTRY_RULE = "crosses_above(Close, `Middle Bollinger Band`) & Volume > 1.5 * Volume_MA"
+
+and turn them into boolean arrays in one pass:
+
+    mask = rules.evaluate(config.BULLISH_RULE, df, rules.config_params(config))
+
+``compile_rule`` parses a rule once into a tree of NumPy operations; calling
+the result on a frame runs each operation over the full columns, so there is
+no Python work per row. Repeated sub-expressions (the same ``prev(Close)``
+in two places) are computed once per call.
+
+Syntax, loosest binding first:
+
+* ``|`` / ``or``, then ``&`` / ``and``, then ``~`` / ``not``. Unlike Python,
+  comparisons bind tighter than ``&``, so ``rsi < 30 & macd > signal`` means
+  what it says.
+* comparisons ``< <= > >= == !=``; chains such as ``20 < RSI < 30`` are
+  read as ``20 < RSI & RSI < 30``.
+* arithmetic ``+ - * /`` and unary minus.
+* numbers, names, ``(...)``, function calls and lookbacks ``x[n]`` (the
+  value ``n`` bars ago, like ``prev(x, n)``).
+
+Names are looked up in ``params`` first (config thresholds), then as exact
+column names, then as a column name ignoring case. Columns with spaces or
+other odd characters are quoted with backticks: ```Upper Bollinger Band```.
+
+Functions: ``prev(x, n=1)``, ``change(x, n=1)``, ``crosses_above(a, b)``,
+``crosses_below(a, b)``, ``rising(x, n=1)``, ``falling(x, n=1)``,
+``highest(x, n)``, ``lowest(x, n)``, ``sma(x, n)``, ``any(cond, n)`` /
+``all(cond, n)`` (true on any / all of the last ``n`` bars),
+``between(x, lo, hi)``, ``abs(x)``, ``min(a, b)``, ``max(a, b)``. A
+constant given where a series is expected (``highest(3, 5)``) is the same
+value on every bar.
+
+Comparisons involving NaN (indicator warm-up) are False, and so is a
+lookback past the first bar of a condition.
+"""
+import re
+
+import numpy as np
+
+from common import rolling
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<name>[A-Za-z_%][A-Za-z0-9_%]*)
+      | `(?P<quoted>[^`]+)`
+      | (?P<op><=|>=|==|!=|&&|\|\||[<>&|~!+\-*/()\[\],])
+    )""", re.VERBOSE)
+
+_KEYWORDS = {'and': '&', 'or': '|', 'not': '~', '&&': '&', '||': '|', '!': '~'}
+_COMPARISONS = ('<', '<=', '>', '>=', '==', '!=')
+
+
+def _tokenize(expr):
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        match = _TOKEN.match(expr, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Cannot parse rule at {expr[pos:pos + 20]!r} in {expr!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'number':
+            tokens.append(('num', float(text)))
+        elif kind == 'quoted':
+            tokens.append(('name', text))
+        elif kind == 'name' and text.lower() in _KEYWORDS:
+            tokens.append(('op', _KEYWORDS[text.lower()]))
+        elif kind == 'name' and text.lower() in ('true', 'false'):
+            tokens.append(('num', text.lower() == 'true'))
+        else:
+            tokens.append((kind, _KEYWORDS.get(text, text)))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing nested tuples."""
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.tokens = _tokenize(expr)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def accept(self, *ops):
+        kind, text = self.peek()
+        if kind == 'op' and text in ops:
+            self.pos += 1
+            return text
+        return None
+
+    def expect(self, op):
+        if self.accept(op) is None:
+            found = self.peek()[1]
+            raise ValueError(f"Expected {op!r} but found {found!r} in rule {self.expr!r}")
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty rule")
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected {self.peek()[1]!r} in rule {self.expr!r}")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept('|'):
+            node = ('|', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept('&'):
+            node = ('&', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.accept('~'):
+            return ('~', self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_sum()
+        node = None
+        while True:
+            op = self.accept(*_COMPARISONS)
+            if op is None:
+                break
+            right = self.parse_sum()
+            term = (op, left, right)
+            node = term if node is None else ('&', node, term)
+            left = right
+        return left if node is None else node
+
+    def parse_sum(self):
+        node = self.parse_product()
+        while True:
+            op = self.accept('+', '-')
+            if op is None:
+                return node
+            node = (op, node, self.parse_product())
+
+    def parse_product(self):
+        node = self.parse_unary()
+        while True:
+            op = self.accept('*', '/')
+            if op is None:
+                return node
+            node = (op, node, self.parse_unary())
+
+    def parse_unary(self):
+        if self.accept('-'):
+            return ('neg', self.parse_unary())
+        if self.accept('+'):
+            return self.parse_unary()
+        node = self.parse_atom()
+        while self.accept('['):
+            kind, bars = self.peek()
+            if kind != 'num' or bars != int(bars) or bars < 0:
+                raise ValueError(f"Lookback must be a non-negative integer in rule {self.expr!r}")
+            self.pos += 1
+            self.expect(']')
+            node = ('call', 'prev', (node, ('num', int(bars))))
+        return node
+
+    def parse_atom(self):
+        kind, text = self.peek()
+        if kind == 'num':
+            self.pos += 1
+            return ('num', text)
+        if kind == 'name':
+            self.pos += 1
+            if self.accept('('):
+                func = text.lower()
+                if func not in _FUNCTIONS:
+                    raise ValueError(f"Unknown function {text!r} in rule {self.expr!r}")
+                args = []
+                if not self.accept(')'):
+                    args.append(self.parse_or())
+                    while self.accept(','):
+                        args.append(self.parse_or())
+                    self.expect(')')
+                low, high = _FUNCTIONS[func][1:]
+                if not low <= len(args) <= high:
+                    raise ValueError(f"{func}() takes {low}-{high} arguments, got {len(args)} in rule {self.expr!r}")
+                return ('call', func, tuple(args))
+            return ('name', text)
+        if self.accept('('):
+            node = self.parse_or()
+            self.expect(')')
+            return node
+        raise ValueError(f"Unexpected {text!r} in rule {self.expr!r}" if text is not None
+                         else f"Rule {self.expr!r} ends too early")
+
+
+def _shift(values, bars):
+    if bars == 0 or np.ndim(values) == 0:
+        return values
+    if values.dtype == bool:
+        out = np.zeros_like(values)
+    else:
+        out = np.full(values.shape, np.nan)
+    if bars < len(values):
+        out[bars:] = values[:-bars]
+    return out
+
+
+def _float(values):
+    return np.asarray(values, dtype=float)
+
+
+def _window_count(cond, bars):
+    """How many of the last ``bars`` entries of ``cond`` are true."""
+    counts = np.cumsum(np.asarray(cond, dtype=np.int64))
+    out = counts.copy()
+    out[bars:] -= counts[:-bars]
+    return out
+
+
+def _bars(value, func):
+    if np.ndim(value) != 0 or value != int(value) or value < 1:
+        raise ValueError(f"{func}() needs a positive whole number of bars, got {value!r}")
+    return int(value)
+
+
+def _prev(x, bars=1):
+    if np.ndim(bars) != 0 or bars != int(bars) or bars < 0:
+        raise ValueError(f"prev() needs a non-negative whole number of bars, got {bars!r}")
+    return _shift(x, int(bars))
+
+
+def _crosses_above(a, b):
+    a, b = np.broadcast_arrays(_float(a), _float(b))
+    return (a > b) & (_shift(a, 1) <= _shift(b, 1))
+
+
+def _crosses_below(a, b):
+    a, b = np.broadcast_arrays(_float(a), _float(b))
+    return (a < b) & (_shift(a, 1) >= _shift(b, 1))
+
+
+def _any(cond, bars):
+    return _window_count(cond, _bars(bars, 'any')) > 0
+
+
+def _all(cond, bars):
+    bars = _bars(bars, 'all')
+    out = _window_count(cond, bars) == bars
+    out[:bars - 1] = False
+    return out
+
+
+# name -> (function, min args, max args); every argument is already evaluated
+_FUNCTIONS = {
+    'prev': (_prev, 1, 2),
+    'change': (lambda x, bars=1: x - _prev(x, bars), 1, 2),
+    'crosses_above': (_crosses_above, 2, 2),
+    'crosses_below': (_crosses_below, 2, 2),
+    'rising': (lambda x, bars=1: x > _prev(x, bars), 1, 2),
+    'falling': (lambda x, bars=1: x < _prev(x, bars), 1, 2),
+    'highest': (lambda x, bars: rolling.rolling_max(_float(x), _bars(bars, 'highest')), 2, 2),
+    'lowest': (lambda x, bars: rolling.rolling_min(_float(x), _bars(bars, 'lowest')), 2, 2),
+    'sma': (lambda x, bars: rolling.rolling_mean(_float(x), _bars(bars, 'sma')), 2, 2),
+    'any': (_any, 2, 2),
+    'all': (_all, 2, 2),
+    'between': (lambda x, low, high: (x >= low) & (x <= high), 3, 3),
+    'abs': (np.abs, 1, 1),
+    'min': (np.fmin, 2, 2),
+    'max': (np.fmax, 2, 2),
+}
+
+_BINARY = {
+    '|': np.logical_or, '&': np.logical_and,
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+    '==': np.equal, '!=': np.not_equal,
+    '+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide,
+}
+_LOGICAL = ('|', '&', '<', '<=', '>', '>=', '==', '!=')
+# functions whose first argument is a series with a window over it
+_WINDOWED = ('highest', 'lowest', 'sma', 'any', 'all')
+
+
+def _walk(node, names, counts):
+    """Collect the names in ``node`` and count how often each subtree occurs."""
+    counts[node] = counts.get(node, 0) + 1
+    if node[0] == 'name':
+        names.append(node[1])
+    elif node[0] == 'call':
+        for arg in node[2]:
+            _walk(arg, names, counts)
+    elif node[0] != 'num':
+        for child in node[1:]:
+            _walk(child, names, counts)
+
+
+class Rule:
+    """A parsed rule; call it with a frame (and params) to get a boolean mask."""
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.tree = _Parser(expr).parse()
+        names, counts = [], {}
+        _walk(self.tree, names, counts)
+        self.names = tuple(dict.fromkeys(names))
+        # subtrees used more than once are computed once and kept per call
+        self.shared = {node for node, count in counts.items() if count > 1 and node[0] not in ('num', 'name')}
+
+    def __repr__(self):
+        return f"Rule({self.expr!r})"
+
+    def resolve(self, df, params=None):
+        """Map each name in the rule to a param value or a column name."""
+        params = params or {}
+        lowered = {}
+        for column in df.columns:
+            lowered.setdefault(str(column).lower(), []).append(column)
+        resolved = {}
+        for name in self.names:
+            if name in params:
+                resolved[name] = ('param', params[name])
+            elif name in df.columns:
+                resolved[name] = ('column', name)
+            elif len(lowered.get(name.lower(), ())) == 1:
+                resolved[name] = ('column', lowered[name.lower()][0])
+            elif name.lower() in lowered:
+                raise ValueError(f"Name {name!r} in rule {self.expr!r} matches several columns: "
+                                 f"{lowered[name.lower()]}")
+            else:
+                raise ValueError(f"Unknown name {name!r} in rule {self.expr!r}; "
+                                 f"not a parameter or a column of the frame")
+        return resolved
+
+    def columns(self, df, params=None):
+        """Frame columns the rule reads."""
+        return [value for kind, value in self.resolve(df, params).values() if kind == 'column']
+
+    def __call__(self, df, params=None):
+        """Boolean NumPy array, one entry per row of ``df``."""
+        resolved = self.resolve(df, params)
+        values = {}
+        for name, (kind, value) in resolved.items():
+            if kind == 'column':
+                column = df[value].to_numpy()
+                values[name] = column if column.dtype == bool else _float(column)
+            else:
+                values[name] = value
+        cache = {}
+        scratch = {}  # intermediate arrays nothing else refers to, by id
+
+        def run(node):
+            if node in cache:
+                return cache[node]
+            kind = node[0]
+            if kind == 'num':
+                return node[1]
+            if kind == 'name':
+                return values[node[1]]
+            if kind == 'call':
+                args = [run(arg) for arg in node[2]]
+                if node[1] in _WINDOWED and np.ndim(args[0]) == 0:
+                    # a constant (``any(2 >= 2, 3)``) holds on every bar
+                    args[0] = np.full(len(df), args[0], dtype=bool if isinstance(args[0], (bool, np.bool_)) else float)
+                result = _FUNCTIONS[node[1]][0](*args)
+            elif kind in ('neg', '~'):
+                args = [run(node[1])]
+                ufunc = np.negative if kind == 'neg' else np.logical_not
+                result = ufunc(args[0], out=args[0]) if id(args[0]) in scratch else ufunc(args[0])
+            else:
+                ufunc = _BINARY[kind]
+                args = [run(node[1]), run(node[2])]
+                # write into an intermediate of the right dtype instead of allocating another
+                dtype = bool if kind in _LOGICAL else float
+                out = next((arg for arg in args if id(arg) in scratch and arg.dtype == dtype), None)
+                result = ufunc(*args) if out is None else ufunc(*args, out=out)
+            for arg in args:
+                scratch.pop(id(arg), None)
+            if node in self.shared:
+                cache[node] = result
+            elif (isinstance(result, np.ndarray) and result.shape == (len(df),) and result.base is None
+                  and not any(result is arg for arg in args)):
+                # only full-length arrays can take later results; constants broadcast to other shapes
+                scratch[id(result)] = result
+            return result
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.asarray(run(self.tree))
+        if result.dtype != bool:
+            # a bare numeric rule ("Signal") is true where non-zero
+            result = np.nan_to_num(result.astype(float)) != 0
+        if result.shape == (len(df),) and (id(result) in scratch or self.tree in self.shared):
+            return result
+        return np.broadcast_to(result, (len(df),)).copy()
+
+
+_compiled = {}
+
+
+def compile_rule(expr):
+    """Parse ``expr`` once; compiled rules are cached by their text."""
+    if isinstance(expr, Rule):
+        return expr
+    rule = _compiled.get(expr)
+    if rule is None:
+        rule = _compiled[expr] = Rule(expr)
+    return rule
+
+
+def evaluate(expr, df, params=None):
+    """Boolean array for ``expr`` over ``df``."""
+    return compile_rule(expr)(df, params)
+
+
+def signals(df, rules, params=None):
+    """Evaluate a dict of ``{signal_name: rule}``; returns ``{signal_name: mask}``."""
+    return {name: evaluate(expr, df, params) for name, expr in rules.items()}
+
+
+def config_params(module):
+    """Number and boolean settings of a config module, for use as rule params."""
+    return {name: value for name, value in vars(module).items()
+            if not name.startswith('_') and isinstance(value, (int, float, bool))}
@@ -0,0 +1,359 @@
+"""Memoised strategy runs.
+
+Research notebooks and CI call the same ``run_*`` functions on the same
+inputs again and again, and every call rewrites its logs and CSVs.
+``memoize`` wraps such a function so that a repeated call with unchanged
+inputs returns the stored result (trade ledger, metrics - whatever the
+function returns) and replays its console output instead of running:
+
+    @runcache.memoize(config)
+    def run_scalping_strategy():
+        ...
+
+The cache key is a SHA-256 over:
+
+* the source of the strategy module and of every ``common`` module it
+  imports, directly or through other ``common`` modules (found by reading
+  the import statements, so the key does not depend on what else the
+  process has loaded),
+* the effective config: public values of the given config modules plus
+  the call's arguments (with defaults applied),
+* a content fingerprint of every data file those values point to
+  (registered dataset names or existing file paths),
+* Python, NumPy, pandas and TA-Lib versions.
+
+Entries live in ``.runcache/`` at the repository root as one pickle each,
+with an index holding their size and last use. When the total size passes
+``max_bytes`` (``RUN_CACHE_MAX_MB`` in the environment, 256 MB by default)
+the least recently used entries are evicted.
+
+Environment switches: ``RUN_CACHE=off`` always runs and stores nothing,
+``RUN_CACHE=refresh`` runs and overwrites the stored result.
+
+Command line (from the repository root):
+
+    python -m common.runcache list
+    python -m common.runcache invalidate run_scalping_strategy
+    python -m common.runcache clear
+"""
+import argparse
+import ast
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import platform
+import sys
+import time
+import types
+
+from common import datasets
+
+CACHE_DIR = os.path.join(datasets.REPO_ROOT, '.runcache')
+COMMON_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_VERSION_MODULES = ('numpy', 'pandas', 'talib')
+
+
+class _Tee(io.TextIOBase):
+    """Write to the real stdout and keep a copy."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer_text = io.StringIO()
+
+    def write(self, text):
+        self.buffer_text.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _source_hash(path, digest):
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+
+
+def _common_imports(path):
+    """Names of the ``common`` modules imported anywhere in a source file."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names if alias.name.split('.')[0] == 'common')
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ''
+            if node.level and os.path.dirname(os.path.abspath(path)) == COMMON_DIR:
+                module = f"common.{module}" if module else 'common'
+            if module == 'common':
+                names.update(f"common.{alias.name}" for alias in node.names)
+            elif module.startswith('common.'):
+                names.add(module)
+    if names:
+        # Importing any submodule runs the package's __init__ first
+        names.add('common')
+    return names
+
+
+def _source_files(path):
+    """``path`` plus the files of every ``common`` module it depends on, in a fixed order."""
+    seen = set()
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for name in _common_imports(current):
+            parts = name.split('.')[1:]
+            candidates = [os.path.join(COMMON_DIR, *parts) + '.py', os.path.join(COMMON_DIR, *parts, '__init__.py')]
+            if not parts:
+                candidates = [os.path.join(COMMON_DIR, '__init__.py')]
+            pending += [c for c in candidates if os.path.isfile(c)]
+    seen.discard(path)
+    return [path] + sorted(seen)
+
+
+def _config_values(module, ignore):
+    values = {}
+    for name, value in vars(module).items():
+        if name.startswith('_') or name in ignore:
+            continue
+        if isinstance(value, (types.ModuleType, types.FunctionType, type)):
+            continue
+        values[name] = value
+    return values
+
+
+def _data_fingerprints(values, registry):
+    """Fingerprint every string among ``values`` that names a dataset or an existing file."""
+    found = {}
+
+    def visit(value):
+        if isinstance(value, str):
+            if value in registry:
+                found[value] = registry[value]['sha256']
+            elif os.path.isfile(value):
+                found[value] = datasets.file_hash(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                visit(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                visit(item)
+
+    visit(values)
+    return found
+
+
+def _json_default(value):
+    # Arrays and frames: hash the full content (their repr is truncated)
+    if hasattr(value, 'to_numpy') or hasattr(value, 'tobytes'):
+        return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+    return repr(value)
+
+
+def library_versions():
+    versions = {'python': platform.python_version()}
+    for name in _VERSION_MODULES:
+        module = sys.modules.get(name)
+        if module is None:
+            try:
+                module = __import__(name)
+            except ImportError:
+                versions[name] = None
+                continue
+        versions[name] = getattr(module, '__version__', None)
+    return versions
+
+
+def run_key(function, args=(), kwargs=None, config_modules=(), ignore=()):
+    """Cache key of one call, and the description stored next to the result."""
+    digest = hashlib.sha256()
+    module = sys.modules.get(function.__module__)
+    for path in _source_files(os.path.abspath(inspect.getsourcefile(function))):
+        _source_hash(path, digest)
+
+    bound = inspect.signature(function).bind(*args, **(kwargs or {}))
+    bound.apply_defaults()
+    config = {getattr(m, '__name__', str(m)): _config_values(m, set(ignore)) for m in config_modules}
+    call = {'arguments': dict(bound.arguments), 'config': config}
+    data = _data_fingerprints(call, datasets.read_registry())
+    description = {
+        'function': f"{getattr(module, '__name__', function.__module__)}.{function.__qualname__}",
+        'cwd': os.getcwd(),
+        'data': data,
+        'versions': library_versions()
+    }
+    digest.update(json.dumps(call, sort_keys=True, default=_json_default).encode('utf-8'))
+    digest.update(json.dumps(description, sort_keys=True, default=_json_default).encode('utf-8'))
+    return digest.hexdigest(), description
+
+
+class RunCache:
+    """Size-bounded store of pickled run results, evicted least recently used first."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=None):
+        self.directory = directory
+        self.index_file = os.path.join(directory, 'index.json')
+        if max_bytes is None:
+            max_mb = os.environ.get('RUN_CACHE_MAX_MB')
+            max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+
+    def _read_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.index_file + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(self.index_file + '.tmp', self.index_file)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """Stored (result, output) for a key, or None."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        index = self._read_index()
+        if key in index:
+            index[key]['last_used'] = time.time()
+            index[key]['hits'] = index[key].get('hits', 0) + 1
+            self._write_index(index)
+        return entry['result'], entry['output']
+
+    def put(self, key, result, output, description):
+        """Store a result; evicts old entries if the cache grows past ``max_bytes``."""
+        os.makedirs(self.directory, exist_ok=True)
+        payload = pickle.dumps({'result': result, 'output': output}, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return False
+        with open(self._path(key) + '.tmp', 'wb') as f:
+            f.write(payload)
+        os.replace(self._path(key) + '.tmp', self._path(key))
+
+        index = self._read_index()
+        now = time.time()
+        index[key] = dict(description, size=len(payload), created=now, last_used=now, hits=0)
+        self._evict(index)
+        self._write_index(index)
+        return True
+
+    def _evict(self, index):
+        total = sum(entry['size'] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= index[key]['size']
+            self._remove(key)
+            del index[key]
+
+    def _remove(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        """Index of stored runs, keyed by cache key."""
+        return self._read_index()
+
+    def invalidate(self, function=None, key=None):
+        """Drop one entry by key, or every entry whose function name contains ``function``."""
+        index = self._read_index()
+        doomed = [k for k, entry in index.items()
+                  if k == key or (function is not None and function in entry['function'])]
+        for k in doomed:
+            self._remove(k)
+            del index[k]
+        self._write_index(index)
+        return len(doomed)
+
+    def clear(self):
+        """Remove every stored run."""
+        count = len(self._read_index())
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            if name.endswith('.pkl') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.directory, name))
+        self._write_index({})
+        return count
+
+
+def memoize(*config_modules, ignore=(), cache=None):
+    """Decorator: return the stored result of a run when its inputs are unchanged.
+
+    ``config_modules`` are the modules whose public values feed the run;
+    ``ignore`` names config values that do not affect results, such as
+    log file names stamped with today's date.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            mode = os.environ.get('RUN_CACHE', 'on').lower()
+            if mode in ('off', '0', 'false', 'no'):
+                return function(*args, **kwargs)
+            store = cache or RunCache()
+            key, description = run_key(function, args, kwargs, config_modules, ignore)
+
+            if mode != 'refresh':
+                hit = store.get(key)
+                if hit is not None:
+                    result, output = hit
+                    sys.stdout.write(output)
+                    return result
+
+            tee = _Tee(sys.stdout)
+            previous, sys.stdout = sys.stdout, tee
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                sys.stdout = previous
+            store.put(key, result, tee.buffer_text.getvalue(), description)
+            return result
+
+        wrapper.uncached = function
+        return wrapper
+    return decorate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and clear the strategy run cache")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Show stored runs")
+    invalidate_parser = commands.add_parser('invalidate', help="Drop the stored runs of a function")
+    invalidate_parser.add_argument('function')
+    commands.add_parser('clear', help="Remove every stored run")
+    args = parser.parse_args()
+
+    cache = RunCache()
+    if args.command == 'list':
+        entries = cache.entries()
+        for key, entry in sorted(entries.items(), key=lambda item: -item[1]['last_used']):
+            used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used']))
+            print(f"{key[:12]} {entry['function']}: {entry['size'] / 1024:.1f} KB, "
+                  f"{entry.get('hits', 0)} hits, last used {used}")
+        print(f"{len(entries)} runs, {sum(e['size'] for e in entries.values()) / 1024 / 1024:.1f} MB "
+              f"of {cache.max_bytes / 1024 / 1024:.0f} MB")
+    elif args.command == 'invalidate':
+        print(f"Removed {cache.invalidate(function=args.function)} runs")
+    elif args.command == 'clear':
+        print(f"Removed {cache.clear()} runs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Per-bar decision traces with reasoning rendered on demand.
+
+Decision functions used to build a reasoning f-string ("Volume: 1,234 vs
+MA: ... | OBV: ...") on every bar, only to throw it away unless a trade
+opened. A ``DecisionTrace`` records the inputs and rule outcomes of each bar
+instead (one float64 slot per field, categories interned to codes) and
+keeps the formatting code in a render function that runs only when the
+reasoning is actually read:
+
+    TRACE = DecisionTrace({'volume': 'int', 'obv': 'float', 'above_ma': 'bool'}, render_reasoning)
+
+    def decision(row, volume_ma):
+        above_ma = row['Volume'] > volume_ma
+        ...
+        return "Buy", TRACE.record("Buy", row['Volume'], row['OBV'], above_ma)
+
+``record`` returns a ``Reason``; ``str(reason)`` (or using it in an
+f-string) calls ``render_reasoning(volume, obv, above_ma)`` for that bar.
+Strategies convert it with ``str`` when a trade opens. For audits,
+``to_frame(reasoning=True)`` renders every recorded bar.
+
+Field kinds:
+    'float'    - numbers (prices, indicator values)
+    'int'      - whole numbers such as bar volumes; stored as float64 (exact
+                 up to 2**53) and handed back as int. NaN, and a value
+                 with a fractional part, is handed back as a float rather
+                 than truncated
+    'bool'     - rule outcomes
+    'category' - anything else from a small set (position labels, None,
+                 per-run thresholds); the original objects are handed back
+                 to the render function unchanged
+"""
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+_KINDS = ('float', 'int', 'bool', 'category')
+
+# Bars kept by default; older blocks are dropped so a live loop stays bounded
+DEFAULT_MAX_BARS = 1_000_000
+
+
+class Reason:
+    """Handle to one recorded bar; renders its reasoning when converted to text."""
+
+    __slots__ = ('trace', 'bar')
+
+    def __init__(self, trace, bar):
+        self.trace = trace
+        self.bar = bar
+
+    def __str__(self):
+        return self.trace.reasoning(self.bar)
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+    def __repr__(self):
+        return f"Reason(bar={self.bar})"
+
+
+class DecisionTrace:
+    """Growable record of decision inputs, one row per ``record`` call."""
+
+    def __init__(self, fields, render, max_bars=DEFAULT_MAX_BARS, chunk=4096):
+        """``fields`` maps name to kind (see module docstring), in the order ``render`` takes them.
+
+        Recent bars are kept as the tuples they were recorded with and packed
+        into a float64 block every ``chunk`` bars; converting NumPy scalars
+        in bulk is several times cheaper than one at a time. The oldest
+        blocks are dropped once the trace grows past ``max_bars`` bars, so
+        live loops that never end stay bounded (None keeps every bar); bar
+        numbers keep counting from the start.
+        """
+        for name, kind in fields.items():
+            if kind not in _KINDS:
+                raise ValueError(f"Unknown field kind '{kind}' for field '{name}'")
+        if max_bars is not None and max_bars < chunk:
+            raise ValueError(f"max_bars must be at least one chunk ({chunk} bars)")
+        self.fields = dict(fields)
+        self.render = render
+        self.max_bars = max_bars
+        self.chunk = int(chunk)
+        self._width = len(self.fields)
+        self._kinds = tuple(self.fields.values())
+        self._categories = [i for i, kind in enumerate(self._kinds) if kind == 'category']
+        self._labels = []
+        self._codes = {}
+        self.clear()
+
+    def clear(self):
+        """Forget every recorded bar; earlier ``Reason`` handles stop rendering."""
+        self._blocks = []
+        self._block_decisions = []
+        self._pending = []
+        self._pending_decisions = []
+        self._first = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count - self._first
+
+    def _code(self, value):
+        key = (value.__class__, value)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self._labels)
+            self._labels.append(value)
+        return code
+
+    def record(self, decision, *values):
+        """Store one bar's decision and field values; returns its ``Reason``."""
+        if len(values) != self._width:
+            raise ValueError(f"Expected {self._width} values ({', '.join(self.fields)}), got {len(values)}")
+        self._pending.append(values)
+        self._pending_decisions.append(decision)
+        bar = self._count
+        self._count += 1
+        if len(self._pending) == self.chunk:
+            self._pack()
+        return Reason(self, bar)
+
+    def _packed(self, rows):
+        if self._categories:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for i in self._categories:
+                    row[i] = self._code(row[i])
+        return np.fromiter(chain.from_iterable(rows), dtype=np.float64,
+                           count=len(rows) * self._width).reshape(len(rows), self._width)
+
+    def _pack(self):
+        self._blocks.append(self._packed(self._pending))
+        self._block_decisions.append(np.array([self._code(d) for d in self._pending_decisions], dtype=np.int32))
+        self._pending = []
+        self._pending_decisions = []
+        if self.max_bars is not None:
+            while len(self) > self.max_bars:
+                del self._blocks[0], self._block_decisions[0]
+                self._first += self.chunk
+
+    def _locate(self, bar):
+        if not self._first <= bar < self._count:
+            raise IndexError(f"bar {bar} is not in the decision trace")
+        block, offset = divmod(bar - self._first, self.chunk)
+        return block, offset
+
+    def _row(self, bar):
+        block, offset = self._locate(bar)
+        if block < len(self._blocks):
+            raw = self._blocks[block][offset].tolist()
+            categories = True
+        else:
+            raw = self._pending[offset]
+            categories = False
+        row = []
+        for value, kind in zip(raw, self._kinds):
+            if kind == 'category':
+                row.append(self._labels[int(value)] if categories else value)
+            elif kind == 'bool':
+                row.append(bool(value))
+            elif kind == 'int' and float(value).is_integer():
+                row.append(int(value))
+            else:
+                row.append(value)
+        return row
+
+    def values(self, bar):
+        """Field values recorded for ``bar``, as a dict."""
+        return dict(zip(self.fields, self._row(bar)))
+
+    def decision(self, bar):
+        """Decision label recorded for ``bar``."""
+        block, offset = self._locate(bar)
+        if block < len(self._blocks):
+            return self._labels[self._block_decisions[block][offset]]
+        return self._pending_decisions[offset]
+
+    def reasoning(self, bar):
+        """Render the reasoning text of ``bar``."""
+        if 0 <= bar < self._first:
+            return f"(bar {bar} has been dropped from the decision trace)"
+        return self.render(*self._row(bar))
+
+    @property
+    def nbytes(self):
+        """Bytes held by the packed blocks (recent unpacked bars and labels excluded)."""
+        return sum(block.nbytes for block in self._blocks) + sum(d.nbytes for d in self._block_decisions)
+
+    def to_frame(self, reasoning=False):
+        """One row per recorded bar, indexed by bar number; optionally with rendered reasoning."""
+        raw = np.concatenate(self._blocks + [self._packed(self._pending)])
+        decisions = np.concatenate(self._block_decisions +
+                                   [np.array([self._code(d) for d in self._pending_decisions], dtype=np.int32)])
+        labels = np.empty(len(self._labels), dtype=object)
+        labels[:] = self._labels
+        frame = {}
+        for i, (name, kind) in enumerate(self.fields.items()):
+            column = raw[:, i]
+            if kind == 'bool':
+                column = column.astype(bool)
+            elif kind == 'int' and np.array_equal(column, np.trunc(column)):
+                column = column.astype(np.int64)
+            elif kind == 'category':
+                column = labels[column.astype(np.intp)]
+            frame[name] = column
+        frame['decision'] = labels[decisions]
+        index = pd.RangeIndex(self._first, self._count, name='bar')
+        frame = pd.DataFrame(frame, index=index)
+        if reasoning:
+            frame['reasoning'] = [self.reasoning(bar) for bar in index]
+        return frame
+
+    def to_csv(self, path, reasoning=True):
+        """Write the trace (with rendered reasoning by default) to a CSV file."""
+        self.to_frame(reasoning=reasoning).to_csv(path)
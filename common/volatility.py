@@ -0,0 +1,157 @@
+"""Rolling volatility estimators from OHLC bars, in batch and streaming form.
+
+Estimators (per-bar variance terms averaged over the last ``window`` bars,
+then annualized with ``periods_per_year``):
+
+* ``close_to_close`` - sample standard deviation of log close-to-close returns.
+* ``parkinson`` - high/low range: ``ln(H/L)^2 / (4 ln 2)``.
+* ``garman_klass`` - range plus open/close: ``0.5 ln(H/L)^2 - (2 ln 2 - 1) ln(C/O)^2``.
+* ``rogers_satchell`` - drift-independent: ``ln(H/C) ln(H/O) + ln(L/C) ln(L/O)``.
+* ``yang_zhang`` - overnight variance + ``k`` open-to-close variance +
+  ``(1 - k)`` Rogers-Satchell, with ``k = 0.34 / (1.34 + (n + 1) / (n - 1))``.
+
+Every value only uses the bar itself and earlier bars. Estimators that need
+the previous close (close-to-close, Yang-Zhang) start one bar later than the
+pure range estimators. Results are annualized fractions (0.18 is 18%).
+
+Batch:
+
+    vols = volatility.rolling_volatility(df['open'], df['high'], df['low'], df['close'],
+                                         windows=[10, 20, 60], estimator='yang_zhang')
+    df['YZ_20'] = vols[20]
+
+The logs and per-bar terms are computed once and shared by every window;
+each window then costs one pass of ``common.rolling``.
+
+Streaming:
+
+    vol = volatility.RollingVolatility(20, estimator='parkinson')
+    for bar in feed:
+        current = vol.update(bar.open, bar.high, bar.low, bar.close)
+
+Both forms agree to rounding error.
+"""
+import math
+
+import numpy as np
+
+from common import rolling
+
+NAN = float('nan')
+
+ESTIMATORS = ('close_to_close', 'parkinson', 'garman_klass', 'rogers_satchell', 'yang_zhang')
+
+_PARKINSON = 1.0 / (4.0 * math.log(2.0))
+_GARMAN_KLASS = 2.0 * math.log(2.0) - 1.0
+
+
+def _check_estimator(estimator):
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Unknown volatility estimator '{estimator}' (expected one of {', '.join(ESTIMATORS)})")
+
+
+def yang_zhang_k(window):
+    """Weight of the open-to-close variance in the Yang-Zhang estimator."""
+    if window < 2:
+        raise ValueError("Yang-Zhang needs a window of at least 2 bars")
+    return 0.34 / (1.34 + (window + 1) / (window - 1))
+
+
+def _terms(open_, high, low, close, estimator):
+    """Per-bar series the estimator averages (means) or takes the variance of (variances)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_close = np.log(np.asarray(close, dtype=np.float64))
+        previous_close = np.concatenate(([np.nan], log_close[:-1]))
+        if estimator == 'close_to_close':
+            return {'variances': [log_close - previous_close]}
+        log_high = np.log(np.asarray(high, dtype=np.float64))
+        log_low = np.log(np.asarray(low, dtype=np.float64))
+        hl = log_high - log_low
+        if estimator == 'parkinson':
+            return {'means': [_PARKINSON * hl * hl]}
+        log_open = np.log(np.asarray(open_, dtype=np.float64))
+        co = log_close - log_open
+        if estimator == 'garman_klass':
+            return {'means': [0.5 * hl * hl - _GARMAN_KLASS * co * co]}
+        rs = (log_high - log_close) * (log_high - log_open) + (log_low - log_close) * (log_low - log_open)
+        if estimator == 'rogers_satchell':
+            return {'means': [rs]}
+        return {'variances': [log_open - previous_close, co], 'means': [rs]}
+
+
+def _variance(terms, estimator, window):
+    """Rolling per-bar variance of one estimator for one window."""
+    if estimator == 'yang_zhang':
+        overnight, open_close = (rolling.rolling_std(t, window) ** 2 for t in terms['variances'])
+        k = yang_zhang_k(window)
+        rs = rolling.rolling_mean(terms['means'][0], window)
+        return overnight + k * open_close + (1 - k) * rs
+    if 'variances' in terms:
+        return rolling.rolling_std(terms['variances'][0], window) ** 2
+    return rolling.rolling_mean(terms['means'][0], window)
+
+
+def rolling_volatility(open_, high, low, close, windows, estimator='yang_zhang', periods_per_year=252):
+    """Annualized rolling volatility for one window (an array) or several (a dict window -> array).
+
+    ``open_`` is unused by close-to-close and Parkinson and may be None
+    for them; ``high``/``low`` likewise for close-to-close.
+    """
+    _check_estimator(estimator)
+    single = np.isscalar(windows)
+    terms = _terms(open_, high, low, close, estimator)
+    result = {}
+    for window in ([windows] if single else windows):
+        variance = _variance(terms, estimator, window)
+        # Rogers-Satchell and Garman-Klass terms can average slightly below zero on flat bars
+        result[window] = np.sqrt(np.maximum(variance, 0.0) * periods_per_year)
+    return result[windows] if single else result
+
+
+class RollingVolatility:
+    """Streaming form of ``rolling_volatility`` for one window; O(1) per bar."""
+
+    def __init__(self, window, estimator='yang_zhang', periods_per_year=252):
+        _check_estimator(estimator)
+        self.window = rolling._check_window(window)
+        self.estimator = estimator
+        self.periods_per_year = periods_per_year
+        self.k = yang_zhang_k(self.window) if estimator == 'yang_zhang' else None
+        n_variances = {'close_to_close': 1, 'yang_zhang': 2}.get(estimator, 0)
+        self._variances = [rolling.RollingStats(self.window) for _ in range(n_variances)]
+        self._mean = rolling.RollingStats(self.window) if estimator != 'close_to_close' else None
+        self._previous_close = NAN
+        self.value = NAN
+
+    def update(self, open_, high, low, close):
+        """Add one bar and return the annualized volatility (NaN until the window is full)."""
+        log_close = math.log(close) if close > 0 else NAN
+        previous_close, self._previous_close = self._previous_close, log_close
+        estimator = self.estimator
+        if estimator == 'close_to_close':
+            self._variances[0].update(log_close - previous_close)
+            variance = self._variances[0].variance
+        else:
+            hl = math.log(high / low) if high > 0 and low > 0 else NAN
+            if estimator == 'parkinson':
+                self._mean.update(_PARKINSON * hl * hl)
+                variance = self._mean.mean
+            else:
+                log_open = math.log(open_) if open_ > 0 else NAN
+                co = log_close - log_open
+                if estimator == 'garman_klass':
+                    self._mean.update(0.5 * hl * hl - _GARMAN_KLASS * co * co)
+                    variance = self._mean.mean
+                else:
+                    log_high = math.log(high) if high > 0 else NAN
+                    log_low = math.log(low) if low > 0 else NAN
+                    self._mean.update((log_high - log_close) * (log_high - log_open) +
+                                      (log_low - log_close) * (log_low - log_open))
+                    variance = self._mean.mean
+                    if estimator == 'yang_zhang':
+                        overnight, open_close = self._variances
+                        overnight.update(log_open - previous_close)
+                        open_close.update(co)
+                        variance = overnight.variance + self.k * open_close.variance + (1 - self.k) * variance
+        self.value = math.sqrt(max(variance, 0.0) * self.periods_per_year) if variance == variance else NAN
+        return self.value